@@ -0,0 +1,86 @@
+"""
+Benchmark the warm pytest worker against cold ``python -m pytest`` runs.
+
+Builds a small project whose tests import a few heavy third-party modules
+(by default Forge's own PySide6 and pygit2), then times the same test run
+started cold (a new interpreter that imports everything) and forked from a
+warm worker that has those modules preloaded. The worker's one-time startup
+is reported separately.
+
+Run from the repository root:
+
+    python benchmarks/bench_pytest_worker.py [--imports numpy,scipy.sparse] [--runs N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forge.tools.process_runner import CommandResult, run_command  # noqa: E402
+from forge.tools.pytest_worker import PytestWorker  # noqa: E402
+
+_PYTEST_ARGS = ["-q", "-p", "no:cacheprovider"]
+
+
+def _build_project(root: Path, modules: list[str], test_files: int) -> None:
+    """A package plus ``test_files`` test modules that import it and ``modules``."""
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text("def double(x):\n    return 2 * x\n")
+    (root / "tests").mkdir()
+    imports = "".join(f"import {name}\n" for name in modules)
+    for i in range(test_files):
+        (root / "tests" / f"test_{i:03d}.py").write_text(
+            f"{imports}from pkg import double\n\n"
+            f"def test_double():\n    assert double({i}) == {2 * i}\n"
+        )
+
+
+def _time(label: str, fn: Callable[[], CommandResult], runs: int) -> float:
+    times: list[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+        assert result.returncode == 0, result.stdout + result.stderr
+    mean = sum(times) / len(times)
+    print(f"{label:<28} {min(times) * 1000:8.1f} ms best {mean * 1000:8.1f} ms mean ({runs} runs)")
+    return mean
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--imports", default="PySide6.QtWidgets,pygit2")
+    parser.add_argument("--test-files", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+    modules = [name for name in args.imports.split(",") if name]
+
+    with tempfile.TemporaryDirectory(prefix="forge_bench_") as tmp:
+        root = Path(tmp)
+        _build_project(root, modules, args.test_files)
+        worker = PytestWorker(root)
+        try:
+            start = time.perf_counter()
+            worker.run(_PYTEST_ARGS, modules)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"{'worker start + first run':<28} {elapsed:8.1f} ms")
+            print(f"Preloaded: {', '.join(worker.preloaded) or 'nothing'}")
+
+            cold = _time(
+                "cold python -m pytest",
+                lambda: run_command([sys.executable, "-m", "pytest", *_PYTEST_ARGS], root),
+                args.runs,
+            )
+            warm = _time("warm worker", lambda: worker.run(_PYTEST_ARGS, modules), args.runs)
+        finally:
+            worker.stop()
+        print(f"{'saved per invocation':<28} {(cold - warm) * 1000:8.1f} ms ({cold / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark ForgeRepository.create_tree_from_changes on a large synthetic tree.
+
+Builds a repository with 100k files (100 top-level directories x 10
+subdirectories x 100 files), then times committing a few hundred scattered
+changes and deletions, and a no-op change set that must return the base tree.
+
+Run from the repository root:
+
+    python benchmarks/bench_tree_builder.py [--files-per-dir N]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pygit2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forge.git_backend.repository import ForgeRepository  # noqa: E402
+
+_SIG = pygit2.Signature("Bench", "bench@example.com")
+
+
+def _build_repo(path: Path, top: int, sub: int, files: int) -> list[str]:
+    """Create the synthetic repository; returns all file paths."""
+    repo = pygit2.init_repository(str(path))
+    paths: list[str] = []
+    root = repo.TreeBuilder()
+    for i in range(top):
+        top_builder = repo.TreeBuilder()
+        for j in range(sub):
+            sub_builder = repo.TreeBuilder()
+            for k in range(files):
+                name = f"file{k:03d}.py"
+                mode = (
+                    pygit2.GIT_FILEMODE_BLOB_EXECUTABLE if k % 10 == 0 else pygit2.GIT_FILEMODE_BLOB
+                )
+                sub_builder.insert(name, repo.create_blob(f"# {i}/{j}/{k}\n".encode()), mode)
+                paths.append(f"dir{i:03d}/sub{j:02d}/{name}")
+            top_builder.insert(f"sub{j:02d}", sub_builder.write(), pygit2.GIT_FILEMODE_TREE)
+        root.insert(f"dir{i:03d}", top_builder.write(), pygit2.GIT_FILEMODE_TREE)
+    repo.create_commit("refs/heads/master", _SIG, _SIG, "synthetic", root.write(), [])
+    repo.set_head("refs/heads/master")
+    return paths
+
+
+def _blob_text(repo: ForgeRepository, tree: pygit2.Tree, path: str) -> str:
+    blob = repo.repo[tree[path].id]
+    assert isinstance(blob, pygit2.Blob)
+    return blob.data.decode()
+
+
+def _time(label: str, fn: Callable[[], object], repeat: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:8.1f} ms (best of {repeat})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--files-per-dir", type=int, default=100)
+    parser.add_argument("--changes", type=int, default=300)
+    parser.add_argument("--deletions", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="forge_bench_") as tmp:
+        start = time.perf_counter()
+        paths = _build_repo(Path(tmp), 100, 10, args.files_per_dir)
+        print(f"Built {len(paths):,} files in {time.perf_counter() - start:.1f} s")
+
+        repo = ForgeRepository(tmp)
+        rng = random.Random(42)
+        sample = rng.sample(paths, args.changes + args.deletions)
+        changes = {p: f"changed {p}\n" for p in sample[: args.changes]}
+        changes.update({f"new/dir{n}/added.py": "new\n" for n in range(10)})
+        deletions = set(sample[args.changes :])
+        base_tree = repo.get_branch_head("master").tree
+
+        _time(
+            f"{len(changes)} changes + {len(deletions)} deletions",
+            lambda: repo.create_tree_from_changes("master", changes, deletions),
+        )
+
+        unchanged = {p: _blob_text(repo, base_tree, p) for p in sample[:100]}
+        result: list[pygit2.Oid] = []
+        _time(
+            "100 writes of identical content",
+            lambda: result.append(repo.create_tree_from_changes("master", unchanged)),
+        )
+        assert result[-1] == base_tree.id, "No-op change set should return the base tree"
+
+
+if __name__ == "__main__":
+    main()
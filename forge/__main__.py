@@ -0,0 +1,17 @@
+"""
+Entry point for ``python -m forge``, main.py and the ``forge`` console script.
+
+Deliberately minimal: worker processes of forge.runtime.process_pool re-import
+the main script when they start, and must not pull in Qt and the UI through
+it. The application is imported only when ``main`` runs.
+"""
+
+
+def main() -> None:
+    from forge.main import main as run_app
+
+    run_app()
+
+
+if __name__ == "__main__":
+    main()
@@ -35,6 +35,12 @@ class Settings:
             # exposed as a regular API tool, so disabling this never removes a
             # capability; it only controls the text-parsing path.
             "inline_tools_enabled": True,
+            # When True, finished inline <replace>/<write>/<delete_file>/
+            # <rename_file> blocks are applied to the pending changes while
+            # the response is still streaming, instead of all at once after
+            # it ends. Failures are reported the same way; a response that
+            # fails the parse-check has its early edits rolled back.
+            "pipelined_inline_commands": False,
             "prefix_tool_args": False,
             # Gates the context mechanism (explicit add-to-context of an
             # image file) for models without vision support. Does NOT gate
@@ -51,6 +57,9 @@ class Settings:
         "ui": {
             "theme": "light",
             "editor_ai_split": [2, 1],  # Ratio for splitter
+            # Streaming events reach the chat view in batches, at most one
+            # per this many milliseconds (0 delivers every token at once)
+            "event_flush_ms": 16,
         },
         "git": {"auto_commit": False},
     }
@@ -146,8 +155,9 @@ class Settings:
     def get_parallel_summarization(self) -> int:
         """Get the number of parallel requests to use for summarization.
 
-        Controls how many LLM requests run concurrently when generating file summaries.
-        Higher values speed up initial summarization but use more API quota.
+        The ceiling on concurrent LLM requests when generating file summaries;
+        the scheduler backs off below it when the provider rate-limits or slows
+        down. Higher values speed up initial summarization but use more API quota.
         """
         parallel: int = int(self.get("llm.parallel_summarization", 8))
         return max(1, parallel)  # At least 1
@@ -160,6 +170,11 @@ class Settings:
         """
         return bool(self.get("llm.vision_enabled", False))
 
+    def get_event_flush_interval(self) -> int:
+        """Milliseconds to batch streaming events for before the UI sees them."""
+        interval: int = int(self.get("ui.event_flush_ms", 16))
+        return max(0, interval)
+
     def get_summary_token_budget(self) -> int:
         """Get the token budget for file summaries.
 
@@ -2,7 +2,6 @@
 Git repository management using pygit2
 """
 
-import contextlib
 from pathlib import Path
 
 import pygit2
@@ -16,6 +15,49 @@ from forge.constants import (
 )
 from forge.git_backend.commit_types import CommitType, format_commit_message, parse_commit_type
 
+# Filemodes of file entries, kept when a file's content changes
+_BLOB_FILEMODES = (
+    pygit2.GIT_FILEMODE_BLOB,
+    pygit2.GIT_FILEMODE_BLOB_EXECUTABLE,
+    pygit2.GIT_FILEMODE_LINK,
+)
+
+
+class _TreeEdit:
+    """Pending changes to one directory, and to directories below it.
+
+    ``blobs`` maps file names to their new blob OID, or None to delete them.
+    """
+
+    __slots__ = ("blobs", "subdirs")
+
+    def __init__(self) -> None:
+        self.blobs: dict[str, pygit2.Oid | None] = {}
+        self.subdirs: dict[str, _TreeEdit] = {}
+
+    def at(self, filepath: str) -> "_TreeEdit":
+        """The edit for the directory containing ``filepath``."""
+        edit = self
+        for part in filepath.split("/")[:-1]:
+            sub = edit.subdirs.get(part)
+            if sub is None:
+                sub = edit.subdirs[part] = _TreeEdit()
+            edit = sub
+        return edit
+
+    def has_writes(self) -> bool:
+        """Whether anything is written (not just deleted) at or below here."""
+        return any(oid is not None for oid in self.blobs.values()) or any(
+            sub.has_writes() for sub in self.subdirs.values()
+        )
+
+
+def _tree_entry(tree: pygit2.Tree | None, name: str) -> pygit2.Object | None:
+    """Direct child of a tree by name, or None."""
+    if tree is None or name not in tree:
+        return None
+    return tree[name]
+
 
 class RepositorySignals(QObject):
     """Qt signals for repository changes."""
@@ -142,8 +184,11 @@ class ForgeRepository:
         """
         Create a new tree with changes applied to base branch.
 
-        Properly handles multiple files in the same directory by building
-        a nested structure first, then constructing trees recursively.
+        Changes and deletions are grouped by directory once, then only the
+        directories on their paths are rebuilt; every other subtree is reused
+        as-is. Existing filemodes (executable bits, symlinks) are kept for
+        changed files. If nothing effectively changes, the base tree's OID is
+        returned without writing anything.
 
         Args:
             base_branch: Branch name to use as base
@@ -156,121 +201,96 @@ class ForgeRepository:
         """
         # Get base commit
         base_commit = self.get_branch_head(base_branch)
-        base_tree = base_commit.tree
+        return self._apply_changes(base_commit.tree, changes, deletions, binary_changes)
 
-        # Build nested structure for changes: {name: blob_oid} or {name: {nested...}}
-        nested_changes: dict = {}
+    def _apply_changes(
+        self,
+        base_tree: pygit2.Tree,
+        changes: dict[str, str],
+        deletions: set[str] | None = None,
+        binary_changes: dict[str, bytes] | None = None,
+    ) -> pygit2.Oid:
+        """Write a tree: ``base_tree`` with changes applied (see create_tree_from_changes)."""
+        # Group everything by directory: one pass over the changed paths
+        root = _TreeEdit()
+        for filepath in deletions or ():
+            root.at(filepath).blobs.setdefault(filepath.rsplit("/", 1)[-1], None)
         for filepath, content in changes.items():
-            blob_oid = self.repo.create_blob(content.encode("utf-8"))
-            parts = filepath.split("/")
-            current = nested_changes
-            for part in parts[:-1]:
-                if part not in current or not isinstance(current[part], dict):
-                    current[part] = {}
-                current = current[part]
-            current[parts[-1]] = blob_oid
-
+            root.at(filepath).blobs[filepath.rsplit("/", 1)[-1]] = self._write_blob(
+                content.encode("utf-8")
+            )
         for filepath, raw_content in (binary_changes or {}).items():
-            blob_oid = self.repo.create_blob(raw_content)
-            parts = filepath.split("/")
-            current = nested_changes
-            for part in parts[:-1]:
-                if part not in current or not isinstance(current[part], dict):
-                    current[part] = {}
-                current = current[part]
-            current[parts[-1]] = blob_oid
-
-        # Build nested structure for deletions
-        nested_deletions: set = deletions or set()
-
-        # Recursively build tree
-        tree_oid = self._build_tree_recursive(base_tree, nested_changes, nested_deletions, "")
+            root.at(filepath).blobs[filepath.rsplit("/", 1)[-1]] = self._write_blob(raw_content)
+
+        tree_oid = self._build_tree_recursive(base_tree, root)
+        if tree_oid is None:
+            # Everything was deleted
+            return self.repo.TreeBuilder().write()
         return tree_oid
 
+    def _write_blob(self, data: bytes) -> pygit2.Oid:
+        """Store a blob, skipping the write if the object already exists."""
+        oid = pygit2.hash(data)
+        if oid not in self.repo.odb:
+            self.repo.create_blob(data)
+        return oid
+
     def _build_tree_recursive(
-        self,
-        base_tree: pygit2.Tree | None,
-        changes: dict,
-        deletions: set[str],
-        current_path: str,
-    ) -> pygit2.Oid:
+        self, base_tree: pygit2.Tree | None, edit: "_TreeEdit"
+    ) -> pygit2.Oid | None:
         """
-        Recursively build a tree from nested changes structure.
+        Apply one directory's edits to its base tree.
 
         Args:
             base_tree: The base tree at this level (or None for new dirs)
-            changes: Nested dict of changes at this level
-            deletions: Full set of deletion paths (we filter by current_path)
-            current_path: Path prefix for this level (for deletion matching)
+            edit: Changes and deletions at and below this level
+
+        Returns:
+            OID of the resulting tree (the base tree's own OID if nothing
+            changed), or None if it ended up empty.
         """
         tree_builder = self.repo.TreeBuilder(base_tree) if base_tree else self.repo.TreeBuilder()
-
-        # Find deletions at this level and subdirectories that need recursion for deletions
-        subdirs_with_deletions: dict[str, set[str]] = {}
-        for del_path in list(deletions):
-            # Check if this deletion is at or below the current level
-            if current_path:
-                if not del_path.startswith(current_path + "/"):
-                    continue
-                relative = del_path[len(current_path) + 1 :]
-            else:
-                relative = del_path
-
-            parts = relative.split("/")
-            if len(parts) == 1:
-                # Direct deletion at this level
-                with contextlib.suppress(KeyError):
-                    tree_builder.remove(parts[0])
-            else:
-                # Deletion in a subdirectory - we need to recurse into it
-                subdir_name = parts[0]
-                if subdir_name not in subdirs_with_deletions:
-                    subdirs_with_deletions[subdir_name] = set()
-                subdirs_with_deletions[subdir_name].add(del_path)
-
-        # Process subdirectories that have deletions but no changes
-        for subdir_name in subdirs_with_deletions:
-            if subdir_name in changes:
-                # Will be handled below in the changes loop
-                continue
-
-            # Need to recurse into this subdir just for deletions
-            subtree = None
-            if base_tree:
-                try:
-                    entry = base_tree[subdir_name]
-                    obj = self.repo[entry.id]
-                    if isinstance(obj, pygit2.Tree):
-                        subtree = obj
-                except KeyError:
-                    pass
-
-            if subtree:
-                subpath = f"{current_path}/{subdir_name}" if current_path else subdir_name
-                subtree_oid = self._build_tree_recursive(subtree, {}, deletions, subpath)
-                tree_builder.insert(subdir_name, subtree_oid, pygit2.GIT_FILEMODE_TREE)
-
-        # Process all changes at this level
-        for name, value in changes.items():
-            if isinstance(value, dict):
-                # It's a subdirectory - recurse
-                subtree = None
-                if base_tree:
-                    try:
-                        entry = base_tree[name]
-                        obj = self.repo[entry.id]
-                        if isinstance(obj, pygit2.Tree):
-                            subtree = obj
-                    except KeyError:
-                        pass
-
-                subpath = f"{current_path}/{name}" if current_path else name
-                subtree_oid = self._build_tree_recursive(subtree, value, deletions, subpath)
+        changed = False
+
+        # Subdirectories first: a directory replaced by a file (or a file by a
+        # directory) must be gone before the blob edits below look at the name
+        for name, sub_edit in edit.subdirs.items():
+            existing = _tree_entry(base_tree, name)
+            subtree = existing if isinstance(existing, pygit2.Tree) else None
+            if subtree is None and not sub_edit.has_writes():
+                continue  # Only deletions, in a directory that doesn't exist
+
+            subtree_oid = self._build_tree_recursive(subtree, sub_edit)
+            if subtree_oid is None:
+                if subtree is not None:
+                    tree_builder.remove(name)  # Directory became empty
+                    changed = True
+            elif subtree is None or subtree.id != subtree_oid:
                 tree_builder.insert(name, subtree_oid, pygit2.GIT_FILEMODE_TREE)
-            else:
-                # It's a file - value is the blob_oid
-                tree_builder.insert(name, value, pygit2.GIT_FILEMODE_BLOB)
+                changed = True
+
+        for name, blob_oid in edit.blobs.items():
+            # What the subdirectories left under this name, not the base tree's
+            existing = tree_builder.get(name)
+            if blob_oid is None:
+                # Deletion (of a file; a directory of the same name is kept)
+                if existing is not None and existing.filemode != pygit2.GIT_FILEMODE_TREE:
+                    tree_builder.remove(name)
+                    changed = True
+                continue
 
+            mode = pygit2.GIT_FILEMODE_BLOB
+            if existing is not None and existing.filemode in _BLOB_FILEMODES:
+                mode = existing.filemode
+                if existing.id == blob_oid:
+                    continue  # Same content
+            tree_builder.insert(name, blob_oid, mode)
+            changed = True
+
+        if not changed:
+            return base_tree.id if base_tree is not None else None
+        if len(tree_builder) == 0:
+            return None
         return tree_builder.write()
 
     def commit_tree(
@@ -399,19 +419,7 @@ class ForgeRepository:
         if new_tree_oid is not None:
             tree_oid = new_tree_oid
         elif additional_changes:
-            # Build nested structure and create tree properly
-            nested_changes: dict = {}
-            for filepath, content in additional_changes.items():
-                blob_oid = self.repo.create_blob(content.encode("utf-8"))
-                parts = filepath.split("/")
-                current = nested_changes
-                for part in parts[:-1]:
-                    if part not in current or not isinstance(current[part], dict):
-                        current[part] = {}
-                    current = current[part]
-                current[parts[-1]] = blob_oid
-
-            tree_oid = self._build_tree_recursive(head_commit.tree, nested_changes, set(), "")
+            tree_oid = self._apply_changes(head_commit.tree, additional_changes)
         else:
             # No changes, use existing tree
             tree_oid = head_commit.tree.id
@@ -0,0 +1,32 @@
+"""
+Locations for Forge's per-repository data on disk.
+
+Caches derived from immutable git objects (keyed by blob or tree OID) live
+inside the repository's git directory under ``forge/``, next to the objects
+they describe. They are shared by every branch and every Forge process working
+on the repository, and disappear with it.
+"""
+
+from pathlib import Path
+
+import pygit2
+
+
+def common_git_dir(repo: pygit2.Repository) -> Path:
+    """The git directory holding the repository's objects and refs.
+
+    For a linked worktree ``repo.path`` is ``.git/worktrees/<name>/``; the
+    shared objects live in the directory its ``commondir`` file points at.
+    """
+    git_dir = Path(repo.path)
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        return (git_dir / commondir_file.read_text().strip()).resolve()
+    return git_dir
+
+
+def forge_data_dir(repo: pygit2.Repository) -> Path:
+    """Directory for Forge's per-repository caches (created on demand)."""
+    path = common_git_dir(repo) / "forge"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
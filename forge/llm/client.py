@@ -11,6 +11,21 @@ import requests
 
 from forge.llm.cost_tracker import COST_TRACKER
 from forge.llm.request_log import REQUEST_LOG
+from forge.llm.transport import TRANSPORT
+
+
+class RateLimitError(requests.HTTPError):
+    """Raised by `LLMClient.chat` when a 429 persists through every retry.
+
+    `retry_after` is the server's Retry-After hint in seconds, if it sent one.
+    """
+
+    def __init__(self, message: str, response: requests.Response) -> None:
+        super().__init__(message, response=response)
+        try:
+            self.retry_after: float | None = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            self.retry_after = None
 
 
 class LLMClient:
@@ -26,16 +41,22 @@ class LLMClient:
         self.model = model
         self.base_url = base_url
 
-    def get_available_models(self) -> list[dict[str, Any]]:
-        """Fetch list of available models from OpenRouter"""
-        headers = {
+        # Built once and reused for every request
+        self._headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "HTTP-Referer": "https://github.com/FeepingCreature/forge",
             "X-Title": "Forge",
         }
+        self._stream_headers = {
+            **self._headers,
+            # Enable fine-grained tool streaming for Anthropic models
+            "x-anthropic-beta": "fine-grained-tool-streaming-2025-05-14",
+        }
 
-        response = requests.get(f"{self.base_url}/models", headers=headers)
+    def get_available_models(self) -> list[dict[str, Any]]:
+        """Fetch list of available models from OpenRouter"""
+        response = TRANSPORT.get(f"{self.base_url}/models", headers=self._headers)
         response.raise_for_status()
 
         data: dict[str, Any] = response.json()
@@ -51,13 +72,6 @@ class LLMClient:
         """Send chat request to LLM (non-streaming) with retry on rate limit"""
         print(f"🌐 LLM Request: {self.model} (non-streaming, {len(messages)} messages)")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/FeepingCreature/forge",
-            "X-Title": "Forge",
-        }
-
         payload = {
             "model": self.model,
             "messages": messages,
@@ -72,13 +86,19 @@ class LLMClient:
         print(f"   📝 Request dumped to: {log_entry.request_file}")
 
         for attempt in range(max_retries):
-            response = requests.post(
-                f"{self.base_url}/chat/completions", headers=headers, json=payload
+            response = TRANSPORT.post(
+                f"{self.base_url}/chat/completions", headers=self._headers, json=payload
             )
 
             if response.status_code == 429:
+                if attempt + 1 == max_retries:
+                    # Out of retries; let the caller decide how to back off
+                    raise RateLimitError(
+                        f"429 {response.reason} for {response.url} after {max_retries} attempts",
+                        response=response,
+                    )
                 # Rate limited - back off and retry
-                wait_time = 2**attempt  # Exponential backoff: 1, 2, 4, 8, 16 seconds
+                wait_time = 2**attempt  # Exponential backoff: 1, 2, 4, 8 seconds
                 print(
                     f"⏳ Rate limited (429), waiting {wait_time}s before retry {attempt + 1}/{max_retries}"
                 )
@@ -128,15 +148,6 @@ class LLMClient:
         """Send chat request to LLM with streaming and retry on rate limit"""
         print(f"🌐 LLM Request: {self.model} (streaming, {len(messages)} messages)")
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/FeepingCreature/forge",
-            "X-Title": "Forge",
-            # Enable fine-grained tool streaming for Anthropic models
-            "x-anthropic-beta": "fine-grained-tool-streaming-2025-05-14",
-        }
-
         payload = {
             "model": self.model,
             "messages": messages,
@@ -154,12 +165,16 @@ class LLMClient:
 
         response = None
         for attempt in range(max_retries):
-            response = requests.post(
-                f"{self.base_url}/chat/completions", headers=headers, json=payload, stream=True
+            response = TRANSPORT.post(
+                f"{self.base_url}/chat/completions",
+                headers=self._stream_headers,
+                json=payload,
+                stream=True,
             )
 
             if response.status_code == 429:
                 # Rate limited - back off and retry
+                response.close()  # Hand the connection back to the pool
                 wait_time = 2**attempt  # Exponential backoff: 1, 2, 4, 8, 16 seconds
                 print(
                     f"⏳ Rate limited (429), waiting {wait_time}s before retry {attempt + 1}/{max_retries}"
@@ -197,39 +212,47 @@ class LLMClient:
         all_chunks: list[dict[str, Any]] = []
         actual_cost: float | None = None
 
-        # Parse SSE stream
-        for line in response.iter_lines():
-            if line:
-                line = line.decode("utf-8")
-                if line.startswith("data: "):
-                    data = line[6:]  # Remove 'data: ' prefix
-                    if data == "[DONE]":
-                        break
-                    try:
-                        chunk = json.loads(data)
-                        all_chunks.append(chunk)
-                        # Capture generation ID for cost lookup
-                        if "id" in chunk and generation_id is None:
-                            generation_id = chunk["id"]
-
-                        # Check for error in the chunk (content filtering, etc.)
-                        if "error" in chunk:
-                            error_info = chunk["error"]
-                            error_msg = error_info.get("message", "Unknown streaming error")
-                            error_code = error_info.get("code", "")
-                            metadata = error_info.get("metadata", {})
-                            provider = metadata.get("provider_name", "unknown")
-                            raise RuntimeError(
-                                f"LLM streaming error (provider={provider}, code={error_code}): {error_msg}"
-                            )
-
-                        # Record cost inline when the usage chunk arrives
-                        if "usage" in chunk:
-                            actual_cost = self._extract_and_record_cost(chunk)
-
-                        yield chunk
-                    except json.JSONDecodeError:
-                        continue
+        # Parse SSE stream. The response is closed when done, or when the
+        # consumer stops early, so the connection goes back to the pool.
+        try:
+            lines = response.iter_lines()
+            for line in lines:
+                if line:
+                    line = line.decode("utf-8")
+                    if line.startswith("data: "):
+                        data = line[6:]  # Remove 'data: ' prefix
+                        if data == "[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                            all_chunks.append(chunk)
+                            # Capture generation ID for cost lookup
+                            if "id" in chunk and generation_id is None:
+                                generation_id = chunk["id"]
+
+                            # Check for error in the chunk (content filtering, etc.)
+                            if "error" in chunk:
+                                error_info = chunk["error"]
+                                error_msg = error_info.get("message", "Unknown streaming error")
+                                error_code = error_info.get("code", "")
+                                metadata = error_info.get("metadata", {})
+                                provider = metadata.get("provider_name", "unknown")
+                                raise RuntimeError(
+                                    f"LLM streaming error (provider={provider}, code={error_code}): {error_msg}"
+                                )
+
+                            # Record cost inline when the usage chunk arrives
+                            if "usage" in chunk:
+                                actual_cost = self._extract_and_record_cost(chunk)
+
+                            yield chunk
+                        except json.JSONDecodeError:
+                            continue
+            # Read the end of the body (after [DONE]) so the connection is reusable
+            for _ in lines:
+                pass
+        finally:
+            response.close()
 
         if actual_cost is None:
             print("💰 WARNING: No cost data found in stream chunks")
@@ -0,0 +1,252 @@
+"""
+Adaptive scheduler for batches of independent LLM requests.
+
+Repository summaries used to go through a fixed-size thread pool where each
+worker retried 429s on its own, sleeping up to 16 s apiece while the others
+kept hammering the same limit. This scheduler runs the batch from one
+asyncio loop instead:
+
+- One token bucket paces request starts for the whole batch. A 429 pauses
+  the bucket for everyone (for the server's Retry-After, or a doubling
+  backoff) and the request goes back to the front of the queue.
+- Concurrency adapts AIMD-style: it grows by one slot per window of
+  successful requests, halves on a 429, and shrinks when latency climbs
+  well above its running average (the provider is queueing us).
+- Results are handed to ``on_result`` on the calling thread as they
+  complete. Returning False from it stops the batch: nothing new starts,
+  but requests already in flight (and already paid for) still finish and
+  are handed to ``on_result`` too, so the caller can keep their results.
+
+The requests themselves are blocking callables (``LLMClient.chat``) run on a
+private thread pool sized to the concurrency ceiling; the loop only decides
+when each one may start.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from forge.llm.client import RateLimitError
+
+J = TypeVar("J")
+R = TypeVar("R")
+
+# Default pacing for request starts, shared by the whole batch
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Attempts per request before a persistent 429 fails the batch
+DEFAULT_MAX_ATTEMPTS = 6
+
+# Backoff after a 429 without Retry-After: doubles per consecutive 429
+_INITIAL_BACKOFF = 1.0
+_MAX_BACKOFF = 16.0
+
+# How often the loop wakes up to check for cancellation
+_POLL_INTERVAL = 0.25
+
+
+class TokenBucket:
+    """Token bucket pacing request starts, with a shared pause for 429s."""
+
+    def __init__(
+        self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def take(self) -> float:
+        """Take a token if one is available.
+
+        Returns 0.0 on success, otherwise the seconds to wait before trying
+        again.
+        """
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds`, then restart from empty."""
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+        self._tokens = 0.0
+        self._updated = self._paused_until
+
+
+class AimdLimit:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(self, maximum: int, latency_factor: float = 3.0) -> None:
+        self.maximum = maximum
+        self.latency_factor = latency_factor
+        self.limit = float(maximum)
+        self._mean_latency: float | None = None
+        # Completions to wait for after a decrease before decreasing again,
+        # so one congested window doesn't collapse the limit
+        self._cooldown = 0
+
+    @property
+    def current(self) -> int:
+        return max(1, int(self.limit))
+
+    def on_success(self, latency: float) -> None:
+        mean = self._mean_latency
+        self._mean_latency = latency if mean is None else mean + 0.2 * (latency - mean)
+        if self._cooldown > 0:
+            self._cooldown -= 1
+        elif mean is not None and latency > self.latency_factor * mean:
+            self._decrease(0.75)
+            return
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        if self._cooldown == 0:
+            self._decrease(0.5)
+
+    def _decrease(self, factor: float) -> None:
+        self.limit = max(1.0, self.limit * factor)
+        self._cooldown = self.current
+
+
+@dataclass
+class SchedulerStats:
+    """What happened during one `SummaryScheduler.run`."""
+
+    completed: int = 0
+    rate_limited: int = 0
+    # Jobs never started, or abandoned in flight by `should_stop`, or failed
+    # while in flight after the batch stopped
+    cancelled: int = 0
+    peak_concurrency: int = 0
+    final_limit: int = 0
+
+
+class SummaryScheduler(Generic[J, R]):
+    """Runs `request(job)` for every job with shared pacing and adaptive concurrency."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self.max_attempts = max_attempts
+        self._should_stop = should_stop or (lambda: False)
+
+    def run(
+        self,
+        jobs: Sequence[J],
+        request: Callable[[J], R],
+        on_result: Callable[[J, R], bool],
+    ) -> SchedulerStats:
+        """Run all jobs, starting them in order. Blocks until done or stopped.
+
+        `request` runs on a worker thread; `on_result` runs on the calling
+        thread and returns False to stop the batch; requests in flight then
+        still complete and reach `on_result`, whose return value no longer
+        matters. An exception from `request` (other than a retryable 429)
+        stops the batch and is raised, unless the batch was already stopped.
+        """
+        return asyncio.run(self._run(jobs, request, on_result))
+
+    async def _run(
+        self,
+        jobs: Sequence[J],
+        request: Callable[[J], R],
+        on_result: Callable[[J, R], bool],
+    ) -> SchedulerStats:
+        loop = asyncio.get_running_loop()
+        stats = SchedulerStats()
+        limit = AimdLimit(self.max_concurrency)
+        bucket = TokenBucket(self.requests_per_second, burst=self.max_concurrency)
+        backoff = _INITIAL_BACKOFF
+        pending: deque[tuple[J, int]] = deque((job, 0) for job in jobs)
+        running: dict[asyncio.Future[tuple[R, float]], tuple[J, int]] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="forge-summary"
+        )
+
+        def timed(job: J) -> tuple[R, float]:
+            start = time.perf_counter()
+            result = request(job)
+            return result, time.perf_counter() - start
+
+        # Set once on_result stops the batch: only in-flight requests remain
+        draining = False
+        dropped = 0
+
+        try:
+            while (pending and not draining) or running:
+                if self._should_stop():
+                    break
+
+                # Start as many requests as the limit and the bucket allow
+                wait = 0.0
+                while pending and not draining and len(running) < limit.current:
+                    wait = bucket.take()
+                    if wait > 0:
+                        break
+                    job, attempt = pending.popleft()
+                    running[loop.run_in_executor(executor, timed, job)] = (job, attempt)
+                stats.peak_concurrency = max(stats.peak_concurrency, len(running))
+
+                timeout = min(wait, _POLL_INTERVAL) if wait > 0 else _POLL_INTERVAL
+                if not running:
+                    await asyncio.sleep(timeout)
+                    continue
+                done, _ = await asyncio.wait(
+                    running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for future in done:
+                    job, attempt = running.pop(future)
+                    try:
+                        result, latency = future.result()
+                    except Exception as e:
+                        if draining:
+                            dropped += 1  # Nothing would retry it now
+                            continue
+                        if not isinstance(e, RateLimitError):
+                            raise
+                        stats.rate_limited += 1
+                        if attempt + 1 >= self.max_attempts:
+                            raise
+                        limit.on_throttle()
+                        delay = e.retry_after if e.retry_after is not None else backoff
+                        backoff = min(backoff * 2, _MAX_BACKOFF)
+                        print(
+                            f"⏳ Rate limited (429), pausing requests for {delay:.1f}s "
+                            f"(concurrency now {limit.current})"
+                        )
+                        bucket.pause(delay)
+                        pending.appendleft((job, attempt + 1))
+                        continue
+
+                    backoff = _INITIAL_BACKOFF
+                    limit.on_success(latency)
+                    stats.completed += 1
+                    if on_result(job, result) is False:
+                        draining = True
+        finally:
+            stats.cancelled = len(pending) + len(running) + dropped
+            for future in running:
+                future.cancel()
+            # In-flight requests can't be interrupted; let them finish unobserved
+            executor.shutdown(wait=False, cancel_futures=True)
+            stats.final_limit = limit.current
+        return stats
@@ -0,0 +1,117 @@
+"""
+Shared HTTP transport for LLM and web requests.
+
+Every request used to go through a bare ``requests.post`` / ``urlopen``,
+paying a fresh TCP + TLS handshake each time. Summary generation alone fires
+hundreds of requests at the same host from a thread pool. All outgoing HTTP
+now goes through one pooled keep-alive session instead.
+
+- Connections are pooled per host and reused; up to
+  ``MAX_CONNECTIONS_PER_HOST`` idle connections are kept alive per host.
+  A burst beyond that opens extra connections that are closed after use
+  rather than blocking: a streamed response that a caller abandons
+  without closing would otherwise hold its slot until garbage collection.
+- The session holds no cookies, so sharing it between unrelated callers
+  behaves like independent ``requests.post`` calls did. Nothing else on the
+  session is mutated after construction, which keeps it safe to use from
+  several threads at once.
+- Per-host latency and time-to-first-byte are recorded (see ``metrics()``).
+  TTFB is the time until the response headers arrived; for streamed
+  responses latency is measured to the same point, since the body is read
+  later by the caller.
+
+HTTP/2 isn't used: it would need the optional ``h2`` package, and keep-alive
+already removes the per-request handshakes that dominated.
+"""
+
+import http.cookiejar
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Idle keep-alive connections kept per host
+MAX_CONNECTIONS_PER_HOST = 16
+
+# Number of distinct hosts whose connection pools are kept around
+_MAX_POOLED_HOSTS = 16
+
+
+@dataclass
+class HostStats:
+    """Request counters and timings for one host."""
+
+    requests: int = 0
+    errors: int = 0
+    total_latency: float = 0.0
+    total_ttfb: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        completed = self.requests - self.errors
+        return self.total_latency / completed if completed else 0.0
+
+    @property
+    def mean_ttfb(self) -> float:
+        completed = self.requests - self.errors
+        return self.total_ttfb / completed if completed else 0.0
+
+
+class HttpTransport:
+    """Pooled, keep-alive HTTP client shared by the whole process."""
+
+    def __init__(self, max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST) -> None:
+        self.session = requests.Session()
+        self.session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(
+            pool_connections=_MAX_POOLED_HOSTS,
+            pool_maxsize=max_connections_per_host,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats: dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """Send a request (same keyword arguments as ``requests.request``)."""
+        host = urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._record(host, None, None)
+            raise
+        latency = time.perf_counter() - start
+        self._record(host, latency, response.elapsed.total_seconds())
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def _record(self, host: str, latency: float | None, ttfb: float | None) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(host, HostStats())
+            stats.requests += 1
+            if latency is None or ttfb is None:
+                stats.errors += 1
+                return
+            stats.total_latency += latency
+            stats.total_ttfb += ttfb
+            stats.max_latency = max(stats.max_latency, latency)
+
+    def metrics(self) -> dict[str, HostStats]:
+        """Snapshot of per-host stats. Failed requests count as errors only."""
+        with self._lock:
+            return {host: HostStats(**vars(stats)) for host, stats in self._stats.items()}
+
+
+# Global instance
+TRANSPORT = HttpTransport()
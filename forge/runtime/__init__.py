@@ -13,9 +13,10 @@ from forge.runtime.events import (
     StreamToolCallDelta,
     SummaryProgress,
     ToolFinished,
+    ToolOutput,
     ToolStarted,
 )
-from forge.runtime.inline_executor import run_inline_commands
+from forge.runtime.inline_executor import InlinePipeline, run_inline_commands
 from forge.runtime.llm_backend import (
     LLMBackend,
     OpenRouterBackend,
@@ -35,6 +36,7 @@ from forge.runtime.tool_executor import execute_tool_calls
 
 __all__ = [
     "CancelToken",
+    "InlinePipeline",
     "LLMBackend",
     "OpenRouterBackend",
     "QtTaskRunner",
@@ -49,6 +51,7 @@ __all__ = [
     "TaskHandle",
     "TaskRunner",
     "ToolFinished",
+    "ToolOutput",
     "ToolStarted",
     "execute_tool_calls",
     "run_inline_commands",
@@ -55,6 +55,14 @@ class ToolFinished:
     result: dict[str, Any]
 
 
+@dataclass
+class ToolOutput:
+    """Output lines from a command a running tool started (see forge.tools.process_runner)."""
+
+    stream: str  # "stdout" or "stderr"
+    lines: list[str]
+
+
 @dataclass
 class SummaryProgress:
     """Progress update during repository summary generation."""
@@ -71,3 +79,10 @@ class PromptProgressEvent:
     processed: int | None
     total: int | None
     cache: int | None
+
+
+@dataclass
+class SearchResultsChunk:
+    """A batch of matches from a running search, as (filepath, line, preview)."""
+
+    matches: list[tuple[str, int, str]]
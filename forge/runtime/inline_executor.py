@@ -10,15 +10,28 @@ only thing it owns is the `vfs.claim_thread()` / `release_thread()`
 bracket so a worker thread can use the VFS safely. With SyncTaskRunner
 those calls are no-ops; with QtTaskRunner they hand the VFS off from
 the caller's thread to the worker thread for the duration of execution.
+
+`InlinePipeline` is the opt-in streaming variant: it runs commands whose
+closing tag has arrived while the rest of the response is still streaming,
+then settles up at the end with the same results `run_inline_commands`
+would have returned.
 """
 
 from typing import Any
 
 from forge.tools.invocation import (
     InlineCommand,
+    InlineScanner,
+    detect_unparsed_inline_blocks,
+    execute_inline_commands,
     execute_inline_commands_with_parse_check,
 )
 
+# Tools that only touch the VFS's pending changes, so running them early can
+# be undone by restoring a snapshot. Anything else (commit, run_tests, check,
+# done, ...) waits for the end of the stream, along with every command after it.
+EARLY_TOOLS = frozenset({"edit", "delete_file", "rename_file"})
+
 
 def run_inline_commands(
     vfs: Any,
@@ -40,3 +53,102 @@ def run_inline_commands(
         return execute_inline_commands_with_parse_check(vfs, content, commands)
     finally:
         vfs.release_thread()
+
+
+class InlinePipeline:
+    """Runs finished inline commands while their response is still streaming.
+
+    Call order, one batch in flight at a time:
+      - `take_ready(content)` on the session's thread with the text so far;
+        returns the commands that are complete and may run now.
+      - `run(commands)` on a worker with that batch.
+      - `finish(content, commands)` on a worker once the stream has ended,
+        with the final text and its parsed commands.
+
+    Only a leading run of EARLY_TOOLS commands executes early, and nothing
+    after a failure. `finish` returns exactly what `run_inline_commands` would
+    have for the final text: if the parse-check fails (or the early commands
+    turn out not to be a prefix of the final ones), the pending changes are
+    rolled back to before the first early command and the whole list is run
+    the classic way.
+    """
+
+    def __init__(self, vfs: Any, inline_tools: dict[str, Any] | None = None) -> None:
+        self.vfs = vfs
+        self._scanner = InlineScanner(inline_tools)
+        self._snapshot: tuple[dict[str, str], dict[str, bytes], set[str]] | None = None
+        # Commands handed out by take_ready so far
+        self._taken = 0
+        self.executed: list[InlineCommand] = []
+        self.results: list[dict[str, Any]] = []
+        self.failed_index: int | None = None
+        # Set once no further command may run early
+        self.stopped = False
+
+    @property
+    def has_run(self) -> bool:
+        return bool(self.executed)
+
+    def take_ready(self, content: str) -> list[InlineCommand]:
+        """Newly finished commands in `content` that may run now."""
+        if self.stopped:
+            return []
+        self._scanner.feed(content)
+        ready: list[InlineCommand] = []
+        for cmd in self._scanner.stable_commands[self._taken :]:
+            if cmd.tool_name not in EARLY_TOOLS:
+                self.stopped = True
+                break
+            ready.append(cmd)
+        self._taken += len(ready)
+        return ready
+
+    def run(self, commands: list[InlineCommand]) -> None:
+        """Execute one batch from `take_ready`, stopping at the first failure."""
+        self.vfs.claim_thread()
+        try:
+            if self._snapshot is None:
+                self._snapshot = self.vfs.snapshot_pending()
+            results, failed_index = execute_inline_commands(self.vfs, commands)
+        finally:
+            self.vfs.release_thread()
+        if failed_index is not None:
+            self.failed_index = len(self.executed) + failed_index
+            self.stopped = True
+        self.executed += commands[: len(results)]
+        self.results += results
+
+    def finish(
+        self, content: str, commands: list[InlineCommand]
+    ) -> tuple[list[dict[str, Any]], int | None]:
+        """Run whatever didn't run early. Same contract as `run_inline_commands`."""
+        self.vfs.claim_thread()
+        try:
+            done = len(self.executed)
+            if detect_unparsed_inline_blocks(content, commands) or commands[:done] != self.executed:
+                self._rollback()
+                return execute_inline_commands_with_parse_check(self.vfs, content, commands)
+            if self.failed_index is not None:
+                return self.results, self.failed_index
+            results, failed_index = execute_inline_commands(self.vfs, commands[done:])
+            if failed_index is not None:
+                failed_index += done
+            return self.results + results, failed_index
+        finally:
+            self.vfs.release_thread()
+
+    def abandon(self) -> None:
+        """Undo every early command (the response is being thrown away).
+
+        Must be called from the VFS's owning thread with no batch running.
+        """
+        self._rollback()
+        self.stopped = True
+
+    def _rollback(self) -> None:
+        if self._snapshot is not None:
+            self.vfs.restore_pending(self._snapshot)
+            self._snapshot = None
+        self.executed = []
+        self.results = []
+        self.failed_index = None
@@ -0,0 +1,71 @@
+"""
+Shared process pool for CPU-bound work that holds the GIL.
+
+Regex scanning over a repository is pure Python-level CPU work, so threads
+don't help. This module owns one lazily-created ProcessPoolExecutor for the
+whole process.
+
+Workers are started with the "spawn" method: forking a process that has Qt
+and other threads running can deadlock the child. Work submitted here must
+therefore be a module-level function whose module imports cleanly without
+Qt.
+
+A spawned worker also re-imports the parent's ``__main__`` script (as
+``__mp_main__``) before it runs anything. Forge's entry points are kept
+minimal for this reason: main.py and the ``forge`` console script go through
+forge/__main__.py, which imports the application (and Qt) only when called.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Never use more than this many worker processes, however many cores there are
+_MAX_WORKERS = 8
+
+_pool: ProcessPoolExecutor | None = None
+_pool_disabled = False
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Number of worker processes the shared pool uses."""
+    return max(1, min(_MAX_WORKERS, os.cpu_count() or 1))
+
+
+def get_process_pool() -> ProcessPoolExecutor | None:
+    """Get the shared pool, creating it on first use.
+
+    Returns None on single-core machines or if worker processes can't be
+    started here; callers then do the work in-process.
+    """
+    global _pool, _pool_disabled
+    with _pool_lock:
+        if _pool is not None or _pool_disabled:
+            return _pool
+        if worker_count() < 2:
+            _pool_disabled = True
+            return None
+        try:
+            _pool = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        except (OSError, ValueError, NotImplementedError):
+            _pool_disabled = True
+        return _pool
+
+
+def discard_process_pool() -> None:
+    """Drop a pool whose workers died (BrokenProcessPool) and stop using one.
+
+    Once a pool has broken we don't keep respawning workers; the rest of the
+    session runs its work in-process.
+    """
+    global _pool, _pool_disabled
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_disabled = True
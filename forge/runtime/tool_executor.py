@@ -1,4 +1,4 @@
-"""Execute a batch of tool calls sequentially.
+"""Execute a batch of tool calls.
 
 Pulled out of `LiveSession._execute_tool_calls` so the per-tool dispatch
 loop — including JSON-argument parsing, the doubly-encoded-string
@@ -15,13 +15,61 @@ expects: each entry is
     {"tool_call": <orig dict>, "args": <parsed dict>, "result": <dict>}
 plus an optional "parse_error": True flag when the arguments couldn't
 be parsed as JSON.
+
+Runs of consecutive calls to read-only tools (schema `"read_only": True`,
+see `ToolManager.is_read_only`) execute concurrently on a thread pool,
+all against one frozen snapshot of the VFS. Their results are reported
+in the original order with the same chain-stop rule; calls after a
+failure in the run are still computed but discarded, which is
+indistinguishable from not running them since they have no effects.
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from forge.runtime.events import ToolFinished, ToolStarted
 
+# Upper bound on read-only tool calls running at once
+MAX_CONCURRENT_TOOLS = 8
+
+
+def _parse_arguments(arguments_str: str) -> dict[str, Any]:
+    """Parse a tool call's JSON arguments. Raises json.JSONDecodeError.
+
+    Mirrors the legacy ToolExecutionWorker semantics exactly:
+      - empty string → empty dict (some tools take no args).
+      - string value that looks like a JSON list/object → try a second
+        decode and use the parsed value if it comes back as list/dict
+        (LLMs sometimes double-encode nested structures by accident).
+    """
+    tool_args: dict[str, Any] = json.loads(arguments_str) if arguments_str else {}
+    for key, value in tool_args.items():
+        if isinstance(value, str) and value.startswith(("[", "{")):
+            try:
+                parsed = json.loads(value)
+                if isinstance(parsed, (list, dict)):
+                    tool_args[key] = parsed
+            except json.JSONDecodeError:
+                pass
+    return tool_args
+
+
+def _read_only_run(
+    tool_calls: list[dict[str, Any]], tool_manager: Any
+) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """Leading calls that are read-only and have valid arguments, parsed."""
+    run: list[tuple[dict[str, Any], dict[str, Any]]] = []
+    for tool_call in tool_calls:
+        if not tool_manager.is_read_only(tool_call["function"]["name"]):
+            break
+        try:
+            tool_args = _parse_arguments(tool_call["function"]["arguments"])
+        except json.JSONDecodeError:
+            break
+        run.append((tool_call, tool_args))
+    return run
+
 
 def execute_tool_calls(
     tool_calls: list[dict[str, Any]],
@@ -29,11 +77,13 @@ def execute_tool_calls(
     session_manager: Any,
     emit: Any,
 ) -> list[dict[str, Any]]:
-    """Run `tool_calls` one-by-one through `tool_manager.execute_tool`.
+    """Run `tool_calls` in order through `tool_manager.execute_tool`.
 
     Stops at the first tool whose result is `{"success": False}` (or
     where argument parsing failed). Per-tool ToolStarted / ToolFinished
-    events are emitted via `emit` so the UI can update live.
+    events are emitted via `emit` so the UI can update live; for a
+    concurrent run of read-only calls they are emitted in order once
+    the run has finished.
     """
     results: list[dict[str, Any]] = []
 
@@ -47,55 +97,106 @@ def execute_tool_calls(
     vfs = session_manager.vfs
     vfs.claim_thread()
     try:
-        for tool_call in tool_calls:
-            tool_name = tool_call["function"]["name"]
-            arguments_str = tool_call["function"]["arguments"]
-            tool_call_id = tool_call.get("id", "")
-
-            # Parse arguments. Mirror the legacy ToolExecutionWorker
-            # semantics exactly:
-            #   - empty string → empty dict (some tools take no args).
-            #   - top-level invalid JSON → wrap raw under INVALID_JSON,
-            #     synthesize a failure result, ToolFinished + break.
-            #   - string value that looks like a JSON list/object →
-            #     try a second decode and use the parsed value if it
-            #     comes back as list/dict (LLMs sometimes double-encode
-            #     nested structures by accident).
-            try:
-                tool_args: dict[str, Any] = json.loads(arguments_str) if arguments_str else {}
-                for key, value in tool_args.items():
-                    if isinstance(value, str) and value.startswith(("[", "{")):
-                        try:
-                            parsed = json.loads(value)
-                            if isinstance(parsed, (list, dict)):
-                                tool_args[key] = parsed
-                        except json.JSONDecodeError:
-                            pass
-            except json.JSONDecodeError as e:
-                tool_args = {"INVALID_JSON": arguments_str}
-                result = {"success": False, "error": f"Invalid JSON arguments: {e}"}
-                emit(ToolFinished(tool_call_id, tool_name, tool_args, result))
-                results.append(
-                    {
-                        "tool_call": tool_call,
-                        "args": tool_args,
-                        "result": result,
-                        "parse_error": True,
-                    }
+        pos = 0
+        while pos < len(tool_calls):
+            run = _read_only_run(tool_calls[pos:], tool_manager)
+            if len(run) > 1:
+                completed = _execute_concurrently(
+                    run, tool_manager, session_manager, vfs, emit, results
                 )
-                break
-
-            emit(ToolStarted(tool_name, tool_args))
-            result = tool_manager.execute_tool(tool_name, tool_args, session_manager)
-            emit(ToolFinished(tool_call_id, tool_name, tool_args, result))
-            results.append({"tool_call": tool_call, "args": tool_args, "result": result})
-
-            # Chain-stop-on-failure: a tool that explicitly returns
-            # success=False aborts the rest of the batch. Tools that
-            # omit the field default to True (best-effort assumption).
-            if not result.get("success", True):
+                pos += len(run)
+            else:
+                completed = _execute_one(
+                    tool_calls[pos], tool_manager, session_manager, emit, results
+                )
+                pos += 1
+            if not completed:
                 break
     finally:
         vfs.release_thread()
 
     return results
+
+
+def _execute_one(
+    tool_call: dict[str, Any],
+    tool_manager: Any,
+    session_manager: Any,
+    emit: Any,
+    results: list[dict[str, Any]],
+) -> bool:
+    """Run one call and append its entry. False means stop the batch."""
+    tool_name = tool_call["function"]["name"]
+    arguments_str = tool_call["function"]["arguments"]
+    tool_call_id = tool_call.get("id", "")
+
+    # Top-level invalid JSON → wrap raw under INVALID_JSON, synthesize a
+    # failure result, ToolFinished + stop.
+    try:
+        tool_args = _parse_arguments(arguments_str)
+    except json.JSONDecodeError as e:
+        tool_args = {"INVALID_JSON": arguments_str}
+        result = {"success": False, "error": f"Invalid JSON arguments: {e}"}
+        emit(ToolFinished(tool_call_id, tool_name, tool_args, result))
+        results.append(
+            {
+                "tool_call": tool_call,
+                "args": tool_args,
+                "result": result,
+                "parse_error": True,
+            }
+        )
+        return False
+
+    emit(ToolStarted(tool_name, tool_args))
+    result = tool_manager.execute_tool(tool_name, tool_args, session_manager)
+    emit(ToolFinished(tool_call_id, tool_name, tool_args, result))
+    results.append({"tool_call": tool_call, "args": tool_args, "result": result})
+
+    # Chain-stop-on-failure: a tool that explicitly returns
+    # success=False aborts the rest of the batch. Tools that
+    # omit the field default to True (best-effort assumption).
+    return bool(result.get("success", True))
+
+
+def _execute_concurrently(
+    run: list[tuple[dict[str, Any], dict[str, Any]]],
+    tool_manager: Any,
+    session_manager: Any,
+    vfs: Any,
+    emit: Any,
+    results: list[dict[str, Any]],
+) -> bool:
+    """Run read-only calls at once, then report them in order like `_execute_one`.
+
+    Every call is reported started before waiting on any of them, since they
+    all run from the start; they are reported finished in order.
+    """
+    snapshot = vfs.snapshot()
+    pool = ThreadPoolExecutor(
+        max_workers=min(len(run), MAX_CONCURRENT_TOOLS), thread_name_prefix="forge-tool"
+    )
+    try:
+        futures = [
+            pool.submit(
+                tool_manager.execute_tool,
+                tool_call["function"]["name"],
+                tool_args,
+                session_manager,
+                vfs=snapshot,
+            )
+            for tool_call, tool_args in run
+        ]
+        for tool_call, tool_args in run:
+            emit(ToolStarted(tool_call["function"]["name"], tool_args))
+        for (tool_call, tool_args), future in zip(run, futures, strict=True):
+            tool_name = tool_call["function"]["name"]
+            result = future.result()
+            emit(ToolFinished(tool_call.get("id", ""), tool_name, tool_args, result))
+            results.append({"tool_call": tool_call, "args": tool_args, "result": result})
+            if not result.get("success", True):
+                return False
+    finally:
+        # After a chain-stop, calls still running finish unobserved
+        pool.shutdown(wait=False, cancel_futures=True)
+    return True
@@ -14,6 +14,8 @@ Attach/Detach model:
 - When detached, events buffer up in a thread-safe queue
 - On attach: lock buffer, get snapshot, unlock, replay buffered events
 - Once buffer is drained, switch to direct signal emission
+- While attached, streaming events go through an EventCoalescer, which
+  delivers them in batches (one per flush interval) instead of per token
 
 Lifecycle:
 - A LiveSession is the in-memory representation of a session branch
@@ -23,12 +25,14 @@ Lifecycle:
 """
 
 from collections import deque
+from collections.abc import Callable
 from threading import Lock
 from typing import TYPE_CHECKING, Any
 
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QTimer, Signal
 
 from forge.runtime import (
+    InlinePipeline,
     LLMBackend,
     PromptProgressEvent,
     QtTaskRunner,
@@ -38,8 +42,10 @@ from forge.runtime import (
     TaskHandle,
     TaskRunner,
     ToolFinished,
+    ToolOutput,
     ToolStarted,
 )
+from forge.tools.process_runner import tool_scope
 
 if TYPE_CHECKING:
     from forge.session.manager import SessionManager
@@ -100,6 +106,14 @@ class ToolFinishedEvent(SessionEvent):
         self.result = result
 
 
+class ToolOutputEvent(SessionEvent):
+    """Output lines from a command a running tool started."""
+
+    def __init__(self, stream: str, lines: list[str]):
+        self.stream = stream
+        self.lines = lines
+
+
 class StateChangedEvent(SessionEvent):
     """Session state changed."""
 
@@ -143,6 +157,103 @@ class MessagesTruncatedEvent(SessionEvent):
         self.new_length = new_length
 
 
+class EventCoalescer:
+    """Batches high-frequency streaming events on their way to an attached UI.
+
+    Every token used to reach the UI as its own signal, each costing a
+    handler call and a render pass. Streaming events are now held for up to
+    `interval_ms` and delivered together:
+
+    - Text chunks (and reasoning chunks, and tool output lines per stream)
+      within a batch are merged into one.
+    - Tool call deltas for the same index, and updates of the same message,
+      collapse to the latest state (they carry the full state, not a diff).
+    - Any other event (state changes, tool start/finish, added messages,
+      ...) first delivers the pending batch, so ordering relative to them is
+      kept. Within a batch, each merged event sits where its first part
+      arrived.
+
+    An interval of 0 delivers every event immediately.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[["SessionEvent | PromptProgressEvent"], None],
+        interval_ms: int = 16,
+    ) -> None:
+        self.deliver = deliver
+        self.interval_ms = interval_ms
+        self._pending: dict[tuple[str, int], SessionEvent] = {}
+        self._timer: QTimer | None = None
+        # Counters: events pushed in, events delivered, batches delivered
+        self.events_in = 0
+        self.events_out = 0
+        self.flushes = 0
+
+    def push(self, event: "SessionEvent | PromptProgressEvent") -> None:
+        self.events_in += 1
+        key = self._merge_key(event)
+        if key is None or self.interval_ms <= 0:
+            self.flush()
+            self._deliver(event)
+            return
+
+        assert isinstance(event, SessionEvent)
+        previous = self._pending.get(key)
+        if isinstance(previous, ChunkEvent) and isinstance(event, ChunkEvent):
+            event = ChunkEvent(previous.chunk + event.chunk)
+        elif isinstance(previous, ReasoningChunkEvent) and isinstance(event, ReasoningChunkEvent):
+            event = ReasoningChunkEvent(previous.chunk + event.chunk)
+        elif isinstance(previous, ToolOutputEvent) and isinstance(event, ToolOutputEvent):
+            event = ToolOutputEvent(event.stream, previous.lines + event.lines)
+        # Reassigning an existing key keeps its position
+        self._pending[key] = event
+
+        if self._timer is None:
+            # Created on first use, on the thread that delivers events
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.timeout.connect(self.flush)
+        if not self._timer.isActive():
+            self._timer.start(self.interval_ms)
+
+    def flush(self) -> None:
+        """Deliver the pending batch now."""
+        if self._timer is not None:
+            self._timer.stop()
+        if not self._pending:
+            return
+        pending = list(self._pending.values())
+        self._pending.clear()
+        self.flushes += 1
+        for event in pending:
+            self._deliver(event)
+
+    def discard(self) -> None:
+        """Drop the pending batch (the UI it was meant for is gone)."""
+        if self._timer is not None:
+            self._timer.stop()
+        self._pending.clear()
+
+    def _deliver(self, event: "SessionEvent | PromptProgressEvent") -> None:
+        self.events_out += 1
+        self.deliver(event)
+
+    @staticmethod
+    def _merge_key(event: "SessionEvent | PromptProgressEvent") -> tuple[str, int] | None:
+        if isinstance(event, ChunkEvent):
+            return ("chunk", 0)
+        if isinstance(event, ReasoningChunkEvent):
+            return ("reasoning", 0)
+        if isinstance(event, ToolCallDeltaEvent):
+            return ("tool_call", event.index)
+        if isinstance(event, MessageUpdatedEvent):
+            return ("message", event.index)
+        if isinstance(event, ToolOutputEvent):
+            return ("tool_output", 0 if event.stream == "stdout" else 1)
+        return None
+
+
 class SessionState:
     """Session execution state."""
 
@@ -180,6 +291,7 @@ class LiveSession(QObject):
     tool_call_delta = Signal(int, dict)
     tool_started = Signal(str, dict)
     tool_finished = Signal(str, str, dict, dict)  # id, name, args, result
+    tool_output = Signal(str, list)  # stream, lines
     prompt_progress = Signal(int, int, int)  # processed, total, cache
     turn_finished = Signal(str)  # commit_oid
     error_occurred = Signal(str)
@@ -230,6 +342,9 @@ class LiveSession(QObject):
         self._attached = False
         self._event_buffer: deque[SessionEvent | PromptProgressEvent] = deque()
         self._buffer_lock = Lock()
+        self.event_coalescer = EventCoalescer(
+            self._emit_signal, session_manager.settings.get_event_flush_interval()
+        )
 
         # Execution state
         self._state = SessionState.IDLE
@@ -270,6 +385,15 @@ class LiveSession(QObject):
         self._tool_handle: TaskHandle | None = None
         self._inline_handle: TaskHandle | None = None
 
+        # Pipelined inline execution (llm.pipelined_inline_commands): runs
+        # finished edit blocks while the response streams. One early batch
+        # runs at a time; stream completion/error waits for it via
+        # _after_early_batch. A flag rather than a handle, since a
+        # synchronous runner finishes the batch before submit() returns.
+        self._inline_pipeline: InlinePipeline | None = None
+        self._early_inline_running = False
+        self._after_early_batch: Callable[[], None] | None = None
+
         # === PARENT/CHILD RELATIONSHIPS ===
         # These are authoritative - registry queries these, not the other way around
         self.child_sessions: list[str] = []  # Branch names of children we spawned
@@ -424,6 +548,7 @@ class LiveSession(QObject):
         with self._buffer_lock:
             self._attached = False
             self._event_buffer.clear()  # Clear any stale events
+        self.event_coalescer.discard()
 
     def drain_buffer(self) -> list[SessionEvent | PromptProgressEvent]:
         """
@@ -447,10 +572,16 @@ class LiveSession(QObject):
         """
         with self._buffer_lock:
             if not self._attached:
-                self._event_buffer.append(event)
+                # Live command output is only worth showing as it happens
+                if not isinstance(event, ToolOutputEvent):
+                    self._event_buffer.append(event)
                 return
 
-        # Attached - emit directly via appropriate signal
+        # Attached - emit via the coalescer, which batches streaming events
+        self.event_coalescer.push(event)
+
+    def _emit_signal(self, event: SessionEvent | PromptProgressEvent) -> None:
+        """Emit the signal for an event."""
         if isinstance(event, ChunkEvent):
             self.chunk_received.emit(event.chunk)
         elif isinstance(event, ReasoningChunkEvent):
@@ -463,6 +594,8 @@ class LiveSession(QObject):
             self.tool_finished.emit(
                 event.tool_call_id, event.tool_name, event.tool_args, event.result
             )
+        elif isinstance(event, ToolOutputEvent):
+            self.tool_output.emit(event.stream, event.lines)
         elif isinstance(event, PromptProgressEvent):
             # Convert None to 0 or -1 to satisfy signal types
             self.prompt_progress.emit(
@@ -632,6 +765,9 @@ class LiveSession(QObject):
         self._stream_handle = None
         self._tool_handle = None
         self._inline_handle = None
+        self._inline_pipeline = None
+        self._early_inline_running = False
+        self._after_early_batch = None
 
     def _process_llm_request(self) -> None:
         """Start an LLM request with streaming via the LLMBackend seam."""
@@ -651,6 +787,12 @@ class LiveSession(QObject):
         # Start streaming
         self.start_streaming()
 
+        settings = self.session_manager.settings
+        if settings.get("llm.pipelined_inline_commands", False) and settings.get(
+            "llm.inline_tools_enabled", True
+        ):
+            self._inline_pipeline = InlinePipeline(self.session_manager.vfs)
+
         from forge.runtime import stream_to_events
 
         def stream_work(emit: Any, token: Any) -> dict[str, Any]:
@@ -695,6 +837,56 @@ class LiveSession(QObject):
     def _on_stream_chunk(self, chunk: str) -> None:
         """Handle streaming text chunk."""
         self.append_streaming_chunk(chunk)
+        # A command can only have been completed by a chunk with a closing '>'
+        if self._inline_pipeline is not None and ">" in chunk:
+            self._run_early_inline_commands()
+
+    def _run_early_inline_commands(self) -> None:
+        """Start the next batch of finished inline commands, if any."""
+        pipeline = self._inline_pipeline
+        if pipeline is None or self._early_inline_running:
+            return
+        commands = pipeline.take_ready(self.streaming_content)
+        if not commands:
+            return
+
+        def work(emit: Any, token: Any) -> None:
+            with tool_scope(emit, token):
+                pipeline.run(commands)
+
+        self._early_inline_running = True
+        self._tasks.submit(
+            work,
+            on_result=lambda _result: self._on_early_inline_batch_done(),
+            on_error=self._on_early_inline_batch_error,
+            on_event=self._on_tool_output,
+        )
+
+    def _on_early_inline_batch_done(self) -> None:
+        self._early_inline_running = False
+        continuation, self._after_early_batch = self._after_early_batch, None
+        if continuation is not None:
+            continuation()
+        else:
+            # More commands may have finished while the batch ran
+            self._run_early_inline_commands()
+
+    def _on_early_inline_batch_error(self, error_msg: str) -> None:
+        # Give up on early execution; the classic path at the end of the
+        # stream reruns everything and reports the error there.
+        self._early_inline_running = False
+        if self._inline_pipeline is not None:
+            self._inline_pipeline.abandon()
+            self._inline_pipeline = None
+        continuation, self._after_early_batch = self._after_early_batch, None
+        if continuation is not None:
+            continuation()
+
+    def _drop_inline_pipeline(self) -> None:
+        """Discard the pipeline, undoing anything it ran early."""
+        if self._inline_pipeline is not None and self._inline_pipeline.has_run:
+            self._inline_pipeline.abandon()
+        self._inline_pipeline = None
 
     def _on_reasoning_chunk(self, chunk: str) -> None:
         """Handle streaming reasoning/thinking chunk."""
@@ -707,6 +899,9 @@ class LiveSession(QObject):
     def _on_stream_finished(self, result: dict[str, Any]) -> None:
         """Handle stream completion."""
         self._stream_handle = None
+        if self._early_inline_running:
+            self._after_early_batch = lambda: self._on_stream_finished(result)
+            return
 
         # Finalize streaming
         self.finish_streaming(result.get("content"), result.get("tool_calls"))
@@ -724,12 +919,17 @@ class LiveSession(QObject):
                 self._start_inline_command_execution(commands)
                 return
 
+        self._drop_inline_pipeline()
         # Continue with tool calls or finish
         self._finish_stream_processing(result)
 
     def _on_stream_error(self, error_msg: str) -> None:
         """Handle streaming error."""
         self._stream_handle = None
+        if self._early_inline_running:
+            self._after_early_batch = lambda: self._on_stream_error(error_msg)
+            return
+        self._drop_inline_pipeline()
 
         self.is_streaming = False
         self.streaming_content = ""
@@ -760,9 +960,13 @@ class LiveSession(QObject):
         # surface them as errors instead of silently dropping them.
         content = getattr(self, "_pending_stream_result", {}).get("content", "")
         vfs = self.session_manager.vfs
+        pipeline, self._inline_pipeline = self._inline_pipeline, None
 
         def work(emit: Any, token: Any) -> tuple[list, int | None]:
-            return run_inline_commands(vfs, content, commands)
+            with tool_scope(emit, token):
+                if pipeline is not None and pipeline.has_run:
+                    return pipeline.finish(content, commands)
+                return run_inline_commands(vfs, content, commands)
 
         def on_result(payload: tuple[list, int | None]) -> None:
             results, failed_index = payload
@@ -773,6 +977,7 @@ class LiveSession(QObject):
             work,
             on_result=on_result,
             on_error=self._on_inline_commands_error,
+            on_event=self._on_tool_output,
         )
 
     def _on_inline_commands_finished(self, results: list, failed_index: int | None) -> None:
@@ -1074,7 +1279,9 @@ class LiveSession(QObject):
         session_manager = self.session_manager
 
         def work(emit: Any, token: Any) -> list[dict[str, Any]]:
-            return execute_tool_calls(tool_calls, tool_manager, session_manager, emit)
+            # Commands the tools run stream their output and stop on cancel
+            with tool_scope(emit, token):
+                return execute_tool_calls(tool_calls, tool_manager, session_manager, emit)
 
         def on_event(event: Any) -> None:
             if isinstance(event, ToolStarted):
@@ -1083,6 +1290,8 @@ class LiveSession(QObject):
                 self._on_tool_finished(
                     event.tool_call_id, event.tool_name, event.tool_args, event.result
                 )
+            else:
+                self._on_tool_output(event)
 
         self._tool_handle = self._tasks.submit(
             work,
@@ -1095,6 +1304,11 @@ class LiveSession(QObject):
         """Handle tool execution starting."""
         self._emit_event(ToolStartedEvent(tool_name, tool_args))
 
+    def _on_tool_output(self, event: Any) -> None:
+        """Forward output of a command run by a tool (tool calls or inline commands)."""
+        if isinstance(event, ToolOutput):
+            self._emit_event(ToolOutputEvent(event.stream, event.lines))
+
     def _on_tool_finished(
         self, tool_call_id: str, tool_name: str, tool_args: dict[str, Any], result: dict[str, Any]
     ) -> None:
@@ -5,7 +5,6 @@ Session manager for coordinating AI turns and git commits
 import hashlib
 import json
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -22,9 +21,12 @@ from forge.git_backend.commit_types import CommitType
 from forge.git_backend.repository import ForgeRepository
 from forge.llm.client import LLMClient
 from forge.llm.request_log import REQUEST_LOG, RequestLogEntry
+from forge.llm.summary_scheduler import SummaryScheduler
 from forge.prompts.manager import PromptManager
 from forge.runtime import QtTaskRunner, SummaryProgress, TaskHandle, TaskRunner
+from forge.session.summary_cache import get_summary_cache
 from forge.tools.manager import ToolManager
+from forge.vfs.file_metadata import get_file_size
 
 
 class SessionManager(QObject):
@@ -99,9 +101,8 @@ class SessionManager(QObject):
         # Repository summaries cache (in-memory)
         self.repo_summaries: dict[str, str] = {}
 
-        # XDG cache directory for persistent summary cache
-        self.cache_dir = self._get_cache_dir()
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Persistent summary cache (shared by all sessions and processes)
+        self.summary_cache = get_summary_cache()
 
         # Summary generation state
         self._summaries_ready = False
@@ -129,34 +130,13 @@ class SessionManager(QObject):
         """Get uncommitted working directory changes."""
         return self._repo.get_workdir_changes()
 
-    def _get_cache_dir(self) -> Path:
-        """Get XDG cache directory for repository summaries"""
-        xdg_cache = Path.home() / ".cache"
-        if "XDG_CACHE_HOME" in __import__("os").environ:
-            xdg_cache = Path(__import__("os").environ["XDG_CACHE_HOME"])
-        return xdg_cache / "forge" / "summaries"
-
-    def _get_cache_key(self, filepath: str, blob_oid: str) -> str:
-        """Generate cache key from filepath and blob OID (content hash)"""
-        # Use hash to keep filename reasonable length
-        # blob_oid is the content hash, so same content = same cache key
-        key_str = f"{blob_oid}:{filepath}"
-        return hashlib.sha256(key_str.encode()).hexdigest()
-
     def _get_cached_summary(self, filepath: str, blob_oid: str) -> str | None:
         """Get cached summary for a file with a specific content hash"""
-        cache_key = self._get_cache_key(filepath, blob_oid)
-        cache_file = self.cache_dir / cache_key
-
-        if cache_file.exists():
-            return cache_file.read_text()
-        return None
+        return self.summary_cache.get(filepath, blob_oid)
 
     def _cache_summary(self, filepath: str, blob_oid: str, summary: str) -> None:
         """Cache a summary for a file with a specific content hash"""
-        cache_key = self._get_cache_key(filepath, blob_oid)
-        cache_file = self.cache_dir / cache_key
-        cache_file.write_text(summary)
+        self.summary_cache.put(filepath, blob_oid, summary)
 
     def _build_summary_prompt(self, filepath: str, content: str) -> str:
         """Build the prompt for generating a file summary"""
@@ -777,6 +757,7 @@ Keep it under 72 characters."""
             self.generate_repo_summaries(
                 force_refresh=force_refresh,
                 progress_callback=lambda cur, total, fp: emit(SummaryProgress(cur, total, fp)),
+                should_stop=lambda: token.stop_requested,
             )
             return len(self.repo_summaries)
 
@@ -816,6 +797,7 @@ Keep it under 72 characters."""
         self,
         force_refresh: bool = False,
         progress_callback: "Callable[[int, int, str], None] | None" = None,
+        should_stop: "Callable[[], bool] | None" = None,
     ) -> None:
         """
         Generate summaries for files in repository with token budget (breadth-first).
@@ -827,6 +809,8 @@ Keep it under 72 characters."""
         Args:
             force_refresh: If True, regenerate all summaries even if cached
             progress_callback: Optional callback(current, total, filepath) for progress updates
+            should_stop: Optional callable polled during generation; returning True
+                abandons the remaining requests
         """
         model = self.settings.get_summarization_model()
         api_key = self.settings.get_api_key()
@@ -842,13 +826,12 @@ Keep it under 72 characters."""
         # Sort files breadth-first (by path depth, then alphabetically within each level)
         files.sort(key=lambda f: (self._get_path_depth(f), f))
 
-        # Collect file sizes for all files
+        # Collect file sizes for all files (from object headers where possible)
         file_sizes: dict[str, int] = {}
         for filepath in files:
             try:
-                content = self.vfs.read_file(filepath)
-                file_sizes[filepath] = len(content)
-            except (FileNotFoundError, KeyError, UnicodeDecodeError):
+                file_sizes[filepath] = get_file_size(self.vfs, filepath)
+            except (FileNotFoundError, KeyError):
                 file_sizes[filepath] = 0
 
         # First pass: gather cache info and determine which files need generation
@@ -856,12 +839,14 @@ Keep it under 72 characters."""
         files_with_cache_info: list[tuple[str, str, str | None]] = []
         files_needing_generation: list[tuple[str, str]] = []
 
+        keys: list[tuple[str, str]] = []
         for filepath in files:
             # Get blob OID (content hash) for cache key
-            try:
-                blob_oid = self._repo.get_file_blob_oid(filepath, self.branch_name)
-            except KeyError:
-                # File is new (pending), hash the content
+            oid = self.vfs.get_blob_oid(filepath)
+            if oid is not None:
+                blob_oid = str(oid)
+            else:
+                # File is new or modified (pending), hash the content
                 try:
                     content = self.vfs.read_file(filepath)
                 except UnicodeDecodeError:
@@ -869,12 +854,13 @@ Keep it under 72 characters."""
                     print(f"   ⚠ {filepath} (binary, skipped)")
                     continue
                 blob_oid = hashlib.sha256(content.encode()).hexdigest()
+            keys.append((filepath, blob_oid))
 
-            # Check cache (unless force refresh)
-            cached_summary = None
-            if not force_refresh:
-                cached_summary = self._get_cached_summary(filepath, blob_oid)
+        # Check cache in one bulk lookup (unless force refresh)
+        cached = {} if force_refresh else self.summary_cache.get_many(keys)
 
+        for filepath, blob_oid in keys:
+            cached_summary = cached.get((filepath, blob_oid))
             files_with_cache_info.append((filepath, blob_oid, cached_summary))
             if cached_summary is None:
                 files_needing_generation.append((filepath, blob_oid))
@@ -930,9 +916,10 @@ Keep it under 72 characters."""
                 self.repo_summaries[filepath] = cached_summary
                 print(f"   ✓ {filepath} (cached)")
 
-        # Define worker function for parallel generation
-        def generate_one(filepath: str, blob_oid: str) -> tuple[str, str, str] | None:
-            """Generate summary for one file. Returns (filepath, blob_oid, summary) or None if binary."""
+        # Request one summary. Runs on a scheduler worker thread.
+        def generate_one(job: tuple[str, str]) -> str | None:
+            """Generate summary for one file. Returns None if it turned out to be binary."""
+            filepath, _blob_oid = job
             try:
                 content = self.vfs.read_file(filepath)
             except UnicodeDecodeError:
@@ -947,7 +934,8 @@ Keep it under 72 characters."""
 
             prompt = self._build_summary_prompt(filepath, content)
             messages = [{"role": "user", "content": prompt}]
-            response = client.chat(messages)
+            # A single attempt: the scheduler handles 429s for the whole batch
+            response = client.chat(messages, max_retries=1)
 
             summary_content = response["choices"][0]["message"]["content"]
             summary = str(summary_content).strip()
@@ -957,38 +945,85 @@ Keep it under 72 characters."""
             if match:
                 summary = match.group(1).strip()
 
-            return (filepath, blob_oid, summary)
-
-        # Generate summaries in parallel (only for files within budget)
+            return summary
+
+        # Take results as they arrive, but fill the budget in breadth-first
+        # order: a summary is only counted once every file before it has been.
+        # When the real summaries (rather than the placeholder estimate) fill
+        # the budget, returning False stops the batch; requests already in
+        # flight still arrive here and are only cached.
+        generated_count = 0
+        settled: set[str] = set()
+        arrived: dict[str, str | None] = {}
+        next_index = 0
+        budget_reached = False
+
+        def admit(filepath: str, summary: str | None) -> None:
+            nonlocal current_tokens, budget_reached
+            if summary is None:
+                # Binary file, already logged in generate_one
+                settled.add(filepath)
+                return
+            summary_tokens = self._estimate_tokens(f"## {filepath}\n{summary}\n")
+            if current_tokens + summary_tokens > token_budget:
+                print(f"   ✂ {filepath} (token budget reached, stopping)")
+                budget_reached = True
+                return
+            current_tokens += summary_tokens
+            settled.add(filepath)
+            self.repo_summaries[filepath] = summary
+            print(f"   📝 {filepath} ({len(settled)}/{total_to_generate})")
+
+        def admit_in_order(skip_missing: bool) -> None:
+            """Count arrived summaries in order, up to the first one still missing."""
+            nonlocal next_index
+            while not budget_reached and next_index < len(files_needing_generation):
+                filepath = files_needing_generation[next_index][0]
+                if filepath in arrived:
+                    admit(filepath, arrived.pop(filepath))
+                elif not skip_missing:
+                    return
+                next_index += 1
+
+        def on_summary(job: tuple[str, str], summary: str | None) -> bool:
+            nonlocal generated_count
+            filepath, blob_oid = job
+            generated_count += 1
+            if progress_callback:
+                progress_callback(generated_count, total_to_generate, filepath)
+
+            # Cache the summary (even if beyond budget, for future use)
+            if summary is not None:
+                self._cache_summary(filepath, blob_oid, summary)
+            if budget_reached:
+                if summary is not None:
+                    print(f"   💾 {filepath} (cached for later, beyond budget)")
+                return False
+            arrived[filepath] = summary
+            admit_in_order(skip_missing=False)
+            return not budget_reached
+
+        # Generate summaries (only for files within budget)
         if files_needing_generation:
-            generated_count = 0
-            with ThreadPoolExecutor(max_workers=parallel_count) as executor:
-                # Submit all tasks
-                future_to_file = {
-                    executor.submit(generate_one, filepath, blob_oid): filepath
-                    for filepath, blob_oid in files_needing_generation
-                }
-
-                # Process results as they complete
-                for future in as_completed(future_to_file):
-                    filepath = future_to_file[future]
-                    generated_count += 1
-
-                    # Report progress
-                    if progress_callback:
-                        progress_callback(generated_count, total_to_generate, filepath)
-
-                    result = future.result()
-                    if result is None:
-                        # Binary file, already logged in generate_one
-                        continue
-
-                    filepath, blob_oid, summary = result
-                    print(f"   📝 {filepath} ({generated_count}/{total_to_generate})")
-
-                    # Cache the summary (even if beyond budget, for future use)
-                    self._cache_summary(filepath, blob_oid, summary)
-                    self.repo_summaries[filepath] = summary
+            scheduler: SummaryScheduler[tuple[str, str], str | None] = SummaryScheduler(
+                max_concurrency=parallel_count, should_stop=should_stop
+            )
+            stats = scheduler.run(files_needing_generation, generate_one, on_summary)
+            # A stopped batch leaves gaps: count what arrived after them too
+            admit_in_order(skip_missing=True)
+            print(
+                f"📚 Summary requests: {stats.completed} done, {stats.rate_limited} rate-limited, "
+                f"{stats.cancelled} cancelled (peak concurrency {stats.peak_concurrency}, "
+                f"final {stats.final_limit})"
+            )
+
+            # Files the batch stopped before summarizing are listed without summaries
+            unsummarized = {f for f, _ in files_needing_generation if f not in settled}
+            if unsummarized:
+                order = {f: i for i, (f, _, _) in enumerate(files_with_cache_info)}
+                files_beyond_budget = sorted(
+                    [*files_beyond_budget, *unsummarized], key=order.__getitem__
+                )
 
         # Final progress update (signal completion)
         if progress_callback and total_to_generate > 0:
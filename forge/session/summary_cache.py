@@ -0,0 +1,211 @@
+"""
+Persistent cache of generated file summaries.
+
+Summaries are keyed by (filepath, blob OID): same content at the same path
+means the same summary. They used to be stored one file per summary, so a
+session start with a warm cache cost an ``exists()`` and a ``read_text()``
+per repository file. They now live in one SQLite database in WAL mode:
+
+- ``get_many`` answers every key of a session start in a single query.
+- Entries carry a last-used day; once the database outgrows its size cap,
+  the least recently used entries are evicted.
+- WAL plus a busy timeout lets several Forge processes read and write the
+  same cache concurrently. The cache is best-effort: if the database can't
+  be opened or written, lookups miss and writes are dropped.
+
+Summaries from the old per-file layout are still found on a miss and copied
+into the database, so existing caches aren't thrown away.
+"""
+
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Total summary text kept before least recently used entries are evicted
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+# Eviction frees space down to this fraction of the cap, so it runs rarely
+_EVICT_TO = 0.9
+
+# Check the size cap after this many writes
+_EVICT_CHECK_INTERVAL = 256
+
+# Hits only refresh their last-used stamp when it is older than this
+_TOUCH_GRANULARITY = 24 * 60 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS summaries (
+    filepath TEXT NOT NULL,
+    blob_oid TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (filepath, blob_oid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS summaries_last_used ON summaries (last_used);
+"""
+
+
+def default_cache_dir() -> Path:
+    """XDG cache directory for Forge (``~/.cache/forge``)."""
+    xdg_cache = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return xdg_cache / "forge"
+
+
+class SummaryCache:
+    """SQLite-backed summary store shared by every session and process."""
+
+    def __init__(
+        self,
+        path: Path,
+        legacy_dir: Path | None = None,
+        max_bytes: int = MAX_CACHE_BYTES,
+    ) -> None:
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._legacy_names: set[str] | None = None
+        self._db: sqlite3.Connection | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db = db
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠ Summary cache unavailable ({e}); summaries won't be cached")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def get(self, filepath: str, blob_oid: str) -> str | None:
+        """Cached summary for one file, or None."""
+        return self.get_many([(filepath, blob_oid)]).get((filepath, blob_oid))
+
+    def get_many(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], str]:
+        """Cached summaries for many (filepath, blob OID) keys in one query.
+
+        Keys without a summary are absent from the result.
+        """
+        found: dict[tuple[str, str], str] = {}
+        with self._lock:
+            if self._db is not None and keys:
+                with contextlib.suppress(sqlite3.Error):
+                    found = self._lookup(self._db, keys)
+        if self.legacy_dir is not None:
+            for filepath, blob_oid in keys:
+                if (filepath, blob_oid) not in found:
+                    summary = self._read_legacy(filepath, blob_oid)
+                    if summary is not None:
+                        found[(filepath, blob_oid)] = summary
+                        self.put(filepath, blob_oid, summary)
+        return found
+
+    def put(self, filepath: str, blob_oid: str, summary: str) -> None:
+        """Store (or replace) the summary for a file."""
+        with self._lock:
+            if self._db is None:
+                return
+            with contextlib.suppress(sqlite3.Error), self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?, ?)",
+                    (filepath, blob_oid, summary, len(summary.encode()), int(time.time())),
+                )
+            self._writes += 1
+            if self._writes % _EVICT_CHECK_INTERVAL == 0:
+                with contextlib.suppress(sqlite3.Error):
+                    self._evict(self._db)
+
+    def evict(self) -> int:
+        """Evict least recently used entries beyond the size cap. Returns the count removed."""
+        with self._lock:
+            if self._db is None:
+                return 0
+            try:
+                return self._evict(self._db)
+            except sqlite3.Error:
+                return 0
+
+    def _lookup(
+        self, db: sqlite3.Connection, keys: list[tuple[str, str]]
+    ) -> dict[tuple[str, str], str]:
+        now = int(time.time())
+        with db:
+            db.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS wanted (filepath TEXT, blob_oid TEXT, "
+                "PRIMARY KEY (filepath, blob_oid)) WITHOUT ROWID"
+            )
+            db.execute("DELETE FROM wanted")
+            db.executemany("INSERT OR IGNORE INTO wanted VALUES (?, ?)", keys)
+            rows = db.execute(
+                "SELECT s.filepath, s.blob_oid, s.summary, s.last_used FROM summaries s "
+                "JOIN wanted w ON s.filepath = w.filepath AND s.blob_oid = w.blob_oid"
+            ).fetchall()
+            # Refresh last-used for hits, at coarse granularity so a warm
+            # start is a pure read
+            if any(last_used < now - _TOUCH_GRANULARITY for *_, last_used in rows):
+                db.execute(
+                    "UPDATE summaries SET last_used = ? WHERE last_used < ? AND "
+                    "(filepath, blob_oid) IN (SELECT filepath, blob_oid FROM wanted)",
+                    (now, now - _TOUCH_GRANULARITY),
+                )
+            db.execute("DELETE FROM wanted")
+        return {(filepath, blob_oid): summary for filepath, blob_oid, summary, _ in rows}
+
+    def _evict(self, db: sqlite3.Connection) -> int:
+        (total,) = db.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()
+        if total <= self.max_bytes:
+            return 0
+        excess = total - int(self.max_bytes * _EVICT_TO)
+        victims: list[tuple[str, str]] = []
+        for filepath, blob_oid, size in db.execute(
+            "SELECT filepath, blob_oid, size FROM summaries ORDER BY last_used"
+        ):
+            if excess <= 0:
+                break
+            victims.append((filepath, blob_oid))
+            excess -= size
+        with db:
+            db.executemany("DELETE FROM summaries WHERE filepath = ? AND blob_oid = ?", victims)
+        return len(victims)
+
+    def _read_legacy(self, filepath: str, blob_oid: str) -> str | None:
+        assert self.legacy_dir is not None
+        if self._legacy_names is None:
+            # One directory listing instead of a failed open() per miss
+            try:
+                self._legacy_names = set(os.listdir(self.legacy_dir))
+            except OSError:
+                self._legacy_names = set()
+        key = hashlib.sha256(f"{blob_oid}:{filepath}".encode()).hexdigest()
+        if key not in self._legacy_names:
+            return None
+        try:
+            return (self.legacy_dir / key).read_text()
+        except OSError:
+            return None
+
+
+# Process-wide instance, opened on first use
+_cache: SummaryCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_summary_cache() -> SummaryCache:
+    """The summary cache in the user's XDG cache directory."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = default_cache_dir()
+            _cache = SummaryCache(cache_dir / "summaries.db", legacy_dir=cache_dir / "summaries")
+        return _cache
@@ -42,7 +42,8 @@ in the whole block.
 
 import difflib
 import re
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
 from forge.tools.side_effects import SideEffect
@@ -51,34 +52,119 @@ if TYPE_CHECKING:
     from forge.vfs.base import VFS
 
 
-def _find_best_match(search: str, content: str) -> tuple[str, int, int]:
+# Wall-clock cap on the fuzzy locator. The result only feeds a diagnostic
+# diff, so a near-best window found in time beats the exact best found late.
+_FUZZY_TIME_BUDGET_S = 0.25
+
+# Anchored windows scored in full, best-anchored first. Lines shorter than
+# _MIN_ANCHOR_LEN (after stripping) are too common ("", "}", "else:") to
+# locate anything and would flood the candidate set.
+_MAX_FUZZY_CANDIDATES = 256
+_MIN_ANCHOR_LEN = 4
+
+
+def _normalize_ws(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _window_distance(search: str, window: str, ratio: float) -> int:
+    return int((1 - ratio) * max(len(search), len(window)))
+
+
+def _beats(distance: int, pos: int, best_distance: float, best_pos: int) -> bool:
+    return distance < best_distance or (distance == best_distance and pos < best_pos)
+
+
+def _find_best_match(
+    search: str, content: str, time_budget: float = _FUZZY_TIME_BUDGET_S
+) -> tuple[str, int, int]:
     """
     Find the closest matching text in content to the search string.
 
-    Returns (best_match, edit_distance, position).
+    Returns (best_match, edit_distance, position), where position is the
+    starting line of the matched window.
+
+    Tiered so that large files don't stall the edit tool:
+
+      1. Whitespace-normalized exact match of the whole search block.
+      2. Candidate windows anchored on lines the search block shares with
+         the content (stripped-line equality), most anchors first.
+      3. real_quick_ratio/quick_ratio upper bounds prune candidates that
+         can't beat the current best; full ratio() only on survivors.
+
+    Without any anchor every window is a candidate. Scoring stops once
+    `time_budget` seconds have passed and the best window so far wins.
     """
     search_lines = search.split("\n")
     content_lines = content.split("\n")
     search_len = len(search_lines)
+    num_windows = max(1, len(content_lines) - search_len + 1)
 
     if not content_lines:
         return ("", len(search), 0)
 
+    def window_at(i: int) -> str:
+        return "\n".join(content_lines[i : i + search_len])
+
+    matcher = difflib.SequenceMatcher(None)
+    # seq2 is the side SequenceMatcher indexes; fixing it to the search text
+    # builds that index once instead of once per window.
+    matcher.set_seq2(search)
+
+    # Tier 1: same lines modulo whitespace (re-indentation, trailing spaces).
+    norm_search = [_normalize_ws(line) for line in search_lines]
+    norm_content = [_normalize_ws(line) for line in content_lines]
+    for i in range(num_windows):
+        if norm_content[i] == norm_search[0] and norm_content[i : i + search_len] == norm_search:
+            window = window_at(i)
+            matcher.set_seq1(window)
+            return (window, _window_distance(search, window, matcher.ratio()), i)
+
+    # Tier 2: anchor candidates. Each content line equal to search line j
+    # votes for the window starting j lines above it.
+    anchor_offsets: dict[str, list[int]] = {}
+    for j, line in enumerate(search_lines):
+        key = line.strip()
+        if len(key) >= _MIN_ANCHOR_LEN:
+            anchor_offsets.setdefault(key, []).append(j)
+
+    votes: dict[int, int] = {}
+    for i, line in enumerate(content_lines):
+        offsets = anchor_offsets.get(line.strip())
+        if offsets:
+            for j in offsets:
+                start = min(max(i - j, 0), num_windows - 1)
+                votes[start] = votes.get(start, 0) + 1
+
+    if votes:
+        candidates = sorted(votes, key=lambda i: (-votes[i], i))[:_MAX_FUZZY_CANDIDATES]
+    else:
+        candidates = list(range(num_windows))
+
+    # Tier 3: bound, then score. Ties go to the earlier window, matching a
+    # top-to-bottom scan.
+    deadline = time.monotonic() + time_budget
     best_match = ""
     best_distance = float("inf")
     best_pos = 0
 
-    # Sliding window over content lines
-    for i in range(max(1, len(content_lines) - search_len + 1)):
-        window = "\n".join(content_lines[i : i + search_len])
-
-        # Use SequenceMatcher for similarity
-        matcher = difflib.SequenceMatcher(None, search, window)
-        # Convert ratio to edit distance approximation
-        ratio = matcher.ratio()
-        distance = int((1 - ratio) * max(len(search), len(window)))
-
-        if distance < best_distance:
+    for i in candidates:
+        if best_distance < float("inf") and time.monotonic() > deadline:
+            break
+        window = window_at(i)
+        matcher.set_seq1(window)
+
+        # A ratio upper bound gives a distance lower bound: if even that
+        # can't beat the best so far, skip the full comparison.
+        if not _beats(
+            _window_distance(search, window, matcher.real_quick_ratio()), i, best_distance, best_pos
+        ) or not _beats(
+            _window_distance(search, window, matcher.quick_ratio()), i, best_distance, best_pos
+        ):
+            continue
+
+        distance = _window_distance(search, window, matcher.ratio())
+        if _beats(distance, i, best_distance, best_pos):
             best_distance = distance
             best_match = window
             best_pos = i
@@ -322,8 +408,98 @@ def execute(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
     return _execute_single(vfs, args)
 
 
-def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
-    """Apply one edit entry (replace or write) to the VFS."""
+@dataclass
+class _FilePlan:
+    """Pending edits to one file, written back to the VFS once.
+
+    Each accepted replace is a (start, end, replacement) span over `base`.
+    The new file is built from slices of `base` in a single join, so a
+    batch of N edits costs one search per edit plus one build, instead of
+    N full-file rebuilds.
+    """
+
+    base: str
+    spans: list[tuple[int, int, str]] = field(default_factory=list)
+    dirty: bool = False
+
+    def text(self) -> str:
+        if not self.spans:
+            return self.base
+        parts: list[str] = []
+        cursor = 0
+        for start, end, replacement in sorted(self.spans):
+            parts.append(self.base[cursor:start])
+            parts.append(replacement)
+            cursor = end
+        parts.append(self.base[cursor:])
+        return "".join(parts)
+
+    def replace(self, search: str, replace: str) -> bool:
+        """Replace the first occurrence of `search` in the current text.
+
+        Same result as str.replace(search, replace, 1) on the text with all
+        earlier edits applied. Returns False if `search` isn't there.
+        """
+        if not self._place(search, replace):
+            # The edit interacts with an earlier one (or only matches text
+            # an earlier edit produced): apply the spans so far and retry
+            # against the updated text.
+            if self.spans:
+                self.base = self.text()
+                self.spans = []
+            if not self._place(search, replace):
+                return False
+        self.dirty = True
+        return True
+
+    def _place(self, search: str, replace: str) -> bool:
+        """Record the edit as a span over `base` if that's provably safe.
+
+        Safe means the first occurrence in `base` is also the first
+        occurrence in the edited text: it doesn't overlap an earlier edit,
+        and no earlier replacement creates an occurrence, either on its own
+        or straddling its boundary with the surrounding text.
+        """
+        pos = self.base.find(search)
+        if pos < 0:
+            return False
+        end = pos + len(search)
+        reach = len(search) - 1
+
+        for start, stop, replacement in self.spans:
+            if start < end and pos < stop:
+                return False
+            if search in replacement:
+                return False
+            if not reach:
+                continue
+            lo, hi = start - reach, stop + reach
+            # The straddle check below reads neighbouring text from `base`,
+            # which is only valid if no other edit touches it.
+            if any(s < hi and lo < e for s, e, _r in self.spans if (s, e) != (start, stop)):
+                return False
+            neighbourhood = self.base[max(lo, 0) : start] + replacement + self.base[stop:hi]
+            if search in neighbourhood:
+                return False
+
+        self.spans.append((pos, end, replace))
+        return True
+
+
+def _file_exists(vfs: "VFS", filepath: str) -> bool:
+    try:
+        vfs.read_file(filepath)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _plan_entry(vfs: "VFS", plans: dict[str, _FilePlan], args: dict[str, Any]) -> dict[str, Any]:
+    """Plan one edit entry (replace or write) against the pending file plans.
+
+    Returns the same result dict that applying the entry on its own would;
+    nothing reaches the VFS until _flush_plans().
+    """
     filepath = args.get("filepath", "")
     search = args.get("search", "")
     replace = args.get("replace", "")
@@ -333,12 +509,16 @@ def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
 
     # Whole-file write path: an entry with "content" (and no search) is a write.
     if not search and "content" in args:
-        return execute_write(vfs, {"filepath": filepath, "content": args["content"]})
+        existed = filepath in plans or _file_exists(vfs, filepath)
+        plans[filepath] = _FilePlan(args["content"], dirty=True)
+        return _write_result(filepath, existed)
 
-    try:
-        content = vfs.read_file(filepath)
-    except FileNotFoundError:
-        return {"success": False, "error": f"File not found: {filepath}"}
+    plan = plans.get(filepath)
+    if plan is None:
+        try:
+            plan = plans[filepath] = _FilePlan(vfs.read_file(filepath))
+        except FileNotFoundError:
+            return {"success": False, "error": f"File not found: {filepath}"}
 
     # Empty search with no content means ambiguous — require explicit write.
     if not search:
@@ -347,9 +527,9 @@ def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
             "error": "search text is required for replace edits; provide 'content' for a whole-file write",
         }
 
-    if search not in content:
+    if not plan.replace(search, replace):
         # Try fuzzy match for diagnostics
-        best_match, distance, _pos = _find_best_match(search, content)
+        best_match, distance, _pos = _find_best_match(search, plan.text())
         diff = _generate_diff(search, best_match) if best_match else ""
         return {
             "success": False,
@@ -358,9 +538,6 @@ def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
             "fuzzy_distance": distance,
         }
 
-    new_content = content.replace(search, replace, 1)
-    vfs.write_file(filepath, new_content)
-
     return {
         "success": True,
         "filepath": filepath,
@@ -369,9 +546,28 @@ def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _flush_plans(vfs: "VFS", plans: dict[str, _FilePlan]) -> None:
+    """Write every changed file to the VFS, once each."""
+    for filepath, plan in plans.items():
+        if plan.dirty:
+            vfs.write_file(filepath, plan.text())
+
+
+def _execute_single(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
+    """Apply one edit entry (replace or write) to the VFS."""
+    plans: dict[str, _FilePlan] = {}
+    result = _plan_entry(vfs, plans, args)
+    _flush_plans(vfs, plans)
+    return result
+
+
 def _execute_edits(vfs: "VFS", edits: Any) -> dict[str, Any]:
     """Apply a list of edit entries sequentially, stop-on-first-failure.
 
+    All entries are planned first (see _FilePlan) and each touched file is
+    written once at the end, but the outcome is the same as applying them
+    one by one: later entries see earlier entries' changes.
+
     Returns an aggregated result. On failure, the result carries the failing
     entry's error plus how many edits succeeded before it, and any files
     already modified are reported (the VFS changes are NOT rolled back — the
@@ -380,11 +576,13 @@ def _execute_edits(vfs: "VFS", edits: Any) -> dict[str, Any]:
     if not isinstance(edits, list) or not edits:
         return {"success": False, "error": "edits must be a non-empty list"}
 
+    plans: dict[str, _FilePlan] = {}
     modified: list[str] = []
     new_files: list[str] = []
 
     for i, entry in enumerate(edits):
         if not isinstance(entry, dict):
+            _flush_plans(vfs, plans)
             return {
                 "success": False,
                 "error": f"edit #{i} must be an object, got {type(entry).__name__}",
@@ -392,9 +590,10 @@ def _execute_edits(vfs: "VFS", edits: Any) -> dict[str, Any]:
                 "modified_files": modified,
             }
 
-        result = _execute_single(vfs, entry)
+        result = _plan_entry(vfs, plans, entry)
 
         if not result.get("success"):
+            _flush_plans(vfs, plans)
             error = result.get("error", "unknown error")
             out: dict[str, Any] = {
                 "success": False,
@@ -415,6 +614,8 @@ def _execute_edits(vfs: "VFS", edits: Any) -> dict[str, Any]:
             if fp not in new_files:
                 new_files.append(fp)
 
+    _flush_plans(vfs, plans)
+
     side_effects = [SideEffect.FILES_MODIFIED]
     out = {
         "success": True,
@@ -442,15 +643,12 @@ def execute_write(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
     if not filepath:
         return {"success": False, "error": "filepath is required"}
 
-    existed = False
-    try:
-        vfs.read_file(filepath)
-        existed = True
-    except FileNotFoundError:
-        pass
-
+    existed = _file_exists(vfs, filepath)
     vfs.write_file(filepath, content)
+    return _write_result(filepath, existed)
+
 
+def _write_result(filepath: str, existed: bool) -> dict[str, Any]:
     result: dict[str, Any] = {
         "success": True,
         "filepath": filepath,
@@ -15,6 +15,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM"""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "get_lines",
             "description": """Get lines surrounding a specific line number in a file. Useful for investigating errors that reference line numbers.
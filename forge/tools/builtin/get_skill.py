@@ -72,6 +72,13 @@ def execute(ctx: "ToolContext", args: dict[str, Any]) -> dict[str, Any]:
     }
 ```
 
+### Read-only tools
+
+A tool that only reads files (and has no other effect on the session) can
+add `"read_only": True` next to `"type": "function"`. When the AI calls
+several read-only tools in a row, they run concurrently against a frozen
+snapshot of the VFS; writing to `ctx.vfs` from such a tool raises.
+
 ## ToolContext API
 
 The `ctx` parameter is a `ToolContext` that provides access to files and more:
@@ -104,11 +111,10 @@ ctx.repo  # ForgeRepository instance
 For tools that need to run external commands:
 
 ```python
-tmpdir = ctx.vfs.materialize_to_tempdir()  # Returns Path to temp directory
-# tmpdir contains the full repo state with pending changes applied
-# Remember to clean up:
-import shutil
-shutil.rmtree(tmpdir, ignore_errors=True)
+tmpdir = ctx.vfs.materialize_to_tempdir()  # Returns Path to the branch's directory
+# tmpdir contains the full repo state with pending changes applied.
+# It is kept per branch and synced incrementally between calls, so leave it
+# in place when done (deleting it just forces a full rebuild next time).
 ```
 
 ## Calling the LLM (Scout Model)
@@ -182,7 +188,6 @@ is stored in `.forge/approved_tools.json` so modifications require re-approval.
 ## Example: A Tool That Runs Commands
 
 ```python
-import shutil
 import subprocess
 from typing import TYPE_CHECKING, Any
 
@@ -216,20 +221,17 @@ def execute(ctx: "ToolContext", args: dict[str, Any]) -> dict[str, Any]:
     # Materialize VFS to run commands
     tmpdir = ctx.vfs.materialize_to_tempdir()
 
-    try:
-        result = subprocess.run(
-            ["make", target],
-            cwd=tmpdir,
-            capture_output=True,
-            text=True,
-        )
-        return {
-            "success": result.returncode == 0,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-        }
-    finally:
-        shutil.rmtree(tmpdir, ignore_errors=True)
+    result = subprocess.run(
+        ["make", target],
+        cwd=tmpdir,
+        capture_output=True,
+        text=True,
+    )
+    return {
+        "success": result.returncode == 0,
+        "stdout": result.stdout,
+        "stderr": result.stderr,
+    }
 ```
 """,
 }
@@ -15,6 +15,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM"""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "git_history",
             "description": "Inspect git history. Shows commits with author, date, message, and optionally diffs. Handles merges and shows the commit graph structure.",
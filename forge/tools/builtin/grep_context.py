@@ -3,11 +3,18 @@ Grep for a pattern and show surrounding context without adding files to active c
 Useful for peeking at matches to decide if you need the full file.
 """
 
+import dataclasses
 import re
 from typing import TYPE_CHECKING, Any
 
 from forge.tools.builtin.grep_utils import DEFAULT_EXCLUDE_DIRS, get_files_to_search
 from forge.tools.side_effects import SideEffect
+from forge.vfs.search_engine import (
+    SearchPlan,
+    count_line_matches,
+    iter_line_matches,
+    plan_search,
+)
 
 if TYPE_CHECKING:
     from forge.vfs.base import VFS
@@ -17,6 +24,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM"""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "grep_context",
             "description": """Search for a pattern and show lines around each match WITHOUT adding files to context.
@@ -114,52 +122,41 @@ def execute(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
 
     # Get files to search
     if single_file:
+        if not vfs.file_exists(single_file):
+            return {"success": False, "error": f"File not found: {single_file}"}
         files_to_search = [single_file]
     else:
-        files_to_search = get_files_to_search(vfs, exclude_dirs, include_extensions)
+        files_to_search = get_files_to_search(vfs, exclude_dirs, include_extensions, regex)
 
-    # Search and collect snippets
+    # Search and collect snippets. Matches stream in file order; once we have
+    # max_matches, the rest are only counted, with no context or snippets
+    # built for them.
     snippets: list[dict[str, Any]] = []
     total_matches = 0
 
-    for filepath in files_to_search:
+    plan = plan_search(vfs, files_to_search)
+    matches = iter_line_matches(plan, regex, context_before, context_after)
+    for match in matches:
         if len(snippets) >= max_matches:
+            matches.close()  # Drop the batches still in flight
+            total_matches = _count_all(plan, regex, snippets)
             break
-
-        try:
-            content = vfs.read_file(filepath)
-        except FileNotFoundError:
-            if single_file:
-                return {"success": False, "error": f"File not found: {filepath}"}
-            continue
-        except UnicodeDecodeError:
-            continue
-
-        lines = content.split("\n")
-
-        # Find all matches with line numbers
-        for i, line in enumerate(lines):
-            if regex.search(line):
-                total_matches += 1
-                if len(snippets) >= max_matches:
-                    break
-
-                # Extract context
-                start = max(0, i - context_before)
-                end = min(len(lines), i + context_after + 1)
-
-                snippet_lines = []
-                for j in range(start, end):
-                    marker = ">>>" if j == i else "   "
-                    snippet_lines.append(f"{marker} {j + 1:4d} | {lines[j]}")
-
-                snippets.append(
-                    {
-                        "filepath": filepath,
-                        "line": i + 1,
-                        "snippet": "\n".join(snippet_lines),
-                    }
-                )
+        total_matches += 1
+
+        first_line = match.line - len(match.before)
+        context = [*match.before, match.text, *match.after]
+        snippet_lines = []
+        for j, text in enumerate(context, start=first_line):
+            marker = ">>>" if j == match.line else "   "
+            snippet_lines.append(f"{marker} {j:4d} | {text}")
+
+        snippets.append(
+            {
+                "filepath": match.filepath,
+                "line": match.line,
+                "snippet": "\n".join(snippet_lines),
+            }
+        )
 
     if not snippets:
         return {
@@ -186,3 +183,15 @@ def execute(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
         "total_matches": total_matches,
         "side_effects": [SideEffect.EPHEMERAL_RESULT],
     }
+
+
+def _count_all(plan: SearchPlan, regex: re.Pattern[str], snippets: list[dict[str, Any]]) -> int:
+    """Total matches, given the snippets taken so far (in file order)."""
+    if not snippets:
+        return count_line_matches(plan, regex)
+    # Count again from the file the last snippet is in
+    last_file = snippets[-1]["filepath"]
+    start = next(i for i, source in enumerate(plan.sources) if source.filepath == last_file)
+    before = sum(1 for snippet in snippets if snippet["filepath"] != last_file)
+    rest = dataclasses.replace(plan, sources=plan.sources[start:])
+    return before + count_line_matches(rest, regex)
@@ -6,6 +6,7 @@ import re
 from typing import TYPE_CHECKING, Any
 
 from forge.tools.builtin.grep_utils import DEFAULT_EXCLUDE_DIRS, get_files_to_search
+from forge.vfs.search_engine import iter_file_matches, plan_search
 
 if TYPE_CHECKING:
     from forge.vfs.base import VFS
@@ -81,30 +82,21 @@ def execute(vfs: "VFS", args: dict[str, Any]) -> dict[str, Any]:
         return {"success": False, "error": f"Invalid regex pattern: {e}"}
 
     # Get filtered file list
-    files_to_search = get_files_to_search(vfs, exclude_dirs, include_extensions)
+    files_to_search = get_files_to_search(vfs, exclude_dirs, include_extensions, regex)
 
     # Search files
     matches: list[dict[str, Any]] = []
     files_to_add: list[str] = []
 
-    for filepath in files_to_search:
-        # Read and search
-        try:
-            content = vfs.read_file(filepath)
-        except (FileNotFoundError, UnicodeDecodeError):
-            continue
-
-        # Count matches
-        found = regex.findall(content)
-        if found:
-            matches.append(
-                {
-                    "filepath": filepath,
-                    "match_count": len(found),
-                    "first_match": found[0][:50] if found else "",
-                }
-            )
-            files_to_add.append(filepath)
+    for match in iter_file_matches(plan_search(vfs, files_to_search), regex):
+        matches.append(
+            {
+                "filepath": match.filepath,
+                "match_count": match.match_count,
+                "first_match": match.first_match[:50],
+            }
+        )
+        files_to_add.append(match.filepath)
 
     if not matches:
         return {
@@ -5,6 +5,8 @@ Shared utilities for grep tools.
 import re
 from typing import TYPE_CHECKING, Any
 
+from forge.vfs.trigram_index import narrow_candidates
+
 if TYPE_CHECKING:
     from forge.vfs.base import VFS
 
@@ -56,6 +58,7 @@ def get_files_to_search(
     vfs: "VFS",
     exclude_dirs: list[str],
     include_extensions: list[str],
+    regex: re.Pattern[str] | None = None,
 ) -> list[str]:
     """
     Get list of files to search, applying exclusions and extension filters.
@@ -64,9 +67,13 @@ def get_files_to_search(
         vfs: Virtual filesystem to list files from
         exclude_dirs: Directory names to exclude
         include_extensions: Only include files with these extensions (empty = all)
+        regex: If given, drop files the trigram index proves can't match it
 
     Returns:
         List of filepaths to search
     """
     all_files = vfs.list_files()
-    return [f for f in all_files if not should_exclude_file(f, exclude_dirs, include_extensions)]
+    files = [f for f in all_files if not should_exclude_file(f, exclude_dirs, include_extensions)]
+    if regex is not None:
+        files = narrow_candidates(vfs, files, regex)
+    return files
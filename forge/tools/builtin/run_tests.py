@@ -2,27 +2,43 @@
 Run the project's test suite on the current VFS state.
 
 This tool:
-1. Materializes the VFS to a temp directory
+1. Materializes the VFS to disk
 2. Discovers and runs the test command (make test, pytest, etc.)
 3. Returns test output with pass/fail summary
+
+The command runs through forge.tools.process_runner: its output streams to
+the UI while it runs, only the head, tail and failure lines of long output
+are kept, and cancelling the session kills it. Unsharded pytest runs may
+be forked from a warm worker instead (forge.tools.pytest_worker).
 """
 
 import json
 import re
-import subprocess
 import sys
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+from forge.tools.process_runner import CommandResult, read_resource_limits, run_command
+from forge.tools.pytest_worker import run_pytest
 from forge.tools.side_effects import SideEffect
+from forge.tools.test_shards import (
+    ShardedRun,
+    make_supports_shards,
+    read_shard_count,
+    run_make_sharded,
+    run_pytest_sharded,
+)
+from forge.vfs.import_graph import TestImpact, affected_tests
+from forge.vfs.materialize import write_back
 
 if TYPE_CHECKING:
     from forge.vfs.work_in_progress import WorkInProgressVFS
 
 
-# Pattern: <run_tests/> or <run_tests file="..." pattern="..." verbose="true"/>
+# Pattern: <run_tests/> or <run_tests file="..." pattern="..." verbose="true" affected="true"/>
 _INLINE_PATTERN = re.compile(
-    r'<run_tests(?:\s+file="([^"]*)")?(?:\s+pattern="([^"]*)")?(?:\s+verbose="(true|false)")?\s*/?>',
+    r'<run_tests(?:\s+file="([^"]*)")?(?:\s+pattern="([^"]*)")?(?:\s+verbose="(true|false)")?'
+    r'(?:\s+affected="(true|false)")?\s*/?>',
     re.DOTALL,
 )
 
@@ -41,6 +57,8 @@ def parse_inline_match(match: re.Match[str]) -> dict[str, Any]:
         args["pattern"] = match.group(2)
     if match.group(3):
         args["verbose"] = match.group(3) == "true"
+    if match.group(4):
+        args["affected"] = match.group(4) == "true"
     return args
 
 
@@ -49,7 +67,10 @@ def get_schema() -> dict[str, Any]:
     return {
         "type": "function",
         "invocation": "inline",
-        "inline_syntax": '<run_tests/> or <run_tests file="tests/test_foo.py" pattern="test_bar" verbose="true"/>',
+        "inline_syntax": (
+            '<run_tests/> or <run_tests file="tests/test_foo.py" pattern="test_bar" '
+            'verbose="true"/> or <run_tests affected="true"/>'
+        ),
         "function": {
             "name": "run_tests",
             "description": """Run the project's test suite on the current VFS state.
@@ -63,7 +84,18 @@ Automatically discovers test command from:
 Returns test output with pass/fail summary. Use this to verify your changes work.
 
 If the repository configures a test command in .forge/config.json
-("test_command"), that command is used instead of auto-discovery.""",
+("test_command"), that command is used instead of auto-discovery.
+
+If .forge/config.json sets "test_shards" (a number, or "auto"), the run is
+split across that many processes and the outputs are merged.
+
+If it sets "test_worker": true, unsharded pytest runs are forked from a
+warm process that has the project's third-party dependencies imported
+already (falling back to a normal run if that fails).
+
+With affected=true (pytest projects), only test modules that import a file
+changed on this branch (directly or transitively) are run; the result lists
+the tests that were skipped.""",
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -80,6 +112,15 @@ If the repository configures a test command in .forge/config.json
                         "description": "Show verbose test output (default: false)",
                         "default": False,
                     },
+                    "affected": {
+                        "type": "boolean",
+                        "description": (
+                            "Only run test modules affected by this branch's changes "
+                            "(pending edits plus commits since it left the default branch). "
+                            "pytest only; ignored when 'file' is given (default: false)"
+                        ),
+                        "default": False,
+                    },
                 },
             },
         },
@@ -168,13 +209,32 @@ def _discover_test_command(tmpdir: Path) -> tuple[list[str], str]:
     return [sys.executable, "-m", "pytest"], "pytest (default)"
 
 
+def _describe_impact(impact: TestImpact) -> str:
+    """Explain an affected-mode selection, for the top of the test output."""
+    total = len(impact.selected) + len(impact.skipped)
+    changed = ", ".join(impact.changed) if impact.changed else "none"
+    lines = [f"Changed files: {changed}"]
+    if impact.full_run_reason:
+        lines.append(f"Running all {total} test modules: {impact.full_run_reason}")
+    else:
+        lines.append(f"Running {len(impact.selected)} of {total} test modules")
+        if impact.skipped:
+            lines.append("Skipped (no import path to a changed file):")
+            lines.extend(f"  {path}" for path in impact.skipped)
+    if impact.unparsed:
+        lines.append(f"Always run (imports unknown, syntax error): {', '.join(impact.unparsed)}")
+    return "\n".join(lines)
+
+
 def execute(vfs: "WorkInProgressVFS", args: dict[str, Any]) -> dict[str, Any]:
     """Run tests and return results"""
     file = args.get("file", "")
     pattern = args.get("pattern", "")
     verbose = args.get("verbose", False)
+    affected = args.get("affected", False)
 
-    # Materialize VFS to temp directory
+    # Materialize VFS to disk (a persistent per-branch directory, synced
+    # incrementally - left in place for the next call)
     tmpdir = vfs.materialize_to_tempdir()
 
     results: dict[str, Any] = {
@@ -185,134 +245,170 @@ def execute(vfs: "WorkInProgressVFS", args: dict[str, Any]) -> dict[str, Any]:
         "summary": "",
     }
 
-    try:
-        # A per-repository test command (.forge/config.json "test_command")
-        # overrides auto-discovery. It's run via the shell so it may include
-        # arguments and pipes (e.g. "pytest -q" or "npm test"). The file,
-        # pattern, and verbose options only apply to auto-discovered commands
-        # since we can't reliably splice them into an arbitrary shell command.
-        configured = _read_configured_command(vfs)
-        if configured:
-            cmd: list[str] | str = configured
-            cmd_desc = configured
-            use_shell = True
-            if file or pattern or verbose:
+    # A per-repository test command (.forge/config.json "test_command")
+    # overrides auto-discovery. It's run via the shell so it may include
+    # arguments and pipes (e.g. "pytest -q" or "npm test"). The file,
+    # pattern, and verbose options only apply to auto-discovered commands
+    # since we can't reliably splice them into an arbitrary shell command.
+    impact_text = ""
+    # Positional test paths, kept apart from the options so a sharded run
+    # can split them
+    selection: list[str] = []
+    configured = _read_configured_command(vfs)
+    if configured:
+        cmd: list[str] | str = configured
+        cmd_desc = configured
+        use_shell = True
+        if file or pattern or verbose or affected:
+            results["note"] = (
+                "file/pattern/verbose/affected options are ignored when a "
+                "repository test_command is configured"
+            )
+    else:
+        cmd, cmd_desc = _discover_test_command(tmpdir)
+        use_shell = False
+
+        # Add specific test file if specified
+        if file:
+            if "pytest" in cmd_desc:
+                selection.append(file)
+            elif cmd_desc == "make test":
+                results["note"] = "File filtering not supported with make test, running all tests"
+
+        # Add pattern filter if specified
+        if pattern:
+            if "pytest" in cmd_desc:
+                cmd.extend(["-k", pattern])
+            elif cmd_desc == "make test":
+                # Can't easily filter make test, note it
                 results["note"] = (
-                    "file/pattern/verbose options are ignored when a "
-                    "repository test_command is configured"
+                    "Pattern filtering not supported with make test, running all tests"
                 )
-        else:
-            cmd, cmd_desc = _discover_test_command(tmpdir)
-            use_shell = False
 
-            # Add specific test file if specified
+        # Add verbose flag
+        if verbose:
+            if "pytest" in cmd_desc:
+                cmd.append("-v")
+            elif "cargo" in cmd_desc:
+                cmd.append("--verbose")
+
+        # Narrow to the test modules the branch's changes can reach
+        if affected:
             if file:
-                if "pytest" in cmd_desc:
-                    cmd.append(file)
-                elif cmd_desc == "make test":
-                    results["note"] = (
-                        "File filtering not supported with make test, running all tests"
-                    )
-
-            # Add pattern filter if specified
-            if pattern:
-                if "pytest" in cmd_desc:
-                    cmd.extend(["-k", pattern])
-                elif cmd_desc == "make test":
-                    # Can't easily filter make test, note it
-                    results["note"] = (
-                        "Pattern filtering not supported with make test, running all tests"
-                    )
-
-            # Add verbose flag
-            if verbose:
-                if "pytest" in cmd_desc:
-                    cmd.append("-v")
-                elif "cargo" in cmd_desc:
-                    cmd.append("--verbose")
-
-        results["test_command"] = cmd_desc
-
-        # Run tests with timeout
-        try:
-            result = subprocess.run(
-                cmd,
-                cwd=tmpdir,
-                shell=use_shell,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-                timeout=300,  # 5 minute timeout
-            )
+                results["note"] = "affected is ignored when a specific file is given"
+            elif "pytest" not in cmd_desc:
+                results["note"] = (
+                    f"Affected-test selection needs pytest, running all tests ({cmd_desc})"
+                )
+            else:
+                impact = affected_tests(vfs)
+                results["affected"] = {
+                    "changed_files": impact.changed,
+                    "selected": impact.selected,
+                    "skipped": impact.skipped,
+                    "full_run_reason": impact.full_run_reason,
+                }
+                impact_text = _describe_impact(impact)
+                if impact.full_run_reason is None:
+                    if not impact.selected:
+                        results["test_command"] = cmd_desc
+                        results["success"] = True
+                        results["output"] = impact_text
+                        results["summary"] = "✓ No tests affected by the changes"
+                        results["display_output"] = impact_text
+                        results["side_effects"] = [SideEffect.HAS_DISPLAY_OUTPUT]
+                        return results
+                    selection.extend(impact.selected)
+
+    results["test_command"] = cmd_desc
+
+    # Split the run over several processes if the repository asks for it
+    # (.forge/config.json "test_shards"); see forge.tools.test_shards
+    shard_count = 1 if use_shell else read_shard_count(vfs)
+    limits = read_resource_limits(vfs)
+    worker_note = ""
+
+    # Run tests with timeout
+    try:
+        result: CommandResult | ShardedRun | None = None
+        if shard_count > 1 and isinstance(cmd, list):
+            if "pytest" in cmd_desc:
+                result = run_pytest_sharded(vfs, cmd, selection, tmpdir, shard_count, 300, limits)
+            elif cmd_desc == "make test" and make_supports_shards(tmpdir / "Makefile"):
+                result = run_make_sharded(tmpdir, shard_count, 300, limits)
+        if isinstance(result, ShardedRun):
+            results["shards"] = result.shard_count
+        else:
+            if isinstance(cmd, list):
+                cmd.extend(selection)
+            if isinstance(cmd, list) and "pytest" in cmd_desc:
+                # Forked from a warm worker if .forge/config.json asks for
+                # it ("test_worker"); see forge.tools.pytest_worker
+                result, worker_note = run_pytest(vfs, cmd, tmpdir, timeout=300, limits=limits)
+            else:
+                result = run_command(
+                    cmd,
+                    tmpdir,
+                    shell=use_shell,
+                    timeout=300,  # 5 minute timeout
+                    limits=limits,
+                )
 
-            output = result.stdout
-            if result.stderr:
-                output += "\n--- stderr ---\n" + result.stderr
+        output = result.stdout
+        if result.stderr:
+            output += "\n--- stderr ---\n" + result.stderr
+        if worker_note:
+            output = worker_note + "\n\n" + output
+        if impact_text:
+            output = impact_text + "\n\n" + output
 
-            results["output"] = output
-            results["success"] = result.returncode == 0
+        results["output"] = output
+        results["success"] = result.returncode == 0
 
-            # Generate summary
-            if results["success"]:
-                results["summary"] = f"✓ Tests passed ({cmd_desc})"
-            else:
-                results["summary"] = f"✗ Tests failed ({cmd_desc})"
-                results["error"] = output  # Include full output as error
-                # Try to extract failure count from pytest output
-                if "pytest" in cmd_desc:
-                    for line in output.splitlines():
-                        if "failed" in line.lower() and (
-                            "passed" in line.lower() or "error" in line.lower()
-                        ):
-                            results["summary"] += f"\n{line.strip()}"
-                            break
-
-        except subprocess.TimeoutExpired:
-            results["output"] = "Test run timed out after 5 minutes"
+        # Generate summary
+        if result.timed_out:
+            results["output"] = output + "\nTest run timed out after 5 minutes"
             results["summary"] = "✗ Tests timed out"
-            results["error"] = "Test run timed out after 5 minutes"
+            results["error"] = results["output"]
             results["success"] = False
-
-        except FileNotFoundError as e:
-            results["output"] = f"Command not found: {e}"
-            results["summary"] = f"✗ Could not run {cmd_desc}: command not found"
-
-        # Write all text files back to VFS and track which ones changed
-        modified_files = []
-        for rel_path in vfs.list_files():
-            file_path = tmpdir / rel_path
-            if file_path.exists() and not file_path.is_symlink():
-                new_content = file_path.read_text(encoding="utf-8")
-                # Check if content actually changed
-                try:
-                    old_content = vfs.read_file(rel_path)
-                    if new_content != old_content:
-                        vfs.write_file(rel_path, new_content)
-                        modified_files.append(rel_path)
-                except (FileNotFoundError, KeyError):
-                    # File is new
-                    vfs.write_file(rel_path, new_content)
-                    modified_files.append(rel_path)
-
-        # Declare side effects
-        side_effects = []
-
-        if modified_files:
-            results["modified_files"] = modified_files
-            side_effects.append(SideEffect.FILES_MODIFIED)
-
-        # Always provide display output for the UI (test results are useful to see)
-        results["display_output"] = results.get("output", results.get("summary", ""))
-        side_effects.append(SideEffect.HAS_DISPLAY_OUTPUT)
-
-        if side_effects:
-            results["side_effects"] = side_effects
-
-    finally:
-        # Clean up temp directory
-        import shutil
-
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        elif result.cancelled:
+            results["summary"] = "✗ Test run cancelled"
+            results["error"] = "Test run cancelled"
+            results["success"] = False
+        elif results["success"]:
+            results["summary"] = f"✓ Tests passed ({cmd_desc})"
+        else:
+            results["summary"] = f"✗ Tests failed ({cmd_desc})"
+            results["error"] = output  # Include full output as error
+            # Try to extract failure count from pytest output
+            if "pytest" in cmd_desc:
+                for line in output.splitlines():
+                    if "failed" in line.lower() and (
+                        "passed" in line.lower() or "error" in line.lower()
+                    ):
+                        results["summary"] += f"\n{line.strip()}"
+                        break
+
+    except FileNotFoundError as e:
+        results["output"] = f"Command not found: {e}"
+        results["summary"] = f"✗ Could not run {cmd_desc}: command not found"
+
+    # Take over files the run changed on disk (e.g. regenerated fixtures);
+    # only paths whose stat changed are read
+    modified_files = write_back(vfs).modified_files
+
+    # Declare side effects
+    side_effects = []
+
+    if modified_files:
+        results["modified_files"] = modified_files
+        side_effects.append(SideEffect.FILES_MODIFIED)
+
+    # Always provide display output for the UI (test results are useful to see)
+    results["display_output"] = results.get("output", results.get("summary", ""))
+    side_effects.append(SideEffect.HAS_DISPLAY_OUTPUT)
+
+    if side_effects:
+        results["side_effects"] = side_effects
 
     return results
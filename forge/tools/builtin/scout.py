@@ -20,6 +20,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM"""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "scout",
             "description": """Send many files to a smaller/cheaper model (Haiku) to answer a question or identify relevant files.
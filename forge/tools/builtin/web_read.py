@@ -9,11 +9,13 @@ This is a conditionally-enabled built-in tool. Enable it per-repo by adding
 """
 
 import re
-import urllib.request
 from typing import Any
 
+import requests
+
 from forge.config.settings import Settings
 from forge.llm.client import LLMClient
+from forge.llm.transport import TRANSPORT
 
 # Mark this tool as requiring explicit opt-in
 CONDITIONAL = True
@@ -23,6 +25,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM."""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "web_read",
             "description": (
@@ -96,33 +99,35 @@ def execute(vfs: Any, args: dict[str, Any]) -> dict[str, Any]:
 
 def _fetch_page(url: str) -> str | None:
     """Fetch a webpage and return its HTML."""
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-        },
-    )
-
     try:
-        with urllib.request.urlopen(req, timeout=20) as response:
+        response = TRANSPORT.get(
+            url,
+            headers={
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.5",
+            },
+            timeout=20,
+            stream=True,  # Don't download binary content just to discard it
+        )
+        with response:
+            if not response.ok:
+                return None
+
             # Check content type
             content_type = response.headers.get("Content-Type", "")
             if "text/html" not in content_type and "text/plain" not in content_type:
                 # For plain text or other readable formats, still try
                 if "application/json" in content_type:
-                    body: str = response.read().decode("utf-8", errors="replace")
-                    return body
+                    return response.content.decode("utf-8", errors="replace")
                 # Skip binary content
                 if any(
                     t in content_type for t in ["image/", "audio/", "video/", "application/octet"]
                 ):
                     return None
 
-            decoded: str = response.read().decode("utf-8", errors="replace")
-            return decoded
-    except Exception:
+            return response.content.decode("utf-8", errors="replace")
+    except requests.RequestException:
         return None
 
 
@@ -8,11 +8,11 @@ This is a conditionally-enabled built-in tool. Enable it per-repo by adding
 import html
 import re
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Any
 
+from forge.llm.transport import TRANSPORT
+
 # Mark this tool as requiring explicit opt-in
 CONDITIONAL = True
 
@@ -64,6 +64,7 @@ def get_schema() -> dict[str, Any]:
     """Return tool schema for LLM."""
     return {
         "type": "function",
+        "read_only": True,
         "function": {
             "name": "web_search",
             "description": (
@@ -122,36 +123,28 @@ def _search_ddg(query: str, max_results: int, _retries: int = 1) -> list[dict[st
     Retries once after a 10s wait if rate-limited.
     """
     url = "https://html.duckduckgo.com/html/"
-    data = urllib.parse.urlencode({"q": query}).encode("utf-8")
-
-    req = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
-            "Accept": "text/html,application/xhtml+xml",
-            "Accept-Language": "en-US,en;q=0.5",
-        },
-    )
-
-    rate_limited = False
 
     try:
-        with urllib.request.urlopen(req, timeout=15) as response:
-            status = response.status
-            body = response.read().decode("utf-8", errors="replace")
-            if status == 202:
-                rate_limited = True
-    except urllib.error.HTTPError as e:
-        if e.code in (202, 403, 429):
-            rate_limited = True
-        else:
-            print(f"web_search: HTTP {e.code} from DuckDuckGo for query: {query!r}")
-            return None
+        response = TRANSPORT.post(
+            url,
+            data={"q": query},
+            headers={
+                "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0",
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-US,en;q=0.5",
+            },
+            timeout=15,
+        )
     except Exception as e:
         print(f"web_search: {type(e).__name__}: {e} for query: {query!r}")
         return None
 
+    rate_limited = response.status_code in (202, 403, 429)
+    if not rate_limited and not response.ok:
+        print(f"web_search: HTTP {response.status_code} from DuckDuckGo for query: {query!r}")
+        return None
+    body = response.content.decode("utf-8", errors="replace")
+
     if rate_limited:
         if _retries > 0:
             print("web_search: rate-limited by DuckDuckGo, retrying in 10s...")
@@ -21,7 +21,9 @@ Each inline tool exports:
 - parse_inline_match(match) returning parsed arguments dict
 """
 
-import re  # noqa: TC003 - used at runtime in type annotations
+import bisect
+import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import Enum
 from typing import TYPE_CHECKING, Any
@@ -197,8 +199,34 @@ def _build_code_regions(content: str) -> list[tuple[int, int]]:
     """
     Find all code regions (fenced blocks and inline backtick spans) in content.
 
-    Returns sorted list of (start, end) tuples for regions where inline
-    commands should NOT be matched.
+    Returns sorted, non-overlapping (start, end) tuples for regions where
+    inline commands should NOT be matched. See `_scan_code_regions`.
+    """
+    return _scan_code_regions(content)[0]
+
+
+# A run of backticks, for finding the ones no inline span paired up
+_BACKTICK_RUN = re.compile(r"`+")
+
+
+def _scan_code_regions(
+    content: str,
+) -> tuple[list[tuple[int, int]], int, list[tuple[int, int]]]:
+    """
+    Find all code regions in content, and how far they are final.
+
+    Returns (regions, stable_end, backtick_spans). Regions are sorted and
+    non-overlapping (an inline span reaching into a fenced block is merged
+    with it). Appending text to `content` can't change the regions (or
+    what they cover) before `stable_end`: it is the earliest of the last
+    line if it's incomplete (it may still become a fence), an unterminated
+    fence, and a backtick run that no backtick span has paired up yet.
+
+    `backtick_spans` are every pairing of backtick runs, including those
+    dropped because they start inside a fenced block. Those still decide
+    how the runs after them pair up, so scanning again from a position
+    inside one of them (even one past the end of its fenced block) would
+    pair the runs differently.
 
     Fenced blocks follow CommonMark rules:
       - An open fence is a line of 0-3 leading spaces, then 3+ of `\\`` or `~`,
@@ -216,6 +244,7 @@ def _build_code_regions(content: str) -> list[tuple[int, int]]:
     inside a fenced code example doesn't get treated as inline code).
     """
     fenced_spans: list[tuple[int, int]] = []
+    stable_end = content.rfind("\n") + 1
 
     # Pass 1: line-oriented fence scanner.
     # Walk through lines tracking byte offsets so we can record (start, end).
@@ -291,6 +320,7 @@ def _build_code_regions(content: str) -> list[tuple[int, int]]:
         if close_idx is None:
             # Unterminated: protect from the open fence to end of content.
             fenced_spans.append((line_start, len(content)))
+            stable_end = min(stable_end, line_start)
             break
 
         # Region spans from start of open line to end of close line (incl. \n).
@@ -301,30 +331,42 @@ def _build_code_regions(content: str) -> list[tuple[int, int]]:
         line_idx = close_idx + 1
 
     # Pass 2: inline backtick spans, only outside fenced blocks.
-    def _in_fenced(p: int) -> bool:
-        return any(s <= p < e for s, e in fenced_spans)
-
     inline_spans: list[tuple[int, int]] = []
+    backtick_spans: list[tuple[int, int]] = []
     for m in _INLINE_CODE_PATTERN.finditer(content):
-        if _in_fenced(m.start()):
+        backtick_spans.append((m.start(), m.end()))
+        if _inside_code_region(m.start(), fenced_spans) is not None:
             continue
         inline_spans.append((m.start(), m.end()))
 
-    regions = fenced_spans + inline_spans
-    regions.sort()
-    return regions
+    # A backtick run no span pairs up may still pair with one that hasn't
+    # been written yet. Inside a fenced block too: that span would swallow
+    # the runs after the block.
+    for m in _BACKTICK_RUN.finditer(content, 0, stable_end):
+        if _inside_code_region(m.start(), backtick_spans) is None:
+            stable_end = m.start()
+            break
+
+    regions: list[tuple[int, int]] = []
+    for start, end in sorted(fenced_spans + inline_spans):
+        if regions and start < regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(end, regions[-1][1]))
+        else:
+            regions.append((start, end))
+    return regions, stable_end, backtick_spans
 
 
 def _inside_code_region(pos: int, regions: list[tuple[int, int]]) -> int | None:
     """
     Check if pos falls inside any code region.
 
-    Returns the end position of the containing region (so we can skip past it),
-    or None if pos is not inside any code region.
+    `regions` must be sorted and non-overlapping (as `_build_code_regions`
+    returns them). Returns the end position of the containing region (so we
+    can skip past it), or None if pos is not inside any code region.
     """
-    for start, end in regions:
-        if start <= pos < end:
-            return end
+    i = bisect.bisect_right(regions, (pos, float("inf")))
+    if i and pos < regions[i - 1][1]:
+        return regions[i - 1][1]
     return None
 
 
@@ -338,64 +380,205 @@ _PATTERN_METHODS: list[tuple[str, str]] = [
 ]
 
 
-def parse_inline_commands(content: str) -> list[InlineCommand]:
-    """
-    Parse all inline commands from assistant message content.
+@dataclass
+class _InlinePattern:
+    """One (tool, pattern-variant) pair the scanner looks for."""
 
-    Parses front-to-back, finding the earliest matching command at each step.
-    Skips commands that appear inside code blocks (fenced ``` or inline `).
+    tool_name: str
+    pattern: re.Pattern[str]
+    parse: Callable[[re.Match[str]], dict[str, Any]]
+    # Literal text every match starts with ("" if the pattern has none)
+    prefix: str
+
+
+_REGEX_SPECIAL = set(".^$*+?{}[]\\|()")
 
-    Returns list of InlineCommand objects in order of appearance.
-    """
-    inline_tools = discover_inline_tools()
-    code_regions = _build_code_regions(content)
-    commands: list[InlineCommand] = []
-    pos = 0
 
-    while pos < len(content):
-        # Find the earliest matching command from current position across
-        # every (tool, pattern-variant) the tool exposes.
-        earliest_match: re.Match[str] | None = None
-        earliest_tool: str | None = None
-        earliest_parser: Any = None
+def _literal_prefix(pattern: re.Pattern[str]) -> str:
+    """The literal text every match of `pattern` starts with, or ""."""
+    if pattern.flags & re.IGNORECASE:
+        return ""
+    source = pattern.pattern
+    i = 0
+    while i < len(source) and source[i] not in _REGEX_SPECIAL:
+        i += 1
+    # A quantifier makes the character before it optional or repeatable
+    if i < len(source) and source[i] in "*+?{":
+        i -= 1
+    return source[: max(i, 0)]
 
+
+class _PatternTable:
+    """Every inline pattern, plus one alternation over their literal prefixes."""
+
+    def __init__(self, inline_tools: dict[str, Any]) -> None:
+        self.inline_tools = inline_tools
+        self.entries: list[_InlinePattern] = []
         for tool_name, module in inline_tools.items():
             for pattern_attr, parser_attr in _PATTERN_METHODS:
-                if not hasattr(module, pattern_attr):
-                    continue
-                pattern = getattr(module, pattern_attr)()
-                match = pattern.search(content, pos)
-                if match is None:
-                    continue
-                if earliest_match is None or match.start() < earliest_match.start():
-                    earliest_match = match
-                    earliest_tool = tool_name
-                    earliest_parser = getattr(module, parser_attr)
+                if hasattr(module, pattern_attr):
+                    pattern = getattr(module, pattern_attr)()
+                    parse = getattr(module, parser_attr)
+                    self.entries.append(
+                        _InlinePattern(tool_name, pattern, parse, _literal_prefix(pattern))
+                    )
+        prefixes = sorted({e.prefix for e in self.entries if e.prefix}, key=len, reverse=True)
+        self.opener = re.compile("|".join(map(re.escape, prefixes))) if prefixes else None
+        # Patterns without a literal prefix still search on their own
+        self.unanchored = [e for e in self.entries if not e.prefix]
 
-        if earliest_match is None or earliest_tool is None or earliest_parser is None:
-            # No more commands found
-            break
 
-        # Skip commands that fall inside code blocks
-        skip_to = _inside_code_region(earliest_match.start(), code_regions)
-        if skip_to is not None:
-            pos = skip_to
-            continue
+_pattern_table: _PatternTable | None = None
+
+
+def _get_pattern_table(inline_tools: dict[str, Any]) -> _PatternTable:
+    global _pattern_table
+    if _pattern_table is None or _pattern_table.inline_tools is not inline_tools:
+        _pattern_table = _PatternTable(inline_tools)
+    return _pattern_table
+
+
+def _line_start(content: str, pos: int) -> int:
+    return content.rfind("\n", 0, pos) + 1
 
-        # Parse this command
-        args = earliest_parser(earliest_match)
-        cmd = InlineCommand(
-            tool_name=earliest_tool,
-            args=args,
-            start_pos=earliest_match.start(),
-            end_pos=earliest_match.end(),
+
+class InlineScanner:
+    """
+    Finds inline commands in assistant text, resumably.
+
+    Commands are found front to back: one alternation over every tool's tag
+    opener finds the next candidate position, code regions are looked up by
+    bisection, and the patterns whose opener matched are tried anchored at
+    that position. The earliest match wins; on a tie, the first tool (and
+    pattern variant) in discovery order.
+
+    `feed()` takes the full text so far. When it extends the text of the
+    previous call (as while streaming), scanning resumes from a checkpoint:
+    a line start before which neither the commands nor the code regions can
+    change as text is appended. The checkpoint stays behind an unterminated
+    fence, an unpaired backtick run, an opener that didn't match (it may be
+    a command still being written) and the incomplete last line, and never
+    lands inside a command, a code region or a pair of backtick runs, so a
+    scan resumed there pairs fences and backticks as a fresh one would.
+    """
+
+    def __init__(self, inline_tools: dict[str, Any] | None = None) -> None:
+        self._table = _get_pattern_table(
+            inline_tools if inline_tools is not None else discover_inline_tools()
         )
-        commands.append(cmd)
+        self._content = ""
+        self._checkpoint = 0
+        self._final_commands: list[InlineCommand] = []
+        self._final_regions: list[tuple[int, int]] = []
+        self.commands: list[InlineCommand] = []
+        self.code_regions: list[tuple[int, int]] = []
+
+    @property
+    def inline_tools(self) -> dict[str, Any]:
+        return self._table.inline_tools
+
+    @property
+    def stable_commands(self) -> list[InlineCommand]:
+        """Commands before the checkpoint: appending text can't change these."""
+        return self._final_commands
+
+    def feed(self, content: str) -> list[InlineCommand]:
+        """Scan `content` and return all commands in it, in order."""
+        if not content.startswith(self._content):
+            self._checkpoint = 0
+            self._final_commands = []
+            self._final_regions = []
+        base = self._checkpoint
+
+        tail_regions, stable_end, backtick_spans = _scan_code_regions(content[base:])
+        tail_regions = [(start + base, end + base) for start, end in tail_regions]
+        backtick_spans = [(start + base, end + base) for start, end in backtick_spans]
+        self.code_regions = self._final_regions + tail_regions
+        tail_commands, unmatched = self._scan(content, base)
+        self.commands = self._final_commands + tail_commands
+        self._content = content
+
+        # Move the checkpoint up to the first thing appended text could change
+        checkpoint = _line_start(content, min(base + stable_end, unmatched))
+        spans = [(c.start_pos, c.end_pos) for c in tail_commands] + tail_regions + backtick_spans
+        moved = True
+        while moved:
+            moved = False
+            for start, end in spans:
+                if start < checkpoint < end:
+                    checkpoint = _line_start(content, start)
+                    moved = True
+        self._checkpoint = checkpoint
+        self._final_commands += [c for c in tail_commands if c.end_pos <= checkpoint]
+        self._final_regions += [r for r in tail_regions if r[1] <= checkpoint]
+        return self.commands
+
+    def _scan(self, content: str, pos: int) -> tuple[list[InlineCommand], int]:
+        """Commands from `pos` on, and the first opener that matched nothing."""
+        table = self._table
+        commands: list[InlineCommand] = []
+        unmatched = len(content)
+
+        while pos < len(content):
+            opener = table.opener.search(content, pos) if table.opener else None
+            candidate = opener.start() if opener else None
+            unanchored: dict[int, re.Match[str]] = {}
+            for entry in table.unanchored:
+                match = entry.pattern.search(content, pos)
+                if match is not None:
+                    unanchored[id(entry)] = match
+                    if candidate is None or match.start() < candidate:
+                        candidate = match.start()
+            if candidate is None:
+                break
 
-        # Continue searching AFTER this command
-        pos = earliest_match.end()
+            # Skip candidates that fall inside code blocks
+            skip_to = _inside_code_region(candidate, self.code_regions)
+            if skip_to is not None:
+                pos = skip_to
+                continue
 
-    return commands
+            found: tuple[_InlinePattern, re.Match[str]] | None = None
+            for entry in table.entries:
+                if entry.prefix:
+                    if not content.startswith(entry.prefix, candidate):
+                        continue
+                    match = entry.pattern.match(content, candidate)
+                else:
+                    match = unanchored.get(id(entry))
+                if match is not None and match.start() == candidate:
+                    found = (entry, match)
+                    break
+            if found is None:
+                unmatched = min(unmatched, candidate)
+                pos = candidate + 1
+                continue
+
+            entry, match = found
+            commands.append(
+                InlineCommand(
+                    tool_name=entry.tool_name,
+                    args=entry.parse(match),
+                    start_pos=match.start(),
+                    end_pos=match.end(),
+                )
+            )
+            # Continue searching AFTER this command
+            pos = match.end()
+
+        return commands, unmatched
+
+
+def parse_inline_commands(content: str) -> list[InlineCommand]:
+    """
+    Parse all inline commands from assistant message content.
+
+    Parses front-to-back, finding the earliest matching command at each step.
+    Skips commands that appear inside code blocks (fenced ``` or inline `).
+
+    Returns list of InlineCommand objects in order of appearance.
+    """
+    return InlineScanner().feed(content)
 
 
 def detect_unparsed_inline_blocks(
@@ -16,6 +16,7 @@ from forge.git_backend.commit_types import CommitType
 
 if TYPE_CHECKING:
     from forge.git_backend.repository import ForgeRepository
+    from forge.vfs.work_in_progress import WorkInProgressVFS
 
 
 def _discover_builtin_tools() -> set[str]:
@@ -159,26 +160,29 @@ class ToolManager:
         """Get SHA256 hash of content string"""
         return hashlib.sha256(content.encode()).hexdigest()
 
-    def _get_tool_content(self, tool_name: str) -> str | None:
+    def _get_tool_content(
+        self, tool_name: str, vfs: "WorkInProgressVFS | None" = None
+    ) -> str | None:
         """Get tool content from VFS or filesystem"""
+        vfs = vfs or self.vfs
         # Normalize path (remove ./ prefix if present)
         tools_dir_str = str(self.tools_dir).lstrip("./")
         vfs_path = f"{tools_dir_str}/{tool_name}.py"
 
         # Check VFS first (includes pending changes)
-        if self.vfs.file_exists(vfs_path):
-            return self.vfs.read_file(vfs_path)
+        if vfs.file_exists(vfs_path):
+            return vfs.read_file(vfs_path)
 
         # No filesystem fallback - VFS is the single source of truth
         return None
 
-    def is_tool_approved(self, tool_name: str) -> bool:
+    def is_tool_approved(self, tool_name: str, vfs: "WorkInProgressVFS | None" = None) -> bool:
         """Check if a tool is approved and hasn't been modified"""
         # Built-in tools are always approved
         if tool_name in self.BUILTIN_TOOLS:
             return True
 
-        content = self._get_tool_content(tool_name)
+        content = self._get_tool_content(tool_name, vfs)
         if content is None:
             return False
 
@@ -367,8 +371,23 @@ class ToolManager:
         if not self.require_done_tag:
             tools = [t for t in tools if t.get("function", {}).get("name") != "done"]
         if not self.inline_enabled:
-            return [self._strip_inline_markers(t) for t in tools]
-        return [t for t in tools if t.get("invocation", "api") != "inline"]
+            tools = [self._strip_inline_markers(t) for t in tools]
+        else:
+            tools = [t for t in tools if t.get("invocation", "api") != "inline"]
+        # "read_only" is for the tool executor, not the model
+        return [{k: v for k, v in t.items() if k != "read_only"} for t in tools]
+
+    def is_read_only(self, tool_name: str) -> bool:
+        """Whether a loaded tool declares itself read-only in its schema.
+
+        A read-only tool (top-level `"read_only": True`) only reads the VFS
+        and has no other effect on the session, so several calls to it may
+        run concurrently against a VFS snapshot (see execute_tool_calls).
+        """
+        schema = self._schema_cache.get(tool_name)
+        return (
+            schema is not None and bool(schema.get("read_only")) and tool_name in self._tool_modules
+        )
 
     def _apply_arg_prefixing(self, tools: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Prefix tool arguments with 1_, 2_, etc. to force alphanumeric order.
@@ -499,16 +518,25 @@ class ToolManager:
         return None
 
     def execute_tool(
-        self, tool_name: str, args: dict[str, Any], session_manager: Any = None
+        self,
+        tool_name: str,
+        args: dict[str, Any],
+        session_manager: Any = None,
+        vfs: "WorkInProgressVFS | None" = None,
     ) -> dict[str, Any]:
-        """Execute a tool with VFS or ToolContext based on API version."""
+        """Execute a tool with VFS or ToolContext based on API version.
+
+        `vfs` overrides the tool manager's VFS for this call (read-only tools
+        running concurrently get a snapshot).
+        """
         if self.prefix_tool_args:
             args = self._strip_arg_prefixes(args)
+        vfs = vfs or self.vfs
 
         from forge.tools.context import ToolContext, get_tool_api_version
 
         # Check if tool is approved
-        if not self.is_tool_approved(tool_name):
+        if not self.is_tool_approved(tool_name, vfs):
             return {"error": f"Tool {tool_name} is not approved. Cannot execute."}
 
         if tool_name not in self._tool_modules:
@@ -546,7 +574,7 @@ class ToolManager:
                 from forge.session.registry import SESSION_REGISTRY
 
                 ctx = ToolContext(
-                    vfs=self.vfs,
+                    vfs=vfs,
                     repo=self._repo,
                     branch_name=self.branch_name,
                     session_manager=session_manager,
@@ -555,7 +583,7 @@ class ToolManager:
                 result: dict[str, Any] = tool_module.execute(ctx, args)
             else:
                 # v1: Pass VFS only (backwards compatible)
-                result = tool_module.execute(self.vfs, args)
+                result = tool_module.execute(vfs, args)
         except Exception as e:
             import traceback
 
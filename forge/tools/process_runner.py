@@ -0,0 +1,461 @@
+"""
+Streaming, cancellable subprocess execution for tools.
+
+Tools that run commands (run_tests, the repository's check tool, user tools)
+used to call ``subprocess.run(capture_output=True)``: nothing reached the UI
+until the process exited, the whole output was held in memory, and cancelling
+the turn left the process running. ``run_command`` instead:
+
+- streams stdout and stderr line by line as ToolOutput events to the session
+  (and to an optional ``on_line`` callback that sees every line and may
+  leave it out of the output)
+- keeps only the first and last lines of each stream, plus the lines around
+  failures (tracebacks, "FAILED", "error:", ...) from the part in between
+- runs the command in its own process group and kills the whole group when
+  the session is cancelled or the timeout expires, and shortly after the
+  command exits if something it started keeps the output pipes open
+- caps the CPU time of the command's processes, and optionally their memory
+  (address space), with rlimits
+
+``monitor_process`` does the same for a process started some other way (the
+warm pytest worker's forked children).
+
+The event emitter and cancel token come from the ``tool_scope`` the session's
+worker opens around tool execution, so tools don't pass them around. Threads
+a tool starts itself don't inherit the scope; run work on them through
+``contextvars.copy_context().run`` (see ``run_commands``).
+"""
+
+import contextlib
+import contextvars
+import json
+import os
+import re
+import resource
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
+
+from forge.runtime.events import ToolOutput
+
+if TYPE_CHECKING:
+    from forge.vfs.work_in_progress import WorkInProgressVFS
+
+# Per stream: lines kept from the start and from the end of the output
+HEAD_LINES = 200
+TAIL_LINES = 400
+# Lines kept from the middle around failures, and context on either side
+EXCERPT_LINES = 300
+_EXCERPT_BEFORE = 3
+_EXCERPT_AFTER = 8
+# Longer lines are cut (in the kept output; on_line sees them whole)
+MAX_LINE_CHARS = 4000
+# Bytes read at most per line; a longer line arrives in several pieces
+_MAX_READ = 1 << 16
+
+# Default CPU rlimit for commands; .forge/config.json can change or disable
+# it. There is no default memory limit: an address-space cap breaks runtimes
+# that reserve large virtual ranges up front (the JVM, Go, sanitizers), so
+# it is opt-in through "command_memory_mb".
+DEFAULT_CPU_LIMIT_S = 900
+
+# How often the cancel token is polled and buffered lines are emitted
+_POLL_INTERVAL_S = 0.05
+# After SIGTERM, how long the process group gets before SIGKILL
+_KILL_GRACE_S = 2.0
+# After the command exits, how long what it left running may keep its output
+# pipes open before the rest of its process group is killed
+_DRAIN_GRACE_S = 2.0
+
+_FAILURE_LINE = re.compile(
+    r"Traceback \(most recent call last\)|\b(?:FAILED|FAILURES?|ERROR|FAIL|Error)\b|"
+    r"\w+Error\b|\berror(?:\[\w+\])?:|\bpanicked\b|^E\s{2,}"
+)
+
+
+@dataclass
+class ResourceLimits:
+    """rlimits applied to a command's processes. None means unlimited."""
+
+    memory_mb: int | None = None
+    cpu_seconds: int | None = DEFAULT_CPU_LIMIT_S
+
+
+def read_resource_limits(vfs: "WorkInProgressVFS") -> ResourceLimits:
+    """Limits from .forge/config.json ("command_memory_mb", "command_cpu_seconds").
+
+    A positive number sets a limit, null removes it; otherwise the default
+    applies.
+    """
+    limits = ResourceLimits()
+    try:
+        config = json.loads(vfs.read_file(".forge/config.json"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return limits
+    if not isinstance(config, dict):
+        return limits
+    for key, attr in (("command_memory_mb", "memory_mb"), ("command_cpu_seconds", "cpu_seconds")):
+        if key not in config:
+            continue
+        value = config[key]
+        if value is None:
+            setattr(limits, attr, None)
+        elif isinstance(value, int) and not isinstance(value, bool) and value > 0:
+            setattr(limits, attr, value)
+    return limits
+
+
+# --- Tool scope ---
+
+
+@dataclass
+class _ToolScope:
+    emit: Callable[[Any], None] | None
+    token: Any  # anything with a `stop_requested` flag, e.g. CancelToken
+
+
+_scope: contextvars.ContextVar[_ToolScope | None] = contextvars.ContextVar(
+    "forge_tool_scope", default=None
+)
+
+
+@contextlib.contextmanager
+def tool_scope(emit: Callable[[Any], None] | None, token: Any) -> Iterator[None]:
+    """Route command output to ``emit`` and cancel commands with ``token`` in this block."""
+    reset = _scope.set(_ToolScope(emit, token))
+    try:
+        yield
+    finally:
+        _scope.reset(reset)
+
+
+def stop_requested() -> bool:
+    """Whether the session running the current tool has been cancelled."""
+    scope = _scope.get()
+    return scope is not None and scope.token is not None and scope.token.stop_requested
+
+
+# --- Output ---
+
+
+class OutputBuffer:
+    """Bounded record of one output stream.
+
+    Keeps the first ``head`` and last ``tail`` lines. Lines that fall out of
+    the tail are dropped, except for failure lines and a little context
+    around them, up to ``excerpt`` lines.
+    """
+
+    def __init__(
+        self, head: int = HEAD_LINES, tail: int = TAIL_LINES, excerpt: int = EXCERPT_LINES
+    ) -> None:
+        self._head_max = head
+        self._excerpt_max = excerpt
+        self.head: list[str] = []
+        self.tail: deque[tuple[int, str]] = deque(maxlen=tail)
+        self.excerpt: list[tuple[int, str]] = []
+        self.total = 0
+        self._before: deque[tuple[int, str]] = deque(maxlen=_EXCERPT_BEFORE)
+        self._after = 0
+
+    def add(self, line: str) -> None:
+        if len(line) > MAX_LINE_CHARS:
+            line = line[:MAX_LINE_CHARS] + f" [... {len(line) - MAX_LINE_CHARS} chars cut]"
+        number = self.total
+        self.total += 1
+        if len(self.head) < self._head_max:
+            self.head.append(line)
+            return
+        if self.tail.maxlen == 0:
+            self._drop(number, line)
+            return
+        if len(self.tail) == self.tail.maxlen:
+            self._drop(*self.tail[0])
+        self.tail.append((number, line))
+
+    def _drop(self, number: int, line: str) -> None:
+        """A line leaves the tail: keep it in the excerpt if it's near a failure."""
+        if _FAILURE_LINE.search(line):
+            self._keep(self._before)
+            self._before.clear()
+            self._keep([(number, line)])
+            self._after = _EXCERPT_AFTER
+        elif self._after:
+            self._keep([(number, line)])
+            self._after -= 1
+        else:
+            self._before.append((number, line))
+
+    def _keep(self, lines: Any) -> None:
+        room = self._excerpt_max - len(self.excerpt)
+        self.excerpt.extend(list(lines)[: max(0, room)])
+
+    @property
+    def omitted(self) -> int:
+        """Lines not in the output at all."""
+        return self.total - len(self.head) - len(self.tail) - len(self.excerpt)
+
+    def text(self) -> str:
+        """The kept output, with markers where lines were left out."""
+        lines = list(self.head)
+        middle = self.total - len(self.head) - len(self.tail)
+        if middle > 0:
+            if self.excerpt:
+                lines.append(
+                    f"[... {middle} lines omitted; failure-related lines among them follow ...]"
+                )
+                previous = None
+                for number, line in self.excerpt:
+                    if previous is not None and number != previous + 1:
+                        lines.append("[...]")
+                    lines.append(line)
+                    previous = number
+                lines.append("[... end of excerpt ...]")
+            else:
+                lines.append(f"[... {middle} lines omitted ...]")
+        lines.extend(line for _number, line in self.tail)
+        return "".join(line + "\n" for line in lines)
+
+
+@dataclass
+class CommandResult:
+    """Outcome of ``run_command``, shaped like subprocess.CompletedProcess.
+
+    ``stdout`` and ``stderr`` are the bounded renderings of each stream (see
+    OutputBuffer). A killed command has a negative ``returncode`` (the
+    signal) and ``timed_out`` or ``cancelled`` set.
+    """
+
+    args: list[str] | str
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    cancelled: bool = False
+    omitted_lines: int = 0
+
+
+# --- Running ---
+
+
+def _apply_limits(pid: int, limits: ResourceLimits) -> None:
+    """Set the rlimits of a process that has just been started.
+
+    Done from here with prlimit rather than in a preexec_fn: code run
+    between fork and exec can deadlock when the parent has other threads
+    (and Forge always has), and it rules out subprocess's faster spawn
+    paths. The limits reach whatever the process starts from then on; the
+    instant between exec and this call is not covered. Only Linux has
+    prlimit; elsewhere commands run without rlimits.
+    """
+    if sys.platform != "linux":
+        return
+    with contextlib.suppress(ProcessLookupError):  # Already gone
+        if limits.memory_mb is not None:
+            memory = limits.memory_mb * 1024 * 1024
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory, memory))
+        if limits.cpu_seconds is not None:
+            # Soft limit sends SIGXCPU, the hard one a second later SIGKILL
+            cpu = limits.cpu_seconds
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+
+def _kill_group(proc: Any) -> None:
+    """Terminate the command's process group, then kill whatever is left of it."""
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(proc.pid, signal.SIGTERM)
+    with contextlib.suppress(subprocess.TimeoutExpired):
+        proc.wait(timeout=_KILL_GRACE_S)
+    # Also reaches children of a leader that has already exited
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(proc.pid, signal.SIGKILL)
+    proc.wait()
+
+
+def run_command(
+    args: list[str] | str,
+    cwd: Path | str | None = None,
+    *,
+    shell: bool = False,
+    env: dict[str, str] | None = None,
+    timeout: float | None = None,
+    limits: ResourceLimits | None = None,
+    on_line: Callable[[str, str], bool | None] | None = None,
+    label: str = "",
+) -> CommandResult:
+    """Run a command, streaming its output and honouring session cancellation.
+
+    ``on_line(stream, line)`` is called with every line ("stdout" or
+    "stderr") from a reader thread; if it returns False the line is neither
+    kept nor streamed (for lines the caller consumes itself). The rest are
+    emitted as ToolOutput events through the current ``tool_scope``,
+    prefixed with ``label`` when several commands run side by side. Raises
+    FileNotFoundError if the program doesn't exist, like subprocess.run.
+    """
+    limits = limits if limits is not None else ResourceLimits()
+    proc = subprocess.Popen(
+        args,
+        cwd=cwd,
+        shell=shell,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True,
+    )
+    try:
+        _apply_limits(proc.pid, limits)
+    except BaseException:
+        _kill_group(proc)
+        raise
+    return monitor_process(proc, args, timeout=timeout, on_line=on_line, label=label)
+
+
+def monitor_process(
+    proc: Any,
+    args: list[str] | str,
+    *,
+    timeout: float | None = None,
+    on_line: Callable[[str, str], bool | None] | None = None,
+    label: str = "",
+) -> CommandResult:
+    """Stream, bound and supervise an already started process, as ``run_command`` does.
+
+    ``proc`` is a subprocess.Popen or anything shaped like one: ``stdout`` and
+    ``stderr`` pipes to read, a ``pid`` that is also its process group, a
+    ``returncode``, and ``wait(timeout)`` raising subprocess.TimeoutExpired.
+    """
+    scope = _scope.get()
+    assert proc.stdout is not None and proc.stderr is not None
+
+    buffers = {"stdout": OutputBuffer(), "stderr": OutputBuffer()}
+    pending: list[tuple[str, str]] = []
+    pending_lock = threading.Lock()
+
+    def read(stream: str, pipe: IO[bytes]) -> None:
+        buffer = buffers[stream]
+        with pipe:
+            for raw in iter(lambda: pipe.readline(_MAX_READ), b""):
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if on_line is not None and on_line(stream, line) is False:
+                    continue
+                buffer.add(line)
+                with pending_lock:
+                    pending.append((stream, line))
+
+    readers = [
+        threading.Thread(target=read, args=("stdout", proc.stdout), daemon=True),
+        threading.Thread(target=read, args=("stderr", proc.stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    def flush() -> None:
+        with pending_lock:
+            batch = pending[:]
+            pending.clear()
+        if not batch or scope is None or scope.emit is None:
+            return
+        prefix = f"[{label}] " if label else ""
+        for stream in ("stdout", "stderr"):
+            lines = [prefix + line for s, line in batch if s == stream]
+            if lines:
+                scope.emit(ToolOutput(stream, lines))
+
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    timed_out = cancelled = False
+
+    def must_stop() -> bool:
+        nonlocal timed_out, cancelled
+        if scope is not None and scope.token is not None and scope.token.stop_requested:
+            cancelled = True
+        elif deadline is not None and time.monotonic() >= deadline:
+            timed_out = True
+        return cancelled or timed_out
+
+    while True:
+        try:
+            proc.wait(timeout=_POLL_INTERVAL_S)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        flush()
+        if must_stop():
+            _kill_group(proc)
+            break
+
+    if not (cancelled or timed_out):
+        # Whatever the command left running in the background (a daemon, a
+        # "cmd &") may hold the pipes open: the deadline and cancellation
+        # still apply, and after a short grace the rest of the group is killed
+        drain_until = time.monotonic() + _DRAIN_GRACE_S
+        for reader in readers:
+            while reader.is_alive():
+                reader.join(timeout=_POLL_INTERVAL_S)
+                flush()
+                if must_stop() or time.monotonic() >= drain_until:
+                    with contextlib.suppress(ProcessLookupError, PermissionError):
+                        os.killpg(proc.pid, signal.SIGKILL)
+                    break
+
+    # Stray descendants outside the group may still hold the pipes open;
+    # don't wait on them for long
+    for reader in readers:
+        reader.join(timeout=_KILL_GRACE_S)
+    flush()
+
+    return CommandResult(
+        args=args,
+        returncode=proc.returncode,
+        stdout=buffers["stdout"].text(),
+        stderr=buffers["stderr"].text(),
+        timed_out=timed_out,
+        cancelled=cancelled,
+        omitted_lines=buffers["stdout"].omitted + buffers["stderr"].omitted,
+    )
+
+
+def run_commands(
+    commands: list[list[str]],
+    cwd: Path | str | None = None,
+    *,
+    env: dict[str, str] | None = None,
+    timeout: float | None = None,
+    limits: ResourceLimits | None = None,
+    line_handlers: list[Any] | None = None,
+    labels: list[str] | None = None,
+) -> list[CommandResult]:
+    """Run several commands side by side, each like ``run_command``.
+
+    ``line_handlers`` gives each command its ``on_line``. Streamed lines are
+    labelled (by default "i/n") so the commands can be told apart.
+    """
+    count = len(commands)
+    if labels is None:
+        labels = [f"{i + 1}/{count}" for i in range(count)]
+    handlers = line_handlers if line_handlers is not None else [None] * count
+    with ThreadPoolExecutor(max_workers=max(1, count)) as pool:
+        futures = [
+            # Each worker needs its own copy of the context to see the tool scope
+            pool.submit(
+                contextvars.copy_context().run,
+                run_command,
+                cmd,
+                cwd,
+                env=env,
+                timeout=timeout,
+                limits=limits,
+                on_line=on_line,
+                label=label,
+            )
+            for cmd, label, on_line in zip(commands, labels, handlers, strict=True)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,234 @@
+"""
+Fork server behind the warm pytest worker (see forge.tools.pytest_worker).
+
+Run as a script, not imported: ``python pytest_server.py SOCKET_FD MODULE...``.
+It imports pytest and the given modules once, then forks a child per test
+run, so each run starts with those modules already loaded while everything
+else (the project's own code, conftest files, pytest plugins) is imported
+fresh by the child.
+
+Only the standard library is used here, and nothing runs at import time: the
+script is the ``__main__`` module of every child, and multiprocessing's
+"spawn" re-imports it.
+
+Protocol, one JSON object per packet on a SOCK_SEQPACKET socket:
+
+- server -> Forge, once: ``{"ready": true, "preloaded": [...], "failed":
+  {module: error}, "paths": [...]}`` or ``{"ready": false, "error": ...}``.
+  ``paths`` are the directories the preloaded modules were found in.
+- Forge -> server: ``{"run": [pytest args], "cwd": ..., "limits": [address
+  space bytes or null, CPU seconds or null]}`` with the write ends of the
+  run's stdout and stderr pipes attached (SCM_RIGHTS).
+- server -> Forge: ``{"started": pid}``, then ``{"exit": returncode}`` when
+  the child is gone (negative for a signal, like subprocess). Or ``{"error":
+  ...}`` if the run couldn't be started.
+
+The child is the leader of a new process group, so Forge stops a run by
+signalling that group. The server exits when Forge closes the socket (or
+dies), and after half an hour without runs.
+"""
+
+import atexit
+import contextlib
+import importlib
+import json
+import os
+import resource
+import select
+import signal
+import socket
+import sys
+import threading
+import traceback
+from importlib.metadata import entry_points
+from typing import Any
+
+# Idle time after which the server exits; Forge starts a new one when needed
+_IDLE_TIMEOUT_S = 1800
+
+_MAX_PACKET = 1 << 20
+
+
+def _send(sock: socket.socket, message: dict[str, Any]) -> None:
+    sock.send(json.dumps(message).encode("utf-8"))
+
+
+def _plugin_packages() -> set[str]:
+    """Top-level packages of installed pytest plugins.
+
+    pytest rewrites asserts in plugin modules as it imports them; one that
+    is already imported can't be rewritten, so plugins are never preloaded.
+    """
+    packages = {"pytest", "_pytest"}
+    for entry in entry_points(group="pytest11"):
+        packages.add(entry.value.partition(":")[0].partition(".")[0])
+    return packages
+
+
+def _preload(modules: list[str]) -> dict[str, Any]:
+    """Import pytest and ``modules``; the ready message."""
+    try:
+        pytest = importlib.import_module("pytest")
+    except Exception as e:
+        return {"ready": False, "error": f"pytest is not importable: {e}"}
+    skip = _plugin_packages()
+    preloaded: list[str] = []
+    failed: dict[str, str] = {}
+    for name in modules:
+        if name.partition(".")[0] in skip:
+            continue
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            failed[name] = f"{type(e).__name__}: {e}"
+        else:
+            preloaded.append(name)
+    if threading.active_count() > 1:
+        names = ", ".join(t.name for t in threading.enumerate() if t is not threading.main_thread())
+        return {"ready": False, "error": f"preloading started threads ({names}); forking is unsafe"}
+
+    paths: set[str] = set()
+    if pytest.__file__ is not None:
+        paths.add(os.path.dirname(os.path.dirname(os.path.abspath(pytest.__file__))))
+    for name in preloaded:
+        module = sys.modules[name.partition(".")[0]]
+        location = getattr(module, "__file__", None)
+        if isinstance(location, str):
+            # The directory the package (or module) was found in, e.g. site-packages
+            path = os.path.dirname(os.path.abspath(location))
+            if os.path.basename(location).startswith("__init__."):
+                path = os.path.dirname(path)
+            paths.add(path)
+    return {"ready": True, "preloaded": preloaded, "failed": failed, "paths": sorted(paths)}
+
+
+def _run_child(request: dict[str, Any], fds: list[int], closing: list[int]) -> None:
+    """Body of a forked child: become the test run. Never returns."""
+    code = 1
+    try:
+        os.setsid()
+        signal.set_wakeup_fd(-1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        for fd in closing:
+            os.close(fd)
+
+        memory, cpu = request.get("limits") or (None, None)
+        if memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        if cpu is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.dup2(fds[0], 1)
+        os.dup2(fds[1], 2)
+        for fd in (devnull, *fds):
+            os.close(fd)
+
+        # What "python -m pytest" would see
+        cwd = request["cwd"]
+        os.chdir(cwd)
+        sys.path.insert(0, cwd)
+        sys.argv = ["pytest", *request["run"]]
+
+        import pytest
+
+        try:
+            code = pytest.console_main()
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        atexit._run_exitfuncs()
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def _reap(sock: socket.socket, children: set[int]) -> None:
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            children.clear()
+            return
+        if pid == 0:
+            return
+        children.discard(pid)
+        _send(sock, {"exit": os.waitstatus_to_exitcode(status)})
+
+
+def serve(sock: socket.socket, modules: list[str]) -> None:
+    """Preload, report, then fork a child per run request until Forge goes away."""
+    ready = _preload(modules)
+    _send(sock, ready)
+    if not ready["ready"]:
+        return
+
+    # SIGCHLD wakes the select below through the wakeup pipe
+    wake_r, wake_w = os.pipe()
+    os.set_blocking(wake_r, False)
+    os.set_blocking(wake_w, False)
+    signal.set_wakeup_fd(wake_w)
+    signal.signal(signal.SIGCHLD, lambda _signum, _frame: None)
+
+    children: set[int] = set()
+    watched = [sock.fileno(), wake_r]
+    while True:
+        _reap(sock, children)
+        readable, _, _ = select.select(watched, [], [], None if children else _IDLE_TIMEOUT_S)
+        if not readable:
+            return
+        if wake_r in readable:
+            while True:
+                try:
+                    if not os.read(wake_r, 512):
+                        break
+                except BlockingIOError:
+                    break
+        if sock.fileno() not in readable:
+            continue
+
+        try:
+            data, fds, _flags, _addr = socket.recv_fds(sock, _MAX_PACKET, 2)
+        except OSError:
+            data, fds = b"", []
+        if not data:
+            # Forge is gone: take the running tests with it
+            for pid in children:
+                with contextlib.suppress(OSError):
+                    os.killpg(pid, signal.SIGKILL)
+            return
+        try:
+            request = json.loads(data)
+            if len(fds) != 2 or not isinstance(request.get("run"), list):
+                raise ValueError("malformed run request")
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+        except (OSError, ValueError) as e:
+            for fd in fds:
+                os.close(fd)
+            _send(sock, {"error": f"{type(e).__name__}: {e}"})
+            continue
+        if pid == 0:
+            _run_child(request, fds, [sock.fileno(), wake_r, wake_w])
+        for fd in fds:
+            os.close(fd)
+        children.add(pid)
+        _send(sock, {"started": pid})
+
+
+def main() -> None:
+    # The script's own directory (forge/tools) must not shadow project modules
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        del sys.path[0]
+    sock = socket.socket(fileno=int(sys.argv[1]))
+    serve(sock, sys.argv[2:])
+
+
+if __name__ == "__main__":
+    main()
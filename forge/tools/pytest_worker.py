@@ -0,0 +1,321 @@
+"""
+Warm pytest worker for run_tests.
+
+In import-heavy projects (PySide6, numpy and the like) much of a short test
+run is interpreter startup and importing dependencies. With
+``"test_worker": true`` in .forge/config.json, run_tests keeps a fork server
+(forge/tools/pytest_server.py) per materialized directory, that is per branch
+and so per session. The server imports pytest and the project's third-party
+dependencies once; every run forks a child from it. The child sees the
+freshly synced materialized tree and imports the project's own modules,
+conftest files and pytest plugins anew, so the results match a cold
+``python -m pytest`` while the heavy site-packages imports are already done.
+
+What gets preloaded are the absolute imports in the repository that no file
+in it provides (see forge.vfs.import_graph.external_modules), minus the
+standard library. The server is restarted when that set grows, or when a
+directory a preloaded module came from changes (a package was installed or
+upgraded).
+
+The warm path falls back to a normal cold run whenever it can't be trusted:
+
+- the server fails to start, can't preload without starting threads (forking
+  a threaded process is unsafe), or dies: this run is cold; a server that
+  fails to start is not tried again for this directory
+- a child dies of SIGSEGV, SIGBUS, SIGABRT or SIGILL (libraries that don't
+  survive fork fail like this): the run is repeated cold, and the worker is
+  disabled for this directory
+- the worker is busy with another run: this one is cold
+
+Output streaming, output bounds, timeouts, cancellation and resource limits
+work as for any command (forge.tools.process_runner): the child is the
+leader of its own process group and is supervised by ``monitor_process``.
+"""
+
+import atexit
+import contextlib
+import json
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+from forge.tools.process_runner import (
+    CommandResult,
+    ResourceLimits,
+    monitor_process,
+    run_command,
+)
+from forge.vfs.import_graph import external_modules
+
+if TYPE_CHECKING:
+    from forge.vfs.work_in_progress import WorkInProgressVFS
+
+_SERVER_SCRIPT = Path(__file__).with_name("pytest_server.py")
+
+# How long the server may take to import everything before it's given up on
+_START_TIMEOUT_S = 120
+
+_MAX_PACKET = 1 << 20
+
+# How a child that didn't survive being forked usually dies
+_CRASH_SIGNALS = frozenset({signal.SIGSEGV, signal.SIGBUS, signal.SIGABRT, signal.SIGILL})
+
+
+def worker_enabled(vfs: "WorkInProgressVFS") -> bool:
+    """Whether .forge/config.json opts into the warm pytest worker ("test_worker")."""
+    try:
+        config = json.loads(vfs.read_file(".forge/config.json"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return isinstance(config, dict) and config.get("test_worker") is True
+
+
+class WorkerUnavailableError(Exception):
+    """The warm path can't be used for this run; run cold instead."""
+
+
+class WorkerCrashedError(WorkerUnavailableError):
+    """A forked child died the way fork-unsafe libraries make it die."""
+
+
+class _WarmRun:
+    """A test run in a forked child, shaped like subprocess.Popen for monitor_process."""
+
+    def __init__(
+        self, sock: socket.socket, pid: int, args: list[str], stdout: IO[bytes], stderr: IO[bytes]
+    ) -> None:
+        self._sock = sock
+        self.pid = pid
+        self.args = args
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode: int | None = None
+        self.server_lost = False
+
+    def wait(self, timeout: float | None = None) -> int:
+        if self.returncode is not None:
+            return self.returncode
+        readable, _, _ = select.select([self._sock], [], [], timeout)
+        if not readable:
+            raise subprocess.TimeoutExpired(self.args, timeout or 0)
+        try:
+            message = json.loads(self._sock.recv(_MAX_PACKET) or b"null")
+        except (OSError, ValueError):
+            message = None
+        if isinstance(message, dict) and isinstance(message.get("exit"), int):
+            self.returncode = message["exit"]
+        else:
+            # Without the server nobody reaps the child or reports its status
+            self.server_lost = True
+            with contextlib.suppress(OSError):
+                os.killpg(self.pid, signal.SIGKILL)
+            self.returncode = -signal.SIGKILL
+        return self.returncode
+
+
+class PytestWorker:
+    """The fork server for one materialized directory.
+
+    Thread safety: one run at a time; ``run`` raises WorkerUnavailableError when
+    another is in progress rather than waiting for it.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.disabled_reason: str | None = None
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._sock: socket.socket | None = None
+        self._modules: frozenset[str] = frozenset()
+        self._paths: dict[str, int] = {}
+        self.preloaded: list[str] = []
+        self._lock = threading.Lock()
+
+    def _stale(self, modules: frozenset[str]) -> bool:
+        if self._proc is None or self._proc.poll() is not None:
+            return True
+        if not modules <= self._modules:
+            return True
+        for path, mtime in self._paths.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _start(self, modules: frozenset[str]) -> None:
+        """Start a server preloading ``modules``; WorkerUnavailableError if it doesn't come up."""
+        self.stop()
+        ours, theirs = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._proc = subprocess.Popen(
+                [sys.executable, str(_SERVER_SCRIPT), str(theirs.fileno()), *sorted(modules)],
+                cwd=self.root,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=[theirs.fileno()],
+                start_new_session=True,
+            )
+        finally:
+            theirs.close()
+        self._sock = ours
+        self._modules = modules
+
+        readable, _, _ = select.select([ours], [], [], _START_TIMEOUT_S)
+        try:
+            ready = json.loads(ours.recv(_MAX_PACKET) or b"null") if readable else None
+        except (OSError, ValueError):
+            ready = None
+        if not isinstance(ready, dict) or not ready.get("ready"):
+            self.stop()
+            if ready is None:
+                reason = "the worker did not start" if readable else "the worker timed out starting"
+            else:
+                reason = str(ready.get("error", "the worker did not start"))
+            raise WorkerUnavailableError(reason)
+        self.preloaded = list(ready.get("preloaded", []))
+        self._paths = {}
+        for path in ready.get("paths", []):
+            with contextlib.suppress(OSError):
+                self._paths[path] = os.stat(path).st_mtime_ns
+
+    def run(
+        self,
+        args: list[str],
+        modules: list[str],
+        *,
+        timeout: float | None = None,
+        limits: ResourceLimits | None = None,
+    ) -> CommandResult:
+        """Run ``pytest args`` in a child of the (re)started server.
+
+        Raises WorkerUnavailableError when the run has to happen cold instead,
+        WorkerCrashedError (after which the worker stays disabled) when the child
+        crashed.
+        """
+        if self.disabled_reason is not None:
+            raise WorkerUnavailableError(self.disabled_reason)
+        if not self._lock.acquire(blocking=False):
+            raise WorkerUnavailableError("the worker is busy")
+        try:
+            wanted = frozenset(modules)
+            if self._stale(wanted):
+                try:
+                    self._start(wanted | self._modules)
+                except WorkerUnavailableError as e:
+                    self.disabled_reason = str(e)
+                    raise
+            return self._run(args, timeout, limits or ResourceLimits())
+        finally:
+            self._lock.release()
+
+    def _run(self, args: list[str], timeout: float | None, limits: ResourceLimits) -> CommandResult:
+        assert self._sock is not None
+        memory = limits.memory_mb * 1024 * 1024 if limits.memory_mb is not None else None
+        request = {"run": args, "cwd": str(self.root), "limits": [memory, limits.cpu_seconds]}
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            socket.send_fds(self._sock, [json.dumps(request).encode("utf-8")], [out_w, err_w])
+            readable, _, _ = select.select([self._sock], [], [], _START_TIMEOUT_S)
+            reply = json.loads(self._sock.recv(_MAX_PACKET) or b"null") if readable else None
+        except (OSError, ValueError):
+            reply = None
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+        if not isinstance(reply, dict) or not isinstance(reply.get("started"), int):
+            os.close(out_r)
+            os.close(err_r)
+            self.stop()
+            error = reply.get("error") if isinstance(reply, dict) else None
+            raise WorkerUnavailableError(str(error or "the worker stopped responding"))
+
+        cmd = ["pytest", *args]
+        process = _WarmRun(
+            self._sock, reply["started"], cmd, os.fdopen(out_r, "rb"), os.fdopen(err_r, "rb")
+        )
+        result = monitor_process(process, cmd, timeout=timeout)
+        if process.server_lost:
+            self.stop()
+            raise WorkerUnavailableError("the worker died during the run")
+        if not result.timed_out and not result.cancelled and -result.returncode in _CRASH_SIGNALS:
+            self.stop()
+            self.disabled_reason = f"a forked run died of {signal.Signals(-result.returncode).name}"
+            raise WorkerCrashedError(self.disabled_reason)
+        return result
+
+    def stop(self) -> None:
+        """Shut the server down (it exits when its socket closes)."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._proc is not None:
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+            self._proc = None
+        self._modules = frozenset()
+
+
+# Process-wide registry: one worker per materialized directory
+_workers: dict[Path, PytestWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_pytest_worker(root: Path) -> PytestWorker:
+    """Get (or create) the worker for a materialized directory."""
+    with _workers_lock:
+        worker = _workers.get(root)
+        if worker is None:
+            worker = PytestWorker(root)
+            _workers[root] = worker
+        return worker
+
+
+@atexit.register
+def _stop_workers() -> None:
+    with _workers_lock:
+        for worker in _workers.values():
+            worker.stop()
+        _workers.clear()
+
+
+def run_pytest(
+    vfs: "WorkInProgressVFS",
+    cmd: list[str],
+    cwd: Path,
+    *,
+    timeout: float | None = None,
+    limits: ResourceLimits | None = None,
+) -> tuple[CommandResult, str]:
+    """Run a ``python -m pytest ...`` command, warm if possible.
+
+    Returns the result and a note for the output ("" when the warm run went
+    through, or the worker is simply not set up for this command).
+    """
+    if cmd[:3] != [sys.executable, "-m", "pytest"] or not worker_enabled(vfs):
+        return run_command(cmd, cwd, timeout=timeout, limits=limits), ""
+
+    worker = get_pytest_worker(cwd)
+    start = time.monotonic()
+    try:
+        return worker.run(cmd[3:], external_modules(vfs), timeout=timeout, limits=limits), ""
+    except WorkerCrashedError as e:
+        note = f"Warm pytest worker disabled ({e}); reran cold"
+    except WorkerUnavailableError as e:
+        note = f"Warm pytest worker not used ({e}); ran cold"
+    if timeout is not None:
+        # A failed warm attempt counts against the run's time
+        timeout = max(1.0, timeout - (time.monotonic() - start))
+    return run_command(cmd, cwd, timeout=timeout, limits=limits), note
@@ -0,0 +1,418 @@
+"""
+Parallel test sharding for run_tests.
+
+A pytest suite used to run in one process, on one core. With sharding on
+(.forge/config.json "test_shards": a number, or "auto" for one per CPU), the
+test IDs are collected once, split into balanced shards, and each shard runs
+in its own ``python -m pytest`` process over the same materialized directory.
+No pytest plugin (such as pytest-xdist) is needed.
+
+Shards are balanced on test durations from earlier runs. Durations are read
+from pytest's ``--durations`` report as the output streams (the report itself
+is left out of the output) and cached per test file, keyed by the
+file's blob OID, so an edited test file starts over with no timings while
+every unchanged one keeps them. Tests without a timing count as the average.
+
+Whole test files are kept together where possible (module-scoped fixtures
+then run once); only a file that is too big for one shard is split.
+
+Projects run through ``make test`` can opt in by reading SHARD_INDEX and
+SHARD_COUNT in their test target; if the Makefile mentions both, shards run
+as ``make test SHARD_INDEX=i SHARD_COUNT=n``.
+
+Shard outputs are merged into one: each shard's output under a header,
+followed by one combined pytest-style summary line.
+"""
+
+import contextlib
+import heapq
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygit2
+
+from forge.git_backend.storage import forge_data_dir
+from forge.tools.process_runner import CommandResult, ResourceLimits, run_command, run_commands
+
+if TYPE_CHECKING:
+    from forge.vfs.work_in_progress import WorkInProgressVFS
+
+_DURATIONS_FILE = "test_durations.json"
+
+# Test files (blob OIDs) whose timings are kept
+_MAX_CACHED_FILES = 5000
+
+# Assumed duration of a test when nothing at all is known
+_DEFAULT_DURATION_S = 0.1
+
+# "0.52s call     tests/test_a.py::test_x[1]"
+_DURATION_LINE = re.compile(r"^\s*(\d+(?:\.\d+)?)s\s+(?:setup|call|teardown)\s+(\S.*?)\s*$")
+_DURATIONS_HEADER = re.compile(r"^=+ slowest .*durations =+$")
+_SECTION_RULE = re.compile(r"^=+ .* =+$")
+# "=== 2 failed, 10 passed, 1 skipped in 3.21s ==="
+_SUMMARY_LINE = re.compile(r"^=+ (.+) in (\d+(?:\.\d+)?)s(?: \([^)]*\))? =+$")
+_SUMMARY_COUNT = re.compile(r"(\d+) (\w+)")
+# pytest's order of outcomes in its summary line
+_OUTCOME_ORDER = ["failed", "passed", "skipped", "deselected", "xfailed", "xpassed"]
+
+
+def read_shard_count(vfs: "WorkInProgressVFS") -> int:
+    """Number of shards configured in .forge/config.json ("test_shards").
+
+    A positive number, or "auto" for one per CPU. 1 (the default) means no
+    sharding.
+    """
+    try:
+        config = json.loads(vfs.read_file(".forge/config.json"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return 1
+    value = config.get("test_shards", 1) if isinstance(config, dict) else 1
+    if value == "auto":
+        return os.cpu_count() or 1
+    if isinstance(value, int) and not isinstance(value, bool):
+        return max(1, value)
+    return 1
+
+
+def make_supports_shards(makefile: Path) -> bool:
+    """Whether a Makefile's tests read the SHARD_INDEX/SHARD_COUNT convention."""
+    try:
+        content = makefile.read_text(encoding="utf-8", errors="replace")
+    except OSError:
+        return False
+    return "SHARD_INDEX" in content and "SHARD_COUNT" in content
+
+
+# --- Durations ---
+
+
+class DurationStore:
+    """Persistent test-file blob OID -> {test name: seconds} store for one repository.
+
+    Test names are node IDs without the file part ("TestX::test_y[1]").
+    Thread safety: guarded by an internal lock; the file is replaced
+    atomically, so a concurrent writer at worst loses the other's update.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[str, dict[str, float]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict):
+            self._entries = {
+                oid: timings for oid, timings in data.items() if isinstance(timings, dict)
+            }
+
+    def get(self, oid: pygit2.Oid) -> dict[str, float]:
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return dict(self._entries.get(str(oid), {}))
+
+    def update(self, timings: dict[pygit2.Oid, dict[str, float]]) -> None:
+        """Record new timings and persist. Most recently updated files are kept."""
+        if not timings:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            for oid, tests in timings.items():
+                merged = self._entries.pop(str(oid), {})
+                merged.update(tests)
+                self._entries[str(oid)] = merged
+            while len(self._entries) > _MAX_CACHED_FILES:
+                del self._entries[next(iter(self._entries))]
+            # A read-only git dir etc. still keeps the in-memory entries
+            with contextlib.suppress(OSError):
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".durations-")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp, self.path)
+
+
+# Process-wide registry: one store per repository
+_stores: dict[str, DurationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_duration_store(repo: pygit2.Repository) -> DurationStore:
+    """Get (or create) the test duration store for a repository."""
+    with _stores_lock:
+        store = _stores.get(repo.path)
+        if store is None:
+            store = DurationStore(forge_data_dir(repo) / _DURATIONS_FILE)
+            _stores[repo.path] = store
+        return store
+
+
+def _file_oid(vfs: "WorkInProgressVFS", path: str) -> pygit2.Oid | None:
+    """Blob OID of a test file, as it is now (hashing pending content)."""
+    try:
+        oid = vfs.get_blob_oid(path)
+        if oid is None:
+            oid = pygit2.hash(vfs.read_file_bytes(path))
+    except FileNotFoundError:
+        return None
+    return oid
+
+
+class DurationReport:
+    """Picks the --durations report out of pytest output as it streams.
+
+    Use as run_command's ``on_line``: per-test durations (setup + call +
+    teardown) accumulate in ``durations``, and the report's lines are left
+    out of the command's output.
+    """
+
+    def __init__(self) -> None:
+        self.durations: dict[str, float] = {}
+        self._in_report = False
+
+    def __call__(self, stream: str, line: str) -> bool:
+        if stream != "stdout":
+            return True
+        if _DURATIONS_HEADER.match(line):
+            self._in_report = True
+            return False
+        if not self._in_report:
+            return True
+        if _SECTION_RULE.match(line):
+            self._in_report = False
+            return True
+        match = _DURATION_LINE.match(line)
+        if match:
+            node_id = match.group(2)
+            self.durations[node_id] = self.durations.get(node_id, 0.0) + float(match.group(1))
+        return False
+
+
+# --- Planning ---
+
+
+def plan_shards(node_ids: list[str], durations: dict[str, float], count: int) -> list[list[str]]:
+    """Split collected test IDs into at most ``count`` balanced shards.
+
+    Each shard is a list of pytest arguments: a whole file path where the
+    file fits in one shard, node IDs of a split file otherwise. Longest
+    units go first to the least-loaded shard (LPT scheduling).
+    """
+    known = [durations[n] for n in node_ids if n in durations]
+    default = sum(known) / len(known) if known else _DEFAULT_DURATION_S
+
+    files: dict[str, list[str]] = {}
+    for node_id in node_ids:
+        files.setdefault(node_id.split("::", 1)[0], []).append(node_id)
+
+    def cost(ids: list[str]) -> float:
+        return sum(durations.get(n, default) for n in ids)
+
+    total = cost(node_ids)
+    count = max(1, min(count, len(node_ids)))
+    target = total / count
+
+    units: list[tuple[float, list[str]]] = []
+    for path, ids in files.items():
+        file_cost = cost(ids)
+        if file_cost > target and len(ids) > 1:
+            units.extend((durations.get(n, default), [n]) for n in ids)
+        else:
+            units.append((file_cost, [path]))
+    units.sort(key=lambda unit: -unit[0])
+
+    loads = [(0.0, i) for i in range(count)]
+    shards: list[list[str]] = [[] for _ in range(count)]
+    for unit_cost, args in units:
+        load, i = heapq.heappop(loads)
+        shards[i].extend(args)
+        heapq.heappush(loads, (load + unit_cost, i))
+    return [shard for shard in shards if shard]
+
+
+# --- Running ---
+
+
+@dataclass
+class ShardResult:
+    """Outcome of one shard's process."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    cancelled: bool = False
+    durations: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class ShardedRun:
+    """Merged outcome of all shards, shaped like a single test run."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    shard_count: int
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+def collect_pytest_ids(
+    base_cmd: list[str],
+    selection: list[str],
+    cwd: Path,
+    timeout: float,
+    limits: ResourceLimits | None = None,
+) -> list[str] | None:
+    """Node IDs pytest would run, or None if collection failed."""
+    node_ids: list[str] = []
+
+    def take_id(stream: str, line: str) -> bool:
+        if stream == "stdout" and "::" in line and line[:1] != " ":
+            node_ids.append(line.strip())
+            return False  # Not worth streaming to the UI
+        return True
+
+    result = run_command(
+        [*base_cmd, *selection, "--collect-only", "-q", "-p", "no:cacheprovider"],
+        cwd,
+        timeout=timeout,
+        limits=limits,
+        on_line=take_id,
+    )
+    if result.returncode != 0:
+        return None
+    return node_ids
+
+
+def _shard_result(result: CommandResult, report: DurationReport | None = None) -> ShardResult:
+    return ShardResult(
+        result.returncode,
+        result.stdout,
+        result.stderr,
+        timed_out=result.timed_out,
+        cancelled=result.cancelled,
+        durations=report.durations if report is not None else {},
+    )
+
+
+def merge_shard_results(results: list[ShardResult]) -> ShardedRun:
+    """Combine shard outputs and add one summary line over all of them."""
+    counts: dict[str, int] = {}
+    elapsed = 0.0
+    stdout_parts: list[str] = []
+    stderr_parts: list[str] = []
+    for i, result in enumerate(results, 1):
+        header = f"--- shard {i}/{len(results)} ---\n"
+        stdout_parts.append(header + result.stdout.rstrip("\n") + "\n")
+        if result.stderr:
+            stderr_parts.append(header + result.stderr)
+        for line in reversed(result.stdout.splitlines()):
+            match = _SUMMARY_LINE.match(line.strip())
+            if match:
+                for number, kind in _SUMMARY_COUNT.findall(match.group(1)):
+                    counts[kind] = counts.get(kind, 0) + int(number)
+                elapsed = max(elapsed, float(match.group(2)))
+                break
+
+    if counts:
+        order = {kind: i for i, kind in enumerate(_OUTCOME_ORDER)}
+        kinds = sorted(counts, key=lambda kind: order.get(kind, len(order)))
+        summary = ", ".join(f"{counts[kind]} {kind}" for kind in kinds)
+        stdout_parts.append(f"===== {summary} in {elapsed:.2f}s ({len(results)} shards) =====\n")
+    failed = [r.returncode for r in results if r.returncode != 0]
+    return ShardedRun(
+        returncode=failed[0] if failed else 0,
+        stdout="\n".join(stdout_parts),
+        stderr="".join(stderr_parts),
+        shard_count=len(results),
+        timed_out=any(r.timed_out for r in results),
+        cancelled=any(r.cancelled for r in results),
+    )
+
+
+def run_pytest_sharded(
+    vfs: "WorkInProgressVFS",
+    base_cmd: list[str],
+    selection: list[str],
+    cwd: Path,
+    count: int,
+    timeout: float,
+    limits: ResourceLimits | None = None,
+) -> ShardedRun | None:
+    """Run a pytest invocation split over ``count`` processes.
+
+    ``base_cmd`` is the pytest command with its options, ``selection`` the
+    positional test paths (may be empty). Returns None when sharding isn't
+    worthwhile or possible (collection failed, fewer than two shards), in
+    which case the caller should run the suite normally.
+    """
+    node_ids = collect_pytest_ids(base_cmd, selection, cwd, timeout, limits)
+    if not node_ids:
+        return None
+
+    repo = vfs.get_git_repository()
+    store = get_duration_store(repo) if repo is not None else None
+    file_oids: dict[str, pygit2.Oid] = {}
+    durations: dict[str, float] = {}
+    for path in {n.split("::", 1)[0] for n in node_ids}:
+        oid = _file_oid(vfs, path)
+        if oid is None:
+            continue
+        file_oids[path] = oid
+        if store is not None:
+            for name, seconds in store.get(oid).items():
+                durations[f"{path}::{name}"] = seconds
+
+    shards = plan_shards(node_ids, durations, count)
+    if len(shards) < 2:
+        return None
+
+    options = [*base_cmd, "-p", "no:cacheprovider", "--durations=0", "--durations-min=0"]
+    reports = [DurationReport() for _ in shards]
+    results = [
+        _shard_result(result, report)
+        for result, report in zip(
+            run_commands(
+                [[*options, *shard] for shard in shards],
+                cwd,
+                timeout=timeout,
+                limits=limits,
+                line_handlers=reports,
+            ),
+            reports,
+            strict=True,
+        )
+    ]
+
+    if store is not None:
+        timings: dict[pygit2.Oid, dict[str, float]] = {}
+        for result in results:
+            for node_id, seconds in result.durations.items():
+                path, _sep, name = node_id.partition("::")
+                if path in file_oids and name:
+                    timings.setdefault(file_oids[path], {})[name] = seconds
+        store.update(timings)
+
+    return merge_shard_results(results)
+
+
+def run_make_sharded(
+    cwd: Path, count: int, timeout: float, limits: ResourceLimits | None = None
+) -> ShardedRun:
+    """Run ``make test`` as ``count`` shards via SHARD_INDEX/SHARD_COUNT."""
+    commands = [["make", "test", f"SHARD_INDEX={i}", f"SHARD_COUNT={count}"] for i in range(count)]
+    results = run_commands(commands, cwd, timeout=timeout, limits=limits)
+    return merge_shard_results([_shard_result(result) for result in results])
@@ -3,9 +3,11 @@ AI chat widget with markdown/LaTeX rendering
 """
 
 import json
+from collections.abc import Callable
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
-from PySide6.QtCore import QEvent, QObject, Qt, Signal
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer, Signal
 from PySide6.QtGui import QKeyEvent, QKeySequence, QShortcut
 from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtWebEngineCore import QWebEnginePage
@@ -23,17 +25,22 @@ from PySide6.QtWidgets import (
 from forge.ui.chat_helpers import ChatBridge, ExternalLinkPage
 from forge.ui.chat_message import (
     ChatMessage,
-    build_tool_results_lookup,
+    RenderCache,
+    build_raw_tool_results,
     group_messages_into_turns,
+    parse_tool_result,
 )
 from forge.ui.chat_streaming import (
+    StreamingPatcher,
+    build_clear_tool_output_js,
     build_collapse_thought_js,
     build_queued_message_js,
     build_reasoning_chunk_js,
-    build_streaming_chunk_js,
     build_streaming_tool_calls_js,
+    build_tool_output_js,
 )
 from forge.ui.chat_styles import get_chat_scripts, get_chat_styles
+from forge.ui.chat_transcript import find_turns, windowed_transcript
 from forge.ui.editor_widget import SearchBar
 from forge.ui.js_cache import JS_CACHE_DIR, get_script_src, get_script_tag
 from forge.ui.tool_rendering import render_markdown
@@ -145,6 +152,7 @@ class AIChatWidget(QWidget):
         # Tool execution signals
         self.runner.tool_started.connect(self._on_runner_tool_started)
         self.runner.tool_finished.connect(self._on_runner_tool_finished)
+        self.runner.tool_output.connect(self._on_runner_tool_output)
 
         # State signals
         self.runner.state_changed.connect(self._on_runner_state_changed)
@@ -209,6 +217,7 @@ class AIChatWidget(QWidget):
                 self.runner.tool_call_delta.disconnect(self._on_runner_tool_call_delta)
                 self.runner.tool_started.disconnect(self._on_runner_tool_started)
                 self.runner.tool_finished.disconnect(self._on_runner_tool_finished)
+                self.runner.tool_output.disconnect(self._on_runner_tool_output)
                 self.runner.state_changed.disconnect(self._on_runner_state_changed)
                 self.runner.turn_finished.disconnect(self._on_runner_turn_finished)
                 self.runner.error_occurred.disconnect(self._on_runner_error)
@@ -254,16 +263,20 @@ class AIChatWidget(QWidget):
 
     def _on_runner_tool_started(self, tool_name: str, tool_args: dict[str, Any]) -> None:
         """Handle tool execution starting."""
-        # Could show a "running..." indicator here if desired
-        pass
+        self.chat_view.page().runJavaScript(build_clear_tool_output_js())
 
     def _on_runner_tool_finished(
         self, tool_call_id: str, tool_name: str, tool_args: dict[str, Any], result: dict[str, Any]
     ) -> None:
         """Handle individual tool completion from runner."""
+        self.chat_view.page().runJavaScript(build_clear_tool_output_js())
         # Display tool result (system messages for failures, etc.)
         self._display_tool_result(tool_name, tool_args, result)
 
+    def _on_runner_tool_output(self, stream: str, lines: list[str]) -> None:
+        """Show output of a command a running tool started (tests, checks)."""
+        self.chat_view.page().runJavaScript(build_tool_output_js(stream, lines))
+
     def _on_runner_state_changed(self, state: str) -> None:
         """Handle runner state change."""
         from forge.session.live_session import SessionState
@@ -274,6 +287,7 @@ class AIChatWidget(QWidget):
             self.ai_turn_started.emit()
             self._set_processing_ui(True)
         elif state in (SessionState.IDLE, SessionState.ERROR):
+            self.chat_view.page().runJavaScript(build_clear_tool_output_js())
             self._set_processing_ui(False)
             self._check_for_unapproved_tools()
 
@@ -437,6 +451,21 @@ class AIChatWidget(QWidget):
         self.chat_view.loadFinished.connect(self._on_shell_loaded)
         self._init_chat_shell()
 
+        # Rendered HTML per message and per turn, and the turns last sent to
+        # the page (None until the page has been given the full conversation)
+        self._message_render_cache = RenderCache()
+        self._turn_render_cache = RenderCache()
+        self._sent_turns: list[str] | None = None
+        # Search text whose matching turns were last revealed in the page
+        self._revealed_search: str | None = None
+
+        # Streaming text is sent as incremental patches, at most one per frame
+        self._streaming_patcher = StreamingPatcher()
+        self._streaming_flush_timer = QTimer(self)
+        self._streaming_flush_timer.setSingleShot(True)
+        self._streaming_flush_timer.setInterval(16)
+        self._streaming_flush_timer.timeout.connect(self._flush_streaming_patch)
+
         layout.addWidget(self.chat_view)
 
         # Search bar (hidden by default, at bottom of chat view)
@@ -814,12 +843,20 @@ class AIChatWidget(QWidget):
         return bool(self.runner.session_manager.settings.get("llm.inline_tools_enabled", True))
 
     def _append_streaming_chunk(self, chunk: str) -> None:
-        """Append a raw text chunk to the streaming message, rendering <edit> blocks as diffs"""
+        """Schedule a streaming message update; chunks within a frame share one patch"""
+        if not self._streaming_flush_timer.isActive():
+            self._streaming_flush_timer.start()
+
+    def _flush_streaming_patch(self) -> None:
+        """Send the changes to the streaming message since the last patch"""
+        if not self.runner.is_streaming:
+            return
         # streaming_content is already updated in _on_stream_chunk before this is called
-        js_code = build_streaming_chunk_js(
+        js_code = self._streaming_patcher.patch_js(
             self.runner.streaming_content, inline_enabled=self._inline_enabled()
         )
-        self.chat_view.page().runJavaScript(js_code)
+        if js_code:
+            self.chat_view.page().runJavaScript(js_code)
 
     def _finalize_streaming_content(self) -> None:
         """Convert accumulated streaming text to markdown (called once at end)"""
@@ -866,6 +903,8 @@ class AIChatWidget(QWidget):
         """Called when the HTML shell has finished loading"""
         if ok:
             self._shell_ready = True
+            self._sent_turns = None
+            self._revealed_search = None
             # Now it's safe to inject content
             self._update_chat_display()
         else:
@@ -920,22 +959,26 @@ class AIChatWidget(QWidget):
         base_url = QUrl.fromLocalFile(str(JS_CACHE_DIR) + "/")
         self.chat_view.setHtml(html, base_url)
 
-    def _build_messages_html(self) -> str:
-        """Build HTML for all messages, grouped by turn.
+    def _build_turns_html(self) -> list[str]:
+        """Build HTML for all messages, one string per turn.
 
         A "turn" is a user message followed by all AI responses until the next user message.
         Each turn gets Revert/Fork buttons at the bottom.
+
+        Message and turn HTML come from render caches, so only messages that
+        changed since the last render are rendered again.
         """
         # Convert raw message dicts to ChatMessage objects
         chat_messages = [ChatMessage.from_dict(msg) for msg in self.runner.messages]
 
-        # Build tool results lookup
-        tool_results = build_tool_results_lookup(chat_messages)
+        # Raw tool results; only parsed when a message using them is re-rendered
+        raw_tool_results = build_raw_tool_results(chat_messages)
 
         # Group messages into turns
         turns = group_messages_into_turns(chat_messages)
 
-        html_parts = []
+        inline_enabled = self._inline_enabled()
+        turns_html = []
 
         # Render each turn
         for turn_idx, turn_messages in enumerate(turns):
@@ -944,26 +987,7 @@ class AIChatWidget(QWidget):
             turn_is_streaming = is_current_turn and self.runner.is_streaming
             first_msg_idx = turn_messages[0][0]
 
-            # Start turn wrapper with clickable marker
-            html_parts.append(f'<div class="turn" data-turn="{turn_idx}">')
-            html_parts.append(
-                f'<div class="turn-marker" onclick="scrollTurn({turn_idx})" '
-                f'title="Click to scroll"></div>'
-            )
-
-            # Add turn actions at TOP - but not for streaming turns or first turn
-            if not turn_is_streaming and turn_idx > 0:
-                html_parts.append(f"""
-                <div class="turn-actions turn-actions-top">
-                    <button class="turn-btn revert-btn" onclick="revertTurn({first_msg_idx})" title="Revert this turn and all later turns">
-                        ⏪ Revert this
-                    </button>
-                    <button class="turn-btn fork-btn" onclick="forkBeforeTurn({first_msg_idx})" title="Fork from before this turn">
-                        🔀 Fork before
-                    </button>
-                </div>
-                """)
-
+            messages_html = []
             for i, msg in turn_messages:
                 # Check if this is the currently streaming message
                 is_streaming_msg = (
@@ -972,32 +996,109 @@ class AIChatWidget(QWidget):
                     and msg.role == "assistant"
                 )
 
-                # Render the message
-                html_parts.append(
-                    msg.render_html(
-                        tool_results,
-                        self.handled_approvals,
-                        is_streaming_msg,
-                        inline_enabled=self._inline_enabled(),
-                        vfs=self._vfs(),
+                # Render the message (or reuse its previous render)
+                key = msg.render_key(
+                    raw_tool_results, self.handled_approvals, is_streaming_msg, inline_enabled
+                )
+                messages_html.append(
+                    self._message_render_cache.get(
+                        key,
+                        partial(
+                            self._render_message,
+                            msg,
+                            raw_tool_results,
+                            is_streaming_msg,
+                            inline_enabled,
+                        ),
                     )
                 )
 
-            # Add turn actions at bottom - but not for streaming turns or first turn
-            if not turn_is_streaming and turn_idx > 0:
-                html_parts.append(f"""
-                <div class="turn-actions turn-actions-bottom">
-                    <button class="turn-btn revert-btn" onclick="revertToTurn({first_msg_idx})" title="Revert to after this turn (undo later turns)">
-                        ⏪ Revert to here
-                    </button>
-                    <button class="turn-btn fork-btn" onclick="forkAfterTurn({first_msg_idx})" title="Fork from after this turn">
-                        🔀 Fork after
-                    </button>
-                </div>
-                """)
-
-            # Close turn wrapper
-            html_parts.append("</div>")
+            turn_key = (turn_idx, first_msg_idx, turn_is_streaming, *messages_html)
+            turns_html.append(
+                self._turn_render_cache.get(
+                    turn_key,
+                    partial(
+                        self._render_turn,
+                        turn_idx,
+                        first_msg_idx,
+                        turn_is_streaming,
+                        messages_html,
+                    ),
+                )
+            )
+
+        self._message_render_cache.sweep()
+        self._turn_render_cache.sweep()
+        return turns_html
+
+    def _render_message(
+        self,
+        msg: ChatMessage,
+        raw_tool_results: dict[str, str],
+        is_streaming: bool,
+        inline_enabled: bool,
+    ) -> str:
+        """Render one message, parsing just the tool results it displays."""
+        tool_results = {
+            tc_id: parse_tool_result(raw_tool_results[tc_id])
+            for tc in msg.tool_calls
+            if (tc_id := tc.get("id", "")) in raw_tool_results
+        }
+        return msg.render_html(
+            tool_results,
+            self.handled_approvals,
+            is_streaming,
+            inline_enabled=inline_enabled,
+            vfs=self._vfs(),
+        )
+
+    def _render_turn(
+        self,
+        turn_idx: int,
+        first_msg_idx: int,
+        turn_is_streaming: bool,
+        messages_html: list[str],
+    ) -> str:
+        """Wrap a turn's rendered messages with its marker and Revert/Fork buttons."""
+        html_parts = []
+
+        # Start turn wrapper with clickable marker
+        html_parts.append(f'<div class="turn" data-turn="{turn_idx}">')
+        html_parts.append(
+            f'<div class="turn-marker" onclick="scrollTurn({turn_idx})" '
+            f'title="Click to scroll"></div>'
+        )
+
+        # Add turn actions at TOP - but not for streaming turns or first turn
+        if not turn_is_streaming and turn_idx > 0:
+            html_parts.append(f"""
+            <div class="turn-actions turn-actions-top">
+                <button class="turn-btn revert-btn" onclick="revertTurn({first_msg_idx})" title="Revert this turn and all later turns">
+                    ⏪ Revert this
+                </button>
+                <button class="turn-btn fork-btn" onclick="forkBeforeTurn({first_msg_idx})" title="Fork from before this turn">
+                    🔀 Fork before
+                </button>
+            </div>
+            """)
+
+        html_parts.extend(messages_html)
+
+        # Add turn actions at bottom - but not for streaming turns or first turn
+        if not turn_is_streaming and turn_idx > 0:
+            html_parts.append(f"""
+            <div class="turn-actions turn-actions-bottom">
+                <button class="turn-btn revert-btn" onclick="revertToTurn({first_msg_idx})" title="Revert to after this turn (undo later turns)">
+                    ⏪ Revert to here
+                </button>
+                <button class="turn-btn fork-btn" onclick="forkAfterTurn({first_msg_idx})" title="Fork from after this turn">
+                    🔀 Fork after
+                </button>
+            </div>
+            """)
+
+        # Close turn wrapper
+        html_parts.append("</div>")
 
         return "".join(html_parts)
 
@@ -1108,19 +1209,62 @@ class AIChatWidget(QWidget):
             scroll_to_bottom: If True, scroll to bottom after update.
                             If False, scroll position is preserved automatically.
         """
+        # The streaming message is re-rendered from scratch below, so the
+        # next streaming patch has to resend everything
+        self._streaming_patcher.reset()
+
         # Don't try to update before the shell is ready
         if not self._shell_ready:
             return
 
-        messages_html = self._build_messages_html()
-
-        # Escape for JavaScript string
-        escaped_html = messages_html.replace("\\", "\\\\").replace("`", "\\`").replace("$", "\\$")
+        turns_html = self._build_turns_html()
+        previous = self._sent_turns
+        self._sent_turns = turns_html
 
         scroll_js = "true" if scroll_to_bottom else "false"
 
-        # Inject content via JavaScript - scroll position preserved automatically
-        self.chat_view.page().runJavaScript(f"updateMessages(`{escaped_html}`, {scroll_js});")
+        if previous is None:
+            # First render into this page: recent turns, placeholders for the
+            # rest (fetched through requestTurns as they scroll into view)
+            messages_html = windowed_transcript(turns_html)
+
+            # Escape for JavaScript string
+            escaped_html = (
+                messages_html.replace("\\", "\\\\").replace("`", "\\`").replace("$", "\\$")
+            )
+
+            # Inject content via JavaScript - scroll position preserved automatically
+            self.chat_view.page().runJavaScript(f"updateMessages(`{escaped_html}`, {scroll_js});")
+            return
+
+        # Only send the turns whose HTML changed (new turns are appended,
+        # removed ones dropped). Unchanged turns come from the render cache as
+        # the same string object, so comparing them is an identity check.
+        changed = {
+            i: html
+            for i, html in enumerate(turns_html)
+            if i >= len(previous) or html != previous[i]
+        }
+        if not changed and len(turns_html) == len(previous):
+            if scroll_to_bottom:
+                self.chat_view.page().runJavaScript(
+                    "window.scrollTo(0, document.body.scrollHeight);"
+                )
+            return
+        self.chat_view.page().runJavaScript(
+            f"patchTurns({len(turns_html)}, {json.dumps(changed)}, {scroll_js});"
+        )
+        # Changed turns may now (not) match the active search
+        self._revealed_search = None
+
+    def _handle_turn_request(self, turn_indices: list[int]) -> None:
+        """Send the HTML of turns the page wants to render in place of placeholders."""
+        turns_html = self._sent_turns
+        if turns_html is None:
+            return
+        turns = {i: turns_html[i] for i in turn_indices if 0 <= i < len(turns_html)}
+        if turns:
+            self.chat_view.page().runJavaScript(f"fillTurns({json.dumps(turns)}, false);")
 
     # -------------------------------------------------------------------------
     # Clear session
@@ -1162,14 +1306,36 @@ class AIChatWidget(QWidget):
         self.search_bar.hide()
         # Clear any active search highlighting in the web view
         self.chat_view.findText("")
+        if self._revealed_search is not None:
+            self._revealed_search = None
+            self.chat_view.page().runJavaScript("unpinTurns();")
         self.input_field.setFocus()
 
     def _find_next(self, text: str) -> None:
         """Find next occurrence of text in chat"""
         if text:
-            self.chat_view.findText(text)
+            self._reveal_matches(text, partial(self.chat_view.findText, text))
 
     def _find_prev(self, text: str) -> None:
         """Find previous occurrence of text in chat"""
         if text:
-            self.chat_view.findText(text, QWebEnginePage.FindFlag.FindBackward)
+            self._reveal_matches(
+                text,
+                partial(self.chat_view.findText, text, QWebEnginePage.FindFlag.FindBackward),
+            )
+
+    def _reveal_matches(self, text: str, find: Callable[[], None]) -> None:
+        """Render (and pin) every turn containing `text`, then run `find`.
+
+        The page only holds turns near the viewport, and findText can only
+        see what's rendered.
+        """
+        turns_html = self._sent_turns
+        if turns_html is None or text == self._revealed_search:
+            find()
+            return
+        self._revealed_search = text
+        turns = {i: turns_html[i] for i in find_turns(turns_html, text)}
+        self.chat_view.page().runJavaScript(
+            f"unpinTurns(); fillTurns({json.dumps(turns)}, true);", 0, lambda _result: find()
+        )
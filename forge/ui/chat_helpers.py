@@ -4,6 +4,7 @@ Helper classes for AI chat widget.
 Contains WebEngine-related helpers for the chat display.
 """
 
+import json
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QObject, QUrl, Slot
@@ -82,3 +83,8 @@ class ChatBridge(QObject):
     def handleForkAfterTurn(self, first_message_index: int) -> None:  # noqa: N802 - JS bridge
         """Handle forking from after a turn"""
         self.parent_widget._handle_fork_from_turn(first_message_index, before=False)
+
+    @Slot(str)
+    def requestTurns(self, turn_indices_json: str) -> None:  # noqa: N802 - JS bridge
+        """Send the HTML of placeholder turns that scrolled into view"""
+        self.parent_widget._handle_turn_request(json.loads(turn_indices_json))
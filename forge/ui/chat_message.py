@@ -6,6 +6,7 @@ that knows how to render itself to HTML.
 """
 
 import json
+from collections.abc import Callable, Hashable
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
@@ -65,6 +66,47 @@ class ChatMessage:
         """
         return self.role == "user" and not self.is_mid_turn and not self.is_synthetic
 
+    def render_key(
+        self,
+        raw_tool_results: dict[str, str],
+        handled_approvals: set[str],
+        is_streaming: bool,
+        inline_enabled: bool,
+    ) -> tuple[Hashable, ...]:
+        """Everything `render_html` output depends on, as a cache key.
+
+        Holds the message's own strings rather than a digest of them: Python
+        caches a string's hash, so the key of an unchanged message is cheap to
+        look up on every re-render.
+
+        Args:
+            raw_tool_results: Map of tool_call_id -> raw result message content
+        """
+        tool_calls_key = tuple(
+            (
+                tc.get("id", ""),
+                tc.get("function", {}).get("name", ""),
+                tc.get("function", {}).get("arguments", ""),
+                raw_tool_results.get(tc.get("id", "")),
+            )
+            for tc in self.tool_calls
+        )
+        inline_results_key = (
+            json.dumps(self.inline_results, sort_keys=True, default=str)
+            if self.inline_results
+            else None
+        )
+        return (
+            self.role,
+            self.content,
+            tool_calls_key,
+            inline_results_key,
+            self.approval_tool,
+            self.approval_tool in handled_approvals,
+            is_streaming,
+            inline_enabled,
+        )
+
     def render_html(
         self,
         tool_results: dict[str, dict[str, Any]],
@@ -204,6 +246,22 @@ def group_messages_into_turns(
     return turns
 
 
+def parse_tool_result(content: str) -> dict[str, Any]:
+    """Parse a tool result message's content (empty dict if not JSON)."""
+    try:
+        result: dict[str, Any] = json.loads(content) if content else {}
+    except json.JSONDecodeError:
+        return {}
+    return result
+
+
+def build_raw_tool_results(messages: list[ChatMessage]) -> dict[str, str]:
+    """Build a lookup of tool_call_id -> raw (unparsed) result content."""
+    return {
+        msg.tool_call_id: msg.content for msg in messages if msg.role == "tool" and msg.tool_call_id
+    }
+
+
 def build_tool_results_lookup(messages: list[ChatMessage]) -> dict[str, dict[str, Any]]:
     """Build a lookup of tool_call_id -> parsed result for rendering.
 
@@ -213,14 +271,40 @@ def build_tool_results_lookup(messages: list[ChatMessage]) -> dict[str, dict[str
     Returns:
         Dict mapping tool_call_id to parsed result dict
     """
-    tool_results: dict[str, dict[str, Any]] = {}
+    return {
+        tool_call_id: parse_tool_result(content)
+        for tool_call_id, content in build_raw_tool_results(messages).items()
+    }
 
-    for msg in messages:
-        if msg.role == "tool" and msg.tool_call_id:
-            content = msg.content
-            try:
-                tool_results[msg.tool_call_id] = json.loads(content) if content else {}
-            except json.JSONDecodeError:
-                tool_results[msg.tool_call_id] = {}
 
-    return tool_results
+class RenderCache:
+    """Rendered HTML fragments, reused while their key stays the same.
+
+    Used for whole-conversation re-renders: every fragment is looked up
+    once per render, and `sweep()` afterwards drops the entries that render
+    didn't use, so the cache holds exactly the current conversation.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[Hashable, str] = {}
+        self._used: dict[Hashable, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, render: Callable[[], str]) -> str:
+        """The cached HTML for `key`, calling `render()` on a miss."""
+        html = self._used.get(key)
+        if html is None:
+            html = self._entries.get(key)
+        if html is None:
+            self.misses += 1
+            html = render()
+        else:
+            self.hits += 1
+        self._used[key] = html
+        return html
+
+    def sweep(self) -> None:
+        """Forget entries not used since the last sweep."""
+        self._entries = self._used
+        self._used = {}
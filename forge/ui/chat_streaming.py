@@ -2,13 +2,17 @@
 Streaming content helpers for AI chat widget.
 
 These functions generate JavaScript to update the streaming message display
-without requiring a full page re-render.
+without requiring a full page re-render. The message body is updated through
+`StreamingPatcher`, which sends only what changed since the last update.
 """
 
-import html
+import json
 import re
+from dataclasses import dataclass
+from typing import Any
 
-from forge.ui.tool_rendering import render_streaming_edits, render_streaming_tool_html
+from forge.tools.invocation import InlineScanner
+from forge.ui.tool_rendering import render_streaming_edit_parts, render_streaming_tool_html
 
 
 def _detect_svg_blocks(text: str) -> list[dict]:
@@ -50,29 +54,6 @@ def _detect_svg_blocks(text: str) -> list[dict]:
     return segments
 
 
-def _render_streaming_svg_html(segments: list[dict]) -> str:
-    """Render streaming content that contains SVG blocks.
-
-    Text segments are HTML-escaped and wrapped in <span> tags.
-    SVG segments are injected directly as HTML in a container div.
-    Incomplete SVG blocks show a streaming indicator.
-    """
-    parts: list[str] = []
-    for seg in segments:
-        if seg["type"] == "text":
-            escaped = html.escape(seg["content"])
-            parts.append(f'<span class="streaming-text">{escaped}</span>')
-        else:
-            svg_content = seg["content"]
-            indicator = ""
-            if not seg["complete"]:
-                indicator = (
-                    '<div style="color:#999;font-size:11px;margin-top:4px;">▋ streaming...</div>'
-                )
-            parts.append(f'<div class="svg-container">{svg_content}{indicator}</div>')
-    return "".join(parts)
-
-
 def escape_for_js(text: str) -> str:
     """Escape text for safe inclusion in JavaScript string literals."""
     return (
@@ -226,34 +207,6 @@ def _detect_mermaid_blocks(text: str) -> list[dict]:
     return segments
 
 
-def _render_streaming_mermaid_html(segments: list[dict]) -> str:
-    """Render streaming content that contains mermaid blocks.
-
-    Text segments are HTML-escaped and wrapped in <span> tags.
-    Mermaid segments become <pre><code class="language-mermaid"> blocks
-    so renderStreamingMermaid() can pick them up.
-
-    Incomplete mermaid blocks get a streaming indicator.
-    """
-    parts: list[str] = []
-    for seg in segments:
-        if seg["type"] == "text":
-            escaped = html.escape(seg["content"])
-            parts.append(f'<span class="streaming-text">{escaped}</span>')
-        else:
-            # Mermaid block — render as code block for JS to process
-            mermaid_content = seg["content"]
-            if not seg["complete"]:
-                # Best-effort repair so partial diagrams can render
-                mermaid_content = _repair_partial_mermaid(mermaid_content)
-            escaped_content = html.escape(mermaid_content)
-            indicator = "" if seg["complete"] else ' data-streaming="true"'
-            parts.append(
-                f'<pre{indicator}><code class="language-mermaid">{escaped_content}</code></pre>'
-            )
-    return "".join(parts)
-
-
 def build_reasoning_chunk_js(reasoning_chunk: str) -> str:
     """Build JavaScript to APPEND a reasoning delta to the thought-bubble.
 
@@ -385,131 +338,150 @@ def build_collapse_thought_js() -> str:
     """
 
 
-def build_streaming_chunk_js(streaming_content: str, inline_enabled: bool = True) -> str:
-    """Build JavaScript to update the streaming message with new content.
+@dataclass(frozen=True)
+class StreamSegment:
+    """One piece of the streaming message, rendered as one child of ``.content``.
+
+    kind is "text" (raw text, appendable), "html" (rendered markup, e.g. a
+    tool card or SVG), or "mermaid" (diagram source for renderStreamingMermaid).
+    complete is False for a fenced block that is still streaming.
+    """
+
+    kind: str
+    content: str
+    complete: bool = True
+
+    def to_json(self) -> list:
+        return [self.kind, self.content, self.complete]
+
+
+def build_streaming_segments(
+    streaming_content: str, inline_enabled: bool = True, scanner: InlineScanner | None = None
+) -> list[StreamSegment]:
+    """Split the accumulated streaming text into display segments.
 
     Args:
         streaming_content: The accumulated streaming content so far
         inline_enabled: When False, inline text-parsing is off — `<replace>`/
                        `<write>` blocks won't execute, so don't render them as
                        diff/write previews. Let them fall through to plain text.
-
-    Returns:
-        JavaScript code to execute in the web view
+        scanner: Inline command scanner kept across snapshots of the same
+                 message, so only appended text is rescanned
     """
     # Strip [id N] prefix that the model might echo back
     display_content = re.sub(r"^\[id \d+\]\s*", "", streaming_content)
 
-    # Check if we have any inline edit blocks (<replace> or <write>) in the
-    # accumulated content. Catches both plain and nonced forms (e.g.
-    # <replace_x9k>, <write_q42>) since both start with the bare tag prefix.
-    # Skipped entirely when inline parsing is disabled — those tags won't run,
-    # so we render them as ordinary streaming text instead of edit previews.
+    # Inline edit blocks (<replace> or <write>) become diff views / write
+    # previews. Catches both plain and nonced forms (e.g. <replace_x9k>,
+    # <write_q42>) since both start with the bare tag prefix. Skipped when
+    # inline parsing is disabled — those tags won't run, so they stay text.
     if inline_enabled and ("<replace" in display_content or "<write" in display_content):
-        # Render inline edits as diff views / write previews
-        rendered_html = render_streaming_edits(display_content)
-        escaped_html = escape_for_js(rendered_html)
-
-        # Update the entire content with rendered edits
-        return f"""
-        (function() {{
-            var streamingMsg = document.getElementById('streaming-message');
-            if (streamingMsg) {{
-                var scrollThreshold = 50;
-                var wasAtBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - scrollThreshold);
-
-                var content = streamingMsg.querySelector('.content');
-                if (content) {{
-                    content.innerHTML = `{escaped_html}`;
-                    content.style.whiteSpace = 'pre-wrap';
-                }}
-
-                if (wasAtBottom) {{
-                    window.scrollTo(0, document.body.scrollHeight);
-                }}
-            }}
-        }})();
-        """
+        return [
+            StreamSegment(kind, part)
+            for kind, part in render_streaming_edit_parts(display_content, scanner)
+        ]
 
-    # Check for mermaid code blocks (```mermaid)
+    # Mermaid code blocks (```mermaid); partial diagrams get a best-effort repair
     mermaid_segments = _detect_mermaid_blocks(display_content)
-    has_mermaid = any(seg["type"] == "mermaid" for seg in mermaid_segments)
-
-    if has_mermaid:
-        rendered_html = _render_streaming_mermaid_html(mermaid_segments)
-        escaped_html = escape_for_js(rendered_html)
-
-        return f"""
-        (function() {{
-            var streamingMsg = document.getElementById('streaming-message');
-            if (streamingMsg) {{
-                var scrollThreshold = 50;
-                var wasAtBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - scrollThreshold);
-
-                var content = streamingMsg.querySelector('.content');
-                if (content) {{
-                    content.innerHTML = `{escaped_html}`;
-                    content.style.whiteSpace = 'pre-wrap';
-                }}
-
-                renderStreamingMermaid();
-
-                if (wasAtBottom) {{
-                    window.scrollTo(0, document.body.scrollHeight);
-                }}
-            }}
-        }})();
-        """
-    # Check for SVG code blocks (```svg)
+    if any(seg["type"] == "mermaid" for seg in mermaid_segments):
+        segments = []
+        for seg in mermaid_segments:
+            if seg["type"] == "text":
+                segments.append(StreamSegment("text", seg["content"]))
+            elif seg["complete"]:
+                segments.append(StreamSegment("mermaid", seg["content"]))
+            else:
+                repaired = _repair_partial_mermaid(seg["content"])
+                segments.append(StreamSegment("mermaid", repaired, complete=False))
+        return segments
+
+    # SVG code blocks (```svg) are injected directly as markup
     svg_segments = _detect_svg_blocks(display_content)
-    has_svg = any(seg["type"] == "svg" for seg in svg_segments)
-
-    if has_svg:
-        rendered_html = _render_streaming_svg_html(svg_segments)
-        escaped_html = escape_for_js(rendered_html)
-
-        return f"""
-        (function() {{
-            var streamingMsg = document.getElementById('streaming-message');
-            if (streamingMsg) {{
-                var scrollThreshold = 50;
-                var wasAtBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - scrollThreshold);
-
-                var content = streamingMsg.querySelector('.content');
-                if (content) {{
-                    content.innerHTML = `{escaped_html}`;
-                    content.style.whiteSpace = 'pre-wrap';
-                }}
-
-                if (wasAtBottom) {{
-                    window.scrollTo(0, document.body.scrollHeight);
-                }}
-            }}
-        }})();
-        """
-
-    else:
-        # No edit blocks, mermaid, or SVG - replace entire content with stripped version
-        escaped_content = escape_for_js(display_content)
-
-        return f"""
-        (function() {{
-            var streamingMsg = document.getElementById('streaming-message');
-            if (streamingMsg) {{
-                var scrollThreshold = 50;
-                var wasAtBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - scrollThreshold);
-
-                var content = streamingMsg.querySelector('.content');
-                if (content) {{
-                    content.innerText = `{escaped_content}`;
-                }}
-
-                if (wasAtBottom) {{
-                    window.scrollTo(0, document.body.scrollHeight);
-                }}
-            }}
-        }})();
-        """
+    if any(seg["type"] == "svg" for seg in svg_segments):
+        segments = []
+        for seg in svg_segments:
+            if seg["type"] == "text":
+                segments.append(StreamSegment("text", seg["content"]))
+            else:
+                indicator = ""
+                if not seg["complete"]:
+                    indicator = '<div style="color:#999;font-size:11px;margin-top:4px;">▋ streaming...</div>'
+                svg_html = f'<div class="svg-container">{seg["content"]}{indicator}</div>'
+                segments.append(StreamSegment("html", svg_html, seg["complete"]))
+        return segments
+
+    return [StreamSegment("text", display_content)]
+
+
+class StreamingPatcher:
+    """Turns successive snapshots of the streaming message into small DOM patches.
+
+    Resending the whole accumulated message on every chunk made streaming
+    O(n²): each chunk re-escaped, re-sent and re-parsed everything, and threw
+    away rendered diagrams. The patcher remembers the segments the DOM was
+    last given and returns JS (for ``applyStreamingPatch``) that only touches
+    what changed:
+
+    - segments in the unchanged prefix are left alone,
+    - a growing trailing text segment gets just its new characters appended,
+    - a still-streaming mermaid block has its source updated in place, so the
+      previous diagram stays up until the new one renders,
+    - everything after the first changed segment is replaced.
+
+    Call `reset()` whenever the streaming message is re-rendered from scratch,
+    so the next patch resends everything.
+    """
+
+    def __init__(self) -> None:
+        self._sent: list[StreamSegment] | None = None
+        # Restarts by itself when the content no longer extends what it saw
+        self._scanner = InlineScanner()
+
+    def reset(self) -> None:
+        self._sent = None
+
+    def patch_js(self, streaming_content: str, inline_enabled: bool = True) -> str | None:
+        """JavaScript bringing the DOM up to date, or None if nothing changed."""
+        segments = build_streaming_segments(streaming_content, inline_enabled, self._scanner)
+        patch = self.diff(segments)
+        self._sent = segments
+        if patch is None:
+            return None
+        return f"applyStreamingPatch({json.dumps(patch)});"
+
+    def diff(self, segments: list[StreamSegment]) -> dict[str, Any] | None:
+        """The patch from the last sent segments to `segments` (None if equal)."""
+        old = self._sent
+        if old is None:
+            return {
+                "reset": True,
+                "keep": 0,
+                "segments": [seg.to_json() for seg in segments],
+                "mermaid": any(seg.kind == "mermaid" for seg in segments),
+            }
+
+        # Length of the unchanged prefix
+        common = 0
+        limit = min(len(old), len(segments))
+        while common < limit and old[common] == segments[common]:
+            common += 1
+        if common == len(old) == len(segments):
+            return None
+
+        patch: dict[str, Any] = {"reset": False, "keep": common}
+        if common < limit:
+            before, after = old[common], segments[common]
+            if before.kind == after.kind == "text" and after.content.startswith(before.content):
+                patch["extend"] = [common, after.content[len(before.content) :]]
+                patch["keep"] = common + 1
+            elif before.kind == after.kind == "mermaid" and before.complete == after.complete:
+                patch["update"] = [common, after.content]
+                patch["keep"] = common + 1
+
+        added = segments[patch["keep"] :]
+        patch["segments"] = [seg.to_json() for seg in added]
+        patch["mermaid"] = "update" in patch or any(seg.kind == "mermaid" for seg in added)
+        return patch
 
 
 def build_streaming_tool_calls_js(tool_calls: list[dict]) -> str:
@@ -584,6 +556,60 @@ def build_streaming_tool_calls_js(tool_calls: list[dict]) -> str:
     """
 
 
+# Lines of live tool output kept in the page; older ones are dropped
+_LIVE_OUTPUT_LINES = 200
+
+
+def build_tool_output_js(stream: str, lines: list[str]) -> str:
+    """Build JavaScript to append command output to the live tool output panel.
+
+    The panel (`#live-tool-output`) sits at the end of the messages and shows
+    the tail of what a running command (tests, checks) prints. It's removed
+    again by `build_clear_tool_output_js()` when the tool finishes.
+    """
+    payload = json.dumps({"stream": stream, "lines": lines})
+    return f"""
+    (function() {{
+        var data = {payload};
+        var container = document.getElementById('messages-container');
+        if (!container) return;
+
+        var atBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - 50);
+
+        var panel = document.getElementById('live-tool-output');
+        if (!panel) {{
+            panel = document.createElement('pre');
+            panel.id = 'live-tool-output';
+            panel.className = 'live-tool-output';
+            container.appendChild(panel);
+        }}
+        for (var i = 0; i < data.lines.length; i++) {{
+            var line = document.createElement('div');
+            if (data.stream === 'stderr') line.className = 'stderr';
+            line.textContent = data.lines[i];
+            panel.appendChild(line);
+        }}
+        while (panel.childNodes.length > {_LIVE_OUTPUT_LINES}) {{
+            panel.removeChild(panel.firstChild);
+        }}
+        panel.scrollTop = panel.scrollHeight;
+        if (atBottom) {{
+            window.scrollTo(0, document.body.scrollHeight);
+        }}
+    }})();
+    """
+
+
+def build_clear_tool_output_js() -> str:
+    """Build JavaScript to remove the live tool output panel."""
+    return """
+    (function() {
+        var panel = document.getElementById('live-tool-output');
+        if (panel) panel.remove();
+    })();
+    """
+
+
 def build_queued_message_js(text: str) -> str:
     """Build JavaScript to show a queued message indicator.
 
@@ -133,6 +133,10 @@ def get_chat_styles() -> str:
             margin-bottom: 8px;
             padding-left: 24px;  /* Fixed space for turn marker */
         }
+        .turn-placeholder {
+            /* Height is set inline; keeps the transcript's scroll geometry */
+            overflow-anchor: none;
+        }
         .turn-marker {
             position: absolute;
             left: 0;
@@ -249,6 +253,25 @@ def get_chat_styles() -> str:
         .streaming-text {
             white-space: pre-wrap;
         }
+        /* Live output of a command a running tool started (tests, checks) */
+        .live-tool-output {
+            margin: 8px 0;
+            padding: 8px 12px;
+            background: #1e1e1e;
+            color: #d4d4d4;
+            border-radius: 6px;
+            font-size: 12px;
+            max-height: 240px;
+            overflow-y: auto;
+            white-space: pre-wrap;
+        }
+        .live-tool-output .stderr {
+            color: #f48771;
+        }
+        /* Streaming segment wrapper: lays its children out as if unwrapped */
+        .streaming-segment {
+            display: contents;
+        }
         /* Thought bubble: reasoning/chain-of-thought from the model.
            Rendered above the streaming response while the model is thinking,
            collapses to a thin "💭 Thought" affordance once the response begins. */
@@ -407,7 +430,12 @@ def get_chat_scripts() -> str:
         function updateMessages(html, scrollToBottom) {
             var container = document.getElementById('messages-container');
             if (container) {
+                if (_turnRevealer) {
+                    _turnRevealer.disconnect();
+                    _turnReaper.disconnect();
+                }
                 container.innerHTML = html;
+                _observeTurns(container.querySelectorAll(':scope > .turn'));
 
                 // Render any SVG diagrams in the new content
                 renderSvgDiagrams();
@@ -421,6 +449,151 @@ def get_chat_scripts() -> str:
             }
         }
 
+        // Keyed update of the conversation: the container holds one element
+        // per turn. Keeps `count` turns and replaces (or appends) only the
+        // turns in `changed` (turn index -> HTML), so unchanged turns keep
+        // their DOM, including already-rendered diagrams.
+        function patchTurns(count, changed, scrollToBottom) {
+            var container = document.getElementById('messages-container');
+            if (!container) return;
+
+            // A full update used to clear this along with everything else
+            var queued = document.getElementById('queued-message-indicator');
+            if (queued) queued.remove();
+
+            var turns = container.children;
+            while (turns.length > count) {
+                container.removeChild(container.lastElementChild);
+            }
+            // Integer keys iterate in ascending order, so appends stay in order
+            Object.keys(changed).forEach(function(key) {
+                var index = parseInt(key, 10);
+                var template = document.createElement('template');
+                template.innerHTML = changed[key];
+                var node = template.content.firstElementChild;
+                if (!node) return;
+                if (index < turns.length) {
+                    // Placeholders fetch their current HTML when revealed
+                    var old = turns[index];
+                    if (old.classList.contains('turn-placeholder')) return;
+                    if (old.dataset.pinned) node.dataset.pinned = 'true';
+                    if (_turnReaper) _turnReaper.unobserve(old);
+                    container.replaceChild(node, old);
+                } else {
+                    container.appendChild(node);
+                }
+                _observeTurns([node]);
+            });
+
+            renderSvgDiagrams();
+            renderMermaidDiagrams();
+
+            if (scrollToBottom) {
+                window.scrollTo(0, document.body.scrollHeight);
+            }
+        }
+
+        // === Windowed transcript ===
+        // Only turns near the viewport hold real HTML. The others are
+        // placeholders of the turn's (measured or estimated) height, whose
+        // HTML is requested from Python when they approach the viewport.
+        var _turnRevealer = null;
+        var _turnReaper = null;
+        var _requestedTurns = {};
+        var _turnRequestScheduled = false;
+
+        function _initTurnObservers() {
+            _turnRevealer = new IntersectionObserver(function(entries) {
+                entries.forEach(function(entry) {
+                    var turn = entry.target;
+                    if (entry.isIntersecting && turn.classList.contains('turn-placeholder')) {
+                        _requestTurn(parseInt(turn.dataset.turn, 10));
+                    }
+                });
+            }, { rootMargin: '1500px 0px' });
+            _turnReaper = new IntersectionObserver(function(entries) {
+                entries.forEach(function(entry) {
+                    if (!entry.isIntersecting) _dehydrateTurn(entry.target);
+                });
+            }, { rootMargin: '6000px 0px' });
+        }
+
+        function _observeTurns(turns) {
+            if (typeof IntersectionObserver === 'undefined') return;
+            if (!_turnRevealer) _initTurnObservers();
+            for (var i = 0; i < turns.length; i++) {
+                var observer = turns[i].classList.contains('turn-placeholder') ? _turnRevealer : _turnReaper;
+                observer.observe(turns[i]);
+            }
+        }
+
+        function _requestTurn(index) {
+            _requestedTurns[index] = true;
+            if (_turnRequestScheduled) return;
+            _turnRequestScheduled = true;
+            requestAnimationFrame(function() {
+                _turnRequestScheduled = false;
+                var indices = Object.keys(_requestedTurns).map(Number);
+                _requestedTurns = {};
+                if (bridge && indices.length) bridge.requestTurns(JSON.stringify(indices));
+            });
+        }
+
+        // Swap a rendered turn that scrolled far away for a placeholder of
+        // its measured height
+        function _dehydrateTurn(turn) {
+            if (!turn.parentNode || turn.classList.contains('turn-placeholder')) return;
+            // Search results stay put; the streaming turn is patched in place
+            if (turn.dataset.pinned || turn.querySelector('#streaming-message')) return;
+            var turns = turn.parentNode.querySelectorAll(':scope > .turn');
+            if (turn === turns[turns.length - 1]) return;
+            var placeholder = document.createElement('div');
+            placeholder.className = 'turn turn-placeholder';
+            placeholder.dataset.turn = turn.dataset.turn;
+            placeholder.style.height = turn.getBoundingClientRect().height + 'px';
+            _turnReaper.unobserve(turn);
+            turn.replaceWith(placeholder);
+            _observeTurns([placeholder]);
+        }
+
+        // Fill placeholders with their turn HTML (called from Python).
+        // `turns` maps turn index -> HTML; with `pin`, the turns stay
+        // rendered (and any already rendered ones are pinned) until
+        // unpinTurns().
+        function fillTurns(turns, pin) {
+            var container = document.getElementById('messages-container');
+            if (!container) return;
+            Object.keys(turns).forEach(function(key) {
+                var old = container.querySelector(':scope > .turn[data-turn="' + key + '"]');
+                if (!old) return;
+                if (old.classList.contains('turn-placeholder')) {
+                    var template = document.createElement('template');
+                    template.innerHTML = turns[key];
+                    var node = template.content.firstElementChild;
+                    if (!node) return;
+                    _turnRevealer.unobserve(old);
+                    old.replaceWith(node);
+                    old = node;
+                    _observeTurns([node]);
+                }
+                if (pin) old.dataset.pinned = 'true';
+            });
+            renderSvgDiagrams();
+            renderMermaidDiagrams();
+        }
+
+        function unpinTurns() {
+            document.querySelectorAll('.turn[data-pinned]').forEach(function(turn) {
+                delete turn.dataset.pinned;
+                // Re-observing reports the current visibility, so pinned
+                // turns far from the viewport get reaped now
+                if (!turn.classList.contains('turn-placeholder')) {
+                    _turnReaper.unobserve(turn);
+                    _turnReaper.observe(turn);
+                }
+            });
+        }
+
         // Render SVG diagrams - finds code blocks with class 'language-svg'
         // and replaces them with the actual SVG rendered directly.
         function renderSvgDiagrams() {
@@ -597,4 +770,81 @@ def get_chat_scripts() -> str:
                 }
             });
         }
+
+        // Apply an incremental update to the streaming message, built by
+        // StreamingPatcher (chat_streaming.py). Each segment is one child
+        // element of .content; only the segments that changed are touched.
+        function _buildStreamingSegment(seg) {
+            var el;
+            if (seg[0] === 'text') {
+                el = document.createElement('span');
+                el.className = 'streaming-text';
+                el.textContent = seg[1];
+                return el;
+            }
+            el = document.createElement('div');
+            el.className = 'streaming-segment';
+            if (seg[0] === 'mermaid') {
+                var pre = document.createElement('pre');
+                if (!seg[2]) pre.dataset.streaming = 'true';
+                var code = document.createElement('code');
+                code.className = 'language-mermaid';
+                code.textContent = seg[1];
+                pre.appendChild(code);
+                el.appendChild(pre);
+            } else {
+                el.innerHTML = seg[1];
+            }
+            return el;
+        }
+
+        function applyStreamingPatch(patch) {
+            var streamingMsg = document.getElementById('streaming-message');
+            if (!streamingMsg) return;
+            var content = streamingMsg.querySelector('.content');
+            if (!content) return;
+
+            var scrollThreshold = 50;
+            var wasAtBottom = (window.innerHeight + window.scrollY) >= (document.body.scrollHeight - scrollThreshold);
+
+            if (patch.reset) {
+                content.textContent = '';
+                content.style.whiteSpace = 'pre-wrap';
+            }
+            var children = content.children;
+            var target;
+            if (patch.extend) {
+                target = children[patch.extend[0]];
+                if (target) {
+                    target.appendChild(document.createTextNode(patch.extend[1]));
+                    // Merge the appended text nodes now and then, bounding the
+                    // node count on long answers
+                    if (target.childNodes.length > 1000) {
+                        target.textContent = target.textContent;
+                    }
+                }
+            }
+            if (patch.update) {
+                target = children[patch.update[0]];
+                var code = target && target.querySelector('code.language-mermaid');
+                if (code) code.textContent = patch.update[1];
+            }
+            while (children.length > patch.keep) {
+                content.removeChild(content.lastElementChild);
+            }
+            if (patch.segments.length) {
+                var fragment = document.createDocumentFragment();
+                patch.segments.forEach(function(seg) {
+                    fragment.appendChild(_buildStreamingSegment(seg));
+                });
+                content.appendChild(fragment);
+            }
+            if (patch.mermaid) {
+                renderStreamingMermaid();
+            }
+
+            if (wasAtBottom) {
+                window.scrollTo(0, document.body.scrollHeight);
+            }
+        }
     """
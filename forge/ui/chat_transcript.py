@@ -0,0 +1,73 @@
+"""
+Windowed transcript for the chat view.
+
+Keeping every turn's DOM alive makes memory and layout cost grow with the
+session, and opening an old branch used to lay out its whole history up
+front. The page now only holds real HTML for turns near the viewport:
+
+- The first render of a page sends the last ``LIVE_TURNS`` turns; earlier
+  turns are placeholders (same ``.turn`` element and ``data-turn`` index, so
+  turn scrolling still finds them) with an estimated height.
+- When a placeholder comes near the viewport, the page asks for its HTML
+  through ``ChatBridge.requestTurns`` and the widget sends it back. Turns
+  that scroll far away are swapped back for placeholders of their measured
+  height.
+- Chat search runs over the turns' text here, and reveals (and pins) the
+  matching turns before the view's ``findText`` looks for them.
+"""
+
+import html
+import re
+from functools import lru_cache
+
+# Turns rendered for real on the first render of a page, counted from the end
+LIVE_TURNS = 6
+
+# Placeholder height bounds (px) for turns the page hasn't measured yet
+_MIN_ESTIMATE = 80
+_MAX_ESTIMATE = 4000
+
+# Rough layout of rendered text: characters per line and pixels per line
+_CHARS_PER_LINE = 100
+_LINE_HEIGHT = 20
+
+_TAG = re.compile(r"<[^>]*>")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def turn_text(turn_html: str) -> str:
+    """Visible text of a rendered turn, lowercased and whitespace-collapsed.
+
+    Tags are dropped without a separator: joining two words across a tag
+    only makes a search reveal a turn it didn't need to, while splitting
+    one would hide a real match.
+    """
+    return _SPACE.sub(" ", html.unescape(_TAG.sub("", turn_html))).lower()
+
+
+def estimate_turn_height(turn_html: str) -> int:
+    """Guess the rendered height of a turn from its text and line breaks."""
+    lines = turn_html.count("\n") + len(turn_text(turn_html)) // _CHARS_PER_LINE
+    return max(_MIN_ESTIMATE, min(_MAX_ESTIMATE, lines * _LINE_HEIGHT))
+
+
+def placeholder_html(turn_idx: int, height: int) -> str:
+    """Stand-in for a turn that isn't rendered."""
+    return f'<div class="turn turn-placeholder" data-turn="{turn_idx}" style="height: {height}px"></div>'
+
+
+def windowed_transcript(turns_html: list[str], live_turns: int = LIVE_TURNS) -> str:
+    """First-render HTML: the last `live_turns` turns, placeholders before them."""
+    first_live = max(0, len(turns_html) - live_turns)
+    parts = [placeholder_html(i, estimate_turn_height(turns_html[i])) for i in range(first_live)]
+    parts.extend(turns_html[first_live:])
+    return "".join(parts)
+
+
+def find_turns(turns_html: list[str], text: str) -> list[int]:
+    """Indices of the turns whose visible text contains `text` (case-insensitive)."""
+    needle = _SPACE.sub(" ", text).lower()
+    if not needle:
+        return []
+    return [i for i, turn in enumerate(turns_html) if needle in turn_text(turn)]
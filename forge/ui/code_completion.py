@@ -7,9 +7,11 @@ Uses the configured summarization model for inline completions.
 import os
 from typing import TYPE_CHECKING, Any
 
-import httpx
+import requests
 from PySide6.QtCore import QObject, QThread, QTimer, Signal
 
+from forge.llm.transport import TRANSPORT
+
 if TYPE_CHECKING:
     from forge.config.settings import Settings
 
@@ -80,7 +82,7 @@ Complete at █:"""
                 return
 
             # Use the configured summarization model for completions
-            response = httpx.post(
+            response = TRANSPORT.post(
                 "https://openrouter.ai/api/v1/chat/completions",
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -107,7 +109,7 @@ Complete at █:"""
             else:
                 self.error.emit(f"API error: {response.status_code}")
 
-        except httpx.TimeoutException:
+        except requests.Timeout:
             pass  # Silently ignore timeouts
         except Exception as e:
             self.error.emit(str(e))
@@ -21,6 +21,7 @@ from PySide6.QtWidgets import (
 
 from forge.constants import IMAGE_EXTENSIONS
 from forge.vfs import is_binary_file
+from forge.vfs.file_metadata import get_file_size
 
 if TYPE_CHECKING:
     from forge.ui.branch_workspace import BranchWorkspace
@@ -40,7 +41,7 @@ ICON_PARTIAL = "◐"  # Half-filled circle - partial context
 ICON_FULL = "●"  # Filled circle - full context
 ICON_WARNING = "⚠️"  # Warning icon for large files
 
-# Threshold for "large file" warning (in characters)
+# Threshold for "large file" warning (in bytes)
 LARGE_FILE_THRESHOLD = 10000
 
 
@@ -64,7 +65,7 @@ class FileExplorerWidget(QWidget):
     - ◯ (empty) for files/folders not in context
     - ◐ (half) for folders with some files in context
     - ● (full) for files in context or folders fully in context
-    - ⚠️ (warning) shown next to large files (10k+ chars) in context
+    - ⚠️ (warning) shown next to large files (10k+ bytes) in context
     """
 
     # Emitted when user wants to open a file
@@ -81,8 +82,8 @@ class FileExplorerWidget(QWidget):
         self.workspace = workspace
         self._context_files: set[str] = set()  # Files currently in AI context
         self._all_files: list[str] = []  # All files in the VFS (cached for context calculations)
-        self._large_files: set[str] = set()  # Files that are large (10k+ chars)
-        self._file_sizes: dict[str, int] = {}  # File sizes in characters
+        self._large_files: set[str] = set()  # Files that are large (10k+ bytes)
+        self._file_sizes: dict[str, int] = {}  # File sizes in bytes
         self._root_item: QTreeWidgetItem | None = None  # The <root> item
         # Whether images can be added to AI context (vision-gated). Cached on
         # refresh() so click/menu/icon logic doesn't repeatedly ask the workspace.
@@ -132,7 +133,7 @@ class FileExplorerWidget(QWidget):
 
         # Add tooltip explaining the context icons
         self.tree.setToolTip(
-            "Double-click to open file\nClick ◯/● to toggle AI context\n\n◯ = not in context\n◐ = some files in context\n● = in context\n⚠️ = large file (10k+ chars)"
+            "Double-click to open file\nClick ◯/● to toggle AI context\n\n◯ = not in context\n◐ = some files in context\n● = in context\n⚠️ = large file (10k+ bytes)"
         )
 
         # Enable context menu
@@ -167,17 +168,18 @@ class FileExplorerWidget(QWidget):
         files = self.workspace.vfs.list_all_files()
         self._all_files = [f for f in files if not f.startswith(".forge/")]
 
-        # Check file sizes and track large files (skip binary files)
+        # Check file sizes and track large files (skip binary files). Sizes of
+        # committed files come from object headers, so this doesn't read them.
         for filepath in self._all_files:
             if is_binary_file(filepath):
                 continue
             try:
-                content = self.workspace.vfs.read_file(filepath)
-                self._file_sizes[filepath] = len(content)
-                if len(content) >= LARGE_FILE_THRESHOLD:
-                    self._large_files.add(filepath)
+                size = get_file_size(self.workspace.vfs, filepath)
             except Exception:
-                pass  # Skip files we can't read
+                continue  # Skip files we can't read
+            self._file_sizes[filepath] = size
+            if size >= LARGE_FILE_THRESHOLD:
+                self._large_files.add(filepath)
 
         # Create the root item that contains everything
         self._root_item = QTreeWidgetItem()
@@ -255,7 +257,7 @@ class FileExplorerWidget(QWidget):
                 if filepath in self._file_sizes:
                     size = self._file_sizes[filepath]
                     tokens = size // 3  # Rough estimate
-                    tooltip_parts.append(f"Size: {size:,} chars (~{tokens:,} tokens)")
+                    tooltip_parts.append(f"Size: {size:,} bytes (~{tokens:,} tokens)")
                     if filepath in self._large_files:
                         tooltip_parts.append("⚠️ Large file - may consume significant context")
                 file_item.setToolTip(COL_NAME, "\n".join(tooltip_parts))
@@ -5,6 +5,7 @@ Embeddable version of GlobalSearchDialog for use in side panel.
 """
 
 import re
+import time
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import Qt, Signal
@@ -19,9 +20,20 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from forge.runtime.events import SearchResultsChunk
+from forge.runtime.tasks import CancelToken, Emitter, QtTaskRunner, TaskHandle, TaskRunner
+from forge.vfs.search_engine import SearchPlan, iter_line_matches, plan_search
+from forge.vfs.trigram_index import get_trigram_index
+
 if TYPE_CHECKING:
     from forge.ui.branch_workspace import BranchWorkspace
 
+# Stop after this many matches to avoid UI slowdown
+MAX_RESULTS = 500
+
+# Results are handed to the UI in batches, at most this often (seconds)
+_BATCH_INTERVAL = 0.05
+
 
 class SearchWidget(QWidget):
     """
@@ -34,10 +46,20 @@ class SearchWidget(QWidget):
     # Emitted when user selects a result (filepath, line_number)
     file_selected = Signal(str, int)
 
-    def __init__(self, workspace: "BranchWorkspace", parent: QWidget | None = None) -> None:
+    def __init__(
+        self,
+        workspace: "BranchWorkspace",
+        parent: QWidget | None = None,
+        task_runner: TaskRunner | None = None,
+    ) -> None:
         super().__init__(parent)
         self.workspace = workspace
 
+        # Scans run off the main thread; results stream in as they're found
+        self._tasks: TaskRunner = task_runner if task_runner is not None else QtTaskRunner()
+        self._search_handle: TaskHandle | None = None
+        self._match_count = 0
+
         self._setup_ui()
 
     def _setup_ui(self) -> None:
@@ -77,63 +99,70 @@ class SearchWidget(QWidget):
         self.search_input.selectAll()
 
     def _do_search(self) -> None:
-        """Execute the search"""
+        """Start a search, replacing any that is still running"""
         pattern = self.search_input.text().strip()
         if not pattern:
             return
 
+        if self._search_handle is not None:
+            self._search_handle.request_stop()
+            self._search_handle = None
+
         self.results_list.clear()
+        self._match_count = 0
         self.status_label.setText("Searching...")
 
-        # Get all files from VFS
-        files = self.workspace.vfs.list_files()
-        # Filter out .forge/ files
-        files = [f for f in files if not f.startswith(".forge/")]
-
-        matches: list[tuple[str, int, str]] = []  # (filepath, line_num, line_content)
-        total_matches = 0
-
         try:
             regex = re.compile(pattern, re.IGNORECASE)
         except re.error as e:
             self.status_label.setText(f"Invalid regex: {e}")
             return
 
-        for filepath in files:
-            try:
-                content = self.workspace.vfs.read_file(filepath)
-                lines = content.split("\n")
-
-                for line_num, line in enumerate(lines, 1):
-                    if regex.search(line):
-                        matches.append((filepath, line_num, line.strip()[:80]))
-                        total_matches += 1
-
-                        # Limit results to avoid UI slowdown
-                        if total_matches >= 500:
-                            break
-
-            except Exception:
-                continue  # Skip files we can't read
-
-            if total_matches >= 500:
-                break
-
-        # Populate results
-        for filepath, line_num, line_preview in matches:
+        # Resolving files touches the VFS, so it happens here on its owner
+        # thread (a lookup per file); the rest only needs the resulting plan.
+        vfs = self.workspace.vfs
+        files = [f for f in vfs.list_files() if not f.startswith(".forge/")]
+        plan = plan_search(vfs, files)
+        repo = vfs.get_git_repository()
+        index = get_trigram_index(repo) if repo is not None else None
+
+        def work(emit: Emitter, token: CancelToken) -> bool:
+            # Skip files the trigram index proves can't match
+            narrowed = index.narrow_plan(plan, regex) if index is not None else plan
+            return _scan(narrowed, regex, emit, token)
+
+        self._search_handle = self._tasks.submit(
+            work,
+            on_result=self._on_search_finished,
+            on_error=self._on_search_error,
+            on_event=self._on_search_event,
+        )
+
+    def _on_search_event(self, event: object) -> None:
+        """Append a batch of results as it arrives"""
+        if not isinstance(event, SearchResultsChunk):
+            return
+        for filepath, line_num, line_preview in event.matches:
             item = QListWidgetItem()
             item.setText(f"{filepath}:{line_num}\n  {line_preview}")
             item.setData(Qt.ItemDataRole.UserRole, (filepath, line_num))
             self.results_list.addItem(item)
+        if self._match_count == 0 and event.matches:
+            # Select first result
+            self.results_list.setCurrentRow(0)
+        self._match_count += len(event.matches)
+        self.status_label.setText(f"Searching... {self._match_count} match(es)")
 
-        if total_matches >= 500:
-            self.status_label.setText("500+ matches (first 500)")
+    def _on_search_finished(self, truncated: bool) -> None:
+        self._search_handle = None
+        if truncated:
+            self.status_label.setText(f"{MAX_RESULTS}+ matches (first {MAX_RESULTS})")
         else:
-            self.status_label.setText(f"{total_matches} match(es)")
+            self.status_label.setText(f"{self._match_count} match(es)")
 
-        # Select first result
-        if self.results_list.count() > 0:
-            self.results_list.setCurrentRow(0)
+    def _on_search_error(self, error: str) -> None:
+        self._search_handle = None
+        self.status_label.setText(f"Search failed: {error.splitlines()[0]}")
 
     def _on_item_double_clicked(self, item: QListWidgetItem) -> None:
         """Handle double-click on result"""
@@ -149,3 +178,24 @@ class SearchWidget(QWidget):
         if data:
             filepath, line_num = data
             self.file_selected.emit(filepath, line_num)
+
+
+def _scan(plan: SearchPlan, regex: re.Pattern[str], emit: Emitter, token: CancelToken) -> bool:
+    """Scan a plan, emitting batches of results. Returns whether it hit MAX_RESULTS."""
+    batch: list[tuple[str, int, str]] = []
+    last_flush = 0.0  # Show the first match right away
+    truncated = False
+    for count, match in enumerate(iter_line_matches(plan, regex)):
+        if token.stop_requested:
+            return False
+        if count >= MAX_RESULTS:
+            truncated = True
+            break
+        batch.append((match.filepath, match.line, match.text.strip()[:80]))
+        if time.monotonic() - last_flush >= _BATCH_INTERVAL:
+            emit(SearchResultsChunk(batch))
+            batch = []
+            last_flush = time.monotonic()
+    if batch:
+        emit(SearchResultsChunk(batch))
+    return truncated
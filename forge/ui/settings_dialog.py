@@ -201,6 +201,16 @@ class SettingsDialog(QDialog):
         inline_tools_info.setStyleSheet("color: #666; font-size: 10px;")
         layout.addRow("", inline_tools_info)
 
+        # Apply finished inline edits while the response streams
+        self.pipelined_inline_input = QCheckBox()
+        self.pipelined_inline_input.setToolTip(
+            "When enabled, each inline <replace>, <write>, <delete_file> or "
+            "<rename_file> block is applied as soon as its closing tag arrives, while "
+            "the rest of the response is still streaming. Commands like <commit/> or "
+            "<run_tests/> still wait for the end of the response."
+        )
+        layout.addRow("Apply inline edits while streaming:", self.pipelined_inline_input)
+
         # Prefix tool arguments with 1_, 2_, etc.
         self.prefix_tool_args_input = QCheckBox()
         self.prefix_tool_args_input.setToolTip(
@@ -600,6 +610,9 @@ class SettingsDialog(QDialog):
         self.inline_tools_enabled_input.setChecked(
             self.settings.get("llm.inline_tools_enabled", True)
         )
+        self.pipelined_inline_input.setChecked(
+            self.settings.get("llm.pipelined_inline_commands", False)
+        )
         self.prefix_tool_args_input.setChecked(self.settings.get("llm.prefix_tool_args", False))
         self.vision_enabled_input.setChecked(self.settings.get("llm.vision_enabled", False))
 
@@ -626,6 +639,7 @@ class SettingsDialog(QDialog):
         self.settings.set("llm.base_url", self.base_url_input.text())
         self.settings.set("llm.require_done_tag", self.require_done_tag_input.isChecked())
         self.settings.set("llm.inline_tools_enabled", self.inline_tools_enabled_input.isChecked())
+        self.settings.set("llm.pipelined_inline_commands", self.pipelined_inline_input.isChecked())
         self.settings.set("llm.prefix_tool_args", self.prefix_tool_args_input.isChecked())
         self.settings.set("llm.vision_enabled", self.vision_enabled_input.isChecked())
         # Editor settings
@@ -21,6 +21,7 @@ from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from forge.session.image_embedding import _BytesVFS
+    from forge.tools.invocation import InlineScanner
 
 
 def get_diff_styles() -> str:
@@ -1285,12 +1286,13 @@ def render_run_tests_html(
     """Render run_tests tool call as HTML.
 
     Args:
-        args: Tool arguments (pattern, verbose)
+        args: Tool arguments (pattern, verbose, affected)
         result: Execution result (None if streaming/pending)
         widget_id: Unique ID for this widget (for in-place updates)
     """
     pattern = args.get("pattern", "")
     verbose = args.get("verbose", False)
+    affected = args.get("affected", False)
 
     streaming_class = ""
     if result is None:
@@ -1301,6 +1303,8 @@ def render_run_tests_html(
         args_info += f"<div>Pattern: <code>{html.escape(str(pattern))}</code></div>"
     if verbose:
         args_info += "<div>Verbose: on</div>"
+    if affected:
+        args_info += "<div>Affected tests only</div>"
 
     status = ""
     output_html = ""
@@ -1584,11 +1588,7 @@ def render_markdown(
 
     import markdown as md
 
-    from forge.tools.invocation import (
-        _build_code_regions,
-        _inside_code_region,
-        discover_inline_tools,
-    )
+    from forge.tools.invocation import InlineScanner
 
     # Configure markdown extensions for code blocks with language-X class format.
     # `sane_lists` is included so ordered lists respect their starting number
@@ -1616,51 +1616,13 @@ def render_markdown(
         )
         return _finish(_preserve_ordered_list_numbers(content, rendered))
 
-    inline_tools = discover_inline_tools()
-    code_regions = _build_code_regions(content)
+    # The same commands, in the same order, as the executor ran, so
+    # inline_results line up with them by index
     result_parts = []
     pos = 0
-    command_index = 0
-
-    while pos < len(content):
-        # Find the earliest matching inline command that is NOT inside a code block
-        earliest_match = None
-        earliest_tool = None
-        earliest_module = None
-
-        for tool_name, module in inline_tools.items():
-            pattern = module.get_inline_pattern()
-            search_pos = pos
-            while True:
-                match = pattern.search(content, search_pos)
-                if match is None:
-                    break
-                # Skip matches inside code blocks
-                skip_to = _inside_code_region(match.start(), code_regions)
-                if skip_to is not None:
-                    search_pos = skip_to
-                    continue
-                # Found a valid match outside code blocks
-                if earliest_match is None or match.start() < earliest_match.start():
-                    earliest_match = match
-                    earliest_tool = tool_name
-                    earliest_module = module
-                break
-
-        if earliest_match is None or earliest_tool is None or earliest_module is None:
-            # No more commands - render remaining as markdown
-            remaining = content[pos:].strip()
-            if remaining:
-                rendered = md.markdown(
-                    _escape_raw_html(remaining),
-                    extensions=md_extensions,
-                    extension_configs=md_extension_configs,
-                )
-                result_parts.append(_preserve_ordered_list_numbers(remaining, rendered))
-            break
-
+    for command_index, cmd in enumerate(InlineScanner().feed(content)):
         # Render markdown text before this command
-        text_before = content[pos : earliest_match.start()].rstrip()
+        text_before = content[pos : cmd.start_pos].rstrip()
         if text_before:
             rendered = md.markdown(
                 _escape_raw_html(text_before),
@@ -1675,15 +1637,23 @@ def render_markdown(
             result = inline_results[command_index]
 
         # Render the inline command with its index and result
-        args = earliest_module.parse_inline_match(earliest_match)
         tool_html = _render_inline_command_html(
-            earliest_tool, args, is_streaming=False, command_index=command_index, result=result
+            cmd.tool_name, cmd.args, is_streaming=False, command_index=command_index, result=result
         )
         result_parts.append(tool_html)
 
         # Continue after this command
-        pos = earliest_match.end()
-        command_index += 1
+        pos = cmd.end_pos
+
+    # No more commands - render remaining as markdown
+    remaining = content[pos:].strip()
+    if remaining:
+        rendered = md.markdown(
+            _escape_raw_html(remaining),
+            extensions=md_extensions,
+            extension_configs=md_extension_configs,
+        )
+        result_parts.append(_preserve_ordered_list_numbers(remaining, rendered))
 
     return _finish("".join(result_parts))
 
@@ -1834,8 +1804,6 @@ def render_streaming_edits(content: str, inline_enabled: bool = True) -> str:
     Used during streaming to show inline commands as they're being typed.
     Text outside commands is escaped (not markdown-rendered) for performance.
 
-    Uses front-to-back parsing to avoid matching commands inside code blocks.
-
     Args:
         content: Streaming text that may contain partial inline commands
         inline_enabled: When False, inline parsing is off — don't render inline
@@ -1850,77 +1818,67 @@ def render_streaming_edits(content: str, inline_enabled: bool = True) -> str:
     if not inline_enabled:
         return html.escape(content.rstrip())
 
-    from forge.tools.invocation import (
-        _build_code_regions,
-        _inside_code_region,
-        discover_inline_tools,
+    return "".join(
+        html.escape(part) if kind == "text" else part
+        for kind, part in render_streaming_edit_parts(content)
     )
 
-    inline_tools = discover_inline_tools()
-    code_regions = _build_code_regions(content)
-    result_parts = []
-    pos = 0
 
-    while pos < len(content):
-        # Find the earliest matching complete inline command NOT inside a code block
-        earliest_match = None
-        earliest_tool = None
-        earliest_module = None
-
-        for tool_name, module in inline_tools.items():
-            pattern = module.get_inline_pattern()
-            search_pos = pos
-            while True:
-                match = pattern.search(content, search_pos)
-                if match is None:
-                    break
-                skip_to = _inside_code_region(match.start(), code_regions)
-                if skip_to is not None:
-                    search_pos = skip_to
-                    continue
-                if earliest_match is None or match.start() < earliest_match.start():
-                    earliest_match = match
-                    earliest_tool = tool_name
-                    earliest_module = module
-                break
+def render_streaming_edit_parts(
+    content: str, scanner: "InlineScanner | None" = None
+) -> list[tuple[str, str]]:
+    """
+    Split streaming content into text and rendered inline-command parts.
 
-        if earliest_match is None or earliest_tool is None or earliest_module is None:
-            # No more complete commands - check for partial at the end
-            remaining = content[pos:]
-            if remaining:
-                partial_html = _render_partial_inline_command(
-                    remaining, inline_tools, code_regions, pos
-                )
-                if partial_html:
-                    # Find where the partial command starts
-                    partial_start = _find_partial_command_start(
-                        remaining, inline_tools, code_regions, pos
-                    )
-                    if partial_start is not None:
-                        text_before = remaining[:partial_start].rstrip()
-                        if text_before:
-                            result_parts.append(html.escape(text_before))
-                        result_parts.append(partial_html)
-                    else:
-                        result_parts.append(html.escape(remaining.rstrip()))
-                else:
-                    result_parts.append(html.escape(remaining.rstrip()))
-            break
+    Uses front-to-back parsing to avoid matching commands inside code blocks.
+    Pass the same `scanner` for successive snapshots of a growing message,
+    so each call only rescans what was appended.
 
-        # Escape text before this command
-        text_before = content[pos : earliest_match.start()].rstrip()
+    Returns:
+        ("text", raw text) and ("html", tool card HTML) parts, in order. Text
+        parts are not escaped, so the streaming view can append to them.
+    """
+    from forge.tools.invocation import InlineScanner
+
+    if scanner is None:
+        scanner = InlineScanner()
+    commands = scanner.feed(content)
+    code_regions = scanner.code_regions
+    inline_tools = scanner.inline_tools
+    result_parts: list[tuple[str, str]] = []
+    pos = 0
+
+    for cmd in commands:
+        # Text before this command
+        text_before = content[pos : cmd.start_pos].rstrip()
         if text_before:
-            result_parts.append(html.escape(text_before))
+            result_parts.append(("text", text_before))
 
         # Render the complete inline command
-        args = earliest_module.parse_inline_match(earliest_match)
-        tool_html = _render_inline_command_html(earliest_tool, args, is_streaming=False)
-        result_parts.append(tool_html)
+        tool_html = _render_inline_command_html(cmd.tool_name, cmd.args, is_streaming=False)
+        result_parts.append(("html", tool_html))
 
         # Continue after this command
-        pos = earliest_match.end()
+        pos = cmd.end_pos
+
+    # No more complete commands - check for partial at the end
+    remaining = content[pos:]
+    if remaining:
+        partial_html = _render_partial_inline_command(remaining, inline_tools, code_regions, pos)
+        if partial_html:
+            # Find where the partial command starts
+            partial_start = _find_partial_command_start(remaining, inline_tools, code_regions, pos)
+            if partial_start is not None:
+                text_before = remaining[:partial_start].rstrip()
+                if text_before:
+                    result_parts.append(("text", text_before))
+                result_parts.append(("html", partial_html))
+            else:
+                result_parts.append(("text", remaining.rstrip()))
+        else:
+            result_parts.append(("text", remaining.rstrip()))
 
-    return "".join(result_parts)
+    return result_parts
 
 
 def _find_partial_command_start(
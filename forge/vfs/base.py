@@ -4,6 +4,10 @@ Abstract VFS interface for git-backed file operations
 
 import threading
 from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pygit2
 
 
 class VFS(ABC):
@@ -59,6 +63,11 @@ class VFS(ABC):
         """Read file content"""
         pass
 
+    @abstractmethod
+    def read_file_bytes(self, path: str) -> bytes:
+        """Read file content as raw bytes"""
+        pass
+
     @abstractmethod
     def write_file(self, path: str, content: str) -> None:
         """Write file content"""
@@ -84,3 +93,18 @@ class VFS(ABC):
     def delete_file(self, path: str) -> None:
         """Delete a file"""
         pass
+
+    def get_blob_oid(self, path: str) -> "pygit2.Oid | None":
+        """Git blob OID of a file's committed content.
+
+        Returns None when the content has no blob (e.g. a pending change).
+        Caches keyed by blob OID use this to skip re-reading unchanged files.
+        Raises FileNotFoundError if the file doesn't exist.
+        """
+        if not self.file_exists(path):
+            raise FileNotFoundError(f"File not found: {path}")
+        return None
+
+    def get_git_repository(self) -> "pygit2.Repository | None":
+        """The git repository backing this VFS, if any."""
+        return None
@@ -0,0 +1,91 @@
+"""
+Process-wide LRU of decoded file text, keyed by blob OID.
+
+A fresh GitCommitVFS is created after every commit, and every branch tab has
+its own, yet most files are the same blobs across all of them. Decoding them
+is cached here once per blob rather than once per VFS: blobs are immutable, so
+an entry never goes stale. (Git-lfs pointer blobs map to the content they
+point at, which is equally fixed.)
+
+The cache is bounded by the total length of the cached text.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import pygit2
+
+# Total characters of text kept, across all repositories
+_MAX_CACHED_CHARS = 64 * 1024 * 1024
+
+# Files bigger than this aren't cached (they'd evict everything else)
+_MAX_ENTRY_CHARS = 4 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters of a cache, for diagnostics."""
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class BlobTextCache:
+    """Memory-bounded LRU of blob OID -> decoded text. Thread-safe."""
+
+    def __init__(self, max_chars: int = _MAX_CACHED_CHARS) -> None:
+        self.max_chars = max_chars
+        self._entries: OrderedDict[bytes, str] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, oid: pygit2.Oid) -> str | None:
+        with self._lock:
+            text = self._entries.get(oid.raw)
+            if text is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(oid.raw)
+            return text
+
+    def put(self, oid: pygit2.Oid, text: str) -> None:
+        if len(text) > min(_MAX_ENTRY_CHARS, self.max_chars):
+            return
+        with self._lock:
+            if oid.raw in self._entries:
+                return
+            self._entries[oid.raw] = text
+            self._size += len(text)
+            while self._size > self.max_chars:
+                _oid, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, len(self._entries), self._size)
+
+
+_text_cache = BlobTextCache()
+
+
+def get_blob_text_cache() -> BlobTextCache:
+    """The process-wide decoded text cache."""
+    return _text_cache
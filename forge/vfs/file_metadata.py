@@ -0,0 +1,199 @@
+"""
+File metadata (size, line count, token estimate, binary/text) keyed by blob OID.
+
+The file explorer and repository summaries only need to know how big files
+are, but used to read and decode every file to find out. Sizes of committed
+files now come from the object database header, without inflating content.
+Stats that do need the content are computed once per blob and persisted in an
+append-only file under ``<gitdir>/forge/``. Blobs are immutable, so entries
+never go stale and are shared by every branch and session.
+
+Files with pending changes in a WorkInProgressVFS have no blob yet; their
+metadata is computed from the pending bytes and not cached.
+"""
+
+import contextlib
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygit2
+
+from forge.git_backend.storage import forge_data_dir
+
+if TYPE_CHECKING:
+    from forge.vfs.base import VFS
+
+_INDEX_FILE = "metadata.idx"
+_MAGIC = b"FORGE-METADATA 1\n"
+
+# Record: blob OID, size, line count, flags
+_RECORD = struct.Struct("<20sQQB")
+_FLAG_BINARY = 1
+
+# Blobs smaller than this may be git-lfs pointers, whose header size isn't
+# the size of the file (see forge/vfs/lfs.py); they get full metadata instead
+_MAX_LFS_POINTER_SIZE = 1024
+
+# How much of a file to sniff for NUL bytes when classifying it (as git does)
+_BINARY_SNIFF_SIZE = 8000
+
+
+@dataclass(frozen=True)
+class FileMetadata:
+    """Stats about one file's content."""
+
+    size: int  # In bytes
+    line_count: int
+    is_binary: bool
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Rough token estimate (3 bytes per token average, more accurate for code)"""
+        return self.size // 3
+
+
+def compute_metadata(data: bytes) -> FileMetadata:
+    """Metadata for some file content."""
+    is_binary = b"\0" in data[:_BINARY_SNIFF_SIZE]
+    if not is_binary:
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError:
+            is_binary = True
+    line_count = 0
+    if not is_binary:
+        line_count = data.count(b"\n")
+        if data and not data.endswith(b"\n"):
+            line_count += 1  # Unterminated last line
+    return FileMetadata(size=len(data), line_count=line_count, is_binary=is_binary)
+
+
+class MetadataStore:
+    """Persistent blob-OID -> FileMetadata store for one repository.
+
+    Thread safety: lookups and additions are guarded by an internal lock;
+    appends to the backing file are single writes of whole records, so
+    several Forge processes can share it.
+    """
+
+    def __init__(self, repo: pygit2.Repository, path: Path) -> None:
+        self.repo = repo
+        self.path = path
+        self._entries: dict[bytes, FileMetadata] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Read the backing file (once). A torn trailing record is ignored."""
+        self._loaded = True
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not data.startswith(_MAGIC):
+            return
+        body = data[len(_MAGIC) :]
+        body = body[: len(body) - len(body) % _RECORD.size]
+        for oid, size, line_count, flags in _RECORD.iter_unpack(body):
+            self._entries[oid] = FileMetadata(size, line_count, bool(flags & _FLAG_BINARY))
+
+    def _append(self, oid: bytes, metadata: FileMetadata) -> None:
+        record = _RECORD.pack(
+            oid,
+            metadata.size,
+            metadata.line_count,
+            _FLAG_BINARY if metadata.is_binary else 0,
+        )
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                record = _MAGIC + record
+            os.write(fd, record)
+        finally:
+            os.close(fd)
+
+    def get(self, oid: pygit2.Oid) -> FileMetadata | None:
+        """Cached metadata for a blob, or None if it hasn't been computed yet."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._entries.get(oid.raw)
+
+    def add(self, oid: pygit2.Oid, data: bytes) -> FileMetadata:
+        """Compute a blob's metadata from its (LFS-resolved) content and persist it."""
+        metadata = compute_metadata(data)
+        with self._lock:
+            if oid.raw not in self._entries:
+                self._entries[oid.raw] = metadata
+                # A read-only git dir etc. still keeps the in-memory entry
+                with contextlib.suppress(OSError):
+                    self._append(oid.raw, metadata)
+        return metadata
+
+    def blob_size(self, oid: pygit2.Oid) -> int:
+        """Size of a blob from the object header, without reading its content."""
+        _type, size = self.repo.odb.read_header(oid)
+        return int(size)
+
+
+# Process-wide registry: one store per repository
+_stores: dict[str, MetadataStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_metadata_store(repo: pygit2.Repository) -> MetadataStore:
+    """Get (or create) the metadata store for a repository."""
+    with _stores_lock:
+        store = _stores.get(repo.path)
+        if store is None:
+            store = MetadataStore(repo, forge_data_dir(repo) / _INDEX_FILE)
+            _stores[repo.path] = store
+        return store
+
+
+def _blob_oid(vfs: "VFS", path: str) -> tuple[MetadataStore, pygit2.Oid] | None:
+    """The store and blob OID for a committed file, or None for pending content."""
+    repo = vfs.get_git_repository()
+    if repo is None:
+        return None
+    oid = vfs.get_blob_oid(path)
+    if oid is None:
+        return None
+    return get_metadata_store(repo), oid
+
+
+def get_file_metadata(vfs: "VFS", path: str) -> FileMetadata:
+    """Metadata for a file, reading its content only the first time a blob is seen.
+
+    Raises FileNotFoundError if the file doesn't exist.
+    """
+    found = _blob_oid(vfs, path)
+    if found is None:
+        return compute_metadata(vfs.read_file_bytes(path))
+    store, oid = found
+    metadata = store.get(oid)
+    if metadata is None:
+        metadata = store.add(oid, vfs.read_file_bytes(path))
+    return metadata
+
+
+def get_file_size(vfs: "VFS", path: str) -> int:
+    """Size of a file in bytes. Committed files don't have their content read.
+
+    Raises FileNotFoundError if the file doesn't exist.
+    """
+    found = _blob_oid(vfs, path)
+    if found is None:
+        return len(vfs.read_file_bytes(path))
+    store, oid = found
+    metadata = store.get(oid)
+    if metadata is not None:
+        return metadata.size
+    size = store.blob_size(oid)
+    if size < _MAX_LFS_POINTER_SIZE:
+        return get_file_metadata(vfs, path).size
+    return size
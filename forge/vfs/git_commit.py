@@ -5,7 +5,9 @@ Read-only VFS backed by a git commit
 import pygit2
 
 from .base import VFS
+from .blob_cache import get_blob_text_cache
 from .lfs import is_lfs_pointer, resolve_lfs_bytes
+from .tree_index import get_tree_index
 
 
 class GitCommitVFS(VFS):
@@ -16,6 +18,13 @@ class GitCommitVFS(VFS):
         self.commit = commit
         self.tree = commit.tree
 
+    def _lookup(self, path: str) -> tuple[int, pygit2.Oid]:
+        """(filemode, blob OID) of a file, from the shared tree index"""
+        entry = get_tree_index(self.repo, self.tree.id).lookup(path)
+        if entry is None:
+            raise FileNotFoundError(f"File not found: {path}")
+        return entry
+
     def read_file_bytes(self, path: str) -> bytes:
         """Read file content as raw bytes from git tree.
 
@@ -23,29 +32,43 @@ class GitCommitVFS(VFS):
         the real bytes from the local LFS store so callers get real content
         for free. Raises if the pointer's object hasn't been fetched.
         """
-        try:
-            entry = self.tree[path]
-            blob = self.repo[entry.id]
-            assert isinstance(blob, pygit2.Blob), f"Expected Blob, got {type(blob)}"
-            data = blob.data
-        except KeyError as err:
-            raise FileNotFoundError(f"File not found: {path}") from err
+        _mode, oid = self._lookup(path)
+        blob = self.repo[oid]
+        assert isinstance(blob, pygit2.Blob), f"Expected Blob, got {type(blob)}"
+        data = blob.data
 
         if is_lfs_pointer(data):
             return resolve_lfs_bytes(self.repo.path, path, data, workdir=self.repo.workdir)
         return data
 
+    def get_blob_oid(self, path: str) -> pygit2.Oid:
+        """Get the blob OID of a file in the commit"""
+        return self._lookup(path)[1]
+
+    def get_git_repository(self) -> pygit2.Repository:
+        """The repository this commit belongs to"""
+        return self.repo
+
     def get_file_mode(self, path: str) -> int:
         """Get the git filemode for a path"""
+        entry = get_tree_index(self.repo, self.tree.id).lookup(path)
+        if entry is not None:
+            return entry[0]
+        # Not a file; directories and submodules still have a mode
         try:
             return self.tree[path].filemode
         except KeyError as err:
             raise FileNotFoundError(f"File not found: {path}") from err
 
     def read_file(self, path: str) -> str:
-        """Read file content as text (UTF-8 decoded)"""
-        data = self.read_file_bytes(path)
-        return data.decode("utf-8")
+        """Read file content as text (UTF-8 decoded), cached by blob"""
+        oid = self.get_blob_oid(path)
+        cache = get_blob_text_cache()
+        text = cache.get(oid)
+        if text is None:
+            text = self.read_file_bytes(path).decode("utf-8")
+            cache.put(oid, text)
+        return text
 
     def write_file(self, path: str, content: str) -> None:
         """Write operations not supported on read-only VFS"""
@@ -56,33 +79,18 @@ class GitCommitVFS(VFS):
         raise NotImplementedError("GitCommitVFS is read-only")
 
     def list_all_files(self) -> list[str]:
-        """List all files in the commit (including binary)"""
-        files: list[str] = []
-
-        def walk_tree(tree: pygit2.Tree, prefix: str = "") -> None:
-            for entry in tree:
-                assert entry.name is not None, "Tree entry name should never be None"
-                entry_path = f"{prefix}/{entry.name}" if prefix else entry.name
-
-                # Skip submodules - their filemode is GIT_FILEMODE_COMMIT (0o160000)
-                # and their OIDs point to commits in other repositories
-                if entry.filemode == pygit2.GIT_FILEMODE_COMMIT:
-                    continue
-
-                obj = self.repo[entry.id]
-                assert isinstance(obj, (pygit2.Tree, pygit2.Blob)), (
-                    f"Unexpected git object type: {type(obj)}"
-                )
-                if isinstance(obj, pygit2.Tree):
-                    walk_tree(obj, entry_path)
-                else:
-                    files.append(entry_path)
-
-        walk_tree(self.tree)
-        return files
+        """List all files in the commit (including binary), sorted"""
+        return list(get_tree_index(self.repo, self.tree.id).paths)
+
+    def list_files(self) -> list[str]:
+        """List text files in the commit (excludes binary files), sorted"""
+        return list(get_tree_index(self.repo, self.tree.id).text_paths())
 
     def file_exists(self, path: str) -> bool:
         """Check if file exists in commit"""
+        if get_tree_index(self.repo, self.tree.id).lookup(path) is not None:
+            return True
+        # Not a file, but directories and submodules have always counted
         try:
             self.tree[path]
             return True
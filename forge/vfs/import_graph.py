@@ -0,0 +1,376 @@
+"""
+Python import graph of a repository, used to pick the tests a change affects.
+
+run_tests used to run the whole suite every time. In "affected" mode it runs
+only the test modules that can reach a changed file through imports: a test
+imports (directly or transitively) a changed module, or sits below a changed
+conftest.py.
+
+Parsing imports is the expensive part, so the parsed import statements of
+each Python blob are cached by blob OID. Blobs are immutable, so entries never
+go stale and are shared by all branches and sessions; they persist in an
+append-only file under ``<gitdir>/forge/``. Resolving them to files is cheap
+and redone on every call against the current listing, which keeps the graph
+correct as files come and go. Files with pending changes in a
+WorkInProgressVFS have no blob yet and are parsed from their pending content.
+
+Resolution is deliberately generous: a dotted name resolves to every file it
+could mean (from the repository root or any subdirectory acting as a source
+root). Over-approximating only runs extra tests; missing an edge would skip
+one that should have run.
+"""
+
+import ast
+import contextlib
+import json
+import os
+import posixpath
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygit2
+
+from forge.git_backend.storage import forge_data_dir
+from forge.vfs.tree_index import get_tree_index
+
+if TYPE_CHECKING:
+    from forge.vfs.work_in_progress import WorkInProgressVFS
+
+_INDEX_FILE = "imports.idx"
+_MAGIC = b"FORGE-IMPORTS 1\n"
+
+# Changes to these can't affect what a test does, so they don't force a full
+# run. Not .txt: requirements files and test fixtures use it. Not in test
+# directories either, where any file may be a fixture a test reads.
+_DOC_EXTENSIONS = frozenset({".md", ".rst"})
+_TEST_DIRS = frozenset({"test", "tests", "testing"})
+
+# One import: (relative level, module or "", imported names). For
+# "from . import x" that's (1, "", ("x",)); for "import a.b" (0, "a.b", ()).
+ImportRef = tuple[int, str, tuple[str, ...]]
+
+
+def parse_imports(source: str | bytes) -> tuple[ImportRef, ...] | None:
+    """Import statements anywhere in a module, or None if it doesn't parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    refs: list[ImportRef] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            refs.extend((0, alias.name, ()) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != "*")
+            refs.append((node.level, node.module or "", names))
+    return tuple(refs)
+
+
+def _is_doc(path: str) -> bool:
+    """Whether a changed file is documentation no test can depend on."""
+    directories = path.split("/")[:-1]
+    return posixpath.splitext(path)[1] in _DOC_EXTENSIONS and _TEST_DIRS.isdisjoint(directories)
+
+
+def is_test_file(path: str) -> bool:
+    """Whether pytest would collect a file as a test module by default."""
+    name = posixpath.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+class ImportStore:
+    """Persistent blob-OID -> parsed imports store for one repository.
+
+    A blob that doesn't parse is stored as None. Thread safety: lookups and
+    additions are guarded by an internal lock; appends to the backing file
+    are single writes of whole lines, so several Forge processes can share it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[bytes, tuple[ImportRef, ...] | None] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        """Read the backing file (once). A torn trailing line is ignored."""
+        self._loaded = True
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not data.startswith(_MAGIC):
+            return
+        for line in data[len(_MAGIC) :].splitlines():
+            oid_hex, _sep, payload = line.partition(b" ")
+            try:
+                refs = json.loads(payload)
+                oid = bytes.fromhex(oid_hex.decode("ascii"))
+            except (ValueError, UnicodeDecodeError):
+                continue
+            self._entries[oid] = (
+                None
+                if refs is None
+                else tuple((level, module, tuple(names)) for level, module, names in refs)
+            )
+
+    def _append(self, oid: bytes, refs: tuple[ImportRef, ...] | None) -> None:
+        line = oid.hex().encode("ascii") + b" " + json.dumps(refs).encode("utf-8") + b"\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                line = _MAGIC + line
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+    def get(self, oid: pygit2.Oid) -> tuple[tuple[ImportRef, ...] | None] | None:
+        """(imports,) for a blob, or None if it hasn't been parsed yet."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if oid.raw not in self._entries:
+                return None
+            return (self._entries[oid.raw],)
+
+    def add(self, oid: pygit2.Oid, data: bytes) -> tuple[ImportRef, ...] | None:
+        """Parse a blob's imports and persist the entry."""
+        refs = parse_imports(data)
+        with self._lock:
+            if oid.raw not in self._entries:
+                self._entries[oid.raw] = refs
+                # A read-only git dir etc. still keeps the in-memory entry
+                with contextlib.suppress(OSError):
+                    self._append(oid.raw, refs)
+        return refs
+
+
+# Process-wide registry: one store per repository
+_stores: dict[str, ImportStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_import_store(repo: pygit2.Repository) -> ImportStore:
+    """Get (or create) the import store for a repository."""
+    with _stores_lock:
+        store = _stores.get(repo.path)
+        if store is None:
+            store = ImportStore(forge_data_dir(repo) / _INDEX_FILE)
+            _stores[repo.path] = store
+        return store
+
+
+def _module_names(path: str) -> list[str]:
+    """Every dotted name a .py file could be imported as.
+
+    "src/pkg/mod.py" -> ["src.pkg.mod", "pkg.mod", "mod"]; a package's
+    __init__.py is named after its directory.
+    """
+    parts = path[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return [".".join(parts[i:]) for i in range(len(parts))]
+
+
+class ImportGraph:
+    """Which Python files each Python file imports, resolved against a listing."""
+
+    def __init__(self, py_files: list[str]) -> None:
+        self._by_name: dict[str, list[str]] = {}
+        for path in py_files:
+            for name in _module_names(path):
+                self._by_name.setdefault(name, []).append(path)
+        self.edges: dict[str, set[str]] = {}
+
+    def _resolve_name(self, name: str, into: set[str]) -> None:
+        """Files for a dotted name plus the packages imported on the way."""
+        parts = name.split(".")
+        for i in range(1, len(parts) + 1):
+            into.update(self._by_name.get(".".join(parts[:i]), ()))
+
+    def add_file(self, path: str, refs: tuple[ImportRef, ...]) -> None:
+        targets: set[str] = set()
+        package = posixpath.dirname(path)
+        for level, module, names in refs:
+            if level:
+                base = package
+                for _ in range(level - 1):
+                    base = posixpath.dirname(base)
+                prefix = base.replace("/", ".")
+                module = ".".join(p for p in (prefix, module) if p)
+            if module:
+                self._resolve_name(module, targets)
+            for name in names:
+                # "from pkg import mod" may import a submodule
+                self._resolve_name(f"{module}.{name}" if module else name, targets)
+        targets.discard(path)
+        self.edges[path] = targets
+
+    def add_conftests(self, test_files: list[str], conftests: list[str]) -> None:
+        """Make each test depend on the conftest.py files pytest loads for it."""
+        by_dir = {posixpath.dirname(c): c for c in conftests}
+        for test in test_files:
+            directory = posixpath.dirname(test)
+            while True:
+                conftest = by_dir.get(directory)
+                if conftest is not None:
+                    self.edges.setdefault(test, set()).add(conftest)
+                if not directory:
+                    break
+                directory = posixpath.dirname(directory)
+
+    def reaching(self, targets: set[str]) -> set[str]:
+        """Files that import any of ``targets``, directly or transitively (and the targets)."""
+        importers: dict[str, list[str]] = {}
+        for source, deps in self.edges.items():
+            for dep in deps:
+                importers.setdefault(dep, []).append(source)
+        seen = set(targets)
+        queue = deque(targets)
+        while queue:
+            for source in importers.get(queue.popleft(), ()):
+                if source not in seen:
+                    seen.add(source)
+                    queue.append(source)
+        return seen
+
+
+@dataclass
+class TestImpact:
+    """The tests a set of changes affects.
+
+    If ``full_run_reason`` is set, the impact couldn't be narrowed and the
+    whole suite should run; ``selected`` then lists every test module.
+    """
+
+    __test__ = False  # Not a pytest test class
+
+    changed: list[str]
+    selected: list[str]
+    skipped: list[str]
+    full_run_reason: str | None = None
+    unparsed: list[str] = field(default_factory=list)
+
+
+def _default_branch_base(vfs: "WorkInProgressVFS") -> pygit2.Oid | None:
+    """Commit the branch forked from the default branch at, if any."""
+    repo = vfs.repo
+    try:
+        default = repo.get_default_branch()
+        default_head = repo.get_branch_head(default)
+    except (KeyError, ValueError):
+        return None
+    head = vfs.base_vfs.commit
+    if default_head.id == head.id:
+        return None
+    base = repo.repo.merge_base(head.id, default_head.id)
+    return base if base is not None and base != head.id else None
+
+
+def changed_paths(vfs: "WorkInProgressVFS") -> list[str]:
+    """Paths changed on the branch since it left the default branch, plus pending changes."""
+    changed: set[str] = set(vfs.pending_changes)
+    changed.update(vfs.pending_binary_changes)
+    changed.update(vfs.deleted_files)
+
+    base_oid = _default_branch_base(vfs)
+    if base_oid is not None:
+        git_repo = vfs.repo.repo
+        base_tree = git_repo[base_oid].peel(pygit2.Tree)
+        base = get_tree_index(git_repo, base_tree.id)
+        head = get_tree_index(git_repo, vfs.base_vfs.tree.id)
+        base_entries = dict(zip(base.paths, base.oids, strict=True))
+        for path, oid in zip(head.paths, head.oids, strict=True):
+            if base_entries.pop(path, None) != oid:
+                changed.add(path)
+        changed.update(base_entries)  # Deleted on the branch
+
+    return sorted(changed)
+
+
+def _file_imports(
+    vfs: "WorkInProgressVFS", store: ImportStore, path: str
+) -> tuple[ImportRef, ...] | None:
+    oid = vfs.get_blob_oid(path)
+    if oid is None:
+        return parse_imports(vfs.read_file_bytes(path))
+    cached = store.get(oid)
+    if cached is not None:
+        return cached[0]
+    return store.add(oid, vfs.read_file_bytes(path))
+
+
+def affected_tests(vfs: "WorkInProgressVFS") -> TestImpact:
+    """Work out which test modules can reach the files changed on this branch."""
+    changed = changed_paths(vfs)
+    files = vfs.list_files()
+    py_files = [f for f in files if f.endswith(".py")]
+    test_files = [f for f in py_files if is_test_file(f)]
+
+    def full_run(reason: str) -> TestImpact:
+        return TestImpact(changed, test_files, [], full_run_reason=reason)
+
+    # Non-Python changes (data, config, build files) may matter to any test
+    others = [p for p in changed if not p.endswith(".py") and not _is_doc(p)]
+    if others:
+        return full_run(f"non-Python files changed: {', '.join(others[:5])}")
+
+    # Deleted modules stay resolvable, so their importers count as affected
+    graph = ImportGraph(sorted(set(py_files).union(p for p in changed if p.endswith(".py"))))
+    store = get_import_store(vfs.get_git_repository())
+    unparsed: list[str] = []
+    for path in py_files:
+        refs = _file_imports(vfs, store, path)
+        if refs is None:
+            unparsed.append(path)
+            continue
+        graph.add_file(path, refs)
+    graph.add_conftests(test_files, [f for f in py_files if posixpath.basename(f) == "conftest.py"])
+
+    if any(p in unparsed for p in changed):
+        return TestImpact(
+            changed,
+            test_files,
+            [],
+            full_run_reason="a changed file has a syntax error",
+            unparsed=unparsed,
+        )
+
+    reached = graph.reaching(set(changed))
+    selected = [t for t in test_files if t in reached or t in unparsed]
+    skipped = [t for t in test_files if t not in reached and t not in unparsed]
+    return TestImpact(changed, selected, skipped, unparsed=unparsed)
+
+
+def external_modules(vfs: "WorkInProgressVFS") -> list[str]:
+    """Absolute imports in the repository that no file in it provides.
+
+    These are the third-party modules the project uses (the warm pytest
+    worker preloads them). Standard-library modules are left out, and so is
+    anything whose top-level name matches a file or directory anywhere in the
+    tree: it might be importable from there (through a source root or a
+    sys.path tweak), and that copy must not be loaded ahead of the tests.
+    """
+    files = vfs.list_files()
+    local: set[str] = set()
+    for path in files:
+        parts = path.split("/")
+        local.update(parts[:-1])
+        local.add(parts[-1].partition(".")[0])
+    store = get_import_store(vfs.get_git_repository())
+    modules: set[str] = set()
+    for path in files:
+        if not path.endswith(".py"):
+            continue
+        for level, module, _names in _file_imports(vfs, store, path) or ():
+            top = module.partition(".")[0]
+            if level or not top or top in local or top == "__future__":
+                continue
+            if top in sys.stdlib_module_names:
+                continue
+            modules.add(module)
+    return sorted(modules)
@@ -0,0 +1,602 @@
+"""
+Persistent, incrementally-synced on-disk copies of branch VFS state.
+
+Tools that need real files (run_tests, check, user tools) used to get a
+fresh ``mkdtemp`` with every file of the tree written out and the whole
+``.git`` directory copied in. On large repositories that cost seconds per
+call, and the AI calls these tools several times per turn.
+
+Instead, each (repository, branch) pair gets one directory that lives for the
+rest of the process. On every sync we only touch paths that can differ from
+what is already on disk:
+
+- paths that changed between the last-materialized base tree and the new one
+  (a cheap tree-to-tree diff, identical subtrees are skipped by OID), and
+- paths that carried pending changes or deletions last time or carry them now.
+
+Each of those is compared by blob OID against what we last wrote, so an
+unchanged file is never rewritten.
+
+The ``.git`` in the directory is a small standalone repository whose object
+database borrows the real one through ``objects/info/alternates``. Git
+commands work there (log, diff against HEAD, ...) without copying any objects,
+and anything they write stays out of the user's repository.
+
+Callers may still delete the directory when they're done (the old contract of
+``materialize_to_tempdir``); the next sync notices and rebuilds it from
+scratch.
+
+Every file written is recorded with its (size, mtime_ns, inode), and every
+directory with its mtime. After a command has run in the directory,
+``disk_changes`` finds what it touched with one stat per entry: files whose
+stat differs, and new files in the (few) directories whose mtime moved.
+Only those are read, by ``write_back`` (which copies a command's edits, such
+as formatter output, into the VFS) and by the next sync (which restores
+files a command changed but the VFS didn't take over). As in git's "racy
+clean" rule, a file whose mtime isn't older than the end of the sync can't
+be trusted to look different when changed, so it always counts as a
+candidate.
+
+New files a command leaves behind (build output, test artifacts) are removed
+by the next sync unless the VFS has taken them over, so they can't affect
+later runs. Tool caches such as ``__pycache__`` and ``.pytest_cache`` are
+kept: they validate themselves against the sources.
+"""
+
+import atexit
+import contextlib
+import os
+import posixpath
+import shutil
+import stat
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pygit2
+
+from forge.git_backend.storage import common_git_dir
+
+if TYPE_CHECKING:
+    from forge.vfs.work_in_progress import WorkInProgressVFS
+
+# (blob OID, git filemode) of a path as it exists on disk, or None if absent
+_EntryState = tuple[pygit2.Oid, int] | None
+
+# (size, mtime_ns, inode) of a file as we left it on disk
+_StatKey = tuple[int, int, int]
+
+# Touched at the end of every sync; its mtime is the racy-clean cutoff
+_STAMP_FILE = "forge-sync-stamp"
+
+# Tool caches a command may leave in the directory. They check their entries
+# against the sources themselves, so they are kept across syncs (and never
+# reported as new files); anything else the VFS doesn't have is removed.
+_KEPT_UNTRACKED = frozenset({"__pycache__", ".pytest_cache", ".mypy_cache", ".ruff_cache"})
+
+
+@dataclass
+class DiskChanges:
+    """Paths that may have changed on disk since the last sync.
+
+    ``modified`` are files we wrote whose stat differs (or is too recent to
+    tell): candidates, their content may still be the same. ``added`` are
+    files we didn't write, ``deleted`` files we wrote that are gone.
+    """
+
+    modified: list[str] = field(default_factory=list)
+    added: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+
+def _stat_key(st: os.stat_result) -> _StatKey:
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+def _ancestors(filepath: str) -> list[str]:
+    """Directories containing ``filepath``, up to the root ("")."""
+    dirs = []
+    while filepath:
+        filepath = posixpath.dirname(filepath)
+        dirs.append(filepath)
+    return dirs
+
+
+class MaterializedTree:
+    """One branch's working copy on disk, kept in sync with its VFS.
+
+    Thread safety: sync() holds an internal lock, so two tools materializing
+    the same branch from different threads are serialized.
+    """
+
+    def __init__(self, repo: pygit2.Repository, branch_name: str) -> None:
+        self.repo = repo
+        self.branch_name = branch_name
+        self.root = Path(tempfile.mkdtemp(prefix="forge_vfs_"))
+
+        # Base tree the directory was last synced against (None = never synced)
+        self._tree_oid: pygit2.Oid | None = None
+        # Paths whose on-disk state differs from that base tree: pending
+        # writes (their blob OID) and deletions (None)
+        self._overlay: dict[str, _EntryState] = {}
+
+        # Stat of every file we wrote, mtime of every directory holding them
+        self._files: dict[str, _StatKey] = {}
+        self._dirs: dict[str, int] = {}
+        # Directories whose mtime must be re-recorded at the end of a sync
+        self._touched_dirs: set[str] = set()
+        # mtime_ns of the stamp file at the end of the last sync
+        self._stamp_ns = 0
+
+        self._lock = threading.Lock()
+
+    def sync(self, vfs: "WorkInProgressVFS") -> Path:
+        """Bring the directory up to date with ``vfs`` and return its path."""
+        with self._lock:
+            if self._tree_oid is None or not (self.root / ".git").is_dir():
+                self._full_sync(vfs)
+            else:
+                self._incremental_sync(vfs)
+            return self.root
+
+    def dispose(self) -> None:
+        """Delete the directory. The next sync rebuilds it from scratch."""
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._tree_oid = None
+            self._overlay = {}
+            self._files = {}
+            self._dirs = {}
+
+    def disk_changes(self) -> DiskChanges:
+        """What may have changed on disk since the last sync (see module docstring)."""
+        with self._lock:
+            if self._tree_oid is None:
+                return DiskChanges()
+            changes, _dirs = self._scan()
+            return changes
+
+    # --- Syncing ---
+
+    def _full_sync(self, vfs: "WorkInProgressVFS") -> None:
+        """Write the whole tree into an empty directory."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.root.mkdir(parents=True)
+        self._files = {}
+        self._dirs = {}
+
+        for filepath in vfs.list_all_files():
+            self._write_entry(vfs, filepath, self._desired_state(vfs, filepath))
+
+        self._init_git_dir(vfs)
+        self._copy_submodules(None)
+        self._record(vfs)
+
+        # Record every directory our files live in
+        self._touched_dirs = {d for filepath in self._files for d in _ancestors(filepath)}
+        self._record_dirs()
+
+    def _incremental_sync(self, vfs: "WorkInProgressVFS") -> None:
+        """Touch only the paths that can differ from what's on disk."""
+        assert self._tree_oid is not None
+        old_tree = self.repo[self._tree_oid]
+        assert isinstance(old_tree, pygit2.Tree)
+        new_tree = vfs.base_vfs.tree
+
+        dirty: set[str] = set(self._overlay)
+        dirty.update(vfs.pending_changes, vfs.pending_binary_changes, vfs.deleted_files)
+
+        # Files a command changed or deleted since the last sync (and the VFS
+        # didn't take over) are rewritten
+        changes, changed_dirs = self._scan()
+        self._touched_dirs = set(changed_dirs)
+        forced: set[str] = set()
+        for filepath in (*changes.modified, *changes.deleted):
+            if self._disk_matches(self._current_state(old_tree, filepath), filepath):
+                self._record_file(filepath)
+            else:
+                forced.add(filepath)
+        dirty.update(forced)
+
+        # Files a command created that the VFS doesn't have (build output,
+        # test artifacts) would otherwise leak into later runs
+        for filepath in changes.added:
+            if self._desired_state(vfs, filepath) is None:
+                self._remove_entry(filepath)
+
+        changed_submodules: set[str] = set()
+        if new_tree.id != old_tree.id:
+            for delta in old_tree.diff_to_tree(new_tree).deltas:
+                for diff_file in (delta.old_file, delta.new_file):
+                    if diff_file.mode == pygit2.GIT_FILEMODE_COMMIT:
+                        changed_submodules.add(diff_file.path)
+                    elif diff_file.mode != 0:
+                        dirty.add(diff_file.path)
+
+        # Removals first, so a file replaced by a directory (or vice versa)
+        # is out of the way before the new entry is written
+        updates: list[tuple[str, _EntryState]] = []
+        for filepath in sorted(dirty):
+            current = self._current_state(old_tree, filepath)
+            desired = self._desired_state(vfs, filepath)
+            if current == desired and filepath not in forced:
+                continue
+            if current is not None:
+                self._remove_entry(filepath)
+            if desired is not None:
+                updates.append((filepath, desired))
+
+        for filepath, desired in updates:
+            self._write_entry(vfs, filepath, desired)
+
+        if new_tree.id != old_tree.id:
+            self._update_git_head(vfs)
+        self._copy_submodules(changed_submodules)
+        self._record(vfs)
+        self._record_dirs()
+
+    def _record(self, vfs: "WorkInProgressVFS") -> None:
+        """Remember what is on disk now, relative to the VFS's base tree."""
+        self._tree_oid = vfs.base_vfs.tree.id
+        self._overlay = {
+            filepath: self._desired_state(vfs, filepath)
+            for filepath in (
+                *vfs.pending_changes,
+                *vfs.pending_binary_changes,
+                *vfs.deleted_files,
+            )
+        }
+
+    def _record_file(self, filepath: str) -> None:
+        """Remember the stat of a file we just wrote."""
+        self._files[filepath] = _stat_key((self.root / filepath).lstat())
+        self._touched_dirs.update(_ancestors(filepath))
+
+    def _record_dirs(self) -> None:
+        """Re-read the mtimes of touched directories and the racy-clean cutoff.
+
+        Runs last in a sync, after everything in the directory was written.
+        """
+        for directory in self._touched_dirs:
+            try:
+                self._dirs[directory] = (self.root / directory).stat().st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                self._dirs.pop(directory, None)
+        self._touched_dirs = set()
+        stamp = self.root / ".git" / _STAMP_FILE
+        stamp.write_bytes(b"")
+        self._stamp_ns = stamp.stat().st_mtime_ns
+
+    def _scan(self) -> tuple[DiskChanges, list[str]]:
+        """Stat everything we recorded; list directories whose mtime moved."""
+        changes = DiskChanges()
+        for filepath, key in self._files.items():
+            try:
+                st = (self.root / filepath).lstat()
+            except (FileNotFoundError, NotADirectoryError):
+                changes.deleted.append(filepath)
+                continue
+            if _stat_key(st) != key or key[1] >= self._stamp_ns:
+                changes.modified.append(filepath)
+
+        changed_dirs: list[str] = []
+        for directory, mtime in self._dirs.items():
+            try:
+                current = (self.root / directory).stat().st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            if current != mtime or mtime >= self._stamp_ns:
+                changed_dirs.append(directory)
+                self._scan_dir(directory, changes.added)
+        return changes, changed_dirs
+
+    def _scan_dir(self, directory: str, added: list[str]) -> None:
+        """Add files in ``directory`` we didn't write (all of them in new subdirectories)."""
+        try:
+            entries = list(os.scandir(self.root / directory))
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        for entry in entries:
+            filepath = posixpath.join(directory, entry.name) if directory else entry.name
+            if filepath == ".git" or filepath in self._files or filepath in self._dirs:
+                continue
+            if entry.name in _KEPT_UNTRACKED:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if filepath not in self._submodules():
+                    self._scan_dir(filepath, added)
+            else:
+                added.append(filepath)
+
+    def _submodules(self) -> set[str]:
+        return set(self.repo.listall_submodules()) if self.repo.workdir else set()
+
+    def _disk_matches(self, state: _EntryState, filepath: str) -> bool:
+        """Whether a path on disk holds ``state``'s content (the mode is not compared)."""
+        full_path = self.root / filepath
+        if state is None:
+            return not full_path.is_symlink() and not full_path.exists()
+        oid, mode = state
+        if mode == pygit2.GIT_FILEMODE_LINK:
+            return (
+                full_path.is_symlink()
+                and pygit2.hash(os.readlink(full_path).encode("utf-8")) == oid
+            )
+        if full_path.is_symlink() or not full_path.is_file():
+            return False
+        return pygit2.hashfile(str(full_path)) == oid
+
+    def _current_state(self, old_tree: pygit2.Tree, filepath: str) -> _EntryState:
+        """What we last wrote at ``filepath``."""
+        if filepath in self._overlay:
+            return self._overlay[filepath]
+        return _tree_entry_state(old_tree, filepath)
+
+    @staticmethod
+    def _desired_state(vfs: "WorkInProgressVFS", filepath: str) -> _EntryState:
+        """What ``filepath`` should look like on disk for ``vfs``."""
+        if filepath in vfs.deleted_files:
+            return None
+        base = _tree_entry_state(vfs.base_vfs.tree, filepath)
+        if filepath in vfs.pending_changes:
+            data = vfs.pending_changes[filepath].encode("utf-8")
+        elif filepath in vfs.pending_binary_changes:
+            data = vfs.pending_binary_changes[filepath]
+        else:
+            return base
+        # Edited files keep their executable bit; anything else becomes a
+        # regular file
+        mode = pygit2.GIT_FILEMODE_BLOB
+        if base is not None and base[1] == pygit2.GIT_FILEMODE_BLOB_EXECUTABLE:
+            mode = pygit2.GIT_FILEMODE_BLOB_EXECUTABLE
+        return (pygit2.hash(data), mode)
+
+    # --- Filesystem ---
+
+    def _write_entry(self, vfs: "WorkInProgressVFS", filepath: str, state: _EntryState) -> None:
+        """Write one VFS file to disk according to its desired state."""
+        assert state is not None
+        _oid, mode = state
+        full_path = self.root / filepath
+        self._make_parent_dirs(full_path)
+        # Something the last tool run left behind (never a tracked entry,
+        # those were removed by the caller)
+        if full_path.is_symlink() or full_path.is_dir():
+            self._remove_entry(filepath)
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if mode == pygit2.GIT_FILEMODE_LINK:
+            # Symlink targets are stored as text in the blob
+            full_path.symlink_to(vfs.base_vfs.read_file(filepath))
+        else:
+            # Pending text is written as UTF-8, pending binary and base blobs
+            # as raw bytes (read_file_bytes also resolves git-lfs pointers)
+            full_path.write_bytes(vfs.read_file_bytes(filepath))
+            if mode == pygit2.GIT_FILEMODE_BLOB_EXECUTABLE:
+                current = full_path.stat().st_mode
+                full_path.chmod(current | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        self._record_file(filepath)
+
+    def _make_parent_dirs(self, full_path: Path) -> None:
+        """Create parent directories, replacing any file standing in the way."""
+        current = self.root
+        for part in full_path.relative_to(self.root).parts[:-1]:
+            current = current / part
+            if current.is_symlink() or current.is_file():
+                current.unlink()
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _remove_entry(self, filepath: str) -> None:
+        """Remove a path and any directories it leaves empty."""
+        full_path = self.root / filepath
+        if full_path.is_symlink() or full_path.is_file():
+            full_path.unlink()
+        elif full_path.is_dir():
+            shutil.rmtree(full_path)
+            prefix = filepath + "/"
+            self._files = {p: k for p, k in self._files.items() if not p.startswith(prefix)}
+            self._dirs = {d: m for d, m in self._dirs.items() if not d.startswith(prefix)}
+            self._dirs.pop(filepath, None)
+        self._files.pop(filepath, None)
+        self._touched_dirs.update(_ancestors(filepath))
+
+        parent = full_path.parent
+        while parent != self.root:
+            try:
+                parent.rmdir()
+            except OSError:
+                break  # Not empty (or already gone)
+            parent = parent.parent
+
+    # --- .git and submodules ---
+
+    def _init_git_dir(self, vfs: "WorkInProgressVFS") -> None:
+        """Create a .git that shares the real object database via alternates.
+
+        Refs are mirrored so history-aware tooling (git describe, version
+        plugins) sees the same branches and tags. Submodule git dirs are
+        copied once so the submodule checkouts copied below stay usable.
+        """
+        git_dir = Path(pygit2.init_repository(str(self.root)).path)
+        common_dir = common_git_dir(self.repo)
+
+        alternates = git_dir / "objects" / "info" / "alternates"
+        alternates.parent.mkdir(parents=True, exist_ok=True)
+        alternates.write_text(f"{common_dir / 'objects'}\n")
+
+        # Reopen so the object database picks up the alternates file
+        mirror = pygit2.Repository(str(self.root))
+        for ref_name in self.repo.references:
+            if not ref_name.startswith(("refs/heads/", "refs/tags/", "refs/remotes/")):
+                continue
+            ref = self.repo.references[ref_name]
+            if ref.type == pygit2.enums.ReferenceType.SYMBOLIC:
+                continue  # e.g. origin/HEAD
+            with contextlib.suppress(pygit2.GitError, ValueError):
+                mirror.references.create(ref_name, ref.target, force=True)
+
+        modules = common_dir / "modules"
+        if modules.is_dir():
+            shutil.copytree(modules, git_dir / "modules", symlinks=True)
+
+        self._update_git_head(vfs, mirror)
+
+    def _update_git_head(
+        self, vfs: "WorkInProgressVFS", mirror: pygit2.Repository | None = None
+    ) -> None:
+        """Point the mirror's HEAD and index at the VFS's base commit.
+
+        With the index matching the base tree, ``git status`` and
+        ``git diff`` in the directory show exactly the pending changes.
+        """
+        if mirror is None:
+            mirror = pygit2.Repository(str(self.root))
+        ref_name = f"refs/heads/{self.branch_name}"
+        mirror.references.create(ref_name, vfs.base_vfs.commit.id, force=True)
+        mirror.set_head(ref_name)
+        mirror.index.read_tree(vfs.base_vfs.tree)
+        mirror.index.write()
+
+    def _copy_submodules(self, only: set[str] | None) -> None:
+        """Copy submodule checkouts verbatim from the real working directory.
+
+        Submodules are tracked as gitlink entries (commit pointers), not
+        blobs, so they never appear in list_all_files(). Since the AI can't
+        modify submodule contents anyway, their checked-out folders are
+        copied from the real repo. ``only`` limits the copy to submodules
+        whose gitlink changed (None copies all of them).
+        """
+        workdir = self.repo.workdir
+        if not workdir:
+            return  # Bare repository
+        workdir_path = Path(workdir)
+        for sub_path in self.repo.listall_submodules():
+            if only is not None and sub_path not in only:
+                continue
+            src = workdir_path / sub_path
+            dst = self.root / sub_path
+            if dst.exists():
+                shutil.rmtree(dst, ignore_errors=True)
+            if not src.is_dir():
+                continue
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True)
+
+
+def _tree_entry_state(tree: pygit2.Tree, filepath: str) -> _EntryState:
+    """(OID, filemode) of a file in ``tree``, or None if it's absent or not a file."""
+    try:
+        entry = tree[filepath]
+    except KeyError:
+        return None
+    if entry.filemode in (pygit2.GIT_FILEMODE_TREE, pygit2.GIT_FILEMODE_COMMIT):
+        return None
+    return (entry.id, entry.filemode)
+
+
+@dataclass
+class WrittenBack:
+    """A file taken over from the materialized directory into the VFS."""
+
+    path: str
+    before: str | None  # None for a new file
+    after: str
+
+
+@dataclass
+class WriteBack:
+    """Outcome of ``write_back``.
+
+    ``untracked`` are new files left on disk: not taken over because that
+    wasn't asked for, or because they are git-ignored or not UTF-8 text.
+    """
+
+    written: list[WrittenBack] = field(default_factory=list)
+    untracked: list[str] = field(default_factory=list)
+
+    @property
+    def modified_files(self) -> list[str]:
+        return [w.path for w in self.written if w.before is not None]
+
+    @property
+    def new_files(self) -> list[str]:
+        return [w.path for w in self.written if w.before is None]
+
+
+def write_back(vfs: "WorkInProgressVFS", include_new: bool = False) -> WriteBack:
+    """Copy text files a command changed in the branch's materialized directory into ``vfs``.
+
+    Call after running something (tests, formatters, code generators) in the
+    directory ``vfs.materialize_to_tempdir()`` returned. Only paths whose
+    stat changed are read (see ``MaterializedTree.disk_changes``). With
+    ``include_new``, files the command created are added too, unless they
+    are git-ignored. Deletions are not taken over; the next sync restores
+    the files.
+    """
+    tree = get_materialized_tree(vfs.repo.repo, vfs.branch_name)
+    changes = tree.disk_changes()
+    result = WriteBack()
+
+    for filepath in sorted(changes.modified):
+        if filepath in vfs.pending_binary_changes:
+            continue
+        after = _read_text(tree.root / filepath)
+        if after is None:
+            continue
+        try:
+            before = vfs.read_file(filepath)
+        except (FileNotFoundError, KeyError, UnicodeDecodeError):
+            continue  # Not a text file of the VFS
+        if after != before:
+            vfs.write_file(filepath, after)
+            result.written.append(WrittenBack(filepath, before, after))
+
+    if changes.added:
+        mirror = pygit2.Repository(str(tree.root))
+        for filepath in sorted(changes.added):
+            if mirror.path_is_ignored(filepath):
+                continue
+            after = _read_text(tree.root / filepath) if include_new else None
+            if after is None:
+                result.untracked.append(filepath)
+                continue
+            vfs.write_file(filepath, after)
+            result.written.append(WrittenBack(filepath, None, after))
+    return result
+
+
+def _read_text(full_path: Path) -> str | None:
+    """A regular file's content as UTF-8 text, or None if it isn't one."""
+    if full_path.is_symlink() or not full_path.is_file():
+        return None
+    try:
+        return full_path.read_bytes().decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+# Process-wide registry: one materialized tree per (git dir, branch)
+_trees: dict[tuple[str, str], MaterializedTree] = {}
+_trees_lock = threading.Lock()
+
+
+def get_materialized_tree(repo: pygit2.Repository, branch_name: str) -> MaterializedTree:
+    """Get (or create) the materialized tree for a branch of ``repo``."""
+    key = (repo.path, branch_name)
+    with _trees_lock:
+        tree = _trees.get(key)
+        if tree is None:
+            tree = MaterializedTree(repo, branch_name)
+            _trees[key] = tree
+        return tree
+
+
+@atexit.register
+def _cleanup_materialized_trees() -> None:
+    """Delete every materialized directory when the process exits."""
+    with _trees_lock:
+        for tree in _trees.values():
+            shutil.rmtree(tree.root, ignore_errors=True)
+        _trees.clear()
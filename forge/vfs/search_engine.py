@@ -0,0 +1,258 @@
+"""
+Shared repository search engine behind grep_open, grep_context and the
+search panel.
+
+Searching is split in two steps:
+
+1. plan_search() runs on the thread that owns the VFS. It resolves each file
+   to either its committed blob OID or, for pending changes, its bytes. This
+   is cheap and is the only step that touches the VFS.
+2. iter_line_matches() / iter_file_matches() scan the plan and stream results
+   through a generator, in file order; count_line_matches() only counts. They don't touch the VFS, so they can
+   run on any thread (the search panel scans off the Qt main thread).
+
+Small scans run in-process. Large ones are cut into batches and fanned out
+over the shared process pool (regex matching holds the GIL, so threads
+wouldn't help); workers read blobs straight from the object database by OID.
+At most a couple of batches per worker are in flight, so a consumer that
+stops early (grep_context hitting max_matches) doesn't pay for the rest.
+
+Worker processes pickle functions and results by module path, so this lives
+outside forge/tools/builtin/ (whose modules the ToolManager re-executes on
+discovery) and must not import Qt (directly or through forge.runtime) at
+module level.
+"""
+
+import re
+import threading
+from collections import deque
+from collections.abc import Generator, Iterator
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import pygit2
+
+from forge.vfs.lfs import is_lfs_pointer, resolve_lfs_bytes
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from forge.vfs.base import VFS
+
+# Scans over fewer files than this stay in-process (spawning work out costs
+# more than it saves)
+PARALLEL_MIN_FILES = 256
+
+# Files per batch sent to a worker process
+_BATCH_SIZE = 64
+
+
+@dataclass(frozen=True)
+class SearchSource:
+    """One file to scan: a committed blob (by OID) or raw pending bytes."""
+
+    filepath: str
+    blob_oid: str | None = None
+    data: bytes | None = None
+
+
+@dataclass
+class SearchPlan:
+    """Everything a scan needs, detached from the VFS."""
+
+    repo_path: str | None
+    sources: list[SearchSource]
+
+
+@dataclass
+class LineMatch:
+    """A matching line, with optional surrounding context lines."""
+
+    filepath: str
+    line: int  # 1-based
+    text: str
+    before: list[str]
+    after: list[str]
+
+
+@dataclass
+class FileMatch:
+    """Whole-content match summary for one file (re.findall semantics)."""
+
+    filepath: str
+    match_count: int
+    first_match: Any  # str, or a tuple of groups if the pattern has several
+
+
+def plan_search(vfs: "VFS", files: list[str]) -> SearchPlan:
+    """Resolve ``files`` to scan sources. Must run on the VFS's owner thread.
+
+    Files that don't exist are skipped, like the scan skips undecodable ones.
+    """
+    repo = vfs.get_git_repository()
+    sources: list[SearchSource] = []
+    for filepath in files:
+        try:
+            oid = vfs.get_blob_oid(filepath) if repo is not None else None
+            if oid is not None:
+                sources.append(SearchSource(filepath, blob_oid=str(oid)))
+            else:
+                sources.append(SearchSource(filepath, data=vfs.read_file_bytes(filepath)))
+        except FileNotFoundError:
+            continue
+    return SearchPlan(repo.path if repo is not None else None, sources)
+
+
+def iter_line_matches(
+    plan: SearchPlan,
+    regex: re.Pattern[str],
+    context_before: int = 0,
+    context_after: int = 0,
+) -> Generator[LineMatch, None, None]:
+    """Yield every line matching ``regex``, in file order.
+
+    Close the generator to stop early; batches still queued are cancelled.
+    """
+    for result in _iter_results(plan, regex, "lines", context_before, context_after):
+        assert isinstance(result, LineMatch)
+        yield result
+
+
+def iter_file_matches(plan: SearchPlan, regex: re.Pattern[str]) -> Iterator[FileMatch]:
+    """Yield a FileMatch for every file whose content matches ``regex``."""
+    for result in _iter_results(plan, regex, "files", 0, 0):
+        assert isinstance(result, FileMatch)
+        yield result
+
+
+def count_line_matches(plan: SearchPlan, regex: re.Pattern[str]) -> int:
+    """Number of lines matching ``regex``, without building matches for them."""
+    total = 0
+    for result in _iter_results(plan, regex, "count", 0, 0):
+        assert isinstance(result, FileMatch)
+        total += result.match_count
+    return total
+
+
+def _iter_results(
+    plan: SearchPlan,
+    regex: re.Pattern[str],
+    mode: str,
+    context_before: int,
+    context_after: int,
+) -> Iterator[LineMatch | FileMatch]:
+    """Scan a plan in-process or on the process pool, preserving order."""
+    args = (plan.repo_path, regex.pattern, regex.flags, mode, context_before, context_after)
+    sources = plan.sources
+
+    pool = None
+    if len(sources) >= PARALLEL_MIN_FILES:
+        from forge.runtime.process_pool import get_process_pool, worker_count
+
+        pool = get_process_pool()
+    if pool is None:
+        for source in sources:
+            yield from _scan_batch(*args, [source])
+        return
+
+    batches = [sources[i : i + _BATCH_SIZE] for i in range(0, len(sources), _BATCH_SIZE)]
+    in_flight: deque[tuple[int, Future[list[LineMatch | FileMatch]]]] = deque()
+    next_batch = 0
+    try:
+        while next_batch < len(batches) or in_flight:
+            while next_batch < len(batches) and len(in_flight) < 2 * worker_count():
+                in_flight.append((next_batch, pool.submit(_scan_batch, *args, batches[next_batch])))
+                next_batch += 1
+            index, future = in_flight.popleft()
+            try:
+                results = future.result()
+            except BrokenProcessPool:
+                from forge.runtime.process_pool import discard_process_pool
+
+                discard_process_pool()
+                # Finish this batch and everything after it in-process
+                for _, pending in in_flight:
+                    pending.cancel()
+                in_flight.clear()
+                for batch in batches[index:]:
+                    yield from _scan_batch(*args, batch)
+                return
+            yield from results
+    finally:
+        # Consumer stopped early (or we're done): drop unstarted batches
+        for _, pending in in_flight:
+            pending.cancel()
+
+
+# Repositories opened by this thread (workers scan many batches per repo)
+_local = threading.local()
+
+
+def _open_repo(repo_path: str) -> pygit2.Repository:
+    repos: dict[str, pygit2.Repository] | None = getattr(_local, "repos", None)
+    if repos is None:
+        repos = _local.repos = {}
+    repo = repos.get(repo_path)
+    if repo is None:
+        repo = repos[repo_path] = pygit2.Repository(repo_path)
+    return repo
+
+
+def _read_source(repo_path: str | None, source: SearchSource) -> bytes:
+    """Bytes of a source; blobs are read by OID, resolving git-lfs pointers."""
+    if source.data is not None:
+        return source.data
+    assert repo_path is not None and source.blob_oid is not None
+    repo = _open_repo(repo_path)
+    blob = repo[source.blob_oid]
+    assert isinstance(blob, pygit2.Blob), f"Expected Blob, got {type(blob)}"
+    data = blob.data
+    if is_lfs_pointer(data):
+        return resolve_lfs_bytes(repo.path, source.filepath, data, workdir=repo.workdir)
+    return data
+
+
+def _scan_batch(
+    repo_path: str | None,
+    pattern: str,
+    flags: int,
+    mode: str,
+    context_before: int,
+    context_after: int,
+    sources: list[SearchSource],
+) -> list[LineMatch | FileMatch]:
+    """Scan some sources. Runs in worker processes, so arguments are plain data."""
+    regex = re.compile(pattern, flags)
+    results: list[LineMatch | FileMatch] = []
+    for source in sources:
+        try:
+            content = _read_source(repo_path, source).decode("utf-8")
+        except (FileNotFoundError, UnicodeDecodeError):
+            continue  # Missing LFS object or binary content
+
+        if mode == "files":
+            found = regex.findall(content)
+            if found:
+                results.append(FileMatch(source.filepath, len(found), found[0]))
+            continue
+
+        lines = content.split("\n")
+        if mode == "count":
+            count = sum(1 for line in lines if regex.search(line))
+            if count:
+                results.append(FileMatch(source.filepath, count, None))
+            continue
+
+        for i, line in enumerate(lines):
+            if regex.search(line):
+                results.append(
+                    LineMatch(
+                        filepath=source.filepath,
+                        line=i + 1,
+                        text=line,
+                        before=lines[max(0, i - context_before) : i],
+                        after=lines[i + 1 : i + 1 + context_after],
+                    )
+                )
+    return results
@@ -0,0 +1,136 @@
+"""
+Flat, memoized path index of git trees.
+
+Listing a commit's files means walking every tree in it. Nearly every tool
+(grep, scout, quick open, the file explorer, summaries) lists files, often
+several times per turn, and each VFS used to walk the whole tree again.
+
+A TreeIndex is the flattened listing of one tree: sorted paths with their
+filemodes and blob OIDs. Indexes are keyed by tree OID, so they're shared by
+every VFS looking at the same commit. Subtrees are indexed (and cached) the
+same way, so after a commit only the directories that changed are walked;
+unchanged ones are spliced in from their cached index.
+
+Git orders tree entries as if directory names ended in "/", which makes a
+depth-first walk come out in plain byte (and so str) order of full paths. The
+index is therefore sorted without sorting anything.
+"""
+
+import bisect
+import threading
+from collections import OrderedDict
+
+import pygit2
+
+from forge.vfs.binary import is_binary_file
+from forge.vfs.blob_cache import CacheStats
+
+# Cached indexes are evicted least-recently-used once they hold this many
+# paths in total (roots and subtrees alike)
+_MAX_CACHED_PATHS = 2_000_000
+
+
+class TreeIndex:
+    """Sorted (path, filemode, blob OID) listing of every file in a tree.
+
+    Submodules (gitlinks) aren't files and are left out. Instances are
+    immutable and shared between threads.
+    """
+
+    __slots__ = ("paths", "modes", "oids", "_text_paths")
+
+    def __init__(self, paths: list[str], modes: list[int], oids: list[pygit2.Oid]) -> None:
+        self.paths = paths
+        self.modes = modes
+        self.oids = oids
+        self._text_paths: list[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def text_paths(self) -> list[str]:
+        """Paths that aren't binary by extension (see VFS.list_files)."""
+        if self._text_paths is None:
+            self._text_paths = [p for p in self.paths if not is_binary_file(p)]
+        return self._text_paths
+
+    def lookup(self, path: str) -> tuple[int, pygit2.Oid] | None:
+        """(filemode, blob OID) of a file, or None if it isn't in the tree."""
+        i = bisect.bisect_left(self.paths, path)
+        if i < len(self.paths) and self.paths[i] == path:
+            return self.modes[i], self.oids[i]
+        return None
+
+
+# Process-wide cache: (repository path, tree OID) -> index
+_cache: OrderedDict[tuple[str, bytes], TreeIndex] = OrderedDict()
+_cached_paths = 0
+_hits = 0
+_misses = 0
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: tuple[str, bytes]) -> TreeIndex | None:
+    global _hits, _misses
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is None:
+            _misses += 1
+            return None
+        _hits += 1
+        _cache.move_to_end(key)
+        return index
+
+
+def _cache_put(key: tuple[str, bytes], index: TreeIndex) -> None:
+    global _cached_paths
+    with _cache_lock:
+        if key in _cache:
+            return
+        _cache[key] = index
+        _cached_paths += len(index)
+        while _cached_paths > _MAX_CACHED_PATHS and len(_cache) > 1:
+            _key, evicted = _cache.popitem(last=False)
+            _cached_paths -= len(evicted)
+
+
+def tree_index_stats() -> CacheStats:
+    """Hit/miss counters of the index cache (size is in paths)."""
+    with _cache_lock:
+        return CacheStats(_hits, _misses, len(_cache), _cached_paths)
+
+
+def _build(repo: pygit2.Repository, tree: pygit2.Tree) -> TreeIndex:
+    paths: list[str] = []
+    modes: list[int] = []
+    oids: list[pygit2.Oid] = []
+    for entry in tree:
+        name = entry.name
+        assert name is not None, "Tree entry name should never be None"
+        mode = entry.filemode
+        if mode == pygit2.GIT_FILEMODE_TREE:
+            sub = get_tree_index(repo, entry.id)
+            prefix = name + "/"
+            paths.extend([prefix + p for p in sub.paths])
+            modes.extend(sub.modes)
+            oids.extend(sub.oids)
+        elif mode == pygit2.GIT_FILEMODE_COMMIT:
+            # Submodule: its OID points to a commit in another repository
+            continue
+        else:
+            paths.append(name)
+            modes.append(mode)
+            oids.append(entry.id)
+    return TreeIndex(paths, modes, oids)
+
+
+def get_tree_index(repo: pygit2.Repository, tree_oid: pygit2.Oid) -> TreeIndex:
+    """Get the (cached) index of a tree."""
+    key = (repo.path, tree_oid.raw)
+    index = _cache_get(key)
+    if index is None:
+        tree = repo[tree_oid]
+        assert isinstance(tree, pygit2.Tree), f"Expected Tree, got {type(tree)}"
+        index = _build(repo, tree)
+        _cache_put(key, index)
+    return index
@@ -0,0 +1,431 @@
+"""
+Trigram index over git blobs, used to narrow regex searches.
+
+grep_open, grep_context and the search panel used to decode and regex-scan
+every file on every call. Most searches contain some literal text, and a file
+can only match if it contains every three-byte window (trigram) of that text.
+So we keep, per blob, a compact bitmap of the trigrams it contains and only
+scan files whose bitmap has all the bits a query needs.
+
+Each bitmap is a one-hash Bloom filter sized to the blob's distinct trigram
+count: a missing bit proves a trigram is absent, a set bit only says it may be
+present. False positives just cost a scan, so results are always exact.
+
+Bitmaps are keyed by blob OID. Blobs are immutable, so an entry never goes
+stale and the index is shared by all branches and sessions; it persists in an
+append-only file under ``<gitdir>/forge/``. Files with pending changes in a
+WorkInProgressVFS have no blob yet and are always scanned.
+
+Building bitmaps in Python costs much more than the regex scan it saves, so
+a search never waits for it: while some blob of the searched files isn't
+indexed, the search scans everything and the missing blobs are indexed on a
+background thread. Searches narrow once the index covers all their blobs.
+
+Trigrams are taken from ASCII-lowercased bytes so one index serves both
+case-sensitive and case-insensitive searches.
+"""
+
+import contextlib
+import dataclasses
+import functools
+import os
+import re
+import threading
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pygit2
+
+from forge.git_backend.storage import forge_data_dir
+from forge.vfs.lfs import is_lfs_pointer, resolve_lfs_bytes
+
+if TYPE_CHECKING:
+    from forge.vfs.base import VFS
+    from forge.vfs.search_engine import SearchPlan
+
+try:
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+except ImportError:  # Python 3.10
+    import sre_parse
+
+_LITERAL = sre_parse.LITERAL
+_SUBPATTERN = sre_parse.SUBPATTERN
+_BRANCH = sre_parse.BRANCH
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+_ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+
+_INDEX_FILE = "trigrams.idx"
+_MAGIC = b"FORGE-TRIGRAMS 1\n"
+
+# Bitmap sizes, as powers of two. Sized at ~4 bits per distinct trigram so
+# roughly a fifth of the bits are set; a query of a few trigrams then lets
+# through about one non-matching file in a hundred.
+_MIN_BITS_LOG2 = 10
+_MAX_BITS_LOG2 = 20
+
+# Blobs bigger than this aren't indexed (always scanned): their bitmap would
+# be nearly full anyway
+_MAX_INDEXED_SIZE = 4 * 1024 * 1024
+
+# Cap on alternatives in a query (OR of ANDs) before it's simplified
+_MAX_ALTERNATIVES = 32
+
+# Under re.IGNORECASE these ASCII letters also match non-ASCII characters
+# (ı, İ, ſ, K), which the ASCII-lowercased index can't see
+_UNSAFE_FOLD_CHARS = frozenset("iks")
+
+# A query in disjunctive normal form: the content must contain every trigram
+# of at least one alternative. None means "no constraint" (scan everything).
+Query = list[frozenset[bytes]] | None
+
+
+def _and(a: Query, b: Query) -> Query:
+    """Both queries must hold."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    product = [x | y for x in a for y in b]
+    if len(product) > _MAX_ALTERNATIVES:
+        # Dropping a conjunct only weakens the query, which is always safe
+        return a if min(map(len, a)) >= min(map(len, b)) else b
+    return product
+
+
+def _or(a: Query, b: Query) -> Query:
+    """Either query may hold."""
+    if a is None or b is None:
+        return None
+    combined = a + b
+    if len(combined) > _MAX_ALTERNATIVES:
+        return None
+    return combined
+
+
+def _literal_query(text: str) -> Query:
+    """Query requiring a literal string."""
+    data = text.encode("utf-8").lower()
+    if len(data) < 3:
+        return None
+    return [frozenset(data[i : i + 3] for i in range(len(data) - 2))]
+
+
+def _analyze(parsed: Any, ignorecase: bool) -> Query:
+    """Derive the trigrams a parsed regex requires of any text it matches."""
+    result: Query = None
+    run: list[str] = []
+
+    def flush() -> None:
+        nonlocal result
+        if run:
+            result = _and(result, _literal_query("".join(run)))
+            run.clear()
+
+    for op, av in parsed:
+        if (
+            op is _LITERAL
+            and av < 128
+            and not (ignorecase and chr(av).lower() in _UNSAFE_FOLD_CHARS)
+        ):
+            run.append(chr(av))
+            continue
+        flush()
+        if op is _SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                result = _and(result, _analyze(sub, ignorecase))
+        elif op in _REPEATS:
+            min_count, _max_count, sub = av
+            if min_count >= 1:
+                result = _and(result, _analyze(sub, ignorecase))
+        elif op is _BRANCH:
+            _unused, branches = av
+            alternatives = _analyze(branches[0], ignorecase)
+            for branch in branches[1:]:
+                alternatives = _or(alternatives, _analyze(branch, ignorecase))
+            result = _and(result, alternatives)
+        elif op is _ATOMIC_GROUP:
+            result = _and(result, _analyze(av, ignorecase))
+        # Anything else (classes, anchors, lookarounds, backrefs) requires
+        # nothing we can look up
+    flush()
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_query(pattern: str, flags: int) -> Query:
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    effective = parsed.state.flags
+    ignorecase = bool(effective & re.IGNORECASE) and not effective & re.ASCII
+    return _analyze(parsed, ignorecase)
+
+
+def compile_query(regex: re.Pattern[str]) -> Query:
+    """Trigram query for a compiled regex (None if it requires no literal text)."""
+    return _compile_query(regex.pattern, regex.flags)
+
+
+def _slot(trigram: bytes, bits_log2: int) -> int:
+    """Bit position of a trigram in a bitmap of 2**bits_log2 bits."""
+    value = int.from_bytes(trigram, "big")
+    return ((value * 0x9E3779B1) & 0xFFFFFFFF) >> (32 - bits_log2)
+
+
+def build_bitmap(data: bytes) -> tuple[int, int]:
+    """Trigram bitmap of some content, as (bits_log2, bitmap).
+
+    bits_log2 is 0 for content that isn't indexed (always a candidate).
+    """
+    if len(data) > _MAX_INDEXED_SIZE:
+        return (0, 0)
+    lowered = data.lower()
+    trigrams = {lowered[i : i + 3] for i in range(len(lowered) - 2)}
+    bits_log2 = max(_MIN_BITS_LOG2, min(_MAX_BITS_LOG2, (len(trigrams) * 4).bit_length()))
+    buf = bytearray(1 << (bits_log2 - 3))
+    for trigram in trigrams:
+        slot = _slot(trigram, bits_log2)
+        buf[slot >> 3] |= 1 << (slot & 7)
+    return (bits_log2, int.from_bytes(buf, "little"))
+
+
+class CompiledQuery:
+    """A query turned into bit masks, memoized per bitmap size."""
+
+    def __init__(self, query: list[frozenset[bytes]]) -> None:
+        self.query = query
+        self._masks: dict[int, list[int]] = {}
+
+    def matches(self, bits_log2: int, bitmap: int) -> bool:
+        if bits_log2 == 0:
+            return True
+        masks = self._masks.get(bits_log2)
+        if masks is None:
+            masks = []
+            for alternative in self.query:
+                mask = 0
+                for trigram in alternative:
+                    mask |= 1 << _slot(trigram, bits_log2)
+                masks.append(mask)
+            self._masks[bits_log2] = masks
+        return any(bitmap & mask == mask for mask in masks)
+
+
+class TrigramIndex:
+    """Persistent blob-OID -> trigram bitmap store for one repository.
+
+    Thread safety: lookups and additions are guarded by an internal lock;
+    appends to the backing file are single writes of whole records, so
+    several Forge processes can share it.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._entries: dict[bytes, tuple[int, int]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Blobs waiting for the background builder
+        self._backlog: deque[tuple[str, str, pygit2.Oid]] = deque()
+        self._queued: set[bytes] = set()
+        self._builder: threading.Thread | None = None
+        self._idle = threading.Condition(self._lock)
+
+    def _load(self) -> None:
+        """Read the backing file (once). A torn trailing record is ignored."""
+        self._loaded = True
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return
+        if not data.startswith(_MAGIC):
+            return
+        pos = len(_MAGIC)
+        while pos + 21 <= len(data):
+            oid = data[pos : pos + 20]
+            bits_log2 = data[pos + 20]
+            size = (1 << (bits_log2 - 3)) if bits_log2 else 0
+            end = pos + 21 + size
+            if end > len(data):
+                break
+            self._entries[oid] = (bits_log2, int.from_bytes(data[pos + 21 : end], "little"))
+            pos = end
+
+    def _append(self, oid: bytes, bits_log2: int, bitmap: int) -> None:
+        size = (1 << (bits_log2 - 3)) if bits_log2 else 0
+        record = oid + bytes([bits_log2]) + bitmap.to_bytes(size, "little")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size == 0:
+                record = _MAGIC + record
+            os.write(fd, record)
+        finally:
+            os.close(fd)
+
+    def get(self, oid: pygit2.Oid) -> tuple[int, int] | None:
+        """Bitmap for a blob, or None if it hasn't been indexed yet."""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._entries.get(oid.raw)
+
+    def add(self, oid: pygit2.Oid, data: bytes) -> tuple[int, int]:
+        """Index a blob's content and persist the entry."""
+        entry = build_bitmap(data)
+        self._put(oid.raw, entry)
+        return entry
+
+    def _put(self, oid: bytes, entry: tuple[int, int]) -> None:
+        with self._lock:
+            if oid not in self._entries:
+                self._entries[oid] = entry
+                # A read-only git dir etc. still keeps the in-memory entry
+                with contextlib.suppress(OSError):
+                    self._append(oid, *entry)
+
+    def may_match(
+        self, repo_path: str, blobs: list[tuple[str, pygit2.Oid]], regex: re.Pattern[str]
+    ) -> list[bool] | None:
+        """For each (path, blob OID), whether the blob may contain a match for ``regex``.
+
+        None while any of the blobs isn't indexed yet: building bitmaps costs
+        far more than the scan they would save, so the caller should scan
+        everything this time. The missing blobs are indexed on a background
+        thread, and later searches are narrowed once all of them are in.
+        """
+        query = compile_query(regex)
+        if query is None:
+            return [True] * len(blobs)
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            entries = [self._entries.get(oid.raw) for _path, oid in blobs]
+        missing = [blob for blob, entry in zip(blobs, entries, strict=True) if entry is None]
+        if missing:
+            self._build_later(repo_path, missing)
+            return None
+        compiled = CompiledQuery(query)
+        return [compiled.matches(*entry) for entry in entries if entry is not None]
+
+    def candidates(self, vfs: "VFS", files: list[str], regex: re.Pattern[str]) -> list[str]:
+        """Filter ``files`` down to those that may contain a match for ``regex``.
+
+        Files without a committed blob (pending changes) are always kept. If
+        the index doesn't cover every blob yet, nothing is filtered (see
+        ``may_match``).
+        """
+        repo = vfs.get_git_repository()
+        if repo is None or compile_query(regex) is None:
+            return files
+        blobs: list[tuple[str, pygit2.Oid]] = []
+        for filepath in files:
+            try:
+                oid = vfs.get_blob_oid(filepath)
+            except FileNotFoundError:
+                continue  # Kept below; let the scan report it
+            if oid is not None:
+                blobs.append((filepath, oid))
+        verdicts = self.may_match(repo.path, blobs, regex)
+        if verdicts is None:
+            return files
+        excluded = {path for (path, _oid), ok in zip(blobs, verdicts, strict=True) if not ok}
+        return [f for f in files if f not in excluded]
+
+    def narrow_plan(self, plan: "SearchPlan", regex: re.Pattern[str]) -> "SearchPlan":
+        """Drop the blobs of a search plan that can't match ``regex``.
+
+        Doesn't touch the VFS, so it can run on the scanning thread.
+        """
+        if plan.repo_path is None:
+            return plan
+        blobs = [
+            (source.filepath, pygit2.Oid(hex=source.blob_oid))
+            for source in plan.sources
+            if source.blob_oid is not None
+        ]
+        verdicts = self.may_match(plan.repo_path, blobs, regex)
+        if verdicts is None:
+            return plan
+        excluded = {path for (path, _oid), ok in zip(blobs, verdicts, strict=True) if not ok}
+        sources = [s for s in plan.sources if s.blob_oid is None or s.filepath not in excluded]
+        return dataclasses.replace(plan, sources=sources)
+
+    # --- Background indexing ---
+
+    def _build_later(self, repo_path: str, blobs: list[tuple[str, pygit2.Oid]]) -> None:
+        """Queue blobs for the builder thread, starting it if it isn't running."""
+        with self._lock:
+            for filepath, oid in blobs:
+                if oid.raw not in self._entries and oid.raw not in self._queued:
+                    self._queued.add(oid.raw)
+                    self._backlog.append((repo_path, filepath, oid))
+            if self._backlog and self._builder is None:
+                self._builder = threading.Thread(
+                    target=self._build, name="trigram-index", daemon=True
+                )
+                self._builder.start()
+
+    def _build(self) -> None:
+        repos: dict[str, pygit2.Repository] = {}
+        while True:
+            with self._lock:
+                if not self._backlog:
+                    self._builder = None
+                    self._idle.notify_all()
+                    return
+                repo_path, filepath, oid = self._backlog.popleft()
+            try:
+                repo = repos.get(repo_path)
+                if repo is None:
+                    repo = repos[repo_path] = pygit2.Repository(repo_path)
+                entry = build_bitmap(_read_blob(repo, filepath, oid))
+            except (KeyError, ValueError, OSError):  # OSError covers a missing LFS object
+                entry = (0, 0)  # Unreadable here: always a candidate
+            self._put(oid.raw, entry)
+            with self._lock:
+                self._queued.discard(oid.raw)
+
+    def wait_until_built(self, timeout: float | None = None) -> bool:
+        """Wait for background indexing to finish. False on timeout."""
+        with self._lock:
+            return self._idle.wait_for(lambda: self._builder is None, timeout)
+
+
+def _read_blob(repo: pygit2.Repository, filepath: str, oid: pygit2.Oid) -> bytes:
+    """A blob's content, with git-lfs pointers resolved from the local store only."""
+    blob = repo[oid]
+    if not isinstance(blob, pygit2.Blob):
+        raise ValueError(f"Not a blob: {oid}")
+    data = blob.data
+    if is_lfs_pointer(data):
+        return resolve_lfs_bytes(repo.path, filepath, data)
+    return data
+
+
+# Process-wide registry: one index per repository
+_indexes: dict[str, TrigramIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_trigram_index(repo: pygit2.Repository) -> TrigramIndex:
+    """Get (or create) the trigram index for a repository."""
+    with _indexes_lock:
+        index = _indexes.get(repo.path)
+        if index is None:
+            index = TrigramIndex(forge_data_dir(repo) / _INDEX_FILE)
+            _indexes[repo.path] = index
+        return index
+
+
+def narrow_candidates(vfs: "VFS", files: list[str], regex: re.Pattern[str]) -> list[str]:
+    """Filter ``files`` to those that may match ``regex``, if ``vfs`` is git-backed."""
+    repo = vfs.get_git_repository()
+    if repo is None:
+        return files
+    return get_trigram_index(repo).candidates(vfs, files, regex)
@@ -2,17 +2,19 @@
 Writable VFS that accumulates changes on top of a git commit
 """
 
-import shutil
-import stat
-import tempfile
+import heapq
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from forge.git_backend.commit_types import CommitType
 from forge.vfs.base import VFS
+from forge.vfs.binary import is_binary_file
 from forge.vfs.git_commit import GitCommitVFS
+from forge.vfs.materialize import get_materialized_tree
 
 if TYPE_CHECKING:
+    import pygit2
+
     from forge.git_backend.repository import ForgeRepository
 
 
@@ -83,6 +85,21 @@ class WorkInProgressVFS(VFS):
 
         return self.base_vfs.read_file_bytes(path)
 
+    def get_blob_oid(self, path: str) -> "pygit2.Oid | None":
+        """Blob OID of an unmodified base file; None for pending changes"""
+        self._assert_owner()
+        if path in self.deleted_files:
+            raise FileNotFoundError(f"File deleted: {path}")
+
+        if path in self.pending_changes or path in self.pending_binary_changes:
+            return None
+
+        return self.base_vfs.get_blob_oid(path)
+
+    def get_git_repository(self) -> "pygit2.Repository":
+        """The underlying pygit2 repository"""
+        return self.repo.repo
+
     def write_file_bytes(self, path: str, content: bytes) -> None:
         """Write raw bytes - accumulates in pending binary changes"""
         self._assert_owner()
@@ -96,16 +113,31 @@ class WorkInProgressVFS(VFS):
     def list_all_files(self) -> list[str]:
         """List all files - base files + new files - deleted files (including binary)"""
         self._assert_owner()
-        files = set(self.base_vfs.list_all_files())
+        return self._overlay_listing(self.base_vfs.list_all_files(), include_binary=True)
 
-        # Add new files from pending changes
-        files.update(self.pending_changes.keys())
-        files.update(self.pending_binary_changes.keys())
+    def list_files(self) -> list[str]:
+        """List text files - base files + new files - deleted files"""
+        self._assert_owner()
+        return self._overlay_listing(self.base_vfs.list_files(), include_binary=False)
 
-        # Remove deleted files
-        files -= self.deleted_files
+    def _overlay_listing(self, base_files: list[str], include_binary: bool) -> list[str]:
+        """Apply pending changes to a sorted base listing, keeping it sorted.
 
-        return sorted(files)
+        Only the (few) changed paths are looked at; the base listing comes
+        pre-sorted from the shared tree index.
+        """
+        files = base_files
+        if self.deleted_files:
+            files = [f for f in files if f not in self.deleted_files]
+
+        added = [
+            path
+            for path in (*self.pending_changes, *self.pending_binary_changes)
+            if not self.base_vfs.file_exists(path) and (include_binary or not is_binary_file(path))
+        ]
+        if added:
+            files = list(heapq.merge(files, sorted(added)))
+        return files
 
     def file_exists(self, path: str) -> bool:
         """Check if file exists - considers pending changes and deletions"""
@@ -153,6 +185,27 @@ class WorkInProgressVFS(VFS):
         self.pending_binary_changes.clear()
         self.deleted_files.clear()
 
+    def snapshot_pending(self) -> tuple[dict[str, str], dict[str, bytes], set[str]]:
+        """Copy of all pending state, for `restore_pending`"""
+        self._assert_owner()
+        return (
+            self.pending_changes.copy(),
+            self.pending_binary_changes.copy(),
+            self.deleted_files.copy(),
+        )
+
+    def restore_pending(self, snapshot: tuple[dict[str, str], dict[str, bytes], set[str]]) -> None:
+        """Roll pending state back to a `snapshot_pending` copy"""
+        self._assert_owner()
+        changes, binary_changes, deleted = snapshot
+        self.pending_changes = changes.copy()
+        self.pending_binary_changes = binary_changes.copy()
+        self.deleted_files = deleted.copy()
+
+    def snapshot(self) -> "WorkInProgressSnapshot":
+        """Frozen read-only copy of the current state, readable from any thread"""
+        return WorkInProgressSnapshot(self)
+
     def commit(
         self,
         message: str,
@@ -256,56 +309,68 @@ class WorkInProgressVFS(VFS):
 
     def materialize_to_tempdir(self) -> Path:
         """
-        Create a temporary directory with the current VFS state.
+        Get a directory on disk holding the current VFS state.
 
         Useful for running tests or commands that need actual files.
 
+        The directory is persistent per branch and synced incrementally (see
+        forge.vfs.materialize), so repeated calls only rewrite paths that
+        changed since the last one. Callers should leave it in place when
+        done; deleting it is allowed but makes the next call rebuild it from
+        scratch.
+
         Returns:
-            Path to temporary directory
+            Path to the materialized directory
         """
         self._assert_owner()
-        tmpdir = Path(tempfile.mkdtemp(prefix="forge_vfs_"))
-
-        # Write all files (including binary)
-        for filepath in self.list_all_files():
-            full_path = tmpdir / filepath
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Pending changes are text (from AI edits), write as UTF-8
-            if filepath in self.pending_changes:
-                full_path.write_text(self.pending_changes[filepath], encoding="utf-8")
-            elif filepath in self.pending_binary_changes:
-                full_path.write_bytes(self.pending_binary_changes[filepath])
-            else:
-                # Base commit files: copy raw bytes (preserves binary files)
-                # Check if it's a symlink first
-                if stat.S_ISLNK(self.base_vfs.get_file_mode(filepath)):
-                    # Symlink targets are stored as text in the blob
-                    target = self.base_vfs.read_file(filepath)
-                    full_path.symlink_to(target)
-                else:
-                    full_path.write_bytes(self.base_vfs.read_file_bytes(filepath))
-
-        # Submodules are tracked as gitlink entries (commit pointers), not
-        # blobs, so they never appear in list_all_files() and aren't written
-        # above. There's also no .git in the tempdir, so `git submodule update`
-        # can't work there. Since the AI can't modify submodule contents
-        # anyway, just copy each submodule's checked-out folder verbatim from
-        # the real repo's working directory into the tempdir.
-        workdir = self.repo.repo.workdir
-        if workdir is not None:
-            workdir_path = Path(workdir)
-            # Copy the .git directory so that tools in tempdir can run git commands
-            git_dir = workdir_path / ".git"
-            if git_dir.exists():
-                shutil.copytree(git_dir, tmpdir / ".git", symlinks=True, dirs_exist_ok=True)
-
-            for sub_path in self.repo.repo.listall_submodules():
-                src = workdir_path / sub_path
-                if not src.is_dir():
-                    continue
-                dst = tmpdir / sub_path
-                dst.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copytree(src, dst, symlinks=True, dirs_exist_ok=True)
-
-        return tmpdir
+        return get_materialized_tree(self.repo.repo, self.branch_name).sync(self)
+
+
+class WorkInProgressSnapshot(WorkInProgressVFS):
+    """
+    Frozen, read-only copy of a WorkInProgressVFS at one point in a turn.
+
+    Shares the base commit and copies the pending state. Nothing can change
+    it afterwards, so several threads may read it at once without claiming
+    it (used to run read-only tools concurrently).
+    """
+
+    def __init__(self, source: WorkInProgressVFS) -> None:
+        VFS.__init__(self)
+        self.repo = source.repo
+        self.branch_name = source.branch_name
+        self.base_vfs = source.base_vfs
+        self.pending_changes, self.pending_binary_changes, self.deleted_files = (
+            source.snapshot_pending()
+        )
+
+    def _assert_owner(self) -> None:
+        """Immutable, so any thread may read it"""
+
+    def write_file(self, path: str, content: str) -> None:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def write_file_bytes(self, path: str, content: bytes) -> None:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def delete_file(self, path: str) -> None:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def clear_pending_changes(self) -> None:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def restore_pending(self, snapshot: tuple[dict[str, str], dict[str, bytes], set[str]]) -> None:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def commit(
+        self,
+        message: str,
+        author_name: str | None = None,
+        author_email: str | None = None,
+        commit_type: CommitType = CommitType.MAJOR,
+    ) -> str:
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
+
+    def materialize_to_tempdir(self) -> Path:
+        # The per-branch materialized tree is shared with the live VFS
+        raise NotImplementedError("WorkInProgressSnapshot is read-only")
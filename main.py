@@ -3,10 +3,10 @@
 Forge - AI-assisted development environment
 
 This is a convenience wrapper for running from the repo root.
-The actual entry point is forge.main:main (for pip install).
+The actual entry point is forge.__main__:main (for pip install).
 """
 
-from forge.main import main
+from forge.__main__ import main
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,84 @@
+"""Tests for the shared decoded-blob cache (forge/vfs/blob_cache.py) and the
+GitCommitVFS lookups that use it."""
+
+import pygit2
+import pytest
+
+from forge.vfs.blob_cache import BlobTextCache, get_blob_text_cache
+from forge.vfs.git_commit import GitCommitVFS
+from forge.vfs.tree_index import tree_index_stats
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+
+def _oid(n):
+    return pygit2.Oid(hex=f"{n:040x}")
+
+
+def test_lru_is_bounded_by_size():
+    cache = BlobTextCache(max_chars=10)
+    cache.put(_oid(1), "aaaa")
+    cache.put(_oid(2), "bbbb")
+    assert cache.get(_oid(1)) == "aaaa"  # Now most recently used
+    cache.put(_oid(3), "cccc")
+
+    assert cache.get(_oid(2)) is None
+    assert cache.get(_oid(1)) == "aaaa"
+    assert cache.get(_oid(3)) == "cccc"
+    assert cache.stats().size == 8
+
+
+def test_oversized_entries_are_not_cached():
+    cache = BlobTextCache(max_chars=10)
+    cache.put(_oid(1), "x" * 11)
+    assert cache.get(_oid(1)) is None
+
+
+def test_stats():
+    cache = BlobTextCache()
+    cache.put(_oid(1), "a")
+    cache.get(_oid(1))
+    cache.get(_oid(1))
+    cache.get(_oid(2))
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 1)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    vfs = WorkInProgressVFS(bootstrap_repo(tmp_path, {"a.py": "alpha\n"}), "master")
+    vfs.write_file("pkg/b.py", "beta\n")
+    vfs.commit("add pkg")
+    return vfs
+
+
+def test_decoded_text_is_shared_across_vfs_instances(vfs, monkeypatch):
+    base = vfs.base_vfs
+    assert base.read_file("pkg/b.py") == "beta\n"
+
+    fresh = GitCommitVFS(base.repo, base.commit)
+    monkeypatch.setattr(fresh, "read_file_bytes", lambda path: pytest.fail(f"read {path}"))
+    hits = get_blob_text_cache().stats().hits
+    assert fresh.read_file("pkg/b.py") == "beta\n"
+    assert get_blob_text_cache().stats().hits == hits + 1
+
+
+def test_lookups_use_the_tree_index(vfs):
+    base = vfs.base_vfs
+    base.list_all_files()
+    hits = tree_index_stats().hits
+    assert base.get_file_mode("pkg/b.py") == pygit2.GIT_FILEMODE_BLOB
+    assert base.read_file_bytes("a.py") == b"alpha\n"
+    assert tree_index_stats().hits == hits + 2
+
+
+def test_directories_and_missing_files(vfs):
+    base = vfs.base_vfs
+    assert base.file_exists("pkg")
+    assert base.get_file_mode("pkg") == pygit2.GIT_FILEMODE_TREE
+    assert not base.file_exists("missing.py")
+    with pytest.raises(FileNotFoundError):
+        base.read_file("pkg")
+    with pytest.raises(FileNotFoundError):
+        base.get_file_mode("missing.py")
@@ -0,0 +1,42 @@
+"""Tests for the windowed chat transcript helpers (forge/ui/chat_transcript.py)."""
+
+from forge.ui.chat_transcript import (
+    estimate_turn_height,
+    find_turns,
+    turn_text,
+    windowed_transcript,
+)
+
+
+def _turn(i, body):
+    return f'<div class="turn" data-turn="{i}"><div class="message">{body}</div></div>'
+
+
+def test_first_render_keeps_recent_turns_live():
+    turns = [_turn(i, f"turn {i}") for i in range(10)]
+    html = windowed_transcript(turns, live_turns=3)
+
+    assert html.count("turn-placeholder") == 7
+    assert html.endswith("".join(turns[7:]))
+    # Placeholders keep the turn index, so scrolling to a turn still works
+    assert '<div class="turn turn-placeholder" data-turn="6"' in html
+    assert windowed_transcript(turns[:2], live_turns=3) == "".join(turns[:2])
+
+
+def test_height_estimate_grows_with_content_within_bounds():
+    short = estimate_turn_height(_turn(0, "hi"))
+    longer = estimate_turn_height(_turn(0, "<p>line</p>\n" * 50))
+    assert 0 < short < longer <= estimate_turn_height(_turn(0, "x\n" * 100_000))
+
+
+def test_search_matches_visible_text_only():
+    turns = [
+        _turn(0, "Hello <b>World</b>"),
+        _turn(1, '<a href="world.html">link</a>'),
+        _turn(2, "fish &amp; chips\n   and   peas"),
+    ]
+    assert find_turns(turns, "hello world") == [0]
+    assert find_turns(turns, "WORLD") == [0]
+    assert find_turns(turns, "fish & chips and peas") == [2]
+    assert find_turns(turns, "") == []
+    assert turn_text(turns[1]) == "link"
@@ -0,0 +1,110 @@
+"""Tests for EventCoalescer (forge/session/live_session.py), which batches
+streaming events between a LiveSession and its attached UI."""
+
+import time
+
+import pytest
+from PySide6.QtCore import QCoreApplication
+from PySide6.QtWidgets import QApplication
+
+from forge.session.live_session import (
+    ChunkEvent,
+    EventCoalescer,
+    MessageUpdatedEvent,
+    ReasoningChunkEvent,
+    StateChangedEvent,
+    ToolCallDeltaEvent,
+    ToolOutputEvent,
+)
+
+
+@pytest.fixture
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+def _describe(event):
+    if isinstance(event, (ChunkEvent, ReasoningChunkEvent)):
+        return (type(event).__name__, event.chunk)
+    if isinstance(event, ToolCallDeltaEvent):
+        return ("delta", event.index, event.tool_call["arguments"])
+    if isinstance(event, MessageUpdatedEvent):
+        return ("updated", event.index)
+    if isinstance(event, ToolOutputEvent):
+        return ("output", event.stream, event.lines)
+    return ("state", event.state)
+
+
+def _coalescer(interval_ms=16):
+    delivered = []
+    return EventCoalescer(lambda e: delivered.append(_describe(e)), interval_ms), delivered
+
+
+def test_merges_chunks_and_collapses_deltas(qapp):
+    coalescer, delivered = _coalescer()
+    coalescer.push(ReasoningChunkEvent("hm"))
+    for chunk in ["Hel", "lo", "!"]:
+        coalescer.push(MessageUpdatedEvent(1, {}))
+        coalescer.push(ChunkEvent(chunk))
+    coalescer.push(ToolCallDeltaEvent(0, {"arguments": "{"}))
+    coalescer.push(ToolCallDeltaEvent(1, {"arguments": "{}"}))
+    coalescer.push(ToolCallDeltaEvent(0, {"arguments": "{}"}))
+    assert delivered == []
+
+    coalescer.flush()
+    assert delivered == [
+        ("ReasoningChunkEvent", "hm"),
+        ("updated", 1),
+        ("ChunkEvent", "Hello!"),
+        ("delta", 0, "{}"),
+        ("delta", 1, "{}"),
+    ]
+    assert (coalescer.events_in, coalescer.events_out, coalescer.flushes) == (10, 5, 1)
+
+
+def test_merges_tool_output_per_stream(qapp):
+    coalescer, delivered = _coalescer()
+    coalescer.push(ToolOutputEvent("stdout", ["a"]))
+    coalescer.push(ToolOutputEvent("stderr", ["oops"]))
+    coalescer.push(ToolOutputEvent("stdout", ["b", "c"]))
+
+    coalescer.flush()
+    assert delivered == [("output", "stdout", ["a", "b", "c"]), ("output", "stderr", ["oops"])]
+
+
+def test_other_events_keep_their_order(qapp):
+    coalescer, delivered = _coalescer()
+    coalescer.push(ChunkEvent("a"))
+    coalescer.push(StateChangedEvent("running"))
+    coalescer.push(ChunkEvent("b"))
+    coalescer.push(StateChangedEvent("idle"))
+    assert delivered == [
+        ("ChunkEvent", "a"),
+        ("state", "running"),
+        ("ChunkEvent", "b"),
+        ("state", "idle"),
+    ]
+
+
+def test_timer_flushes_and_zero_interval_passes_through(qapp):
+    coalescer, delivered = _coalescer(interval_ms=1)
+    coalescer.push(ChunkEvent("a"))
+    coalescer.push(ChunkEvent("b"))
+    deadline = time.monotonic() + 2
+    while not delivered and time.monotonic() < deadline:
+        time.sleep(0.005)
+        QCoreApplication.processEvents()
+    assert delivered == [("ChunkEvent", "ab")]
+
+    coalescer, delivered = _coalescer(interval_ms=0)
+    coalescer.push(ChunkEvent("a"))
+    coalescer.push(ChunkEvent("b"))
+    assert delivered == [("ChunkEvent", "a"), ("ChunkEvent", "b")]
+
+
+def test_discard_drops_the_pending_batch(qapp):
+    coalescer, delivered = _coalescer()
+    coalescer.push(ChunkEvent("a"))
+    coalescer.discard()
+    coalescer.flush()
+    assert delivered == []
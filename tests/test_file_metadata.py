@@ -0,0 +1,82 @@
+"""Tests for blob-OID-keyed file metadata (forge/vfs/file_metadata.py)."""
+
+import pytest
+
+from forge.vfs.file_metadata import (
+    FileMetadata,
+    MetadataStore,
+    compute_metadata,
+    get_file_metadata,
+    get_file_size,
+)
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+BIG = "x = 1\n" * 500  # Well past the size where blobs could be LFS pointers
+
+FILES = {
+    "big.py": BIG,
+    "small.py": "a\nb",
+}
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    return WorkInProgressVFS(bootstrap_repo(tmp_path, FILES), "master")
+
+
+def test_compute_metadata():
+    assert compute_metadata(b"") == FileMetadata(size=0, line_count=0, is_binary=False)
+    assert compute_metadata(b"a\nb\n") == FileMetadata(size=4, line_count=2, is_binary=False)
+    assert compute_metadata(b"a\nb") == FileMetadata(size=3, line_count=2, is_binary=False)
+    assert compute_metadata(b"a\0b").is_binary
+    assert compute_metadata(b"\xff\xfe").is_binary
+    assert compute_metadata(b"x" * 300).estimated_tokens == 100
+
+
+def test_size_of_committed_file_comes_from_header(vfs, monkeypatch):
+    def fail(path):
+        raise AssertionError(f"read {path}")
+
+    monkeypatch.setattr(vfs, "read_file_bytes", fail)
+    assert get_file_size(vfs, "big.py") == len(BIG)
+
+
+def test_small_blobs_are_read_in_case_they_are_lfs_pointers(vfs):
+    assert get_file_size(vfs, "small.py") == 3
+
+
+def test_pending_changes(vfs):
+    vfs.write_file("big.py", "changed\n")
+    vfs.write_file("new.py", "one\ntwo\n")
+    assert get_file_size(vfs, "big.py") == 8
+    assert get_file_metadata(vfs, "new.py") == FileMetadata(size=8, line_count=2, is_binary=False)
+
+    vfs.delete_file("small.py")
+    with pytest.raises(FileNotFoundError):
+        get_file_size(vfs, "small.py")
+
+
+def test_metadata_persists_across_instances(vfs, tmp_path):
+    metadata = get_file_metadata(vfs, "big.py")
+    assert metadata == FileMetadata(size=len(BIG), line_count=500, is_binary=False)
+
+    oid = vfs.get_blob_oid("big.py")
+    assert oid is not None
+    path = tmp_path / ".git" / "forge" / "metadata.idx"
+    fresh = MetadataStore(vfs.get_git_repository(), path)
+    assert fresh.get(oid) == metadata
+
+
+def test_torn_record_is_ignored(vfs, tmp_path):
+    get_file_metadata(vfs, "big.py")
+    get_file_metadata(vfs, "small.py")
+    path = tmp_path / ".git" / "forge" / "metadata.idx"
+    path.write_bytes(path.read_bytes()[:-5])
+
+    fresh = MetadataStore(vfs.get_git_repository(), path)
+    big_oid = vfs.get_blob_oid("big.py")
+    small_oid = vfs.get_blob_oid("small.py")
+    assert big_oid is not None and small_oid is not None
+    assert fresh.get(big_oid) is not None
+    assert fresh.get(small_oid) is None
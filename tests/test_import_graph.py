@@ -0,0 +1,194 @@
+"""Tests for the import graph behind run_tests' affected mode
+(forge/vfs/import_graph.py)."""
+
+import pygit2
+import pytest
+
+from forge.vfs.import_graph import (
+    ImportGraph,
+    ImportStore,
+    affected_tests,
+    changed_paths,
+    external_modules,
+    is_test_file,
+    parse_imports,
+)
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+
+class TestParseImports:
+    def test_plain_and_from_imports(self):
+        refs = parse_imports("import os, pkg.mod\nfrom pkg import a, b\nfrom . import c\n")
+        assert refs == (
+            (0, "os", ()),
+            (0, "pkg.mod", ()),
+            (0, "pkg", ("a", "b")),
+            (1, "", ("c",)),
+        )
+
+    def test_nested_imports_are_found(self):
+        refs = parse_imports("def f():\n    import lazy\n")
+        assert refs == ((0, "lazy", ()),)
+
+    def test_syntax_error(self):
+        assert parse_imports("def broken(:\n") is None
+
+
+class TestImportGraph:
+    def _graph(self, files):
+        graph = ImportGraph(sorted(files))
+        for path, source in files.items():
+            graph.add_file(path, parse_imports(source))
+        return graph
+
+    def test_transitive_importers(self):
+        graph = self._graph(
+            {
+                "pkg/__init__.py": "",
+                "pkg/core.py": "",
+                "pkg/api.py": "from pkg.core import thing\n",
+                "tests/test_api.py": "from pkg import api\n",
+                "tests/test_other.py": "import json\n",
+            }
+        )
+
+        reached = graph.reaching({"pkg/core.py"})
+
+        assert "tests/test_api.py" in reached
+        assert "tests/test_other.py" not in reached
+
+    def test_relative_imports(self):
+        graph = self._graph(
+            {
+                "pkg/__init__.py": "",
+                "pkg/sub/__init__.py": "",
+                "pkg/sub/leaf.py": "",
+                "pkg/sub/user.py": "from .leaf import x\nfrom .. import sub\n",
+            }
+        )
+
+        assert graph.edges["pkg/sub/user.py"] >= {"pkg/sub/leaf.py", "pkg/sub/__init__.py"}
+
+    def test_package_init_is_a_dependency(self):
+        graph = self._graph({"pkg/__init__.py": "", "pkg/mod.py": "", "t.py": "import pkg.mod\n"})
+
+        assert graph.edges["t.py"] == {"pkg/__init__.py", "pkg/mod.py"}
+
+    def test_src_layout_resolves(self):
+        graph = self._graph({"src/pkg/mod.py": "", "tests/test_mod.py": "from pkg import mod\n"})
+
+        assert graph.edges["tests/test_mod.py"] == {"src/pkg/mod.py"}
+
+    def test_conftest_applies_to_tests_below_it(self):
+        graph = ImportGraph(["tests/conftest.py", "tests/unit/test_a.py", "other/test_b.py"])
+        graph.add_conftests(["tests/unit/test_a.py", "other/test_b.py"], ["tests/conftest.py"])
+
+        reached = graph.reaching({"tests/conftest.py"})
+
+        assert "tests/unit/test_a.py" in reached
+        assert "other/test_b.py" not in reached
+
+
+def test_is_test_file():
+    assert is_test_file("tests/test_a.py")
+    assert is_test_file("a_test.py")
+    assert not is_test_file("tests/helpers.py")
+    assert not is_test_file("test_data.json")
+
+
+class TestImportStore:
+    def test_persists_by_blob_oid(self, tmp_path):
+        oid = pygit2.Oid(hex="ab" * 20)
+        bad = pygit2.Oid(hex="cd" * 20)
+        store = ImportStore(tmp_path / "imports.idx")
+        store.add(oid, b"import os\n")
+        store.add(bad, b"def broken(:\n")
+
+        reloaded = ImportStore(tmp_path / "imports.idx")
+
+        assert reloaded.get(oid) == (((0, "os", ()),),)
+        assert reloaded.get(bad) == (None,)
+        assert reloaded.get(pygit2.Oid(hex="ef" * 20)) is None
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    repo = bootstrap_repo(tmp_path, {"README.md": "hi\n"})
+    vfs = WorkInProgressVFS(repo, "master")
+    vfs.write_file("pkg/__init__.py", "")
+    vfs.write_file("pkg/core.py", "VALUE = 1\n")
+    vfs.write_file("pkg/api.py", "from pkg.core import VALUE\n")
+    vfs.write_file("pkg/util.py", "")
+    vfs.write_file("tests/test_api.py", "from pkg import api\n")
+    vfs.write_file("tests/test_util.py", "from pkg import util\n")
+    vfs.commit("add package")
+    return vfs
+
+
+def test_selects_tests_reaching_pending_change(vfs):
+    vfs.write_file("pkg/core.py", "VALUE = 2\n")
+
+    impact = affected_tests(vfs)
+
+    assert impact.full_run_reason is None
+    assert impact.changed == ["pkg/core.py"]
+    assert impact.selected == ["tests/test_api.py"]
+    assert impact.skipped == ["tests/test_util.py"]
+
+
+def test_includes_commits_since_default_branch(vfs):
+    repo = vfs.repo
+    head = repo.get_branch_head("master")
+    repo.repo.branches.local.create("feature", head)
+    feature = WorkInProgressVFS(repo, "feature")
+    feature.write_file("pkg/util.py", "X = 1\n")
+    feature.commit("touch util")
+
+    assert changed_paths(feature) == ["pkg/util.py"]
+    assert affected_tests(feature).selected == ["tests/test_util.py"]
+
+
+def test_non_python_change_runs_everything(vfs):
+    vfs.write_file("pyproject.toml", "[tool.pytest.ini_options]\n")
+
+    impact = affected_tests(vfs)
+
+    assert impact.full_run_reason is not None
+    assert impact.selected == ["tests/test_api.py", "tests/test_util.py"]
+
+
+def test_doc_change_selects_nothing(vfs):
+    vfs.write_file("README.md", "changed\n")
+
+    impact = affected_tests(vfs)
+
+    assert impact.full_run_reason is None
+    assert impact.selected == []
+
+
+@pytest.mark.parametrize("path", ["tests/data/expected.txt", "requirements.txt", "tests/fixture.md"])
+def test_fixture_and_requirements_changes_run_everything(vfs, path):
+    vfs.write_file(path, "changed\n")
+
+    impact = affected_tests(vfs)
+
+    assert impact.full_run_reason is not None
+    assert impact.selected == ["tests/test_api.py", "tests/test_util.py"]
+
+
+def test_deleted_module_affects_importers(vfs):
+    vfs.delete_file("pkg/util.py")
+
+    assert affected_tests(vfs).selected == ["tests/test_util.py"]
+
+
+def test_external_modules(vfs):
+    vfs.write_file(
+        "tests/test_ext.py",
+        "import os, numpy\nfrom PySide6.QtCore import Qt\nfrom pkg import core\n"
+        "from . import helpers\nimport tests.helpers\nimport scripts\n",
+    )
+    vfs.write_file("scripts/run.sh", "")
+
+    assert external_modules(vfs) == ["PySide6.QtCore", "numpy"]
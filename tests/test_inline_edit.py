@@ -9,6 +9,7 @@ from unittest.mock import MagicMock
 
 from forge.tools.builtin.edit import (
     EditBlock,
+    _find_best_match,
     detect_unparsed_edit_blocks,
     execute,
     execute_write,
@@ -239,6 +240,226 @@ class TestExecuteReplace:
         assert "search" in result["error"].lower()
 
 
+# ---------------------------------------------------------------------------
+# execute() — multi-edit API form
+# ---------------------------------------------------------------------------
+
+
+class _DictVFS:
+    """Minimal VFS over a dict that counts writes per file."""
+
+    def __init__(self, files: dict[str, str]):
+        self.files = dict(files)
+        self.writes: dict[str, int] = {}
+
+    def read_file(self, path: str) -> str:
+        if path not in self.files:
+            raise FileNotFoundError(path)
+        return self.files[path]
+
+    def write_file(self, path: str, content: str) -> None:
+        self.files[path] = content
+        self.writes[path] = self.writes.get(path, 0) + 1
+
+
+def _apply_sequentially(content: str, pairs: list[tuple[str, str]]) -> str | None:
+    for search, replace in pairs:
+        if search not in content:
+            return None
+        content = content.replace(search, replace, 1)
+    return content
+
+
+class TestExecuteEdits:
+    """Test the planned multi-edit path against plain sequential replace."""
+
+    def test_many_edits_one_write_per_file(self):
+        lines = [f"line {i}" for i in range(100)]
+        vfs = _DictVFS({"a.py": "\n".join(lines), "b.py": "x = 1\n"})
+        edits = [
+            {"filepath": "a.py", "search": f"line {i}\n", "replace": f"LINE {i}\n"}
+            for i in range(90, 10, -8)
+        ]
+        edits.append({"filepath": "b.py", "search": "x = 1", "replace": "x = 2"})
+
+        result = execute(vfs, {"edits": edits})
+
+        assert result["success"] is True
+        assert result["edits_applied"] == len(edits)
+        assert result["modified_files"] == ["a.py", "b.py"]
+        assert vfs.writes == {"a.py": 1, "b.py": 1}
+        pairs = [(e["search"], e["replace"]) for e in edits[:-1]]
+        assert vfs.files["a.py"] == _apply_sequentially("\n".join(lines), pairs)
+
+    def test_later_edit_sees_earlier_replacement(self):
+        vfs = _DictVFS({"a.py": "foo()\nbar()\n"})
+        edits = [
+            {"filepath": "a.py", "search": "bar()", "replace": "baz()"},
+            {"filepath": "a.py", "search": "baz()", "replace": "qux()"},
+        ]
+
+        result = execute(vfs, {"edits": edits})
+
+        assert result["success"] is True
+        assert vfs.files["a.py"] == "foo()\nqux()\n"
+
+    def test_earlier_replacement_shadows_original_occurrence(self):
+        # Sequential semantics: edit #2 hits the "x" that edit #1 introduced,
+        # which comes before the original one.
+        vfs = _DictVFS({"a.py": "a b x"})
+        edits = [
+            {"filepath": "a.py", "search": "a", "replace": "x"},
+            {"filepath": "a.py", "search": "x", "replace": "y"},
+        ]
+
+        execute(vfs, {"edits": edits})
+
+        assert vfs.files["a.py"] == "y b x"
+
+    def test_occurrence_straddling_replacement_boundary(self):
+        vfs = _DictVFS({"a.py": "ab cd abXd"})
+        edits = [
+            {"filepath": "a.py", "search": " cd", "replace": "X"},
+            {"filepath": "a.py", "search": "bXd", "replace": "!"},
+        ]
+
+        execute(vfs, {"edits": edits})
+
+        assert vfs.files["a.py"] == _apply_sequentially("ab cd abXd", [(" cd", "X"), ("bXd", "!")])
+
+    def test_overlapping_edits_apply_in_order(self):
+        vfs = _DictVFS({"a.py": "one two three"})
+        edits = [
+            {"filepath": "a.py", "search": "one two", "replace": "1 2"},
+            {"filepath": "a.py", "search": "2 three", "replace": "2 3"},
+        ]
+
+        result = execute(vfs, {"edits": edits})
+
+        assert result["success"] is True
+        assert vfs.files["a.py"] == "1 2 3"
+
+    def test_failure_keeps_earlier_edits_and_reports_index(self):
+        vfs = _DictVFS({"a.py": "alpha\nbeta\n"})
+        edits = [
+            {"filepath": "a.py", "search": "alpha", "replace": "ALPHA"},
+            {"filepath": "a.py", "search": "gamma", "replace": "GAMMA"},
+            {"filepath": "a.py", "search": "beta", "replace": "BETA"},
+        ]
+
+        result = execute(vfs, {"edits": edits})
+
+        assert result["success"] is False
+        assert result["error"].startswith("edit #1 failed: Search text not found")
+        assert result["edits_succeeded"] == 1
+        assert result["modified_files"] == ["a.py"]
+        assert "diff" in result
+        assert vfs.files["a.py"] == "ALPHA\nbeta\n"
+
+    def test_write_then_replace_same_file(self):
+        vfs = _DictVFS({})
+        edits = [
+            {"filepath": "new.py", "content": "x = 1\n"},
+            {"filepath": "new.py", "search": "x = 1", "replace": "x = 2"},
+        ]
+
+        result = execute(vfs, {"edits": edits})
+
+        assert result["success"] is True
+        assert result["new_files"] == ["new.py"]
+        assert vfs.files["new.py"] == "x = 2\n"
+        assert vfs.writes == {"new.py": 1}
+
+    def test_matches_sequential_on_random_batches(self):
+        import random
+
+        rng = random.Random(1234)
+        alphabet = "ab \n"
+        for _ in range(300):
+            content = "".join(rng.choice(alphabet) for _ in range(rng.randint(5, 40)))
+            pairs = []
+            for _ in range(rng.randint(1, 6)):
+                search = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+                replace = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 3)))
+                pairs.append((search, replace))
+            expected = _apply_sequentially(content, pairs)
+            vfs = _DictVFS({"f": content})
+
+            result = execute(
+                vfs,
+                {"edits": [{"filepath": "f", "search": s, "replace": r} for s, r in pairs]},
+            )
+
+            if expected is None:
+                assert result["success"] is False
+            else:
+                assert result["success"] is True
+                assert vfs.files["f"] == expected
+
+
+# ---------------------------------------------------------------------------
+# _find_best_match() — fuzzy locator for failed searches
+# ---------------------------------------------------------------------------
+
+
+def _big_file(n: int) -> list[str]:
+    return [f"    value_{i} = compute({i}, scale={i % 7})" for i in range(n)]
+
+
+class TestFindBestMatch:
+    """Test the tiered fuzzy locator used for failed-search diagnostics."""
+
+    def test_whitespace_normalized_match(self):
+        content = "def foo():\n    x = 1\n    return x\n"
+        search = "def foo():\n  x = 1  \n  return x"
+
+        match, distance, pos = _find_best_match(search, content)
+
+        assert pos == 0
+        assert match == "def foo():\n    x = 1\n    return x"
+        assert distance > 0
+
+    def test_anchored_match_in_large_file(self):
+        lines = _big_file(5000)
+        content = "\n".join(lines)
+        # A 40-line block with one line changed and no whitespace-only match
+        search_lines = lines[3000:3040]
+        search_lines[20] = "    value_3020 = compute(3020, scale=99)"
+        search = "\n".join(search_lines)
+
+        match, distance, pos = _find_best_match(search, content)
+
+        assert pos == 3000
+        assert match == "\n".join(lines[3000:3040])
+        assert distance <= 2
+
+    def test_no_anchor_falls_back_to_full_scan(self):
+        content = "alpha\nbeta\ngamma\n"
+        search = "gamme"
+
+        match, _distance, pos = _find_best_match(search, content)
+
+        assert match == "gamma"
+        assert pos == 2
+
+    def test_ties_prefer_earliest_window(self):
+        content = "x = 1\ny = 2\nx = 1\ny = 2"
+        search = "x = 1\ny = 3"
+
+        _match, _distance, pos = _find_best_match(search, content)
+
+        assert pos == 0
+
+    def test_time_budget_still_returns_a_candidate(self):
+        content = "\n".join(_big_file(2000))
+        search = "\n".join(f"unrelated_{i}()" for i in range(30))
+
+        match, distance, _pos = _find_best_match(search, content, time_budget=0.0)
+
+        assert match
+        assert distance > 0
+
+
 # ---------------------------------------------------------------------------
 # execute_write() — whole-file writes
 # ---------------------------------------------------------------------------
@@ -0,0 +1,86 @@
+"""Tests for the resumable inline command scanner (InlineScanner in
+forge/tools/invocation.py)."""
+
+import random
+import re
+
+from forge.tools.invocation import InlineScanner, _literal_prefix, parse_inline_commands
+from forge.ui.tool_rendering import render_markdown
+
+MESSAGE = (
+    "Plan:\n"
+    '<replace file="a.py">\nold\n<with/>\nnew\n</replace>\n'
+    "Docs use `<done/>` and\n```\n<commit message=\"not me\"/>\n```\n"
+    '<write file="b.txt">\nhello\n</write>\n'
+    "A stray ` backtick, then <commit message=\"real\"/>\n"
+    "<done/>\n"
+)
+
+
+def _summary(commands):
+    return [(c.tool_name, c.start_pos, c.end_pos, c.args) for c in commands]
+
+
+def test_resuming_matches_a_fresh_parse_at_every_prefix():
+    scanner = InlineScanner()
+    for end in range(len(MESSAGE) + 1):
+        prefix = MESSAGE[:end]
+        assert _summary(scanner.feed(prefix)) == _summary(parse_inline_commands(prefix))
+
+    commands = parse_inline_commands(MESSAGE)
+    assert [c.tool_name for c in commands] == ["edit", "edit", "commit", "done"]
+    assert commands[2].args == {"message": "real"}
+
+
+def test_text_that_is_not_an_extension_restarts_the_scan():
+    scanner = InlineScanner()
+    scanner.feed(MESSAGE)
+    assert _summary(scanner.feed("<done/>")) == _summary(parse_inline_commands("<done/>"))
+
+
+def test_checkpoint_stays_behind_an_unpaired_backtick():
+    scanner = InlineScanner()
+    assert [c.tool_name for c in scanner.feed("x ` y\n<done/>\n")] == ["done"]
+    # The closing backtick turns the command into inline code
+    assert scanner.feed("x ` y\n<done/>\n`") == []
+
+
+def test_checkpoint_stays_behind_backticks_paired_across_a_fence():
+    # The fence's closing run pairs with the first run on the last line, so
+    # the command after it is not inline code
+    content = "``` ```\n```\n    ```<run_tests>```"
+    scanner = InlineScanner()
+    for end in range(len(content) + 1):
+        scanner.feed(content[:end])
+    assert _summary(scanner.commands) == _summary(parse_inline_commands(content))
+    assert [c.tool_name for c in scanner.commands] == ["run_tests"]
+
+
+def test_streaming_matches_a_fresh_parse_on_random_text():
+    pieces = ["`", "``", "```", "~~~", " ", "    ", "\n", "\n", "x", "<done/>", "<run_tests>"]
+    for seed in range(300):
+        rng = random.Random(seed)
+        content = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+        final = _summary(parse_inline_commands(content))
+        scanner = InlineScanner()
+        for end in range(len(content) + 1):
+            prefix = content[:end]
+            assert _summary(scanner.feed(prefix)) == _summary(parse_inline_commands(prefix)), prefix
+            stable = _summary(scanner.stable_commands)
+            assert final[: len(stable)] == stable, prefix
+
+
+def test_literal_prefix():
+    assert _literal_prefix(re.compile(r'<replace(_\w+|)\s+file="')) == "<replace"
+    assert _literal_prefix(re.compile(r"<done\s*/>")) == "<done"
+    assert _literal_prefix(re.compile(r"<ab?c")) == "<a"
+    assert _literal_prefix(re.compile(r"(?:<x>)")) == ""
+    assert _literal_prefix(re.compile(r"<x>", re.IGNORECASE)) == ""
+
+
+def test_rendered_cards_line_up_with_executed_commands():
+    content = '<write file="a">\nx\n</write>\n<commit message="m"/>'
+    html = render_markdown(content, inline_results=[{"success": True}, {"success": False}])
+    # The write gets its own card, so the commit gets the second (failed) result
+    assert '<span class="tool-name">write</span>' in html
+    assert "✗" in html
@@ -0,0 +1,228 @@
+"""Tests for the persistent, incrementally-synced materialized tree
+(forge/vfs/materialize.py via WorkInProgressVFS.materialize_to_tempdir)."""
+
+import os
+import shutil
+import subprocess
+
+import pygit2
+import pytest
+
+from forge.vfs.materialize import get_materialized_tree, write_back
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    repo = bootstrap_repo(tmp_path / "repo", {"a.txt": "alpha\n", "b.txt": "beta\n"})
+    vfs = WorkInProgressVFS(repo, "master")
+    vfs.write_file("pkg/mod.py", "x = 1\n")
+    vfs.commit("add pkg")
+    return vfs
+
+
+def _files(root):
+    """All regular files under root (outside .git), relative and sorted."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d != ".git"]
+        for name in filenames:
+            found.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(found)
+
+
+def test_materializes_tree_with_pending_changes(vfs):
+    vfs.write_file("a.txt", "changed\n")
+    vfs.delete_file("b.txt")
+
+    root = vfs.materialize_to_tempdir()
+
+    assert _files(root) == ["a.txt", "pkg/mod.py"]
+    assert (root / "a.txt").read_text() == "changed\n"
+
+
+def test_same_directory_is_reused(vfs):
+    assert vfs.materialize_to_tempdir() == vfs.materialize_to_tempdir()
+
+
+def test_unchanged_files_are_not_rewritten(vfs):
+    root = vfs.materialize_to_tempdir()
+    before = (root / "b.txt").stat().st_mtime_ns
+    os.utime(root / "b.txt", ns=(1, 1))
+
+    vfs.write_file("a.txt", "changed\n")
+    vfs.materialize_to_tempdir()
+
+    assert (root / "a.txt").read_text() == "changed\n"
+    assert (root / "b.txt").stat().st_mtime_ns == 1 != before
+
+
+def test_discarded_pending_changes_are_reverted(vfs):
+    vfs.write_file("a.txt", "changed\n")
+    vfs.write_file("new/file.txt", "new\n")
+    vfs.delete_file("b.txt")
+    root = vfs.materialize_to_tempdir()
+
+    vfs.clear_pending_changes()
+    vfs.materialize_to_tempdir()
+
+    assert _files(root) == ["a.txt", "b.txt", "pkg/mod.py"]
+    assert (root / "a.txt").read_text() == "alpha\n"
+    assert not (root / "new").exists()
+
+
+def test_follows_new_base_commit(vfs):
+    root = vfs.materialize_to_tempdir()
+
+    vfs.write_file("pkg/other.py", "y = 2\n")
+    vfs.delete_file("pkg/mod.py")
+    vfs.commit("move module")
+    vfs.materialize_to_tempdir()
+
+    assert _files(root) == ["a.txt", "b.txt", "pkg/other.py"]
+
+
+def test_file_replaced_by_directory(vfs):
+    root = vfs.materialize_to_tempdir()
+
+    vfs.delete_file("a.txt")
+    vfs.write_file("a.txt/inner.txt", "inner\n")
+    vfs.materialize_to_tempdir()
+
+    assert (root / "a.txt" / "inner.txt").read_text() == "inner\n"
+
+
+def test_deleted_directory_is_rebuilt(vfs):
+    root = vfs.materialize_to_tempdir()
+    shutil.rmtree(root)
+
+    vfs.write_file("a.txt", "changed\n")
+    assert vfs.materialize_to_tempdir() == root
+
+    assert _files(root) == ["a.txt", "b.txt", "pkg/mod.py"]
+    assert (root / "a.txt").read_text() == "changed\n"
+
+
+def test_git_dir_shares_objects_and_tracks_head(vfs):
+    root = vfs.materialize_to_tempdir()
+    vfs.write_file("c.txt", "gamma\n")
+    vfs.commit("add c")
+    vfs.write_file("a.txt", "changed\n")
+    vfs.materialize_to_tempdir()
+
+    mirror = pygit2.Repository(str(root))
+    assert mirror.head.target == vfs.base_vfs.commit.id
+    # Objects come from the real repository through alternates, not a copy
+    assert not any((root / ".git" / "objects").glob("??/*"))
+    assert mirror.status() == {"a.txt": pygit2.GIT_STATUS_WT_MODIFIED}
+
+
+def test_executable_bit_is_preserved(tmp_path):
+    repo = bootstrap_repo(tmp_path / "repo", {"run.sh": "#!/bin/sh\n"})
+    raw = repo.repo
+    tb = raw.TreeBuilder(raw.head.peel(pygit2.Commit).tree)
+    tb.insert("run.sh", raw.create_blob(b"#!/bin/sh\n"), pygit2.GIT_FILEMODE_BLOB_EXECUTABLE)
+    sig = pygit2.Signature("Test", "test@test.com")
+    raw.create_commit("HEAD", sig, sig, "chmod", tb.write(), [raw.head.target])
+
+    vfs = WorkInProgressVFS(repo, "master")
+    root = vfs.materialize_to_tempdir()
+    assert os.access(root / "run.sh", os.X_OK)
+
+    vfs.write_file("run.sh", "#!/bin/sh\necho hi\n")
+    vfs.materialize_to_tempdir()
+    assert os.access(root / "run.sh", os.X_OK)
+    assert subprocess.run([str(root / "run.sh")], capture_output=True).stdout == b"hi\n"
+
+
+def test_sync_restores_files_a_command_changed(vfs):
+    root = vfs.materialize_to_tempdir()
+    (root / "a.txt").write_text("scribbled\n")
+    (root / "b.txt").unlink()
+
+    vfs.materialize_to_tempdir()
+
+    assert (root / "a.txt").read_text() == "alpha\n"
+    assert (root / "b.txt").read_text() == "beta\n"
+
+
+def test_sync_removes_files_a_command_created(vfs):
+    root = vfs.materialize_to_tempdir()
+    (root / "build" / "lib").mkdir(parents=True)
+    (root / "build" / "lib" / "out.o").write_bytes(b"\0")
+    (root / "pkg" / "stray.txt").write_text("artifact\n")
+    (root / "pkg" / "__pycache__").mkdir()
+    (root / "pkg" / "__pycache__" / "mod.cpython-311.pyc").write_bytes(b"\0")
+    (root / "pkg" / "kept.py").write_text("taken over\n")
+    vfs.write_file("pkg/kept.py", "taken over\n")
+
+    vfs.materialize_to_tempdir()
+
+    assert not (root / "build").exists()
+    assert not (root / "pkg" / "stray.txt").exists()
+    assert (root / "pkg" / "__pycache__" / "mod.cpython-311.pyc").exists()
+    assert (root / "pkg" / "kept.py").read_text() == "taken over\n"
+    assert get_materialized_tree(vfs.repo.repo, "master").disk_changes().added == []
+
+
+def test_disk_changes_uses_stat_only(vfs):
+    root = vfs.materialize_to_tempdir()
+    # Age the file and resync so its recorded mtime is well before the sync
+    os.utime(root / "b.txt", ns=(1, 1))
+    vfs.materialize_to_tempdir()
+    tree = get_materialized_tree(vfs.repo.repo, "master")
+    assert "b.txt" not in tree.disk_changes().modified
+
+    # Same size, same mtime, same inode: invisible to the stat check
+    (root / "b.txt").write_text("BETA\n")
+    os.utime(root / "b.txt", ns=(1, 1))
+    (root / "a.txt").write_text("changed\n")
+
+    changes = tree.disk_changes()
+    assert "a.txt" in changes.modified
+    assert "b.txt" not in changes.modified
+
+
+def test_new_files_are_found_through_directory_mtimes(vfs):
+    root = vfs.materialize_to_tempdir()
+    (root / "pkg" / "generated.py").write_text("y = 2\n")
+    (root / "out" / "deep").mkdir(parents=True)
+    (root / "out" / "deep" / "report.txt").write_text("ok\n")
+
+    changes = get_materialized_tree(vfs.repo.repo, "master").disk_changes()
+
+    assert sorted(changes.added) == ["out/deep/report.txt", "pkg/generated.py"]
+    assert changes.deleted == []
+
+
+def test_write_back_takes_over_changed_text_files(vfs):
+    vfs.write_file(".gitignore", "*.log\n")
+    vfs.commit("ignore logs")
+    root = vfs.materialize_to_tempdir()
+    (root / "pkg" / "mod.py").write_text("x = 1  # formatted\n")
+    (root / "a.txt").touch()  # stat changes, content doesn't
+    (root / "new.txt").write_text("created\n")
+    (root / "run.log").write_text("noise\n")
+
+    result = write_back(vfs)
+
+    assert [(w.path, w.before, w.after) for w in result.written] == [
+        ("pkg/mod.py", "x = 1\n", "x = 1  # formatted\n")
+    ]
+    assert result.untracked == ["new.txt"]
+    assert vfs.read_file("pkg/mod.py") == "x = 1  # formatted\n"
+    assert not vfs.file_exists("new.txt")
+
+
+def test_write_back_can_include_new_files(vfs):
+    root = vfs.materialize_to_tempdir()
+    (root / "gen").mkdir()
+    (root / "gen" / "out.py").write_text("GENERATED = True\n")
+    (root / "gen" / "blob.bin").write_bytes(b"\xff\xfe\x00")
+
+    result = write_back(vfs, include_new=True)
+
+    assert result.new_files == ["gen/out.py"]
+    assert result.untracked == ["gen/blob.bin"]
+    assert vfs.read_file("gen/out.py") == "GENERATED = True\n"
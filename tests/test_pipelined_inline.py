@@ -0,0 +1,133 @@
+"""
+Flow tests for pipelined inline execution (llm.pipelined_inline_commands):
+finished edit blocks are applied while the response is still streaming, and
+the turn ends up exactly where the classic run-everything-at-the-end path
+would have left it.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from tests.harness.dsl import compile_dsl
+
+FILES = {
+    "a.py": "def foo():\n    return 1\n",
+    "b.py": "def bar():\n    return 10\n",
+    "c.py": "def baz():\n    return 100\n",
+}
+
+TWO_EDITS = """
+I'll fix both functions.
+
+@edit a.py
+    old:
+        def foo():
+            return 1
+    new:
+        def foo():
+            return 2
+
+@edit b.py
+    old:
+        def bar():
+            return 10
+    new:
+        def bar():
+            return 20
+
+Both functions are updated.
+"""
+
+
+def _start(session, pipelined: bool) -> None:
+    session.given_files(FILES)
+    session.given_files_in_context(*FILES)
+    session.session_manager.settings.set("llm.pipelined_inline_commands", pipelined)
+
+
+def test_edits_apply_while_response_streams(session):
+    _start(session, pipelined=True)
+    content = compile_dsl(TWO_EDITS)
+
+    # Record a.py's pending content after every chunk
+    sess = session.session
+    seen: list[tuple[int, str | None]] = []
+    on_chunk = sess._on_stream_chunk
+
+    def recording_on_chunk(chunk: str) -> None:
+        on_chunk(chunk)
+        seen.append(
+            (len(sess.streaming_content), sess.session_manager.vfs.pending_changes.get("a.py"))
+        )
+
+    sess._on_stream_chunk = recording_on_chunk  # type: ignore[method-assign]
+
+    session.user_says("Fix foo and bar.")
+    session.backend.queue_response(content=content, chunk_size=16)
+    result = session.run_turn()
+
+    assert result.succeeded, result
+    early = [n for n, a in seen if a == "def foo():\n    return 2\n"]
+    assert early and early[0] < len(content), "a.py edit only applied after the stream ended"
+    assert session.vfs["a.py"] == "def foo():\n    return 2\n"
+    assert session.vfs["b.py"] == "def bar():\n    return 20\n"
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_failed_edit_stops_the_chain_like_classic_mode(session, pipelined):
+    _start(session, pipelined)
+    session.user_says("Fix all three.")
+    session.backend.queue_response(
+        content=compile_dsl(
+            """
+            @edit a.py
+                old:
+                    return 1
+                new:
+                    return 2
+
+            @edit b.py
+                old:
+                    return 99
+                new:
+                    return 20
+
+            @edit c.py
+                old:
+                    return 100
+                new:
+                    return 200
+
+            Done.
+            """
+        ),
+        chunk_size=16,
+    )
+    session.ai_says_raw("Sorry, giving up on b.py.")
+    session.run_turn()
+
+    assert session.vfs["a.py"] == "def foo():\n    return 2\n"
+    assert session.vfs["b.py"] == FILES["b.py"]
+    assert session.vfs["c.py"] == FILES["c.py"]
+    annotated = next(m["content"] for m in session.messages if m.get("role") == "assistant")
+    assert "[INLINE COMMAND ERROR:" in annotated
+    assert "1 subsequent inline command(s) were skipped" in annotated
+
+
+def test_parse_check_failure_rolls_back_early_edits(session):
+    _start(session, pipelined=True)
+    # The first edit finishes (and runs early) long before the malformed
+    # block shows up; the parse-check then rejects the whole response.
+    content = compile_dsl(TWO_EDITS) + '\n<replace file="c.py">\nreturn 100\n\nNever closed.\n'
+    session.user_says("Fix everything.")
+    session.backend.queue_response(content=content, chunk_size=16)
+    session.ai_says_raw("Let me try again later.")
+    session.run_turn()
+
+    assert session.vfs["a.py"] == FILES["a.py"]
+    assert session.vfs["b.py"] == FILES["b.py"]
+    assert any(
+        m.get("role") == "user" and "Inline commands not executed" in m.get("content", "")
+        for m in session.messages
+    )
@@ -0,0 +1,202 @@
+"""Tests for the streaming subprocess runner (forge/tools/process_runner.py)."""
+
+import os
+import resource
+import sys
+import threading
+import time
+
+from forge.runtime import CancelToken, ToolOutput
+from forge.tools.process_runner import (
+    OutputBuffer,
+    ResourceLimits,
+    run_command,
+    run_commands,
+    tool_scope,
+)
+
+
+def _python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+class TestOutputBuffer:
+    def test_short_output_is_kept_whole(self):
+        buffer = OutputBuffer(head=3, tail=3)
+        for i in range(5):
+            buffer.add(f"line {i}")
+
+        assert buffer.text() == "".join(f"line {i}\n" for i in range(5))
+        assert buffer.omitted == 0
+
+    def test_keeps_head_and_tail(self):
+        buffer = OutputBuffer(head=2, tail=2)
+        for i in range(10):
+            buffer.add(f"line {i}")
+
+        assert buffer.text() == "line 0\nline 1\n[... 6 lines omitted ...]\nline 8\nline 9\n"
+        assert buffer.omitted == 6
+
+    def test_keeps_failures_from_the_middle(self):
+        buffer = OutputBuffer(head=1, tail=1)
+        lines = ["start", *(f"ok {i}" for i in range(20)), "FAILED tests/test_a.py::test_x"]
+        lines += [f"ok {i}" for i in range(20, 40)] + ["end"]
+        for line in lines:
+            buffer.add(line)
+
+        text = buffer.text()
+        assert "FAILED tests/test_a.py::test_x" in text
+        assert "ok 18" in text  # context before
+        assert "ok 20" in text  # context after
+        assert "ok 5" not in text
+        assert text.startswith("start\n[... 41 lines omitted; failure-related")
+        assert text.endswith("[... end of excerpt ...]\nend\n")
+
+    def test_excerpt_is_bounded(self):
+        buffer = OutputBuffer(head=0, tail=0, excerpt=5)
+        for i in range(100):
+            buffer.add(f"Error {i}")
+
+        assert len(buffer.excerpt) == 5
+
+    def test_long_lines_are_cut(self):
+        buffer = OutputBuffer()
+        buffer.add("x" * 10_000)
+
+        assert len(buffer.text()) < 5_000
+
+
+class TestRunCommand:
+    def test_captures_both_streams(self):
+        result = run_command(
+            _python("import sys; print('out'); print('err', file=sys.stderr); sys.exit(3)")
+        )
+
+        assert result.returncode == 3
+        assert result.stdout == "out\n"
+        assert result.stderr == "err\n"
+        assert not result.timed_out and not result.cancelled
+
+    def test_bounds_large_output(self):
+        result = run_command(_python("for i in range(100000): print(i)"))
+
+        assert result.returncode == 0
+        assert result.stdout.startswith("0\n1\n")
+        assert result.stdout.endswith("99999\n")
+        assert result.omitted_lines > 99_000
+
+    def test_on_line_sees_every_line_and_can_drop_it(self):
+        seen: list[tuple[str, str]] = []
+
+        def on_line(stream: str, line: str) -> bool:
+            seen.append((stream, line))
+            return line != "secret"
+
+        result = run_command(_python("print('a'); print('secret'); print('b')"), on_line=on_line)
+
+        assert seen == [("stdout", "a"), ("stdout", "secret"), ("stdout", "b")]
+        assert result.stdout == "a\nb\n"
+
+    def test_streams_output_to_the_tool_scope(self):
+        events: list[ToolOutput] = []
+
+        with tool_scope(events.append, None):
+            run_command(_python("import sys; print('one'); print('two', file=sys.stderr)"))
+
+        assert [line for e in events if e.stream == "stdout" for line in e.lines] == ["one"]
+        assert [line for e in events if e.stream == "stderr" for line in e.lines] == ["two"]
+
+    def test_timeout_kills_the_process_group(self, tmp_path):
+        pid_file = tmp_path / "child.pid"
+        # The command starts a grandchild that would outlive a plain kill
+        code = (
+            "import subprocess, sys, time\n"
+            "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+            f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+            "time.sleep(60)\n"
+        )
+
+        start = time.monotonic()
+        result = run_command(_python(code), timeout=1)
+
+        assert result.timed_out
+        assert result.returncode < 0
+        assert time.monotonic() - start < 10
+        child_pid = int(pid_file.read_text())
+        time.sleep(0.2)
+        assert not _alive(child_pid)
+
+    def test_cancel_stops_the_command(self):
+        token = CancelToken()
+        threading.Timer(0.3, token.request_stop).start()
+
+        start = time.monotonic()
+        with tool_scope(None, token):
+            result = run_command(_python("import time; time.sleep(60)"))
+
+        assert result.cancelled
+        assert time.monotonic() - start < 10
+
+    def test_background_children_do_not_hold_the_command_open(self):
+        start = time.monotonic()
+        result = run_command(["sh", "-c", "(sleep 20 &); echo hi"])
+
+        assert time.monotonic() - start < 10
+        assert result.stdout == "hi\n"
+        assert result.returncode == 0 and not result.timed_out
+
+    def test_timeout_applies_while_background_children_hold_the_pipes(self):
+        start = time.monotonic()
+        result = run_command(["sh", "-c", "(sleep 20 &); echo hi"], timeout=0.5)
+
+        assert time.monotonic() - start < 10
+        assert result.timed_out
+
+    def test_memory_limit(self):
+        result = run_command(
+            _python("x = bytearray(512 * 1024 * 1024)"),
+            limits=ResourceLimits(memory_mb=256, cpu_seconds=None),
+        )
+
+        assert result.returncode != 0
+        assert "MemoryError" in result.stderr
+
+    def test_memory_is_unlimited_by_default(self):
+        result = run_command(
+            _python("import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0])")
+        )
+
+        assert result.stdout == f"{resource.RLIM_INFINITY}\n"
+
+    def test_cpu_limit(self):
+        result = run_command(
+            _python("while True: pass"),
+            timeout=30,
+            limits=ResourceLimits(memory_mb=None, cpu_seconds=1),
+        )
+
+        assert not result.timed_out
+        assert result.returncode < 0
+
+
+def test_run_commands_keeps_the_scope_and_order():
+    events: list[ToolOutput] = []
+
+    with tool_scope(events.append, None):
+        results = run_commands([_python("print('first')"), _python("print('second')")])
+
+    assert [r.stdout for r in results] == ["first\n", "second\n"]
+    assert sorted(line for e in events for line in e.lines) == ["[1/2] first", "[2/2] second"]
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers; it counts as gone
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split()[2] != "Z"
+    except FileNotFoundError:
+        return False
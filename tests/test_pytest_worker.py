@@ -0,0 +1,121 @@
+"""Tests for the warm pytest worker (forge/tools/pytest_worker.py)."""
+
+import os
+import signal
+import threading
+
+import pytest
+
+from forge.runtime import CancelToken
+from forge.tools.process_runner import tool_scope
+from forge.tools.pytest_worker import PytestWorker, WorkerCrashedError, WorkerUnavailableError
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A project plus a "third-party" module that logs every import of it."""
+    site = tmp_path / "site"
+    site.mkdir()
+    imports_log = tmp_path / "imports.log"
+    (site / "heavy.py").write_text(
+        f"with open({str(imports_log)!r}, 'a') as f:\n    f.write('imported\\n')\nVALUE = 42\n"
+    )
+    (site / "threaded.py").write_text(
+        "import threading, time\nthreading.Thread(target=time.sleep, args=(5,), daemon=True).start()\n"
+    )
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join([str(site), os.environ.get("PYTHONPATH", "")]))
+
+    root = tmp_path / "root"
+    (root / "tests").mkdir(parents=True)
+    (root / "mod.py").write_text("ANSWER = 1\n")
+    (root / "tests" / "test_mod.py").write_text(
+        "import heavy\nimport mod\n\n"
+        "def test_answer():\n    assert heavy.VALUE == 42\n    assert mod.ANSWER == 1\n"
+    )
+    worker = PytestWorker(root)
+    yield root, worker, imports_log
+    worker.stop()
+
+
+def test_runs_tests_with_preloaded_modules(project):
+    root, worker, imports_log = project
+
+    first = worker.run(["-q", "-p", "no:cacheprovider"], ["heavy"])
+    second = worker.run(["-q", "-p", "no:cacheprovider"], ["heavy"])
+
+    assert worker.preloaded == ["heavy"]
+    assert first.returncode == 0 and second.returncode == 0
+    assert "1 passed" in second.stdout
+    # Imported once, by the server; the children inherit it
+    assert imports_log.read_text() == "imported\n"
+
+
+def test_project_modules_are_imported_fresh(project):
+    root, worker, _ = project
+    assert worker.run(["-q", "-p", "no:cacheprovider"], ["heavy"]).returncode == 0
+
+    (root / "mod.py").write_text("ANSWER = 2\n")
+    result = worker.run(["-q", "-p", "no:cacheprovider"], ["heavy"])
+
+    assert result.returncode == 1
+    assert "assert 2 == 1" in result.stdout
+
+
+def test_new_dependency_restarts_the_server(project):
+    root, worker, imports_log = project
+    worker.run(["-q", "-p", "no:cacheprovider"], ["heavy"])
+
+    worker.run(["-q", "-p", "no:cacheprovider"], ["heavy", "json"])
+
+    assert sorted(worker.preloaded) == ["heavy", "json"]
+    assert imports_log.read_text() == "imported\n" * 2
+
+
+def test_crash_disables_the_worker(project):
+    root, worker, _ = project
+    (root / "tests" / "test_crash.py").write_text(
+        "import os, signal\n\ndef test_crash():\n    os.kill(os.getpid(), signal.SIGSEGV)\n"
+    )
+
+    with pytest.raises(WorkerCrashedError, match="SIGSEGV"):
+        worker.run(["-q", "-p", "no:cacheprovider", "-p", "no:faulthandler"], ["heavy"])
+    with pytest.raises(WorkerUnavailableError, match="SIGSEGV"):
+        worker.run(["-q"], ["heavy"])
+
+
+def test_server_death_is_detected(project):
+    root, worker, _ = project
+    (root / "tests" / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(60)\n")
+    worker.run(["-q", "-p", "no:cacheprovider", "tests/test_mod.py"], ["heavy"])
+    assert worker._proc is not None
+    threading.Timer(0.5, os.kill, (worker._proc.pid, signal.SIGKILL)).start()
+
+    with pytest.raises(WorkerUnavailableError, match="died"):
+        worker.run(["-q", "-p", "no:cacheprovider", "tests/test_slow.py"], ["heavy"], timeout=30)
+
+    # Not a crash of the tests: the next run starts a new server
+    assert worker.run(["-q", "-p", "no:cacheprovider", "tests/test_mod.py"], ["heavy"]).returncode == 0
+
+
+def test_cancel_and_timeout_stop_the_run(project):
+    root, worker, _ = project
+    (root / "tests" / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(60)\n")
+    args = ["-q", "-p", "no:cacheprovider", "tests/test_slow.py"]
+
+    assert worker.run(args, ["heavy"], timeout=1).timed_out
+
+    token = CancelToken()
+    threading.Timer(0.5, token.request_stop).start()
+    with tool_scope(None, token):
+        assert worker.run(args, ["heavy"]).cancelled
+
+    # The server survives both
+    assert worker.run(["-q", "-p", "no:cacheprovider", "tests/test_mod.py"], ["heavy"]).returncode == 0
+
+
+def test_threads_at_preload_make_it_unavailable(project):
+    root, worker, _ = project
+
+    with pytest.raises(WorkerUnavailableError, match="threads"):
+        worker.run(["-q"], ["threaded"])
+    assert worker.disabled_reason is not None
@@ -0,0 +1,66 @@
+"""Tests for the chat render cache (RenderCache and ChatMessage.render_key in
+forge/ui/chat_message.py)."""
+
+from forge.ui.chat_message import ChatMessage, RenderCache, build_tool_results_lookup
+
+
+def _assistant(content="hi", tool_call_id="call_1"):
+    return ChatMessage.from_dict(
+        {
+            "role": "assistant",
+            "content": content,
+            "tool_calls": [
+                {"id": tool_call_id, "function": {"name": "grep_open", "arguments": "{}"}}
+            ],
+        }
+    )
+
+
+def _key(msg, raw_results=None, handled=frozenset(), streaming=False, inline=True):
+    return msg.render_key(raw_results or {}, set(handled), streaming, inline)
+
+
+def test_render_key_tracks_everything_rendered():
+    msg = _assistant()
+    base = _key(msg)
+    assert _key(_assistant()) == base
+    assert _key(_assistant(content="changed")) != base
+    assert _key(msg, raw_results={"call_1": '{"success": true}'}) != base
+    assert _key(msg, raw_results={"other": '{"success": true}'}) == base
+    assert _key(msg, streaming=True) != base
+    assert _key(msg, inline=False) != base
+
+    approval = ChatMessage.from_dict({"role": "system", "content": "x", "_approval_tool": "t"})
+    assert _key(approval) != _key(approval, handled={"t"})
+
+
+def test_cache_reuses_and_sweeps():
+    cache = RenderCache()
+    calls = []
+
+    def render(text):
+        calls.append(text)
+        return f"<p>{text}</p>"
+
+    assert cache.get("a", lambda: render("a")) == "<p>a</p>"
+    first = cache.get("b", lambda: render("b"))
+    cache.sweep()
+
+    # Unchanged keys come back as the very same string
+    assert cache.get("b", lambda: render("b")) is first
+    assert calls == ["a", "b"]
+    cache.sweep()
+
+    # "a" wasn't used by the last render, so it was dropped
+    cache.get("a", lambda: render("a"))
+    assert calls == ["a", "b", "a"]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_tool_results_lookup():
+    messages = [
+        ChatMessage.from_dict({"role": "tool", "tool_call_id": "1", "content": '{"ok": 1}'}),
+        ChatMessage.from_dict({"role": "tool", "tool_call_id": "2", "content": "not json"}),
+        ChatMessage.from_dict({"role": "tool", "tool_call_id": "3", "content": ""}),
+    ]
+    assert build_tool_results_lookup(messages) == {"1": {"ok": 1}, "2": {}, "3": {}}
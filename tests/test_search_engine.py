@@ -0,0 +1,147 @@
+"""Tests for the streaming search engine behind the grep tools and search panel
+(forge/vfs/search_engine.py)."""
+
+import os
+import re
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from PySide6.QtWidgets import QApplication
+
+from forge.runtime import process_pool
+from forge.runtime.tasks import SyncTaskRunner
+from forge.tools.builtin import grep_context
+from forge.vfs import search_engine
+from forge.vfs.search_engine import iter_file_matches, iter_line_matches, plan_search
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+FILES = {
+    f"mod{i:03d}.py": f"# module {i}\nVALUE = {i}\n\ndef f{i}():\n    return VALUE\n"
+    for i in range(40)
+}
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    vfs = WorkInProgressVFS(bootstrap_repo(tmp_path, FILES), "master")
+    vfs.write_file("pending.py", "VALUE = 'pending'\n")
+    vfs.write_file_bytes("binary.dat", b"\xff\xfeVALUE")
+    return vfs
+
+
+def _naive_line_matches(vfs, regex):
+    result = []
+    for filepath in vfs.list_files():
+        try:
+            lines = vfs.read_file_bytes(filepath).decode("utf-8").split("\n")
+        except UnicodeDecodeError:
+            continue
+        result.extend((filepath, i + 1, line) for i, line in enumerate(lines) if regex.search(line))
+    return result
+
+
+def test_line_matches_equal_sequential_scan(vfs):
+    regex = re.compile(r"VALUE")
+    plan = plan_search(vfs, vfs.list_files())
+    found = [(m.filepath, m.line, m.text) for m in iter_line_matches(plan, regex)]
+    assert found == _naive_line_matches(vfs, regex)
+    assert ("pending.py", 1, "VALUE = 'pending'") in found
+
+
+def test_context_lines(vfs):
+    plan = plan_search(vfs, ["mod007.py"])
+    (match,) = iter_line_matches(plan, re.compile(r"def f7"), context_before=2, context_after=5)
+    assert match.line == 4
+    assert match.before == ["VALUE = 7", ""]
+    assert match.after == ["    return VALUE", ""]
+
+
+def test_file_matches(vfs):
+    plan = plan_search(vfs, vfs.list_files())
+    matches = list(iter_file_matches(plan, re.compile(r"f(\d+)\(")))
+    assert [m.filepath for m in matches] == [f"mod{i:03d}.py" for i in range(40)]
+    assert matches[3].match_count == 1
+    assert matches[3].first_match == "3"
+
+
+def test_process_pool_matches_in_process_scan(vfs, monkeypatch):
+    regex = re.compile(r"return|pending")
+    plan = plan_search(vfs, vfs.list_files())
+    expected = list(iter_line_matches(plan, regex))
+
+    # Force a two-worker pool even on a single-core machine
+    monkeypatch.setattr(process_pool, "worker_count", lambda: 2)
+    monkeypatch.setattr(search_engine, "PARALLEL_MIN_FILES", 1)
+    monkeypatch.setattr(search_engine, "_BATCH_SIZE", 4)
+    pool = process_pool.get_process_pool()
+    assert pool is not None
+    try:
+        assert list(iter_line_matches(plan, regex)) == expected
+    finally:
+        pool.shutdown()
+        monkeypatch.setattr(process_pool, "_pool", None)
+
+
+def test_pool_workers_do_not_import_qt(tmp_path):
+    # What pip's console-script wrapper for the "forge" entry point looks like;
+    # spawned workers re-run it as __mp_main__
+    script = tmp_path / "forge_entry.py"
+    script.write_text(
+        "import sys\n"
+        "from forge.__main__ import main\n"
+        "if __name__ == '__main__':\n"
+        "    from forge.runtime import process_pool\n"
+        "    process_pool.worker_count = lambda: 2\n"
+        "    pool = process_pool.get_process_pool()\n"
+        "    print(pool.submit(eval, \"'PySide6' in __import__('sys').modules\").result())\n"
+        "    pool.shutdown()\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+
+    result = subprocess.run(
+        [sys.executable, str(script)], capture_output=True, text=True, env=env, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_grep_context_only_counts_after_max_matches(vfs, monkeypatch):
+    scanned: dict[str, list[str]] = {"lines": [], "count": []}
+    original = search_engine._scan_batch
+
+    def tracking_scan(*args):
+        scanned[args[3]].extend(source.filepath for source in args[-1])
+        return original(*args)
+
+    monkeypatch.setattr(search_engine, "_scan_batch", tracking_scan)
+    result = grep_context.execute(vfs, {"pattern": r"^VALUE", "max_matches": 3})
+
+    assert result["total_matches"] == 41
+    assert "(showing 3 of 41 total matches)" in result["message"]
+    assert result["output"].count(">>>") == 3
+    # Snippets stop at the first extra match; counting restarts at the last
+    # snippet's file
+    assert scanned["lines"] == ["binary.dat", "mod000.py", "mod001.py", "mod002.py", "mod003.py"]
+    assert scanned["count"][0] == "mod002.py"
+
+
+def test_grep_context_single_file_not_found(vfs):
+    result = grep_context.execute(vfs, {"pattern": "x", "file": "missing.py"})
+    assert result == {"success": False, "error": "File not found: missing.py"}
+
+
+def test_search_widget_streams_results(vfs):
+    from forge.ui.search_widget import SearchWidget
+
+    _app = QApplication.instance() or QApplication([])
+    widget = SearchWidget(SimpleNamespace(vfs=vfs), task_runner=SyncTaskRunner())
+    widget.search_input.setText("def f1\\d")
+    widget._do_search()
+
+    items = [widget.results_list.item(i).text() for i in range(widget.results_list.count())]
+    assert items == [f"mod{i:03d}.py:4\n  def f{i}():" for i in range(10, 20)]
+    assert widget.status_label.text() == "10 match(es)"
@@ -0,0 +1,77 @@
+"""Tests for the incremental streaming-message patches (StreamingPatcher in
+forge/ui/chat_streaming.py)."""
+
+import json
+
+from forge.ui.chat_streaming import StreamingPatcher, StreamSegment, build_streaming_segments
+
+
+def _patch(patcher, content):
+    js = patcher.patch_js(content)
+    if js is None:
+        return None
+    assert js.startswith("applyStreamingPatch(") and js.endswith(");")
+    return json.loads(js[len("applyStreamingPatch(") : -2])
+
+
+def test_first_patch_resets_then_text_is_appended():
+    patcher = StreamingPatcher()
+    assert _patch(patcher, "Hello") == {
+        "reset": True,
+        "keep": 0,
+        "segments": [["text", "Hello", True]],
+        "mermaid": False,
+    }
+    patch = _patch(patcher, "Hello, world")
+    assert patch["extend"] == [0, ", world"]
+    assert (patch["keep"], patch["segments"]) == (1, [])
+    assert _patch(patcher, "Hello, world") is None
+
+
+def test_reset_resends_everything():
+    patcher = StreamingPatcher()
+    _patch(patcher, "Hello")
+    patcher.reset()
+    assert _patch(patcher, "Hello")["reset"] is True
+
+
+def test_finished_blocks_are_not_resent():
+    patcher = StreamingPatcher()
+    head = "Look:\n```svg\n<svg></svg>\n```\n"
+    _patch(patcher, head + "after")
+    patch = _patch(patcher, head + "after more")
+    assert patch["keep"] == 3
+    assert patch["extend"] == [2, " more"]
+    assert patch["segments"] == []
+
+
+def test_streaming_mermaid_is_updated_in_place():
+    patcher = StreamingPatcher()
+    _patch(patcher, "Diagram:\n```mermaid\ngraph TD\n  A --> B")
+    patch = _patch(patcher, "Diagram:\n```mermaid\ngraph TD\n  A --> B\n  B --> C")
+    assert patch["update"] == [1, "graph TD\n  A --> B\n  B --> C"]
+    assert patch["mermaid"] is True
+
+    # Completing the block replaces it, so it renders without the streaming marker
+    patch = _patch(patcher, "Diagram:\n```mermaid\ngraph TD\n  A --> B\n  B --> C\n```\n")
+    assert "update" not in patch
+    assert patch["keep"] == 1
+    assert patch["segments"][0] == ["mermaid", "graph TD\n  A --> B\n  B --> C", True]
+
+
+def test_changed_tail_is_replaced():
+    patcher = StreamingPatcher()
+    patcher._sent = [StreamSegment("text", "a"), StreamSegment("html", "<b>x</b>")]
+    patch = patcher.diff([StreamSegment("text", "a"), StreamSegment("html", "<b>y</b>")])
+    assert patch["keep"] == 1
+    assert patch["segments"] == [["html", "<b>y</b>", True]]
+
+
+def test_segments_match_previous_rendering_rules():
+    assert build_streaming_segments("[id 3] hi") == [StreamSegment("text", "hi")]
+    segments = build_streaming_segments("x\n```svg\n<svg>")
+    assert segments[-1].kind == "html" and segments[-1].complete is False
+    assert "▋ streaming" in segments[-1].content
+    # Inline edits disabled: tags stay plain text
+    text = "<write>a.py</write>"
+    assert build_streaming_segments(text, inline_enabled=False) == [StreamSegment("text", text)]
@@ -0,0 +1,79 @@
+"""Tests for the SQLite summary cache (forge/session/summary_cache.py)."""
+
+import hashlib
+import threading
+
+from forge.session.summary_cache import SummaryCache
+
+
+def test_bulk_lookup(tmp_path):
+    cache = SummaryCache(tmp_path / "summaries.db")
+    cache.put("a.py", "oid1", "- alpha")
+    cache.put("b.py", "oid2", "- beta")
+    cache.put("b.py", "oid2", "- beta v2")  # Replaces
+
+    found = cache.get_many([("a.py", "oid1"), ("b.py", "oid2"), ("a.py", "oid2"), ("c.py", "x")])
+    assert found == {("a.py", "oid1"): "- alpha", ("b.py", "oid2"): "- beta v2"}
+    assert cache.get("a.py", "oid1") == "- alpha"
+    assert cache.get("missing.py", "oid1") is None
+
+
+def test_shared_between_connections(tmp_path):
+    path = tmp_path / "summaries.db"
+    writer = SummaryCache(path)
+    reader = SummaryCache(path)
+    writer.put("a.py", "oid1", "- alpha")
+    assert reader.get("a.py", "oid1") == "- alpha"
+
+    # Concurrent writers don't lose entries
+    def write(cache, prefix):
+        for i in range(50):
+            cache.put(f"{prefix}{i}.py", "oid", "x")
+
+    threads = [
+        threading.Thread(target=write, args=(c, p)) for c, p in ((writer, "w"), (reader, "r"))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    keys = [(f"{p}{i}.py", "oid") for p in "wr" for i in range(50)]
+    assert len(SummaryCache(path).get_many(keys)) == 100
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    now = [1_000_000]
+    monkeypatch.setattr("forge.session.summary_cache.time.time", lambda: now[0])
+    cache = SummaryCache(tmp_path / "summaries.db", max_bytes=35)
+    for name in ("old", "mid", "new"):
+        cache.put(f"{name}.py", "oid", "x" * 10)
+        now[0] += 10 * 24 * 60 * 60
+    # A hit refreshes "old", so "mid" is now the least recently used
+    assert cache.get("old.py", "oid") is not None
+
+    cache.put("extra.py", "oid", "x" * 10)
+    assert cache.evict() == 1
+    assert cache.get("mid.py", "oid") is None
+    assert cache.get("old.py", "oid") is not None
+
+
+def test_reads_legacy_per_file_cache(tmp_path):
+    legacy = tmp_path / "summaries"
+    legacy.mkdir()
+    key = hashlib.sha256(b"oid1:a.py").hexdigest()
+    (legacy / key).write_text("- legacy")
+
+    cache = SummaryCache(tmp_path / "summaries.db", legacy_dir=legacy)
+    assert cache.get_many([("a.py", "oid1"), ("b.py", "oid2")]) == {("a.py", "oid1"): "- legacy"}
+
+    # Copied into the database
+    (legacy / key).unlink()
+    assert SummaryCache(tmp_path / "summaries.db").get("a.py", "oid1") == "- legacy"
+
+
+def test_unusable_path_degrades_to_no_cache(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = SummaryCache(blocker / "summaries.db")
+    cache.put("a.py", "oid", "x")
+    assert cache.get("a.py", "oid") is None
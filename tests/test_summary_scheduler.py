@@ -0,0 +1,213 @@
+"""Tests for the adaptive summary scheduler (forge/llm/summary_scheduler.py)."""
+
+import re
+import threading
+import time
+
+import pytest
+import requests
+
+from forge.llm.client import RateLimitError
+from forge.llm.summary_scheduler import AimdLimit, SummaryScheduler, TokenBucket
+
+
+def _rate_limit_error(retry_after=None):
+    response = requests.Response()
+    response.status_code = 429
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return RateLimitError("429", response=response)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_paces_and_pauses():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2.0, burst=2, clock=clock)
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    assert bucket.take() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.take() == 0.0
+
+    bucket.pause(3.0)
+    assert bucket.take() == pytest.approx(3.0)
+    clock.now += 3.0
+    # Restarts empty after the pause rather than with a full burst
+    assert bucket.take() == pytest.approx(0.5)
+
+
+def test_aimd_limit():
+    limit = AimdLimit(maximum=8)
+    limit.on_throttle()
+    assert limit.current == 4
+    # Further 429s from the same window don't halve it again
+    limit.on_throttle()
+    assert limit.current == 4
+
+    for _ in range(4):
+        limit.on_success(1.0)  # Cooldown
+    for _ in range(4):
+        limit.on_success(1.0)
+    assert limit.current == 5
+
+    before = limit.limit
+    limit.on_success(10.0)  # Latency spike
+    assert limit.limit == pytest.approx(before * 0.75)
+
+
+def test_runs_every_job_within_concurrency_limit():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def request(job):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        return job * 2
+
+    results = {}
+    scheduler = SummaryScheduler(max_concurrency=3, requests_per_second=1000)
+    stats = scheduler.run(range(20), request, lambda job, r: results.setdefault(job, r) is not None)
+
+    assert results == {i: i * 2 for i in range(20)}
+    assert peak <= 3
+    assert (stats.completed, stats.cancelled) == (20, 0)
+
+
+def test_rate_limited_jobs_are_retried_with_less_concurrency():
+    seen = set()
+    lock = threading.Lock()
+
+    def request(job):
+        with lock:
+            first = job not in seen
+            seen.add(job)
+        if job == 0 and first:
+            raise _rate_limit_error(retry_after=0.01)
+        return job
+
+    results = []
+    scheduler = SummaryScheduler(max_concurrency=4, requests_per_second=1000)
+    stats = scheduler.run(range(5), request, lambda job, r: results.append(r) is None)
+
+    assert sorted(results) == list(range(5))
+    assert stats.rate_limited == 1
+    assert stats.final_limit < 4
+
+
+def test_persistent_rate_limit_fails_the_batch():
+    def request(job):
+        raise _rate_limit_error(retry_after=0)
+
+    scheduler = SummaryScheduler(max_concurrency=1, requests_per_second=1000, max_attempts=2)
+    with pytest.raises(RateLimitError):
+        scheduler.run([1], request, lambda job, r: True)
+
+
+def test_on_result_false_stops_the_batch():
+    requested = []
+
+    def request(job):
+        requested.append(job)
+        return job
+
+    scheduler = SummaryScheduler(max_concurrency=1, requests_per_second=1000)
+    stats = scheduler.run(range(10), request, lambda job, r: job < 2)
+
+    assert requested == [0, 1, 2]
+    assert stats.completed == 3
+    assert stats.cancelled == 7
+
+
+def test_in_flight_results_are_delivered_after_a_stop():
+    release = threading.Event()
+
+    def request(job):
+        if job > 0:
+            release.wait(5)  # Still in flight when job 0 stops the batch
+        return job
+
+    def on_result(job, result):
+        results.append(result)
+        release.set()
+        return False
+
+    results = []
+    scheduler = SummaryScheduler(max_concurrency=3, requests_per_second=1000)
+    stats = scheduler.run(range(10), request, on_result)
+
+    assert sorted(results) == [0, 1, 2]
+    assert stats.completed == 3
+    assert stats.cancelled == 7
+
+
+def test_errors_after_a_stop_are_dropped():
+    def request(job):
+        if job > 0:
+            time.sleep(0.05)
+            raise ValueError("late")
+        return job
+
+    scheduler = SummaryScheduler(max_concurrency=2, requests_per_second=1000)
+    stats = scheduler.run(range(4), request, lambda job, r: False)
+
+    assert stats.completed == 1
+    assert stats.cancelled == 3
+
+
+def test_errors_propagate():
+    def request(job):
+        raise ValueError("boom")
+
+    scheduler = SummaryScheduler(max_concurrency=2, requests_per_second=1000)
+    with pytest.raises(ValueError, match="boom"):
+        scheduler.run([1, 2], request, lambda job, r: True)
+
+
+def test_should_stop_cancels_pending_jobs():
+    scheduler = SummaryScheduler(
+        max_concurrency=1, requests_per_second=1000, should_stop=lambda: True
+    )
+    stats = scheduler.run(range(3), lambda job: pytest.fail("started"), lambda job, r: True)
+    assert stats.cancelled == 3
+
+
+def test_repo_summaries_fill_the_budget_in_breadth_first_order(session, monkeypatch):
+    from forge.session.manager import SessionManager
+
+    # Later files answer first; a summary costs ~103 tokens, so two fit
+    delays = {"a.py": 0.3, "b.py": 0.2, "c.py": 0.1, "d.py": 0.0}
+
+    class _Client:
+        def __init__(self, *args):
+            pass
+
+        def chat(self, messages, max_retries=None):
+            filepath = re.search(r"File: (\S+)", messages[0]["content"]).group(1)
+            time.sleep(delays[filepath])
+            return {"choices": [{"message": {"content": "s" * 300}}]}
+
+    session.given_files({name: f"# {name}\n" for name in delays})
+    manager = session.session_manager
+    monkeypatch.setattr("forge.session.manager.LLMClient", _Client)
+    monkeypatch.setattr(manager.settings, "get_summary_token_budget", lambda: 250)
+    monkeypatch.setattr(manager.settings, "get_parallel_summarization", lambda: 4)
+
+    SessionManager.generate_repo_summaries(manager, force_refresh=True)
+
+    assert sorted(manager.repo_summaries) == ["a.py", "b.py"]
+    # The ones that didn't fit are still cached for next time
+    assert manager.summary_cache.get("d.py", str(manager.vfs.get_blob_oid("d.py"))) == "s" * 300
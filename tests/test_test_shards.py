@@ -0,0 +1,100 @@
+"""Tests for parallel test sharding in run_tests (forge/tools/test_shards.py)."""
+
+import pygit2
+
+from forge.tools.test_shards import (
+    DurationReport,
+    DurationStore,
+    ShardResult,
+    merge_shard_results,
+    plan_shards,
+)
+
+PYTEST_OUTPUT = """\
+............                                                             [100%]
+============================= slowest durations ==============================
+1.50s call     tests/test_slow.py::test_big[1]
+0.20s setup    tests/test_slow.py::test_big[1]
+0.01s call     tests/test_fast.py::TestX::test_y
+
+(3 durations < 0.005s hidden.  Use -vv to show these durations.)
+============================= 12 passed in 1.80s =============================
+"""
+
+
+class TestPlanShards:
+    def test_whole_files_are_balanced(self):
+        ids = [f"tests/test_{name}.py::test_{i}" for name in "abcd" for i in range(3)]
+        durations = {n: 1.0 for n in ids}
+
+        shards = plan_shards(ids, durations, 2)
+
+        assert [len(shard) for shard in shards] == [2, 2]
+        assert sorted(arg for shard in shards for arg in shard) == [
+            f"tests/test_{name}.py" for name in "abcd"
+        ]
+
+    def test_oversized_file_is_split(self):
+        ids = [f"tests/test_big.py::test_{i}" for i in range(4)] + ["tests/test_small.py::t"]
+
+        shards = plan_shards(ids, {}, 2)
+
+        assert len(shards) == 2
+        flat = [arg for shard in shards for arg in shard]
+        assert "tests/test_big.py" not in flat
+        assert sorted(flat) == sorted(ids[:4] + ["tests/test_small.py"])
+
+    def test_never_more_shards_than_tests(self):
+        assert plan_shards(["t.py::a"], {}, 8) == [["t.py"]]
+
+    def test_uses_recorded_durations(self):
+        ids = ["a.py::slow", "b.py::x", "c.py::y", "d.py::z"]
+        durations = {"a.py::slow": 10.0, "b.py::x": 1.0, "c.py::y": 1.0, "d.py::z": 1.0}
+
+        shards = plan_shards(ids, durations, 2)
+
+        assert sorted(shards) == [["a.py"], ["b.py", "c.py", "d.py"]]
+
+
+def test_duration_report_sums_phases():
+    report = DurationReport()
+    for line in PYTEST_OUTPUT.splitlines():
+        report("stdout", line)
+
+    assert report.durations == {
+        "tests/test_slow.py::test_big[1]": 1.7,
+        "tests/test_fast.py::TestX::test_y": 0.01,
+    }
+
+
+def test_duration_report_drops_report_lines():
+    report = DurationReport()
+    kept = [line for line in PYTEST_OUTPUT.splitlines() if report("stdout", line)]
+
+    assert "slowest durations" not in "\n".join(kept)
+    assert not any("1.50s call" in line for line in kept)
+    assert kept[-1] == "============================= 12 passed in 1.80s ============================="
+
+
+def test_merge_shard_results():
+    merged = merge_shard_results(
+        [
+            ShardResult(0, "..\n===== 2 passed in 1.00s =====\n", ""),
+            ShardResult(1, "F.\n===== 1 failed, 1 passed in 2.50s =====\n", "warn\n"),
+        ]
+    )
+
+    assert merged.returncode == 1
+    assert merged.shard_count == 2
+    assert "--- shard 1/2 ---" in merged.stdout
+    assert "--- shard 2/2 ---\nwarn" in merged.stderr
+    assert merged.stdout.rstrip().endswith("===== 1 failed, 3 passed in 2.50s (2 shards) =====")
+
+
+def test_duration_store_round_trip(tmp_path):
+    oid = pygit2.Oid(hex="ab" * 20)
+    store = DurationStore(tmp_path / "durations.json")
+    store.update({oid: {"test_a": 1.0}})
+    store.update({oid: {"test_b": 2.0}})
+
+    assert DurationStore(tmp_path / "durations.json").get(oid) == {"test_a": 1.0, "test_b": 2.0}
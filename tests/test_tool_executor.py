@@ -10,6 +10,7 @@ Tests use minimal fakes for tool_manager and session_manager so the
 helper's behavior is observable without touching real tools or VFS.
 """
 
+import threading
 from typing import Any
 
 import pytest
@@ -56,6 +57,9 @@ class _FakeToolManager:
             raise AssertionError(f"unexpected extra tool call: {tool_name}")
         return self._results.pop(0)
 
+    def is_read_only(self, tool_name: str) -> bool:
+        return False
+
 
 def _tool_call(
     name: str, arguments: str = "{}", call_id: str = "call_x"
@@ -308,6 +312,9 @@ class TestExecuteToolCallsVFSHandoff:
             def execute_tool(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
                 raise RuntimeError("tool went boom")
 
+            def is_read_only(self, tool_name: str) -> bool:
+                return False
+
         with pytest.raises(RuntimeError, match="tool went boom"):
             execute_tool_calls(
                 [_tool_call("a")],
@@ -317,4 +324,141 @@ class TestExecuteToolCallsVFSHandoff:
             )
 
         assert session.vfs.claims == 1
-        assert session.vfs.releases == 1
\ No newline at end of file
+        assert session.vfs.releases == 1
+
+# --- Concurrent read-only calls ---
+
+
+class _SnapshotVFS(_FakeVFS):
+    def __init__(self) -> None:
+        super().__init__()
+        self.snapshots: list[object] = []
+
+    def snapshot(self) -> object:
+        self.snapshots.append(object())
+        return self.snapshots[-1]
+
+
+class _ReadOnlyToolManager:
+    """Tools named "read*" are read-only; each returns results[name].
+
+    Read-only calls wait on a barrier sized to the number of read-only
+    calls, so they only complete if they all run at the same time.
+    """
+
+    def __init__(self, results: dict[str, dict[str, Any]], concurrent: int) -> None:
+        self._results = results
+        self._barrier = threading.Barrier(concurrent, timeout=5)
+        self.calls: list[tuple[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def is_read_only(self, tool_name: str) -> bool:
+        return tool_name.startswith("read")
+
+    def execute_tool(
+        self, tool_name: str, args: dict[str, Any], session_manager: Any, vfs: Any = None
+    ) -> dict[str, Any]:
+        with self._lock:
+            self.calls.append((tool_name, vfs))
+        if self.is_read_only(tool_name):
+            self._barrier.wait()
+        return self._results[tool_name]
+
+
+class TestExecuteToolCallsConcurrency:
+    def test_read_only_run_executes_concurrently_and_reports_in_order(self) -> None:
+        session = _FakeSessionManager()
+        session.vfs = _SnapshotVFS()
+        tools = _ReadOnlyToolManager(
+            {f"read{i}": {"success": True, "n": i} for i in range(3)}, concurrent=3
+        )
+        events: list = []
+
+        results = execute_tool_calls(
+            [_tool_call(f"read{i}", call_id=str(i)) for i in range(3)],
+            tools,
+            session,
+            _emit_to(events),
+        )
+
+        assert [r["result"]["n"] for r in results] == [0, 1, 2]
+        # Every card shows as running before the first one finishes
+        assert [type(e) for e in events] == [ToolStarted] * 3 + [ToolFinished] * 3
+        assert [e.tool_call_id for e in events if isinstance(e, ToolFinished)] == ["0", "1", "2"]
+        # All three ran against the one snapshot, not the live VFS
+        assert {vfs for _, vfs in tools.calls} == {session.vfs.snapshots[0]}
+        assert (session.vfs.claims, session.vfs.releases) == (1, 1)
+
+    def test_failure_in_read_only_run_stops_the_chain(self) -> None:
+        session = _FakeSessionManager()
+        session.vfs = _SnapshotVFS()
+        tools = _ReadOnlyToolManager(
+            {
+                "read_a": {"success": True},
+                "read_b": {"success": False, "error": "bad"},
+                "read_c": {"success": True},
+                "write": {"success": True},
+            },
+            concurrent=3,
+        )
+        events: list = []
+
+        results = execute_tool_calls(
+            [_tool_call("read_a"), _tool_call("read_b"), _tool_call("read_c"), _tool_call("write")],
+            tools,
+            session,
+            _emit_to(events),
+        )
+
+        assert [r["result"].get("error") for r in results] == [None, "bad"]
+        assert [e.tool_name for e in events if isinstance(e, ToolStarted)] == [
+            "read_a",
+            "read_b",
+            "read_c",
+        ]
+        assert [e.tool_name for e in events if isinstance(e, ToolFinished)] == ["read_a", "read_b"]
+        assert "write" not in [name for name, _ in tools.calls]
+
+    def test_other_calls_split_read_only_runs(self) -> None:
+        session = _FakeSessionManager()
+        session.vfs = _SnapshotVFS()
+        # A lone read-only call runs like any other call: no barrier partner
+        tools = _ReadOnlyToolManager(
+            {"read_a": {"success": True}, "write": {"success": True}}, concurrent=1
+        )
+
+        results = execute_tool_calls(
+            [_tool_call("read_a"), _tool_call("write"), _tool_call("read_a")],
+            tools,
+            session,
+            _emit_to([]),
+        )
+
+        assert len(results) == 3
+        assert [name for name, _ in tools.calls] == ["read_a", "write", "read_a"]
+        assert session.vfs.snapshots == []
+
+
+def test_tool_manager_read_only_flag(session) -> None:
+    session.given_files({"a.py": "x = 1\n"})
+    tool_manager = session.session_manager.tool_manager
+    schemas = tool_manager.discover_tools()
+
+    assert tool_manager.is_read_only("grep_context")
+    assert not tool_manager.is_read_only("update_context")
+    # The flag is for the executor; the model never sees it
+    assert not any("read_only" in schema for schema in schemas)
+
+
+def test_snapshot_is_frozen_and_read_only(session) -> None:
+    session.given_files({"a.py": "x = 1\n"})
+    vfs = session.session_manager.vfs
+    vfs.write_file("a.py", "x = 2\n")
+    snapshot = vfs.snapshot()
+    vfs.write_file("a.py", "x = 3\n")
+    vfs.write_file("b.py", "y = 1\n")
+
+    assert snapshot.read_file("a.py") == "x = 2\n"
+    assert not snapshot.file_exists("b.py")
+    with pytest.raises(NotImplementedError):
+        snapshot.write_file("a.py", "x = 4\n")
@@ -0,0 +1,82 @@
+"""Tests for the pooled HTTP transport (forge/llm/transport.py), against a
+local HTTP server."""
+
+import http.server
+import json
+import threading
+
+import pytest
+
+from forge.llm.client import LLMClient
+from forge.llm.transport import HttpTransport
+
+SSE_EVENTS = [
+    b'data: {"id": "gen-1", "choices": [{"delta": {"content": "hi"}}]}\n\n',
+    b"data: [DONE]\n\n",
+]
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.ports.append(self.client_address[1])  # type: ignore[attr-defined]
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Set-Cookie", "session=1")
+        self.end_headers()
+        for event in SSE_EVENTS:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.ports = []  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_streamed_chat_reuses_one_connection(server, monkeypatch):
+    transport = HttpTransport()
+    monkeypatch.setattr("forge.llm.client.TRANSPORT", transport)
+    client = LLMClient("key", "model", _url(server))
+
+    for _ in range(3):
+        chunks = list(client.chat_stream([{"role": "user", "content": "hi"}]))
+        assert chunks == [json.loads(SSE_EVENTS[0][len(b"data: ") :])]
+
+    # Same client-side port every time: the connection was kept alive
+    assert len(set(server.ports)) == 1
+
+
+def test_metrics_and_no_cookies(server):
+    transport = HttpTransport()
+    transport.post(_url(server) + "/x", data=b"{}").close()
+    transport.post(_url(server) + "/x", data=b"{}").close()
+
+    stats = transport.metrics()[f"127.0.0.1:{server.server_address[1]}"]
+    assert (stats.requests, stats.errors) == (2, 0)
+    assert 0 < stats.mean_ttfb <= stats.max_latency
+    assert len(transport.session.cookies) == 0
+
+
+def test_failed_requests_count_as_errors():
+    transport = HttpTransport()
+    with pytest.raises(Exception):  # noqa: B017 - connection refused, type varies
+        transport.get("http://127.0.0.1:9/", timeout=1)
+    stats = transport.metrics()["127.0.0.1:9"]
+    assert (stats.requests, stats.errors) == (1, 1)
+    assert stats.mean_latency == 0.0
@@ -0,0 +1,109 @@
+"""Tests for ForgeRepository.create_tree_from_changes (the incremental tree
+builder)."""
+
+import pygit2
+import pytest
+
+from tests.harness.repo import bootstrap_repo
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = bootstrap_repo(tmp_path, {"README": "hi\n"})
+    raw = repo.repo
+    base = repo.get_branch_head("master").tree
+
+    # Add nested files with varied modes on top of the bootstrap commit
+    pkg = raw.TreeBuilder()
+    pkg.insert("mod.py", raw.create_blob(b"x = 1\n"), pygit2.GIT_FILEMODE_BLOB)
+    pkg.insert("run.sh", raw.create_blob(b"#!/bin/sh\n"), pygit2.GIT_FILEMODE_BLOB_EXECUTABLE)
+    pkg.insert("link", raw.create_blob(b"mod.py"), pygit2.GIT_FILEMODE_LINK)
+    only = raw.TreeBuilder()
+    only.insert("single.txt", raw.create_blob(b"1\n"), pygit2.GIT_FILEMODE_BLOB)
+    root = raw.TreeBuilder(base)
+    root.insert("pkg", pkg.write(), pygit2.GIT_FILEMODE_TREE)
+    root.insert("only", only.write(), pygit2.GIT_FILEMODE_TREE)
+    sig = pygit2.Signature("Test", "test@test.com")
+    head = repo.get_branch_head("master")
+    raw.create_commit("refs/heads/master", sig, sig, "nested", root.write(), [head.id])
+    return repo
+
+
+def _tree(repo, oid):
+    tree = repo.repo[oid]
+    assert isinstance(tree, pygit2.Tree)
+    return tree
+
+
+def test_changes_keep_filemodes(repo):
+    oid = repo.create_tree_from_changes(
+        "master", {"pkg/run.sh": "#!/bin/sh\necho\n", "pkg/link": "other", "pkg/new.py": ""}
+    )
+    tree = _tree(repo, oid)
+    assert tree["pkg/run.sh"].filemode == pygit2.GIT_FILEMODE_BLOB_EXECUTABLE
+    assert tree["pkg/link"].filemode == pygit2.GIT_FILEMODE_LINK
+    assert tree["pkg/new.py"].filemode == pygit2.GIT_FILEMODE_BLOB
+    assert tree["pkg/mod.py"].filemode == pygit2.GIT_FILEMODE_BLOB
+
+
+def test_unchanged_content_returns_base_tree(repo):
+    base = repo.get_branch_head("master").tree
+    oid = repo.create_tree_from_changes(
+        "master", {"pkg/mod.py": "x = 1\n"}, {"missing.txt", "nodir/missing.txt"}
+    )
+    assert oid == base.id
+
+
+def test_untouched_subtrees_are_reused(repo):
+    base = repo.get_branch_head("master").tree
+    oid = repo.create_tree_from_changes("master", {"README": "changed\n"})
+    tree = _tree(repo, oid)
+    assert tree["pkg"].id == base["pkg"].id
+    assert tree["only"].id == base["only"].id
+
+
+def test_deletions(repo):
+    oid = repo.create_tree_from_changes("master", {}, {"pkg/mod.py", "only/single.txt"})
+    tree = _tree(repo, oid)
+    assert "pkg/mod.py" not in tree
+    assert "pkg/run.sh" in tree
+    # Emptied directories are dropped rather than left as empty trees
+    assert "only" not in tree
+
+
+def test_deleting_everything(repo):
+    oid = repo.create_tree_from_changes(
+        "master",
+        {},
+        {"README", "pkg/mod.py", "pkg/run.sh", "pkg/link", "only/single.txt"},
+    )
+    assert len(_tree(repo, oid)) == 0
+
+
+def test_binary_changes_and_new_directories(repo):
+    oid = repo.create_tree_from_changes(
+        "master", {"a/b/c.txt": "deep\n"}, binary_changes={"img/logo.png": b"\x89PNG"}
+    )
+    tree = _tree(repo, oid)
+    assert tree["a/b/c.txt"].data == b"deep\n"
+    assert tree["img/logo.png"].data == b"\x89PNG"
+
+
+def test_amend_uses_the_same_builder(repo):
+    commit_oid = repo.amend_commit("master", {"pkg/run.sh": "#!/bin/sh\nexit 1\n"})
+    tree = repo.repo[commit_oid].tree
+    assert tree["pkg/run.sh"].filemode == pygit2.GIT_FILEMODE_BLOB_EXECUTABLE
+
+
+def test_directory_replaced_by_file(repo):
+    oid = repo.create_tree_from_changes("master", {"only": "now a file\n"}, {"only/single.txt"})
+    tree = _tree(repo, oid)
+    assert tree["only"].filemode == pygit2.GIT_FILEMODE_BLOB
+    assert tree["only"].data == b"now a file\n"
+
+
+def test_file_replaced_by_directory(repo):
+    oid = repo.create_tree_from_changes("master", {"README/notes.txt": "moved\n"}, {"README"})
+    tree = _tree(repo, oid)
+    assert tree["README"].filemode == pygit2.GIT_FILEMODE_TREE
+    assert tree["README/notes.txt"].data == b"moved\n"
@@ -0,0 +1,95 @@
+"""Tests for the memoized flat tree index (forge/vfs/tree_index.py) and the
+VFS listings built on it."""
+
+import pygit2
+import pytest
+
+from forge.vfs import tree_index
+from forge.vfs.tree_index import get_tree_index
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+# Names chosen so git's tree order ("a" sorts as "a/") differs from a naive
+# per-directory name sort
+FILES = {
+    "a-b.txt": "1\n",
+    "a.txt": "2\n",
+    "a/x.py": "3\n",
+    "a/sub/y.py": "4\n",
+    "b/logo.png": b"\x89PNG",
+    "run.sh": "#!/bin/sh\n",
+}
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    vfs = WorkInProgressVFS(bootstrap_repo(tmp_path, {"README": "hi\n"}), "master")
+    for path, content in FILES.items():
+        if isinstance(content, bytes):
+            vfs.write_file_bytes(path, content)
+        else:
+            vfs.write_file(path, content)
+    vfs.commit("add files")
+    return vfs
+
+
+def test_listing_is_sorted_without_sorting(vfs):
+    expected = sorted([*FILES, "README"])
+    assert vfs.base_vfs.list_all_files() == expected
+    assert vfs.base_vfs.list_files() == [p for p in expected if p != "b/logo.png"]
+
+
+def test_index_has_modes_and_oids(vfs):
+    repo = vfs.get_git_repository()
+    index = get_tree_index(repo, vfs.base_vfs.tree.id)
+    mode, oid = index.lookup("a/sub/y.py")
+    assert mode == pygit2.GIT_FILEMODE_BLOB
+    assert oid == vfs.get_blob_oid("a/sub/y.py")
+    assert index.lookup("a/sub") is None
+    assert index.lookup("missing") is None
+
+
+def test_submodules_are_skipped(vfs):
+    repo = vfs.get_git_repository()
+    builder = repo.TreeBuilder(vfs.base_vfs.tree)
+    builder.insert("vendored", pygit2.Oid(hex="1" * 40), pygit2.GIT_FILEMODE_COMMIT)
+    index = get_tree_index(repo, builder.write())
+    assert "vendored" not in index.paths
+    assert len(index) == len(FILES) + 1
+
+
+def test_unchanged_subtrees_are_reused(vfs, monkeypatch):
+    repo = vfs.get_git_repository()
+    get_tree_index(repo, vfs.base_vfs.tree.id)
+
+    built = []
+    original = tree_index._build
+
+    def tracking_build(repo, tree):
+        built.append(tree.id)
+        return original(repo, tree)
+
+    monkeypatch.setattr(tree_index, "_build", tracking_build)
+    vfs.write_file("b/new.txt", "new\n")
+    vfs.commit("add b/new.txt")
+
+    assert "b/new.txt" in vfs.list_all_files()
+    new_tree = vfs.base_vfs.tree
+    assert built == [new_tree.id, new_tree["b"].id]
+
+
+def test_pending_changes_are_merged_in_order(vfs):
+    vfs.write_file("a/new.py", "5\n")
+    vfs.write_file_bytes("z.png", b"\x89PNG")
+    vfs.write_file("a.txt", "changed\n")
+    vfs.delete_file("a-b.txt")
+
+    expected = sorted(({*FILES, "README", "a/new.py", "z.png"}) - {"a-b.txt"})
+    assert vfs.list_all_files() == expected
+    assert vfs.list_files() == [p for p in expected if not p.endswith(".png")]
+
+
+def test_listings_are_copies(vfs):
+    vfs.list_all_files().clear()
+    vfs.base_vfs.list_files().clear()
+    assert len(vfs.list_all_files()) == len(FILES) + 1
@@ -0,0 +1,131 @@
+"""Tests for the blob trigram index that narrows grep searches
+(forge/vfs/trigram_index.py)."""
+
+import re
+
+import pytest
+
+from forge.tools.builtin import grep_context, grep_open
+from forge.vfs.search_engine import plan_search
+from forge.vfs.trigram_index import (
+    CompiledQuery,
+    TrigramIndex,
+    build_bitmap,
+    compile_query,
+    get_trigram_index,
+    narrow_candidates,
+)
+from forge.vfs.work_in_progress import WorkInProgressVFS
+from tests.harness.repo import bootstrap_repo
+
+FILES = {
+    "alpha.py": "def alpha():\n    return compute_total(1)\n",
+    "beta.py": "class Beta:\n    pass\n",
+    "gamma.py": "import os\nprint(os.getcwd())\n",
+    "notes.md": "The Kelvin scale.\n",
+}
+
+
+@pytest.fixture
+def vfs(tmp_path):
+    return WorkInProgressVFS(bootstrap_repo(tmp_path, FILES), "master")
+
+
+def _trigrams(query):
+    return [sorted(t.decode() for t in alternative) for alternative in query]
+
+
+class TestCompileQuery:
+    def test_literal(self):
+        assert _trigrams(compile_query(re.compile("Beta"))) == [["bet", "eta"]]
+
+    def test_alternation(self):
+        query = compile_query(re.compile("alpha|gamma"))
+        assert _trigrams(query) == [["alp", "lph", "pha"], ["amm", "gam", "mma"]]
+
+    def test_literal_runs_split_by_classes(self):
+        query = compile_query(re.compile(r"def \w+\(self\)"))
+        assert _trigrams(query) == [["(se", "def", "ef ", "elf", "lf)", "sel"]]
+
+    def test_optional_parts_are_not_required(self):
+        assert compile_query(re.compile("(?:foo)?ba")) is None
+
+    def test_no_literal_text(self):
+        assert compile_query(re.compile(r"\w+\s*=")) is None
+
+    def test_ignorecase_skips_letters_with_unicode_folds(self):
+        # 'k' also matches KELVIN SIGN and 'i' DOTLESS I under IGNORECASE,
+        # so only the run between them is usable
+        query = compile_query(re.compile("kelvin", re.IGNORECASE))
+        assert _trigrams(query) == [["elv"]]
+
+
+def test_bitmap_has_no_false_negatives():
+    data = b"The quick brown fox jumps over the lazy dog"
+    bits_log2, bitmap = build_bitmap(data)
+    for i in range(len(data) - 2):
+        query = compile_query(re.compile(re.escape(data[i : i + 3].decode())))
+        assert query is not None
+        assert CompiledQuery(query).matches(bits_log2, bitmap)
+
+
+def _warm(vfs):
+    """Index the repository's blobs, as the first search does in the background."""
+    narrow_candidates(vfs, vfs.list_files(), re.compile("warm up"))
+    assert get_trigram_index(vfs.get_git_repository()).wait_until_built(timeout=10)
+
+
+def test_cold_index_scans_everything_and_builds_in_background(vfs):
+    files = vfs.list_files()
+
+    assert narrow_candidates(vfs, files, re.compile("compute_total")) == files
+    assert get_trigram_index(vfs.get_git_repository()).wait_until_built(timeout=10)
+    assert narrow_candidates(vfs, files, re.compile("compute_total")) == ["alpha.py"]
+
+
+def test_case_insensitive_search(vfs):
+    _warm(vfs)
+    candidates = narrow_candidates(vfs, vfs.list_files(), re.compile("BETA", re.IGNORECASE))
+    assert candidates == ["beta.py"]
+
+
+def test_pending_changes_are_always_candidates(vfs):
+    _warm(vfs)
+    vfs.write_file("gamma.py", "compute_total = 3\n")
+    vfs.write_file("delta.py", "nothing here\n")
+    candidates = narrow_candidates(vfs, vfs.list_files(), re.compile("compute_total"))
+    assert candidates == ["alpha.py", "delta.py", "gamma.py"]
+
+
+def test_narrow_plan(vfs):
+    _warm(vfs)
+    vfs.write_file("delta.py", "nothing here\n")
+    plan = plan_search(vfs, vfs.list_files())
+
+    narrowed = get_trigram_index(vfs.get_git_repository()).narrow_plan(
+        plan, re.compile("compute_total")
+    )
+
+    assert [s.filepath for s in narrowed.sources] == ["alpha.py", "delta.py"]
+
+
+def test_index_persists_across_instances(vfs, tmp_path):
+    _warm(vfs)
+    path = tmp_path / ".git" / "forge" / "trigrams.idx"
+    assert path.exists()
+
+    fresh = TrigramIndex(path)
+    oid = vfs.get_blob_oid("alpha.py")
+    assert oid is not None
+    assert fresh.get(oid) == build_bitmap(FILES["alpha.py"].encode())
+
+
+def test_grep_results_are_unchanged(vfs):
+    vfs.write_file("new.py", "x = compute_total(2)\n")
+
+    result = grep_open.execute(vfs, {"pattern": r"compute_\w+\("})
+    assert result["add"] == ["alpha.py", "new.py"]
+
+    result = grep_context.execute(vfs, {"pattern": "getcwd", "context_before": 0})
+    assert result["total_matches"] == 1
+    assert "gamma.py:2" in result["output"]
@@ -2,18 +2,55 @@
 Run make check (format + typecheck + lint) on the current VFS state.
 
 This tool:
-1. Materializes the VFS to a temp directory
-2. Runs `make format` then `make typecheck` then `make lint-check`
-3. Reads back any files modified by formatting and updates the VFS
+1. Materializes the VFS to disk
+2. Runs `make format`, then `make typecheck` and `make lint-check` concurrently
+3. Takes any files modified by formatting back into the VFS (see
+   forge.vfs.materialize.write_back; only files whose stat changed are read)
 4. Returns errors and a list of files that were auto-formatted
+
+mypy and ruff keep their caches in a per-repository, per-branch directory
+under ~/.cache/forge/check/ (via MYPY_CACHE_DIR and RUFF_CACHE_DIR) rather
+than in the materialized tree, so repeated checks are incremental even
+across Forge restarts. The materialized tree only rewrites changed files, so
+mtimes of everything else stay put and both tools skip them.
+
+Commands run through forge.tools.process_runner, so their output streams to
+the UI, long output is cut down to its head, tail and error lines, and
+cancelling the session stops them.
+
+Setting "check_daemon": true in .forge/config.json additionally runs mypy
+through a long-lived dmypy daemon bound to the materialized directory
+(the Makefile's $(MYPY) is pointed at `dmypy run`). The daemon is the dmypy
+that belongs to the project's own $(MYPY), so it is the same mypy version;
+when there is none (no $(MYPY), or one this can't pair with a dmypy),
+typecheck runs as usual. The daemon exits after half an hour of inactivity
+or when Forge does.
 """
 
+import atexit
+import contextvars
+import dataclasses
+import hashlib
+import json
+import os
 import re
+import shlex
+import shutil
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
 
+from forge.tools.process_runner import (
+    CommandResult,
+    ResourceLimits,
+    read_resource_limits,
+    run_command,
+)
 from forge.tools.side_effects import SideEffect
+from forge.vfs.materialize import write_back
 
 if TYPE_CHECKING:
     from forge.vfs.work_in_progress import WorkInProgressVFS
@@ -59,11 +96,136 @@ Call this before finishing to ensure your code passes all checks.""",
     }
 
 
+# Idle time after which a dmypy daemon shuts itself down
+_DAEMON_TIMEOUT_S = 1800
+
+# Status files of daemons started by this process, and the dmypy command
+# each was started with; stopped at exit
+_daemons: dict[Path, list[str]] = {}
+_daemons_lock = threading.Lock()
+
+# Appended to the project's Makefile to print what $(MYPY) expands to
+_PRINT_MYPY = "forge-print-mypy:\n\t$(if $(filter undefined,$(origin MYPY)),,$(info $(MYPY)))\n"
+
+
+def _cache_dir(vfs: "WorkInProgressVFS") -> Path:
+    """Persistent tool-cache directory for this repository and branch."""
+    git_dir = vfs.repo.repo.path
+    repo_key = hashlib.sha1(git_dir.encode("utf-8")).hexdigest()[:12]
+    repo_name = Path(git_dir.rstrip("/")).parent.name or "repo"
+    xdg_cache = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    path = (
+        xdg_cache / "forge" / "check" / f"{repo_name}-{repo_key}" / quote(vfs.branch_name, safe="")
+    )
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _daemon_enabled(vfs: "WorkInProgressVFS") -> bool:
+    """Whether .forge/config.json opts into the dmypy daemon ("check_daemon")."""
+    try:
+        config = json.loads(vfs.read_file(".forge/config.json"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return isinstance(config, dict) and config.get("check_daemon") is True
+
+
+def _daemon_status_file(cache_dir: Path, root: Path) -> Path:
+    """Status file of the daemon serving one materialized directory.
+
+    Keyed by the directory too: a daemon's module paths are absolute, so one
+    started for another directory (an earlier Forge process) can't be reused.
+    """
+    root_key = hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:12]
+    return cache_dir / f"dmypy-{root_key}.json"
+
+
+def _dmypy_command(cwd: Path, env: dict[str, str]) -> list[str] | None:
+    """The dmypy client matching the project's $(MYPY), or None if there is none.
+
+    ``python -m mypy`` becomes ``python -m mypy.dmypy`` with the same
+    interpreter; a ``mypy`` executable becomes the ``dmypy`` next to it.
+    """
+    # The makefile plain `make` would read
+    makefile = next(
+        (name for name in ("GNUmakefile", "makefile", "Makefile") if (cwd / name).is_file()), None
+    )
+    if makefile is None:
+        return None
+    try:
+        result = subprocess.run(
+            ["make", "-s", "--no-print-directory", "-f", makefile, "-f", "-", "forge-print-mypy"],
+            cwd=cwd,
+            env=env,
+            input=_PRINT_MYPY,
+            capture_output=True,
+            text=True,
+            timeout=30,
+            check=False,
+        )
+        mypy = shlex.split(result.stdout.strip()) if result.returncode == 0 else []
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return None
+    if len(mypy) >= 3 and mypy[-2:] == ["-m", "mypy"]:
+        return [*mypy[:-1], "mypy.dmypy"]
+    if len(mypy) != 1 or os.path.basename(mypy[0]) != "mypy":
+        return None
+    executable = mypy[0] if "/" in mypy[0] else shutil.which(mypy[0], path=env.get("PATH"))
+    if executable is None:
+        return None
+    dmypy = cwd / os.path.dirname(executable) / "dmypy"
+    return [str(dmypy)] if os.access(dmypy, os.X_OK) else None
+
+
+@atexit.register
+def _stop_daemons() -> None:
+    with _daemons_lock:
+        for status_file, dmypy in _daemons.items():
+            subprocess.run(
+                [*dmypy, "--status-file", str(status_file), "stop"],
+                capture_output=True,
+                timeout=30,
+                check=False,
+            )
+        _daemons.clear()
+
+
+def _make_env(cache_dir: Path) -> dict[str, str]:
+    env = dict(os.environ)
+    env["MYPY_CACHE_DIR"] = str(cache_dir / "mypy")
+    env["RUFF_CACHE_DIR"] = str(cache_dir / "ruff")
+    return env
+
+
+def _run_make(
+    target: str, cwd: Path, env: dict[str, str], make_vars: list[str], limits: ResourceLimits
+) -> CommandResult:
+    return run_command(["make", target, *make_vars], cwd, env=env, limits=limits, label=target)
+
+
 def execute(vfs: "WorkInProgressVFS", args: dict[str, Any]) -> dict[str, Any]:
     """Run make check and incorporate formatting changes"""
     
-    # Materialize VFS to temp directory
+    # Materialize VFS to disk (a persistent per-branch directory, synced
+    # incrementally - left in place for the next call)
     tmpdir = vfs.materialize_to_tempdir()
+
+    cache_dir = _cache_dir(vfs)
+    env = _make_env(cache_dir)
+    limits = read_resource_limits(vfs)
+    typecheck_vars: list[str] = []
+    typecheck_limits = limits
+    dmypy = _dmypy_command(tmpdir, env) if _daemon_enabled(vfs) else None
+    if dmypy is not None:
+        status_file = _daemon_status_file(cache_dir, tmpdir)
+        with _daemons_lock:
+            _daemons[status_file] = dmypy
+        daemon_run = [*dmypy, "--status-file", str(status_file), "run"]
+        typecheck_vars.append(
+            "MYPY=" + shlex.join([*daemon_run, "--timeout", str(_DAEMON_TIMEOUT_S), "--"])
+        )
+        # The daemon outlives the command and would use up a CPU-time limit
+        typecheck_limits = dataclasses.replace(limits, cpu_seconds=None)
     
     results: dict[str, Any] = {
         "success": True,
@@ -75,114 +237,104 @@ def execute(vfs: "WorkInProgressVFS", args: dict[str, Any]) -> dict[str, Any]:
         "lint_passed": False,
     }
     
-    try:
-        # Capture file contents before formatting
-        py_files = list(tmpdir.rglob("*.py"))
-        before_format: dict[str, str] = {}
-        for py_file in py_files:
-            rel_path = str(py_file.relative_to(tmpdir))
-            before_format[rel_path] = py_file.read_text(encoding="utf-8", errors="replace")
-        
-        # Run make format
-        format_result = subprocess.run(
-            ["make", "format"],
-            cwd=tmpdir,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
-        )
-        
-        # Check which files changed and update VFS
-        formatted_files = []
-        format_diffs = {}
-        for py_file in py_files:
-            rel_path = str(py_file.relative_to(tmpdir))
-            if not py_file.exists():
-                continue
-            after_content = py_file.read_text(encoding="utf-8", errors="replace")
-            before_content = before_format.get(rel_path, "")
-            
-            if after_content != before_content:
-                formatted_files.append(rel_path)
-                # Update VFS with formatted content
-                vfs.write_file(rel_path, after_content)
-                # Generate a simple diff summary
-                format_diffs[rel_path] = _simple_diff(before_content, after_content)
-        
-        results["formatted_files"] = formatted_files
-        results["format_diffs"] = format_diffs
-        
-        # Run make typecheck
-        typecheck_result = subprocess.run(
-            ["make", "typecheck"],
-            cwd=tmpdir,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
+    # Run make format first: typecheck and lint must see the formatted files
+    format_result = _run_make("format", tmpdir, env, [], limits)
+    if format_result.cancelled:
+        return _cancelled(results)
+    
+    # Take the formatted files over into the VFS. Only files whose stat
+    # changed are read, not the whole tree.
+    formatted_files = []
+    format_diffs = {}
+    for change in write_back(vfs).written:
+        formatted_files.append(change.path)
+        format_diffs[change.path] = _simple_diff(change.before or "", change.after)
+    
+    results["formatted_files"] = formatted_files
+    results["format_diffs"] = format_diffs
+    
+    # Run make typecheck and make lint-check (not lint, since we already
+    # formatted) side by side; neither writes to the tree. Each worker runs in
+    # a copy of this context so the commands stream and can be cancelled.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        typecheck_future = pool.submit(
+            contextvars.copy_context().run,
+            _run_make,
+            "typecheck",
+            tmpdir,
+            env,
+            typecheck_vars,
+            typecheck_limits,
         )
-        results["typecheck_output"] = typecheck_result.stdout + typecheck_result.stderr
-        results["typecheck_passed"] = typecheck_result.returncode == 0
-        
-        # Run make lint-check (not lint, since we already formatted)
-        lint_result = subprocess.run(
-            ["make", "lint-check"],
-            cwd=tmpdir,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="replace",
+        lint_future = pool.submit(
+            contextvars.copy_context().run, _run_make, "lint-check", tmpdir, env, [], limits
         )
-        results["lint_output"] = lint_result.stdout + lint_result.stderr
-        results["lint_passed"] = lint_result.returncode == 0
-        
-        # Success means checks passed. Failure means checks failed.
-        checks_passed = results["typecheck_passed"] and results["lint_passed"]
-        results["success"] = checks_passed
-        
-        # Build error output if checks failed
-        if not checks_passed:
-            output_parts = []
-            if not results["typecheck_passed"]:
-                output_parts.append(results["typecheck_output"])
-            if not results["lint_passed"]:
-                output_parts.append(results["lint_output"])
-            results["error"] = "\n".join(output_parts)
-        
-        # Build summary message
-        summary_parts = []
-        if formatted_files:
-            summary_parts.append(f"Formatted {len(formatted_files)} files: {', '.join(formatted_files)}")
-        if results["typecheck_passed"]:
-            summary_parts.append("✓ Type check passed")
-        else:
-            summary_parts.append("✗ Type check failed")
-        if results["lint_passed"]:
-            summary_parts.append("✓ Lint passed")
-        else:
-            summary_parts.append("✗ Lint failed")
-        
-        results["summary"] = "\n".join(summary_parts)
-        
-        # Declare side effects
-        side_effects = [SideEffect.HAS_DISPLAY_OUTPUT]
-        
-        # Build display output for UI - always use summary for clean display
-        # The summary already has proper formatting with newlines
-        results["display_output"] = results["summary"]
-        
-        if formatted_files:
-            results["modified_files"] = formatted_files
-            side_effects.append(SideEffect.FILES_MODIFIED)
-        
-        results["side_effects"] = side_effects
-        
-    finally:
-        # Clean up temp directory
-        import shutil
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        typecheck_result = typecheck_future.result()
+        lint_result = lint_future.result()
+    if typecheck_result.cancelled or lint_result.cancelled:
+        return _cancelled(results)
+
+    results["typecheck_output"] = typecheck_result.stdout + typecheck_result.stderr
+    results["typecheck_passed"] = typecheck_result.returncode == 0
+
+    results["lint_output"] = lint_result.stdout + lint_result.stderr
+    results["lint_passed"] = lint_result.returncode == 0
+    
+    # Success means checks passed. Failure means checks failed.
+    checks_passed = results["typecheck_passed"] and results["lint_passed"]
+    results["success"] = checks_passed
+    
+    # Build error output if checks failed
+    if not checks_passed:
+        output_parts = []
+        if not results["typecheck_passed"]:
+            output_parts.append(results["typecheck_output"])
+        if not results["lint_passed"]:
+            output_parts.append(results["lint_output"])
+        results["error"] = "\n".join(output_parts)
+    
+    # Build summary message
+    summary_parts = []
+    if formatted_files:
+        summary_parts.append(f"Formatted {len(formatted_files)} files: {', '.join(formatted_files)}")
+    if results["typecheck_passed"]:
+        summary_parts.append("✓ Type check passed")
+    else:
+        summary_parts.append("✗ Type check failed")
+    if results["lint_passed"]:
+        summary_parts.append("✓ Lint passed")
+    else:
+        summary_parts.append("✗ Lint failed")
+    
+    results["summary"] = "\n".join(summary_parts)
     
+    # Declare side effects
+    side_effects = [SideEffect.HAS_DISPLAY_OUTPUT]
+    
+    # Build display output for UI - always use summary for clean display
+    # The summary already has proper formatting with newlines
+    results["display_output"] = results["summary"]
+    
+    if formatted_files:
+        results["modified_files"] = formatted_files
+        side_effects.append(SideEffect.FILES_MODIFIED)
+    
+    results["side_effects"] = side_effects
+    
+    return results
+
+
+def _cancelled(results: dict[str, Any]) -> dict[str, Any]:
+    """Finish `results` as a cancelled check."""
+    results["success"] = False
+    results["error"] = "Check cancelled"
+    results["summary"] = "✗ Check cancelled"
+    results["display_output"] = results["summary"]
+    results["side_effects"] = [SideEffect.HAS_DISPLAY_OUTPUT]
+    if results["formatted_files"]:
+        # Formatting already went into the VFS before the cancel
+        results["modified_files"] = results["formatted_files"]
+        results["side_effects"].append(SideEffect.FILES_MODIFIED)
     return results
 
 